@@ -32,6 +32,7 @@ from .products import (
     AdminProductBulkActionSerializer,
     AdminProductVariantSerializer,
     AdminProductVariantCreateSerializer,
+    AdminCatalogImportCreateSerializer,
 )
 from .orders import (
     AdminOrderItemSerializer,
@@ -134,6 +135,7 @@ __all__ = [
     'AdminProductBulkActionSerializer',
     'AdminProductVariantSerializer',
     'AdminProductVariantCreateSerializer',
+    'AdminCatalogImportCreateSerializer',
     # Orders
     'AdminOrderItemSerializer',
     'AdminOrderListSerializer',
@@ -10,7 +10,8 @@ from rest_framework import serializers
 from django.contrib.auth import get_user_model, authenticate
 from django.utils.translation import gettext_lazy as _
 from rest_framework_simplejwt.tokens import RefreshToken
-from admin_api.permissions import get_admin_role, get_user_permissions, AdminRoles
+from admin_api.permissions import AdminRoles
+from users.principal import principal_for
 
 User = get_user_model()
 
@@ -173,19 +174,27 @@ class AdminUserSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = fields
     
+    def _principal(self, obj):
+        """
+        Admin identity of obj, shared with the permission checks when obj is
+        the caller.
+        هوية الأدمن لـ obj، مشتركة مع فحوص الصلاحيات عندما يكون هو المستدعي.
+        """
+        return principal_for(obj, self.context.get('request'))
+    
     def get_role(self, obj):
         """
         Get admin role constant.
         الحصول على ثابت دور الأدمن.
         """
-        return get_admin_role(obj)
+        return self._principal(obj).admin_role
     
     def get_role_display(self, obj):
         """
         Get human-readable role name.
         الحصول على اسم الدور للعرض.
         """
-        role = get_admin_role(obj)
+        role = self._principal(obj).admin_role
         role_names = {
             AdminRoles.SUPER_ADMIN: _('مسؤول فائق / Super Admin'),
             AdminRoles.CONTENT_MANAGER: _('مدير محتوى / Content Manager'),
@@ -199,7 +208,7 @@ class AdminUserSerializer(serializers.ModelSerializer):
         Get list of permissions for admin.
         الحصول على قائمة صلاحيات الأدمن.
         """
-        return get_user_permissions(obj)
+        return list(self._principal(obj).admin_permissions)
     
     def get_full_name(self, obj):
         """
@@ -17,8 +17,10 @@ Author: Yalla Buy Team
 
 from rest_framework import serializers
 from django.utils.translation import gettext_lazy as _
+from django.db import transaction
 from django.utils import timezone
 
+from orders.checkout import release_coupons
 from orders.models import Order, OrderItem
 from products.models import ProductVariant
 
@@ -391,8 +393,14 @@ class AdminOrderStatusUpdateSerializer(serializers.Serializer):
         Update order status
         تحديث حالة الطلب
         """
-        instance.status = validated_data['status']
-        instance.save(update_fields=['status', 'updated_at'])
+        was_cancelled = instance.status == 'cancelled'
+        with transaction.atomic():
+            instance.status = validated_data['status']
+            instance.save(update_fields=['status', 'updated_at'])
+            # A cancellation gives the coupon use back
+            # الإلغاء يعيد استخدام الكوبون
+            if not was_cancelled and instance.status == 'cancelled':
+                release_coupons([instance])
         
         # TODO: Add status change history logging
         # TODO: إضافة تسجيل تاريخ تغيير الحالة
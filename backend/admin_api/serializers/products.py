@@ -9,6 +9,7 @@ This module contains serializers for managing products in the admin panel.
 from rest_framework import serializers
 from django.db import transaction
 from products.models import Product, ProductVariant, ProductImage, Category
+from products.serializers import CatalogImportUploadSerializer
 from vendors.models import Vendor
 
 
@@ -572,3 +573,26 @@ class AdminProductBulkActionSerializer(serializers.Serializer):
             )
         return value
 
+
+
+# =============================================================================
+# Catalog Import Serializer
+# مسلسل استيراد الكتالوج
+# =============================================================================
+
+class AdminCatalogImportCreateSerializer(CatalogImportUploadSerializer):
+    """
+    Admin Catalog Import Create Serializer
+    مسلسل إنشاء استيراد الكتالوج للإدارة
+    
+    Same as the vendor upload, plus the target vendor.
+    مثل رفع البائع، بالإضافة إلى البائع المستهدف.
+    """
+    
+    vendor_id = serializers.IntegerField(help_text="معرف البائع المستهدف")
+    
+    def validate_vendor_id(self, value):
+        """Validate vendor exists"""
+        if not Vendor.objects.filter(pk=value).exists():
+            raise serializers.ValidationError("البائع غير موجود / Vendor not found")
+        return value
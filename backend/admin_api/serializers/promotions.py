@@ -9,6 +9,7 @@ Author: Yalla Buy Team
 """
 
 from rest_framework import serializers
+from core.images import derivative_urls
 from promotions.models import Banner, Story, Coupon
 from products.models import Category, Product
 from users.models import User
@@ -31,9 +32,14 @@ class AdminBannerListSerializer(serializers.ModelSerializer):
     # Computed fields
     # الحقول المحسوبة
     image_url = serializers.SerializerMethodField()
+    image_derivatives = serializers.SerializerMethodField()
     is_currently_active = serializers.SerializerMethodField()
     location_display = serializers.CharField(source='get_location_display', read_only=True)
     link_type_display = serializers.CharField(source='get_link_type_display', read_only=True)
+    # Near-real-time counters (persisted + pending, see core.counters)
+    # عدادات شبه فورية (المحفوظ + المعلق)
+    views = serializers.IntegerField(source='live_views', read_only=True)
+    clicks = serializers.IntegerField(source='live_clicks', read_only=True)
     
     class Meta:
         model = Banner
@@ -44,6 +50,7 @@ class AdminBannerListSerializer(serializers.ModelSerializer):
             'subtitle',
             'subtitle_ar',
             'image_url',
+            'image_derivatives',
             'link_type',
             'link_type_display',
             'link',
@@ -70,6 +77,10 @@ class AdminBannerListSerializer(serializers.ModelSerializer):
             return obj.image.url
         return None
     
+    def get_image_derivatives(self, obj):
+        """Get resized image URLs / روابط النسخ المصغرة (None until generated)"""
+        return derivative_urls(obj, 'image', self.context.get('request'))
+    
     def get_is_currently_active(self, obj):
         """Check if banner is currently active / التحقق من أن البانر نشط حالياً"""
         return obj.is_currently_active()
@@ -85,9 +96,14 @@ class AdminBannerDetailSerializer(serializers.ModelSerializer):
     """
     
     image_url = serializers.SerializerMethodField()
+    image_derivatives = serializers.SerializerMethodField()
     is_currently_active = serializers.SerializerMethodField()
     location_display = serializers.CharField(source='get_location_display', read_only=True)
     link_type_display = serializers.CharField(source='get_link_type_display', read_only=True)
+    # Near-real-time counters (persisted + pending, see core.counters)
+    # عدادات شبه فورية (المحفوظ + المعلق)
+    views = serializers.IntegerField(source='live_views', read_only=True)
+    clicks = serializers.IntegerField(source='live_clicks', read_only=True)
     
     class Meta:
         model = Banner
@@ -99,6 +115,7 @@ class AdminBannerDetailSerializer(serializers.ModelSerializer):
             'subtitle_ar',
             'image',
             'image_url',
+            'image_derivatives',
             'link_type',
             'link_type_display',
             'link',
@@ -125,6 +142,10 @@ class AdminBannerDetailSerializer(serializers.ModelSerializer):
             return obj.image.url
         return None
     
+    def get_image_derivatives(self, obj):
+        """Get resized image URLs / روابط النسخ المصغرة (None until generated)"""
+        return derivative_urls(obj, 'image', self.context.get('request'))
+    
     def get_is_currently_active(self, obj):
         """Check if banner is currently active / التحقق من أن البانر نشط حالياً"""
         return obj.is_currently_active()
@@ -222,8 +243,12 @@ class AdminStoryListSerializer(serializers.ModelSerializer):
     """
     
     image_url = serializers.SerializerMethodField()
+    image_derivatives = serializers.SerializerMethodField()
     is_currently_active = serializers.SerializerMethodField()
     link_type_display = serializers.CharField(source='get_link_type_display', read_only=True)
+    # Near-real-time counter (persisted + pending, see core.counters)
+    # عداد شبه فوري (المحفوظ + المعلق)
+    views = serializers.IntegerField(source='live_views', read_only=True)
     
     class Meta:
         model = Story
@@ -232,6 +257,7 @@ class AdminStoryListSerializer(serializers.ModelSerializer):
             'title',
             'title_ar',
             'image_url',
+            'image_derivatives',
             'link_type',
             'link_type_display',
             'link',
@@ -254,6 +280,10 @@ class AdminStoryListSerializer(serializers.ModelSerializer):
             return obj.image.url
         return None
     
+    def get_image_derivatives(self, obj):
+        """Get resized image URLs / روابط النسخ المصغرة (None until generated)"""
+        return derivative_urls(obj, 'image', self.context.get('request'))
+    
     def get_is_currently_active(self, obj):
         """Check if story is currently active / التحقق من أن القصة نشطة حالياً"""
         return obj.is_currently_active()
@@ -269,8 +299,12 @@ class AdminStoryDetailSerializer(serializers.ModelSerializer):
     """
     
     image_url = serializers.SerializerMethodField()
+    image_derivatives = serializers.SerializerMethodField()
     is_currently_active = serializers.SerializerMethodField()
     link_type_display = serializers.CharField(source='get_link_type_display', read_only=True)
+    # Near-real-time counter (persisted + pending, see core.counters)
+    # عداد شبه فوري (المحفوظ + المعلق)
+    views = serializers.IntegerField(source='live_views', read_only=True)
     
     class Meta:
         model = Story
@@ -280,6 +314,7 @@ class AdminStoryDetailSerializer(serializers.ModelSerializer):
             'title_ar',
             'image',
             'image_url',
+            'image_derivatives',
             'link_type',
             'link_type_display',
             'link',
@@ -302,6 +337,10 @@ class AdminStoryDetailSerializer(serializers.ModelSerializer):
             return obj.image.url
         return None
     
+    def get_image_derivatives(self, obj):
+        """Get resized image URLs / روابط النسخ المصغرة (None until generated)"""
+        return derivative_urls(obj, 'image', self.context.get('request'))
+    
     def get_is_currently_active(self, obj):
         """Check if story is currently active / التحقق من أن القصة نشطة حالياً"""
         return obj.is_currently_active()
@@ -10,6 +10,18 @@ from rest_framework import serializers
 from django.utils.translation import gettext_lazy as _
 
 
+# =============================================================================
+# Detail Section Pagination Serializer
+# متسلسل تقسيم أقسام التفاصيل
+# =============================================================================
+
+class DetailPaginationSerializer(serializers.Serializer):
+    """Cursor pagination links of a report detail section"""
+    next = serializers.CharField(allow_null=True, help_text=_('رابط الصفحة التالية / Next page URL'))
+    previous = serializers.CharField(allow_null=True, help_text=_('رابط الصفحة السابقة / Previous page URL'))
+    page_size = serializers.IntegerField(help_text=_('حجم الصفحة / Page size'))
+
+
 # =============================================================================
 # Sales Report Serializer
 # متسلسل تقرير المبيعات
@@ -87,6 +99,10 @@ class SalesReportSerializer(serializers.Serializer):
         many=True,
         help_text=_('قائمة الطلبات التفصيلية / Detailed orders list')
     )
+    orders_pagination = DetailPaginationSerializer(
+        required=False,
+        help_text=_('تقسيم قائمة الطلبات (cursor) / Orders list pagination (cursor)')
+    )
     
     # Date range
     date_from = serializers.DateField(
@@ -252,6 +268,10 @@ class CommissionsReportSerializer(serializers.Serializer):
         many=True,
         help_text=_('قائمة العمولات التفصيلية / Detailed commissions list')
     )
+    commissions_pagination = DetailPaginationSerializer(
+        required=False,
+        help_text=_('تقسيم قائمة العمولات (cursor) / Commissions list pagination (cursor)')
+    )
     
     # Date range
     date_from = serializers.DateField(
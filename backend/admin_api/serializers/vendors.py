@@ -137,7 +137,7 @@ class AdminVendorListSerializer(serializers.ModelSerializer):
         
         from orders.models import OrderItem
         return OrderItem.objects.filter(
-            product_variant__product__vendor=obj
+            vendor=obj
         ).values('order').distinct().count()
     
     def get_total_revenue(self, obj) -> float:
@@ -152,7 +152,7 @@ class AdminVendorListSerializer(serializers.ModelSerializer):
         
         from orders.models import OrderItem
         result = OrderItem.objects.filter(
-            product_variant__product__vendor=obj,
+            vendor=obj,
             order__status__in=['confirmed', 'shipped', 'delivered']
         ).aggregate(
             total=Sum('price')
@@ -256,7 +256,7 @@ class AdminVendorDetailSerializer(serializers.ModelSerializer):
         """Get total orders count"""
         from orders.models import OrderItem
         return OrderItem.objects.filter(
-            product_variant__product__vendor=obj
+            vendor=obj
         ).values('order').distinct().count()
     
     def get_pending_orders_count(self, obj) -> int:
@@ -266,7 +266,7 @@ class AdminVendorDetailSerializer(serializers.ModelSerializer):
         """
         from orders.models import OrderItem
         return OrderItem.objects.filter(
-            product_variant__product__vendor=obj,
+            vendor=obj,
             order__status='pending'
         ).values('order').distinct().count()
     
@@ -274,7 +274,7 @@ class AdminVendorDetailSerializer(serializers.ModelSerializer):
         """Get total revenue"""
         from orders.models import OrderItem
         result = OrderItem.objects.filter(
-            product_variant__product__vendor=obj,
+            vendor=obj,
             order__status__in=['confirmed', 'shipped', 'delivered']
         ).aggregate(
             total=Sum('price')
@@ -293,7 +293,7 @@ class AdminVendorDetailSerializer(serializers.ModelSerializer):
         start_of_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
         
         result = OrderItem.objects.filter(
-            product_variant__product__vendor=obj,
+            vendor=obj,
             order__status__in=['confirmed', 'shipped', 'delivered'],
             order__created_at__gte=start_of_month
         ).aggregate(
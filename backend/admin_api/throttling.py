@@ -6,7 +6,7 @@ Admin API Throttling
 This file contains custom throttle classes for the Admin API.
 """
 
-from rest_framework.throttling import UserRateThrottle
+from core.throttling import UserRateThrottle
 from django.conf import settings
 
 
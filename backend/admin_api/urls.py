@@ -44,6 +44,8 @@ from admin_api.views import (
     AdminProductVariantDetailView,
     AdminProductImageListCreateView,
     AdminProductImageDetailView,
+    AdminCatalogImportView,
+    AdminCatalogImportDetailView,
     # Orders
     AdminOrderListView,
     AdminOrderDetailView,
@@ -279,6 +281,22 @@ products_urlpatterns = [
         name='bulk-action'
     ),
     
+    # GET, POST /api/v1/admin/products/import/
+    # رفع ملف استيراد الكتالوج وعرض المهام
+    path(
+        'import/',
+        AdminCatalogImportView.as_view(),
+        name='import-list-create'
+    ),
+    
+    # GET /api/v1/admin/products/import/{id}/
+    # حالة مهمة الاستيراد
+    path(
+        'import/<int:pk>/',
+        AdminCatalogImportDetailView.as_view(),
+        name='import-detail'
+    ),
+    
     # GET, PUT, DELETE /api/v1/admin/products/{id}/
     # تفاصيل، تحديث، حذف
     path(
@@ -33,6 +33,8 @@ from .products import (
     AdminProductVariantDetailView,
     AdminProductImageListCreateView,
     AdminProductImageDetailView,
+    AdminCatalogImportView,
+    AdminCatalogImportDetailView,
 )
 from .orders import (
     AdminOrderListView,
@@ -144,6 +146,8 @@ __all__ = [
     'AdminProductVariantDetailView',
     'AdminProductImageListCreateView',
     'AdminProductImageDetailView',
+    'AdminCatalogImportView',
+    'AdminCatalogImportDetailView',
     # Orders
     'AdminOrderListView',
     'AdminOrderDetailView',
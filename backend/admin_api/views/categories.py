@@ -30,7 +30,9 @@ from admin_api.serializers.categories import (
     AdminCategoryUpdateSerializer,
     AdminCategoryTreeSerializer,
 )
+from products.apps import CATALOG_CACHES
 from products.models import Category
+from core.cache import invalidate
 from core.utils import success_response, error_response
 from core.pagination import StandardResultsSetPagination
 
@@ -480,6 +482,10 @@ class AdminCategoryBulkActionView(APIView):
                 status_code=status.HTTP_400_BAD_REQUEST
             )
         
+        # update() skips the save signals: drop the storefront caches here
+        # update() لا يطلق إشارات الحفظ: نمسح كاش الواجهة هنا
+        invalidate(*CATALOG_CACHES)
+        
         return success_response(
             data={'affected': count, 'action': action},
             message=message
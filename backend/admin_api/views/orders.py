@@ -42,6 +42,7 @@ from admin_api.serializers.orders import (
     AdminOrderStatusUpdateSerializer,
     AdminOrderBulkActionSerializer,
 )
+from orders.checkout import release_coupons
 from orders.models import Order, OrderItem
 from core.utils import success_response, error_response
 from core.pagination import StandardResultsSetPagination
@@ -389,12 +390,21 @@ class AdminOrderBulkActionView(APIView):
             order_ids = serializer.validated_data['order_ids']
             target_status = serializer.validated_data['target_status']
             
-            # Update all orders
-            # تحديث جميع الطلبات
-            updated_count = Order.objects.filter(pk__in=order_ids).update(
-                status=target_status,
-                updated_at=timezone.now()
-            )
+            # Update all orders; cancelled ones give their coupon uses back
+            # تحديث جميع الطلبات؛ الملغاة تعيد استخدامات الكوبونات
+            with transaction.atomic():
+                cancelling = []
+                if target_status == 'cancelled':
+                    cancelling = list(
+                        Order.objects.filter(pk__in=order_ids, coupon__isnull=False)
+                        .exclude(status='cancelled')
+                        .select_for_update()
+                    )
+                updated_count = Order.objects.filter(pk__in=order_ids).update(
+                    status=target_status,
+                    updated_at=timezone.now()
+                )
+                release_coupons(cancelling)
             
             # Get action label for message
             # الحصول على تسمية العملية للرسالة
@@ -12,6 +12,9 @@ API Endpoints:
     PUT    /api/v1/admin/products/{id}/      - Update product
     DELETE /api/v1/admin/products/{id}/      - Delete product
     POST   /api/v1/admin/products/bulk-action/ - Bulk actions (activate, deactivate, delete)
+    GET    /api/v1/admin/products/import/      - List catalog import jobs
+    POST   /api/v1/admin/products/import/      - Upload a CSV/JSONL catalog for a vendor
+    GET    /api/v1/admin/products/import/{id}/ - Import job status and row errors
 """
 
 from rest_framework import status
@@ -34,8 +37,13 @@ from admin_api.serializers.products import (
     AdminProductVariantCreateSerializer,
     AdminProductImageSerializer,
     AdminProductImageCreateSerializer,
+    AdminCatalogImportCreateSerializer,
 )
-from products.models import Product, ProductVariant, ProductImage
+from products.models import Product, ProductVariant, ProductImage, CatalogImportJob
+from products.serializers import CatalogImportJobSerializer, CatalogImportJobListSerializer
+from products.apps import CATALOG_CACHES
+from products.catalog_import import start_import_job
+from core.cache import invalidate
 from core.utils import success_response, error_response
 from core.pagination import StandardResultsSetPagination
 
@@ -383,6 +391,10 @@ class AdminProductBulkActionView(APIView):
                 products.delete()
                 message = _(f'تم حذف {count} منتج / {count} products deleted')
             
+            # update() skips the save signals: drop the storefront caches here
+            # update() لا يطلق إشارات الحفظ: نمسح كاش الواجهة هنا
+            invalidate(*CATALOG_CACHES)
+            
             return success_response(
                 message=message,
                 data={'affected_count': count}
@@ -790,3 +802,123 @@ class AdminProductImageDetailView(APIView):
             message=_('تم حذف الصورة بنجاح / Image deleted successfully')
         )
 
+
+
+# =============================================================================
+# Catalog Import Views
+# عروض استيراد الكتالوج
+# =============================================================================
+
+class AdminCatalogImportView(APIView):
+    """
+    Upload a CSV/JSONL catalog for a vendor or list import jobs.
+    رفع كتالوج CSV/JSONL لبائع أو عرض مهام الاستيراد.
+    """
+    
+    permission_classes = [IsAdminUser]
+    parser_classes = [MultiPartParser, FormParser]
+    
+    @extend_schema(
+        summary='List Catalog Imports',
+        description='List catalog import jobs with optional vendor/status filters',
+        parameters=[
+            OpenApiParameter(name='vendor', type=int, description='Filter by vendor ID'),
+            OpenApiParameter(name='status', type=str, description='Filter by status (pending, processing, completed, failed)'),
+            OpenApiParameter(name='page', type=int, description='Page number'),
+            OpenApiParameter(name='page_size', type=int, description='Items per page'),
+        ],
+        responses={200: CatalogImportJobListSerializer(many=True)},
+        tags=['Admin Products'],
+    )
+    def get(self, request):
+        """
+        List import jobs.
+        عرض مهام الاستيراد.
+        """
+        queryset = CatalogImportJob.objects.select_related('vendor').order_by('-created_at')
+        
+        # Vendor filter
+        # فلتر البائع
+        vendor = request.query_params.get('vendor')
+        if vendor:
+            try:
+                queryset = queryset.filter(vendor_id=int(vendor))
+            except ValueError:
+                pass
+        
+        # Status filter
+        # فلتر الحالة
+        status_filter = request.query_params.get('status')
+        if status_filter:
+            queryset = queryset.filter(status=status_filter)
+        
+        paginator = StandardResultsSetPagination()
+        page = paginator.paginate_queryset(queryset, request)
+        serializer = CatalogImportJobListSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+    
+    @extend_schema(
+        summary='Upload Catalog Import',
+        description='Upload a CSV or JSONL catalog for a vendor; processed in the background',
+        request=AdminCatalogImportCreateSerializer,
+        responses={202: CatalogImportJobSerializer},
+        tags=['Admin Products'],
+    )
+    def post(self, request):
+        """
+        Create an import job.
+        إنشاء مهمة استيراد.
+        """
+        serializer = AdminCatalogImportCreateSerializer(data=request.data)
+        if not serializer.is_valid():
+            return error_response(
+                message=_('بيانات غير صالحة / Invalid data'),
+                errors=serializer.errors,
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
+        
+        with transaction.atomic():
+            job = CatalogImportJob.objects.create(
+                vendor_id=serializer.validated_data['vendor_id'],
+                uploaded_by=request.user,
+                file=serializer.validated_data['file'],
+                file_format=serializer.validated_data['file_format'],
+            )
+            start_import_job(job)
+        
+        job = CatalogImportJob.objects.select_related('vendor').get(pk=job.pk)
+        return success_response(
+            data=CatalogImportJobSerializer(job).data,
+            message=_('تم استلام ملف الاستيراد وجاري معالجته / Import file received and queued for processing'),
+            status_code=status.HTTP_202_ACCEPTED
+        )
+
+
+class AdminCatalogImportDetailView(APIView):
+    """
+    Get status, progress and per-row errors of an import job.
+    الحصول على حالة وتقدم وأخطاء صفوف مهمة الاستيراد.
+    """
+    
+    permission_classes = [IsAdminUser]
+    
+    @extend_schema(
+        summary='Get Catalog Import Status',
+        description='Get progress and per-row errors of an import job',
+        responses={200: CatalogImportJobSerializer},
+        tags=['Admin Products'],
+    )
+    def get(self, request, pk):
+        """
+        Get import job status.
+        الحصول على حالة مهمة الاستيراد.
+        """
+        try:
+            job = CatalogImportJob.objects.select_related('vendor').get(pk=pk)
+        except CatalogImportJob.DoesNotExist:
+            return error_response(
+                message=_('مهمة الاستيراد غير موجودة / Import job not found'),
+                status_code=status.HTTP_404_NOT_FOUND
+            )
+        
+        return success_response(data=CatalogImportJobSerializer(job).data)
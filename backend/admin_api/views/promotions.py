@@ -57,7 +57,7 @@ from admin_api.serializers.promotions import (
     AdminCouponUpdateSerializer,
     AdminPromotionStatsSerializer,
 )
-from promotions.models import Banner, Story, Coupon
+from promotions.models import Banner, Story, Coupon, BANNER_VIEWS, BANNER_CLICKS, STORY_VIEWS
 from core.utils import success_response, error_response
 from core.pagination import StandardResultsSetPagination
 
@@ -129,6 +129,11 @@ class AdminBannerListCreateView(APIView):
         paginator = StandardResultsSetPagination()
         paginated_queryset = paginator.paginate_queryset(queryset, request)
         
+        # Pending counter deltas for the whole page in one round trip
+        # الفروقات المعلقة للعدادات لكامل الصفحة دفعة واحدة
+        BANNER_VIEWS.prefetch(paginated_queryset)
+        BANNER_CLICKS.prefetch(paginated_queryset)
+        
         serializer = AdminBannerListSerializer(
             paginated_queryset,
             many=True,
@@ -387,6 +392,10 @@ class AdminStoryListCreateView(APIView):
         paginator = StandardResultsSetPagination()
         paginated_queryset = paginator.paginate_queryset(queryset, request)
         
+        # Pending counter deltas for the whole page in one round trip
+        # الفروقات المعلقة للعدادات لكامل الصفحة دفعة واحدة
+        STORY_VIEWS.prefetch(paginated_queryset)
+        
         serializer = AdminStoryListSerializer(
             paginated_queryset,
             many=True,
@@ -806,12 +815,11 @@ class AdminPromotionStatsView(APIView):
             end_date__lt=now
         ).count() if Banner.objects.filter(is_active=True).exists() else 0
         banners_inactive = banners_total - banners_active
-        banners_total_views = Banner.objects.aggregate(
-            total=Sum('views')
-        )['total'] or 0
-        banners_total_clicks = Banner.objects.aggregate(
-            total=Sum('clicks')
-        )['total'] or 0
+        # Persisted totals + pending counter deltas
+        # المجاميع المحفوظة + الفروقات المعلقة
+        banner_counts = Banner.objects.aggregate(views=Sum('views'), clicks=Sum('clicks'))
+        banners_total_views = (banner_counts['views'] or 0) + BANNER_VIEWS.pending_total()
+        banners_total_clicks = (banner_counts['clicks'] or 0) + BANNER_CLICKS.pending_total()
         
         # Story stats
         # إحصائيات القصص
@@ -822,9 +830,9 @@ class AdminPromotionStatsView(APIView):
         ).count()
         stories_inactive = Story.objects.filter(is_active=False).count()
         stories_expired = Story.objects.filter(expires_at__lte=now).count()
-        stories_total_views = Story.objects.aggregate(
-            total=Sum('views')
-        )['total'] or 0
+        stories_total_views = (
+            Story.objects.aggregate(total=Sum('views'))['total'] or 0
+        ) + STORY_VIEWS.pending_total()
         
         # Coupon stats
         # إحصائيات الكوبونات
@@ -37,6 +37,19 @@ from admin_api.serializers.reports import (
     CommissionsReportSerializer,
 )
 from core.utils import success_response, error_response
+from core.pagination import ReportCursorPagination
+from core.comparison import Window, compare, count, total
+
+
+# Order statuses counted as sales in reports
+# حالات الطلب المحسوبة كمبيعات في التقارير
+FULFILLED_STATUSES = ['delivered', 'confirmed', 'shipped']
+
+FULFILLED_ORDER_METRICS = {
+    'revenue': total('total'),
+    'orders': count(),
+    'commissions': total('platform_commission'),
+}
 
 
 # =============================================================================
@@ -88,6 +101,65 @@ def get_previous_period(date_from, date_to):
     return prev_date_from, prev_date_to
 
 
+def date_window(date_from, date_to):
+    """
+    Aware Window covering whole days date_from..date_to.
+    نافذة تغطي الأيام كاملة من date_from إلى date_to.
+    """
+    return Window(
+        timezone.make_aware(datetime.combine(date_from, datetime.min.time())),
+        timezone.make_aware(datetime.combine(date_to, datetime.max.time())),
+    )
+
+
+def fulfilled_orders_comparison(current):
+    """
+    Revenue / orders / commissions of fulfilled orders, current vs previous
+    window, in one query. Shared (and memoized) by the sales and commissions
+    reports so both report the same order counts.
+    
+    الإيرادات / الطلبات / العمولات للطلبات المنفذة، الحالية مقابل السابقة،
+    باستعلام واحد. مشترك بين تقريري المبيعات والعمولات.
+    """
+    from orders.models import Order
+    
+    return compare(
+        Order.objects.filter(status__in=FULFILLED_STATUSES),
+        FULFILLED_ORDER_METRICS,
+        current,
+        scope='admin:orders:fulfilled',
+    )
+
+
+def customer_display_name(order):
+    """
+    Customer name for report rows (needs select_related('user')).
+    اسم العميل لصفوف التقرير (يتطلب select_related('user')).
+    """
+    if order.customer_name:
+        return order.customer_name
+    if order.user:
+        return order.user.get_full_name() or order.user.email
+    return str(_('ضيف / Guest'))
+
+
+def paginate_details(queryset, request, view, paginate=True):
+    """
+    Cursor-paginate a report detail section.
+    تقسيم قسم التفاصيل في التقرير بالمؤشر.
+    
+    Returns:
+        tuple: (rows, pagination dict) - with paginate=False all rows of the
+               period are streamed in chunks and pagination is None
+    """
+    if not paginate:
+        rows = queryset.order_by(*ReportCursorPagination.ordering).iterator(chunk_size=2000)
+        return rows, None
+    paginator = ReportCursorPagination()
+    rows = paginator.paginate_queryset(queryset, request, view=view)
+    return rows, paginator.get_pagination_data()
+
+
 def calculate_change(current, previous):
     """
     Calculate percentage change.
@@ -136,6 +208,18 @@ class SalesReportView(APIView):
                 location=OpenApiParameter.QUERY,
                 description='End date (YYYY-MM-DD) for custom range',
             ),
+            OpenApiParameter(
+                name='cursor',
+                type=str,
+                location=OpenApiParameter.QUERY,
+                description='Detail list cursor (from the pagination next/previous links)',
+            ),
+            OpenApiParameter(
+                name='page_size',
+                type=int,
+                location=OpenApiParameter.QUERY,
+                description='Detail list page size (default 100, max 500)',
+            ),
         ],
         responses={
             200: SalesReportSerializer,
@@ -147,6 +231,31 @@ class SalesReportView(APIView):
         Get sales report.
         الحصول على تقرير المبيعات.
         """
+        data = self.build_report(request)
+        
+        # Serialize the data
+        serializer = SalesReportSerializer(data=data)
+        if serializer.is_valid():
+            return success_response(
+                data=serializer.validated_data,
+                message=_('تم جلب تقرير المبيعات / Sales report retrieved')
+            )
+        else:
+            # If validation fails, return data directly (shouldn't happen with calculated data)
+            return success_response(
+                data=data,
+                message=_('تم جلب تقرير المبيعات / Sales report retrieved')
+            )
+    
+    def build_report(self, request, paginate=True):
+        """
+        Build sales report data.
+        بناء بيانات تقرير المبيعات.
+        
+        Args:
+            paginate: Cursor-paginate the orders list (False returns the
+                      whole period, e.g. for the Word export)
+        """
         from orders.models import Order
         from django.contrib.auth import get_user_model
         
@@ -166,51 +275,38 @@ class SalesReportView(APIView):
         else:
             date_from, date_to = get_date_range(date_range)
         
-        # Convert to datetime for filtering
-        date_from_dt = timezone.make_aware(datetime.combine(date_from, datetime.min.time()))
-        date_to_dt = timezone.make_aware(datetime.combine(date_to, datetime.max.time()))
+        # Current window (the previous one has the same length, right before it)
+        # النافذة الحالية (السابقة بنفس الطول وقبلها مباشرة)
+        current = date_window(date_from, date_to)
+        date_from_dt, date_to_dt = current
         
-        # Get previous period for comparison
-        prev_date_from, prev_date_to = get_previous_period(date_from, date_to)
-        prev_date_from_dt = timezone.make_aware(datetime.combine(prev_date_from, datetime.min.time()))
-        prev_date_to_dt = timezone.make_aware(datetime.combine(prev_date_to, datetime.max.time()))
-        
-        # Current period orders
         current_orders = Order.objects.filter(
             created_at__gte=date_from_dt,
             created_at__lte=date_to_dt,
-            status__in=['delivered', 'confirmed', 'shipped']
+            status__in=FULFILLED_STATUSES
         )
         
-        # Previous period orders
-        previous_orders = Order.objects.filter(
-            created_at__gte=prev_date_from_dt,
-            created_at__lte=prev_date_to_dt,
-            status__in=['delivered', 'confirmed', 'shipped']
-        )
-        
-        # Calculate statistics
-        total_revenue = current_orders.aggregate(total=Sum('total'))['total'] or Decimal('0.00')
-        total_orders = current_orders.count()
+        # Revenue / orders for both periods in one query
+        # الإيرادات / الطلبات للفترتين باستعلام واحد
+        orders_comparison = fulfilled_orders_comparison(current)
+        total_revenue = orders_comparison.current['revenue']
+        total_orders = orders_comparison.current['orders']
         avg_order_value = (total_revenue / total_orders) if total_orders > 0 else Decimal('0.00')
         
-        # Previous period statistics
-        prev_revenue = previous_orders.aggregate(total=Sum('total'))['total'] or Decimal('0.00')
-        prev_orders = previous_orders.count()
+        prev_revenue = orders_comparison.previous['revenue']
+        prev_orders = orders_comparison.previous['orders']
         prev_avg_order_value = (prev_revenue / prev_orders) if prev_orders > 0 else Decimal('0.00')
         
-        # New users in period
-        new_users = User.objects.filter(
-            is_staff=False,
-            date_joined__gte=date_from_dt,
-            date_joined__lte=date_to_dt
-        ).count()
-        
-        prev_new_users = User.objects.filter(
-            is_staff=False,
-            date_joined__gte=prev_date_from_dt,
-            date_joined__lte=prev_date_to_dt
-        ).count()
+        # New users in both periods
+        # المستخدمون الجدد في الفترتين
+        users_comparison = compare(
+            User.objects.filter(is_staff=False),
+            {'new_users': count()},
+            current,
+            date_field='date_joined',
+            scope='admin:users:new',
+        )
+        new_users = users_comparison.current['new_users']
         
         # Daily sales
         daily_sales_data = current_orders.annotate(
@@ -238,10 +334,11 @@ class SalesReportView(APIView):
                 'sales': item['sales'] or Decimal('0.00')
             })
         
-        # Get detailed orders list
-        detailed_orders = current_orders.select_related('user').prefetch_related('items')[:100]  # Limit to 100 orders
+        # Detailed orders list: one annotated query per page (no per-order queries)
+        # قائمة الطلبات التفصيلية: استعلام واحد لكل صفحة (بدون استعلام لكل طلب)
+        detailed_orders = current_orders.select_related('user').annotate(items_count=Count('items'))
+        detailed_orders, pagination = paginate_details(detailed_orders, request, self, paginate)
         
-        orders_list = []
         status_display_map = {
             'pending': _('قيد الانتظار / Pending'),
             'confirmed': _('مؤكد / Confirmed'),
@@ -250,16 +347,17 @@ class SalesReportView(APIView):
             'cancelled': _('ملغي / Cancelled'),
         }
         
+        orders_list = []
         for order in detailed_orders:
             orders_list.append({
                 'id': order.id,
                 'order_number': order.order_number or f"ORD-{order.id:06d}",
-                'customer_name': order.customer_name or (order.user.get_full_name() if order.user else _('ضيف / Guest')),
-                'customer_phone': getattr(order, 'customer_phone', ''),
+                'customer_name': customer_display_name(order),
+                'customer_phone': order.customer_phone or '',
                 'status': order.status,
-                'status_display': status_display_map.get(order.status, order.status),
+                'status_display': str(status_display_map.get(order.status, order.status)),
                 'total': order.total,
-                'items_count': order.items.count() if hasattr(order, 'items') else 0,
+                'items_count': order.items_count,
                 'created_at': order.created_at,
             })
         
@@ -269,29 +367,19 @@ class SalesReportView(APIView):
             'total_orders': total_orders,
             'avg_order_value': avg_order_value,
             'new_users': new_users,
-            'revenue_change': calculate_change(float(total_revenue), float(prev_revenue)),
-            'orders_change': calculate_change(total_orders, prev_orders),
+            'revenue_change': orders_comparison.change('revenue'),
+            'orders_change': orders_comparison.change('orders'),
             'avg_order_value_change': calculate_change(float(avg_order_value), float(prev_avg_order_value)),
-            'new_users_change': calculate_change(new_users, prev_new_users),
+            'new_users_change': users_comparison.change('new_users'),
             'daily_sales': daily_sales,
             'orders': orders_list,
             'date_from': date_from,
             'date_to': date_to,
         }
+        if pagination is not None:
+            data['orders_pagination'] = pagination
         
-        # Serialize the data
-        serializer = SalesReportSerializer(data=data)
-        if serializer.is_valid():
-            return success_response(
-                data=serializer.validated_data,
-                message=_('تم جلب تقرير المبيعات / Sales report retrieved')
-            )
-        else:
-            # If validation fails, return data directly (shouldn't happen with calculated data)
-            return success_response(
-                data=data,
-                message=_('تم جلب تقرير المبيعات / Sales report retrieved')
-            )
+        return data
 
 
 # =============================================================================
@@ -581,6 +669,18 @@ class CommissionsReportView(APIView):
                 enum=['7days', '30days', '90days', 'year'],
                 default='30days'
             ),
+            OpenApiParameter(
+                name='cursor',
+                type=str,
+                location=OpenApiParameter.QUERY,
+                description='Detail list cursor (from the pagination next/previous links)',
+            ),
+            OpenApiParameter(
+                name='page_size',
+                type=int,
+                location=OpenApiParameter.QUERY,
+                description='Detail list page size (default 100, max 500)',
+            ),
         ],
         responses={
             200: CommissionsReportSerializer,
@@ -592,48 +692,59 @@ class CommissionsReportView(APIView):
         Get commissions report.
         الحصول على تقرير العمولات.
         """
+        data = self.build_report(request)
+        
+        # Serialize the data
+        serializer = CommissionsReportSerializer(data=data)
+        if serializer.is_valid():
+            return success_response(
+                data=serializer.validated_data,
+                message=_('تم جلب تقرير العمولات / Commissions report retrieved')
+            )
+        else:
+            # If validation fails, return data directly
+            return success_response(
+                data=data,
+                message=_('تم جلب تقرير العمولات / Commissions report retrieved')
+            )
+    
+    def build_report(self, request, paginate=True):
+        """
+        Build commissions report data.
+        بناء بيانات تقرير العمولات.
+        
+        Args:
+            paginate: Cursor-paginate the commissions list (False returns
+                      the whole period, e.g. for the Word export)
+        """
         from orders.models import Order
         
         date_range = request.query_params.get('date_range', '30days')
         date_from, date_to = get_date_range(date_range)
-        date_from_dt = timezone.make_aware(datetime.combine(date_from, datetime.min.time()))
-        date_to_dt = timezone.make_aware(datetime.combine(date_to, datetime.max.time()))
-        
-        # Get previous period
-        prev_date_from, prev_date_to = get_previous_period(date_from, date_to)
-        prev_date_from_dt = timezone.make_aware(datetime.combine(prev_date_from, datetime.min.time()))
-        prev_date_to_dt = timezone.make_aware(datetime.combine(prev_date_to, datetime.max.time()))
+        current = date_window(date_from, date_to)
+        date_from_dt, date_to_dt = current
         
-        # Current period commissions
         current_orders = Order.objects.filter(
             created_at__gte=date_from_dt,
             created_at__lte=date_to_dt,
-            status__in=['delivered', 'confirmed', 'shipped']
-        ).select_related('user').prefetch_related('items__product_variant__product__vendor')
+            status__in=FULFILLED_STATUSES
+        )
         
-        total_commissions = current_orders.aggregate(total=Sum('platform_commission'))['total'] or Decimal('0.00')
-        total_orders = current_orders.count()
+        # Commissions / orders for both periods in one query (shared with the sales report)
+        # العمولات / الطلبات للفترتين باستعلام واحد (مشترك مع تقرير المبيعات)
+        orders_comparison = fulfilled_orders_comparison(current)
+        total_commissions = orders_comparison.current['commissions']
+        total_orders = orders_comparison.current['orders']
         avg_commission_per_order = (total_commissions / total_orders) if total_orders > 0 else Decimal('0.00')
         
-        # Previous period commissions
-        previous_orders = Order.objects.filter(
-            created_at__gte=prev_date_from_dt,
-            created_at__lte=prev_date_to_dt,
-            status__in=['delivered', 'confirmed', 'shipped']
-        )
-        
-        prev_commissions = previous_orders.aggregate(total=Sum('platform_commission'))['total'] or Decimal('0.00')
+        # Detailed commissions list: vendor and customer come from joined
+        # rows (the order's vendor), one query per page
+        # قائمة العمولات التفصيلية: البائع والعميل من صفوف مرتبطة، استعلام واحد لكل صفحة
+        detailed_orders = current_orders.select_related('user', 'vendor')
+        detailed_orders, pagination = paginate_details(detailed_orders, request, self, paginate)
         
-        # Get detailed commissions list
         commissions_list = []
-        for order in current_orders[:100]:  # Limit to 100 orders
-            # Get vendor name from first order item
-            vendor_name = 'غير معروف'
-            if order.items.exists():
-                first_item = order.items.first()
-                if first_item and first_item.product_variant and first_item.product_variant.product:
-                    vendor_name = first_item.product_variant.product.vendor.name if first_item.product_variant.product.vendor else 'غير معروف'
-            
+        for order in detailed_orders:
             commission_percentage = 10.0  # Default commission percentage
             if order.subtotal > 0:
                 commission_percentage = float((order.platform_commission / order.subtotal) * 100)
@@ -641,8 +752,8 @@ class CommissionsReportView(APIView):
             commissions_list.append({
                 'order_id': order.id,
                 'order_number': order.order_number or f"ORD-{order.id:06d}",
-                'customer_name': order.customer_name or (order.user.get_full_name() if order.user else _('ضيف / Guest')),
-                'vendor_name': vendor_name,
+                'customer_name': customer_display_name(order),
+                'vendor_name': order.vendor.name if order.vendor else 'غير معروف',
                 'order_total': order.total,
                 'commission_amount': order.platform_commission,
                 'commission_percentage': round(commission_percentage, 2),
@@ -651,27 +762,17 @@ class CommissionsReportView(APIView):
         
         data = {
             'total_commissions': total_commissions,
-            'commissions_change': calculate_change(float(total_commissions), float(prev_commissions)),
+            'commissions_change': orders_comparison.change('commissions'),
             'total_orders': total_orders,
             'avg_commission_per_order': avg_commission_per_order,
             'commissions': commissions_list,
             'date_from': date_from,
             'date_to': date_to,
         }
+        if pagination is not None:
+            data['commissions_pagination'] = pagination
         
-        # Serialize the data
-        serializer = CommissionsReportSerializer(data=data)
-        if serializer.is_valid():
-            return success_response(
-                data=serializer.validated_data,
-                message=_('تم جلب تقرير العمولات / Commissions report retrieved')
-            )
-        else:
-            # If validation fails, return data directly
-            return success_response(
-                data=data,
-                message=_('تم جلب تقرير العمولات / Commissions report retrieved')
-            )
+        return data
 
 
 # =============================================================================
@@ -727,17 +828,11 @@ class ExportReportView(APIView):
         
         # Get report data based on type
         if report_type == 'sales':
-            # Get sales report data
+            # Get sales report data for the whole period (no pagination)
+            # بيانات تقرير المبيعات للفترة كاملة (بدون تقسيم)
             sales_view = SalesReportView()
             sales_view.request = request
-            sales_response = sales_view.get(request)
-            
-            if not sales_response.data.get('success'):
-                return error_response(
-                    message=_('فشل في جلب بيانات التقرير / Failed to retrieve report data')
-                )
-            
-            report_data = sales_response.data['data']
+            report_data = sales_view.build_report(request, paginate=False)
             doc = self._create_sales_word_document(report_data, date_range)
             
         elif report_type == 'products':
@@ -769,14 +864,7 @@ class ExportReportView(APIView):
         elif report_type == 'commissions':
             commissions_view = CommissionsReportView()
             commissions_view.request = request
-            commissions_response = commissions_view.get(request)
-            
-            if not commissions_response.data.get('success'):
-                return error_response(
-                    message=_('فشل في جلب بيانات التقرير / Failed to retrieve report data')
-                )
-            
-            report_data = commissions_response.data['data']
+            report_data = commissions_view.build_report(request, paginate=False)
             doc = self._create_commissions_word_document(report_data, date_range)
             
         else:
@@ -852,7 +940,7 @@ class ExportReportView(APIView):
         if data.get('orders') and len(data.get('orders', [])) > 0:
             doc.add_heading('قائمة الطلبات التفصيلية', 1).alignment = WD_ALIGN_PARAGRAPH.RIGHT
             
-            orders_table = doc.add_table(rows=min(len(data['orders']), 50) + 1, cols=6)
+            orders_table = doc.add_table(rows=len(data['orders']) + 1, cols=6)
             orders_table.style = 'Light Grid Accent 1'
             
             # Header
@@ -863,7 +951,7 @@ class ExportReportView(APIView):
             orders_table.rows[0].cells[4].text = 'الإجمالي'
             orders_table.rows[0].cells[5].text = 'التاريخ'
             
-            for i, order in enumerate(data['orders'][:50], 1):  # Limit to 50 orders in Word
+            for i, order in enumerate(data['orders'], 1):
                 orders_table.rows[i].cells[0].text = order.get('order_number', '')
                 orders_table.rows[i].cells[1].text = order.get('customer_name', '')
                 orders_table.rows[i].cells[2].text = order.get('status_display', order.get('status', ''))
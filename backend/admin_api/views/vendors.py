@@ -50,6 +50,8 @@ from admin_api.serializers.vendors import (
     AdminVendorBulkActionSerializer,
 )
 from vendors.models import Vendor
+from products.apps import CATALOG_CACHES
+from core.cache import invalidate
 from core.utils import success_response, error_response
 from core.pagination import StandardResultsSetPagination
 
@@ -353,14 +355,14 @@ class AdminVendorDetailView(APIView):
         # Check if vendor has products with OrderItems
         # التحقق من وجود منتجات للبائع مع OrderItems
         order_items_count = OrderItem.objects.filter(
-            product_variant__product__vendor=vendor
+            vendor=vendor
         ).count()
         
         if order_items_count > 0:
             # Get unique order count for better error message
             # الحصول على عدد الطلبات الفريدة لرسالة خطأ أفضل
             orders_count = OrderItem.objects.filter(
-                product_variant__product__vendor=vendor
+                vendor=vendor
             ).values('order').distinct().count()
             
             return error_response(
@@ -639,6 +641,9 @@ class AdminVendorBulkActionView(APIView):
                 is_active=is_active,
                 updated_at=timezone.now()
             )
+            # update() skips the save signals: drop the storefront caches here
+            # update() لا يطلق إشارات الحفظ: نمسح كاش الواجهة هنا
+            invalidate(*CATALOG_CACHES)
             
             action_label = 'تفعيل' if is_active else 'تعطيل'
             
@@ -0,0 +1,9 @@
+"""
+Analytics App
+تطبيق التحليلات
+
+This app ingests storefront events (product views, add-to-cart, banner and
+story impressions/clicks) and rolls them up into per-day counters.
+هذا التطبيق يستقبل أحداث واجهة المتجر (مشاهدات المنتجات، الإضافة للسلة،
+مشاهدات ونقرات البانرات والقصص) ويجمعها في عدادات يومية.
+"""
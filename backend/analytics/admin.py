@@ -0,0 +1,28 @@
+"""
+Analytics Admin
+إدارة التحليلات في لوحة Django Admin
+"""
+
+from django.contrib import admin
+
+from .models import DailyEventCount
+
+
+@admin.register(DailyEventCount)
+class DailyEventCountAdmin(admin.ModelAdmin):
+    """
+    Read-only view of the daily rollups (raw events are not listed: the
+    table is append-only and large).
+    عرض للقراءة فقط للعدادات اليومية (الأحداث الخام لا تُعرض لحجمها).
+    """
+
+    list_display = ['date', 'event_type', 'object_id', 'vendor', 'events', 'visitors']
+    list_filter = ['event_type', 'date']
+    list_select_related = ['vendor']
+    date_hierarchy = 'date'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
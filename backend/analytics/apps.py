@@ -0,0 +1,12 @@
+"""
+Analytics App Configuration
+إعدادات تطبيق التحليلات
+"""
+
+from django.apps import AppConfig
+
+
+class AnalyticsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'analytics'
+    verbose_name = 'Analytics'
@@ -0,0 +1,82 @@
+"""
+Event Buffer
+مخزن الأحداث المؤقت
+
+Incoming events are queued here and written to the database in batches.
+الأحداث الواردة تُوضع هنا في طابور وتُكتب في قاعدة البيانات على دفعات.
+
+- RedisEventBuffer: shared list in Redis (used when the cache is django-redis),
+  so every worker process feeds the same queue
+- MemoryEventBuffer: per-process list (development / no Redis)
+
+- RedisEventBuffer: قائمة مشتركة في Redis (عند استخدام django-redis)
+- MemoryEventBuffer: قائمة داخل العملية (التطوير / بدون Redis)
+
+Both expose push(events) -> queue length and pop(limit) -> events.
+"""
+
+import json
+import threading
+
+from core.redis_utils import redis_client, redis_key, uses_redis
+
+
+BUFFER_KEY = 'analytics:events'
+
+
+class MemoryEventBuffer:
+    """In-process event queue / طابور أحداث داخل العملية"""
+
+    def __init__(self):
+        self._events = []
+        self._lock = threading.Lock()
+
+    def push(self, events):
+        with self._lock:
+            self._events.extend(events)
+            return len(self._events)
+
+    def pop(self, limit):
+        with self._lock:
+            batch = self._events[:limit]
+            del self._events[:limit]
+            return batch
+
+    def __len__(self):
+        return len(self._events)
+
+
+class RedisEventBuffer:
+    """Redis list shared by all processes / قائمة Redis مشتركة بين العمليات"""
+
+    def __init__(self, client, key):
+        self.client = client
+        self.key = key
+
+    def push(self, events):
+        return self.client.rpush(self.key, *[json.dumps(event) for event in events])
+
+    def pop(self, limit):
+        # LRANGE + LTRIM in one MULTI so two flushers never get the same events
+        # LRANGE + LTRIM ضمن MULTI واحدة حتى لا يحصل منفذان على نفس الأحداث
+        pipe = self.client.pipeline(transaction=True)
+        pipe.lrange(self.key, 0, limit - 1)
+        pipe.ltrim(self.key, limit, -1)
+        raw, _ = pipe.execute()
+        return [json.loads(item) for item in raw]
+
+    def __len__(self):
+        return self.client.llen(self.key)
+
+
+_memory_buffer = MemoryEventBuffer()
+
+
+def get_buffer():
+    """
+    Event buffer for this deployment (Redis if configured, else in-process).
+    مخزن الأحداث لهذا النشر (Redis إن وُجد، وإلا داخل العملية).
+    """
+    if uses_redis():
+        return RedisEventBuffer(redis_client(), redis_key(BUFFER_KEY))
+    return _memory_buffer
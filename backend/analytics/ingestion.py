@@ -0,0 +1,276 @@
+"""
+Event Ingestion
+استقبال الأحداث
+
+Pipeline:
+1. record_events() pushes events to the buffer (no database write)
+2. When the buffer reaches ANALYTICS_FLUSH_SIZE events, or
+   ANALYTICS_FLUSH_INTERVAL seconds passed since the last flush, a
+   background flush pops batches and writes them with bulk_create
+3. rollup_day() recomputes the DailyEventCount rows of a day with one
+   GROUP BY query and one upsert
+
+The process_analytics_events command runs steps 2 and 3 from cron, so
+events left below the threshold are flushed and rollups stay current.
+
+المسار:
+1. record_events() تضع الأحداث في المخزن المؤقت (بدون كتابة في قاعدة البيانات)
+2. عند بلوغ حد الحجم أو مرور فترة التفريغ، يُفرغ المخزن في الخلفية على دفعات
+3. rollup_day() تعيد حساب العدادات اليومية باستعلام تجميع واحد و upsert واحد
+
+أمر process_analytics_events ينفذ الخطوتين 2 و 3 من cron.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from core.background import PeriodicFlush
+from core.redis_utils import setting
+
+from .buffer import get_buffer
+from .models import DailyEventCount, Event, EventType
+
+logger = logging.getLogger(__name__)
+
+
+# Model each event type's object_id refers to
+# النموذج الذي يشير إليه object_id لكل نوع حدث
+OBJECT_MODELS = {
+    EventType.PRODUCT_VIEW: 'products.Product',
+    EventType.ADD_TO_CART: 'products.Product',
+    EventType.PURCHASE: 'products.Product',
+    EventType.BANNER_VIEW: 'promotions.Banner',
+    EventType.BANNER_CLICK: 'promotions.Banner',
+    EventType.STORY_VIEW: 'promotions.Story',
+}
+
+
+# =============================================================================
+# Recording
+# التسجيل
+# =============================================================================
+
+def make_event(event_type, object_id, session_key, user_id=None, occurred_at=None):
+    """
+    Buffer payload for one event (JSON-serializable).
+    محتوى حدث واحد في المخزن (قابل للتحويل إلى JSON).
+    """
+    return {
+        'type': event_type,
+        'object_id': object_id,
+        'session': session_key,
+        'user_id': user_id,
+        'at': (occurred_at or timezone.now()).isoformat(),
+    }
+
+
+def record_events(events):
+    """
+    Queue events and schedule a flush when the buffer is due.
+    وضع الأحداث في الطابور وجدولة التفريغ عند الحاجة.
+
+    Args:
+        events: List of make_event() payloads
+    """
+    if not events:
+        return
+    size = get_buffer().push(events)
+    _flusher.poke(force=size >= setting('ANALYTICS_FLUSH_SIZE', 500))
+
+
+# =============================================================================
+# Flushing
+# التفريغ
+# =============================================================================
+
+def _object_owners(batch):
+    """
+    {model label: {pk: vendor_id}} for the objects referenced by a batch.
+    One query per referenced model; unknown ids are absent from the result.
+    """
+    ids = defaultdict(set)
+    for event in batch:
+        ids[OBJECT_MODELS[event['type']]].add(event['object_id'])
+
+    owners = {}
+    for label, pks in ids.items():
+        model = apps.get_model(label)
+        queryset = model.objects.filter(pk__in=pks)
+        if any(field.name == 'vendor' for field in model._meta.fields):
+            owners[label] = dict(queryset.values_list('pk', 'vendor_id'))
+        else:
+            owners[label] = dict.fromkeys(queryset.values_list('pk', flat=True))
+    return owners
+
+
+def write_events(batch):
+    """
+    Insert a batch of buffered events with bulk_create.
+    إدخال دفعة من الأحداث باستخدام bulk_create.
+
+    Events pointing to deleted / unknown objects are dropped.
+    الأحداث التي تشير إلى كائنات غير موجودة تُهمل.
+
+    Returns:
+        int: Number of rows inserted
+    """
+    owners = _object_owners(batch)
+    rows = []
+    for event in batch:
+        objects = owners[OBJECT_MODELS[event['type']]]
+        if event['object_id'] not in objects:
+            continue
+        rows.append(Event(
+            event_type=event['type'],
+            object_id=event['object_id'],
+            vendor_id=objects[event['object_id']],
+            user_id=event.get('user_id'),
+            session_key=event['session'],
+            occurred_at=parse_datetime(event['at']),
+        ))
+    Event.objects.bulk_create(rows, batch_size=setting('ANALYTICS_INSERT_BATCH_SIZE', 1000))
+    return len(rows)
+
+
+def write_isolating(batch):
+    """
+    Write a batch; when it fails, split it in halves to write the good
+    events and isolate the failing ones.
+    كتابة دفعة؛ عند فشلها تُقسم إلى نصفين لكتابة الأحداث السليمة وعزل الفاشلة.
+
+    A half of several events that fails entirely (e.g. the database is
+    down) is not probed further: the whole batch is reported failed.
+    النصف متعدد الأحداث الذي يفشل بالكامل لا يُفحص أكثر.
+
+    Returns:
+        tuple: (rows inserted, failed events)
+    """
+    try:
+        with transaction.atomic():
+            return write_events(batch), []
+    except Exception:
+        if len(batch) == 1:
+            logger.warning(f'Analytics event failed: {batch[0]}', exc_info=True)
+            return 0, batch
+    middle = len(batch) // 2
+    written, failed = write_isolating(batch[:middle])
+    if middle > 1 and len(failed) == middle:
+        return 0, batch
+    more, failed_more = write_isolating(batch[middle:])
+    return written + more, failed + failed_more
+
+
+def flush_events(limit=None):
+    """
+    Drain the buffer into the Event table.
+    تفريغ المخزن المؤقت في جدول الأحداث.
+
+    Failed events go back to the end of the buffer with attempts + 1 and
+    are dropped (logged) after ANALYTICS_MAX_ATTEMPTS, like the outbox, so
+    a bad event never blocks the events queued after it.
+    الأحداث الفاشلة تعود لنهاية المخزن مع زيادة المحاولات وتُهمل (مع التسجيل)
+    بعد ANALYTICS_MAX_ATTEMPTS، حتى لا يعطل حدث سيئ الأحداث التي بعده.
+
+    Args:
+        limit: Maximum number of events to drain (default: everything queued)
+
+    Returns:
+        int: Number of events written
+    """
+    buffer = get_buffer()
+    batch_size = setting('ANALYTICS_INSERT_BATCH_SIZE', 1000)
+    written = drained = 0
+    while limit is None or drained < limit:
+        batch = buffer.pop(batch_size if limit is None else min(batch_size, limit - drained))
+        if not batch:
+            break
+        drained += len(batch)
+        inserted, failed = write_isolating(batch)
+        written += inserted
+        if failed:
+            _requeue(buffer, failed)
+            # Stop here; the next flush retries after the newer events
+            # التوقف هنا؛ التفريغ التالي يعيد المحاولة بعد الأحداث الأحدث
+            break
+    return written
+
+
+def _requeue(buffer, failed):
+    """
+    Push failed events back (attempts + 1), dropping those out of attempts.
+    إعادة الأحداث الفاشلة (المحاولات + 1) وإهمال التي استنفدت محاولاتها.
+    """
+    max_attempts = setting('ANALYTICS_MAX_ATTEMPTS', 5)
+    retry, dropped = [], []
+    for event in failed:
+        event['attempts'] = event.get('attempts', 0) + 1
+        (retry if event['attempts'] < max_attempts else dropped).append(event)
+    if retry:
+        buffer.push(retry)
+        logger.error(f'Failed to write {len(retry)} analytics events; requeued')
+    if dropped:
+        logger.error(f'Dropped {len(dropped)} analytics events after {max_attempts} attempts: {dropped[:10]}')
+
+
+# One background flush per process at a time
+# تفريغ واحد في الخلفية لكل عملية في كل مرة
+_flusher = PeriodicFlush(flush_events, lambda: setting('ANALYTICS_FLUSH_INTERVAL', 5))
+
+
+# =============================================================================
+# Rollups
+# التجميعات اليومية
+# =============================================================================
+
+def rollup_day(day):
+    """
+    Recompute the DailyEventCount rows of one day (site timezone).
+    إعادة حساب العدادات اليومية ليوم واحد (بالمنطقة الزمنية للموقع).
+
+    Idempotent: running it again for the same day overwrites its rows.
+    يمكن تشغيلها عدة مرات لنفس اليوم دون تكرار.
+
+    Returns:
+        int: Number of counter rows written
+    """
+    tz = timezone.get_current_timezone()
+    start = datetime(day.year, day.month, day.day, tzinfo=tz)
+    end = start + timedelta(days=1)
+
+    rows = (
+        Event.objects
+        .filter(occurred_at__gte=start, occurred_at__lt=end)
+        .values('event_type', 'object_id')
+        .annotate(
+            total=Count('id'),
+            unique_visitors=Count('session_key', distinct=True),
+            owner=Max('vendor'),
+        )
+        .order_by()
+    )
+    counts = [
+        DailyEventCount(
+            date=day,
+            event_type=row['event_type'],
+            object_id=row['object_id'],
+            vendor_id=row['owner'],
+            events=row['total'],
+            visitors=row['unique_visitors'],
+        )
+        for row in rows
+    ]
+    DailyEventCount.objects.bulk_create(
+        counts,
+        batch_size=setting('ANALYTICS_INSERT_BATCH_SIZE', 1000),
+        update_conflicts=True,
+        unique_fields=['date', 'event_type', 'object_id'],
+        update_fields=['vendor', 'events', 'visitors', 'updated_at'],
+    )
+    return len(counts)
@@ -0,0 +1,70 @@
+"""
+Process Analytics Events Command
+أمر معالجة أحداث التحليلات
+
+Flushes buffered events into the Event table and recomputes the daily
+rollups. Run it from cron every few minutes.
+
+يفرغ الأحداث المخزنة مؤقتاً في جدول الأحداث ويعيد حساب العدادات اليومية.
+يُشغّل من cron كل بضع دقائق.
+
+Note: without Redis the buffer lives inside each server process, so this
+command only sees its own (empty) buffer; the servers flush themselves.
+ملاحظة: بدون Redis المخزن داخل كل عملية خادم، والخوادم تفرغه بنفسها.
+
+Usage:
+    python manage.py process_analytics_events
+    python manage.py process_analytics_events --days 7
+    python manage.py process_analytics_events --date 2026-10-01
+    python manage.py process_analytics_events --no-rollup
+"""
+
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from analytics.ingestion import flush_events, rollup_day
+
+
+class Command(BaseCommand):
+    help = 'Flush buffered analytics events and roll them up per day / تفريغ وتجميع أحداث التحليلات'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=2,
+            help='Roll up this many days ending today (default: 2, today and yesterday)',
+        )
+        parser.add_argument(
+            '--date',
+            help='Roll up only this day (YYYY-MM-DD)',
+        )
+        parser.add_argument(
+            '--no-rollup',
+            action='store_true',
+            help='Only flush the buffer',
+        )
+
+    def handle(self, *args, **options):
+        written = flush_events()
+        self.stdout.write(f'Flushed {written} event(s)')
+
+        if options['no_rollup']:
+            return
+
+        if options['date']:
+            try:
+                days = [date.fromisoformat(options['date'])]
+            except ValueError:
+                raise CommandError('--date must be YYYY-MM-DD')
+        else:
+            today = timezone.localdate()
+            days = [today - timedelta(days=offset) for offset in range(options['days'] - 1, -1, -1)]
+
+        for day in days:
+            rows = rollup_day(day)
+            self.stdout.write(f'  {day}: {rows} counter row(s)')
+
+        self.stdout.write(self.style.SUCCESS(f'Rolled up {len(days)} day(s)'))
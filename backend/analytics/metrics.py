@@ -0,0 +1,59 @@
+"""
+Traffic Metrics
+مؤشرات الزيارات
+
+Funnel metrics read from the DailyEventCount rollups, evaluated with
+core.comparison so any set of windows costs a single query.
+مؤشرات مسار الشراء من العدادات اليومية، تُحسب عبر core.comparison حتى
+تكلف أي مجموعة نوافذ استعلاماً واحداً.
+
+Windows are datetimes; on the `date` column they select whole days.
+النوافذ بتواريخ ووقت؛ على عمود `date` تختار أياماً كاملة.
+"""
+
+from django.db.models import Q, Sum
+
+from core.comparison import Metric, aggregate_windows
+
+from .models import DailyEventCount, EventType
+
+
+def volume(field, event_type):
+    """Sum of a rollup column for one event type"""
+    return Metric(Sum, field, condition=Q(event_type=event_type))
+
+
+TRAFFIC_METRICS = {
+    # Product visits: unique visitors per product per day, summed
+    # زيارات المنتجات: الزوار الفريدون لكل منتج في اليوم، مجموعة
+    'visits': volume('visitors', EventType.PRODUCT_VIEW),
+    'product_views': volume('events', EventType.PRODUCT_VIEW),
+    'add_to_cart': volume('events', EventType.ADD_TO_CART),
+}
+
+
+def vendor_traffic(vendor, windows):
+    """
+    Visits / product views / add-to-cart events of a vendor per window.
+    الزيارات / مشاهدات المنتجات / الإضافات للسلة للبائع لكل نافذة.
+
+    Args:
+        windows: {name: core.comparison.Window | None}
+
+    Returns:
+        dict: {window_name: {'visits', 'product_views', 'add_to_cart'}}
+    """
+    return aggregate_windows(
+        DailyEventCount.objects.filter(vendor=vendor), TRAFFIC_METRICS, windows,
+        date_field='date', scope=f'vendor:{vendor.pk}:traffic',
+    )
+
+
+def conversion_rate(orders, visits):
+    """
+    Orders per 100 visits (None without traffic data).
+    الطلبات لكل 100 زيارة (None بدون بيانات زيارات).
+    """
+    if not visits:
+        return None
+    return round(orders / visits * 100, 2)
@@ -0,0 +1,61 @@
+# Generated by Django 5.0 on 2026-10-19 03:17
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('vendors', '0007_vendorsettings_timezone'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Event',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_type', models.CharField(choices=[('product_view', 'Product View / مشاهدة منتج'), ('add_to_cart', 'Add to Cart / إضافة للسلة'), ('banner_view', 'Banner View / مشاهدة بانر'), ('banner_click', 'Banner Click / نقرة بانر'), ('story_view', 'Story View / مشاهدة قصة')], max_length=20, verbose_name='Event Type / نوع الحدث')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='Object ID / معرف الكائن')),
+                ('session_key', models.CharField(help_text='Client session id or derived visitor key / معرف الجلسة أو مفتاح الزائر', max_length=64, verbose_name='Visitor / الزائر')),
+                ('occurred_at', models.DateTimeField(verbose_name='Occurred At / وقت الحدث')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='User / المستخدم')),
+                ('vendor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='vendors.vendor', verbose_name='Vendor / البائع')),
+            ],
+            options={
+                'verbose_name': 'Event / حدث',
+                'verbose_name_plural': 'Events / الأحداث',
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyEventCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Date / التاريخ')),
+                ('event_type', models.CharField(choices=[('product_view', 'Product View / مشاهدة منتج'), ('add_to_cart', 'Add to Cart / إضافة للسلة'), ('banner_view', 'Banner View / مشاهدة بانر'), ('banner_click', 'Banner Click / نقرة بانر'), ('story_view', 'Story View / مشاهدة قصة')], max_length=20, verbose_name='Event Type / نوع الحدث')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='Object ID / معرف الكائن')),
+                ('events', models.PositiveIntegerField(default=0, verbose_name='Events / الأحداث')),
+                ('visitors', models.PositiveIntegerField(default=0, verbose_name='Unique Visitors / الزوار الفريدون')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('vendor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='daily_event_counts', to='vendors.vendor', verbose_name='Vendor / البائع')),
+            ],
+            options={
+                'verbose_name': 'Daily Event Count / عداد يومي',
+                'verbose_name_plural': 'Daily Event Counts / العدادات اليومية',
+                'ordering': ['-date'],
+                'indexes': [models.Index(fields=['vendor', 'event_type', 'date'], name='analytics_d_vendor__a94461_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dailyeventcount',
+            constraint=models.UniqueConstraint(fields=('date', 'event_type', 'object_id'), name='unique_daily_event_count'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['occurred_at', 'event_type'], name='analytics_e_occurre_d2ac74_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0 on 2026-10-19 03:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='dailyeventcount',
+            name='event_type',
+            field=models.CharField(choices=[('product_view', 'Product View / مشاهدة منتج'), ('add_to_cart', 'Add to Cart / إضافة للسلة'), ('banner_view', 'Banner View / مشاهدة بانر'), ('banner_click', 'Banner Click / نقرة بانر'), ('story_view', 'Story View / مشاهدة قصة'), ('purchase', 'Purchase / شراء')], max_length=20, verbose_name='Event Type / نوع الحدث'),
+        ),
+        migrations.AlterField(
+            model_name='event',
+            name='event_type',
+            field=models.CharField(choices=[('product_view', 'Product View / مشاهدة منتج'), ('add_to_cart', 'Add to Cart / إضافة للسلة'), ('banner_view', 'Banner View / مشاهدة بانر'), ('banner_click', 'Banner Click / نقرة بانر'), ('story_view', 'Story View / مشاهدة قصة'), ('purchase', 'Purchase / شراء')], max_length=20, verbose_name='Event Type / نوع الحدث'),
+        ),
+    ]
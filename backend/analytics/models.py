@@ -0,0 +1,150 @@
+"""
+Analytics Models
+نماذج التحليلات
+
+This module defines the append-only event log and its per-day rollups.
+هذه الوحدة تعرّف سجل الأحداث (إضافة فقط) والتجميعات اليومية له.
+
+Rows are never updated one by one: events are written with batched
+INSERTs by analytics.ingestion.flush_events, and DailyEventCount rows are
+recomputed per day with one upsert by analytics.ingestion.rollup_day.
+لا تُحدَّث الصفوف واحداً واحداً: الأحداث تُكتب بإدخالات مجمّعة، والعدادات
+اليومية يُعاد حسابها لكل يوم بعملية upsert واحدة.
+"""
+
+from django.conf import settings
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class EventType(models.TextChoices):
+    """Tracked event types / أنواع الأحداث المتتبعة"""
+    PRODUCT_VIEW = 'product_view', _('Product View / مشاهدة منتج')
+    ADD_TO_CART = 'add_to_cart', _('Add to Cart / إضافة للسلة')
+    BANNER_VIEW = 'banner_view', _('Banner View / مشاهدة بانر')
+    BANNER_CLICK = 'banner_click', _('Banner Click / نقرة بانر')
+    STORY_VIEW = 'story_view', _('Story View / مشاهدة قصة')
+    PURCHASE = 'purchase', _('Purchase / شراء')
+
+
+# Recorded by the server (order outbox), never accepted from clients
+# تُسجل من الخادم (صندوق صادر الطلبات)، ولا تُقبل من العملاء
+SERVER_EVENT_TYPES = {EventType.PURCHASE}
+
+
+# =============================================================================
+# Event Model
+# نموذج الحدث
+# =============================================================================
+
+class Event(models.Model):
+    """
+    Raw storefront event (append-only).
+    حدث خام من واجهة المتجر (إضافة فقط).
+
+    object_id points to a Product, Banner or Story depending on event_type;
+    vendor is denormalized for product events so rollups need no joins.
+    object_id يشير إلى منتج أو بانر أو قصة حسب نوع الحدث؛ البائع مخزن
+    لأحداث المنتجات حتى لا تحتاج التجميعات إلى joins.
+    """
+
+    event_type = models.CharField(
+        max_length=20,
+        choices=EventType.choices,
+        verbose_name=_('Event Type / نوع الحدث')
+    )
+    object_id = models.PositiveBigIntegerField(
+        verbose_name=_('Object ID / معرف الكائن')
+    )
+    vendor = models.ForeignKey(
+        'vendors.Vendor',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name=_('Vendor / البائع')
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name=_('User / المستخدم')
+    )
+    session_key = models.CharField(
+        max_length=64,
+        verbose_name=_('Visitor / الزائر'),
+        help_text=_('Client session id or derived visitor key / معرف الجلسة أو مفتاح الزائر')
+    )
+    occurred_at = models.DateTimeField(
+        verbose_name=_('Occurred At / وقت الحدث')
+    )
+
+    class Meta:
+        verbose_name = _('Event / حدث')
+        verbose_name_plural = _('Events / الأحداث')
+        indexes = [
+            models.Index(fields=['occurred_at', 'event_type']),
+        ]
+
+    def __str__(self):
+        return f"{self.event_type} #{self.object_id}"
+
+
+# =============================================================================
+# Daily Event Count Model
+# نموذج العداد اليومي
+# =============================================================================
+
+class DailyEventCount(models.Model):
+    """
+    Per-day rollup of events for one object.
+    تجميع يومي للأحداث لكائن واحد.
+    """
+
+    date = models.DateField(
+        verbose_name=_('Date / التاريخ')
+    )
+    event_type = models.CharField(
+        max_length=20,
+        choices=EventType.choices,
+        verbose_name=_('Event Type / نوع الحدث')
+    )
+    object_id = models.PositiveBigIntegerField(
+        verbose_name=_('Object ID / معرف الكائن')
+    )
+    vendor = models.ForeignKey(
+        'vendors.Vendor',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='daily_event_counts',
+        verbose_name=_('Vendor / البائع')
+    )
+    events = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_('Events / الأحداث')
+    )
+    visitors = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_('Unique Visitors / الزوار الفريدون')
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _('Daily Event Count / عداد يومي')
+        verbose_name_plural = _('Daily Event Counts / العدادات اليومية')
+        ordering = ['-date']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['date', 'event_type', 'object_id'],
+                name='unique_daily_event_count',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['vendor', 'event_type', 'date']),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.event_type} #{self.object_id}: {self.events}"
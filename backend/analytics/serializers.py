@@ -0,0 +1,55 @@
+"""
+Analytics Serializers
+مسلسلات التحليلات
+
+This module validates event batches sent by the storefront.
+هذا الوحدة تتحقق من دفعات الأحداث المرسلة من واجهة المتجر.
+"""
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework import serializers
+
+from .models import SERVER_EVENT_TYPES, EventType
+
+
+class EventSerializer(serializers.Serializer):
+    """
+    One tracked event.
+    حدث متتبع واحد.
+    """
+
+    type = serializers.ChoiceField(
+        choices=[choice for choice in EventType.choices if choice[0] not in SERVER_EVENT_TYPES],
+        help_text=_('Event type / نوع الحدث')
+    )
+    object_id = serializers.IntegerField(
+        min_value=1,
+        help_text=_('Product, banner or story id / معرف المنتج أو البانر أو القصة')
+    )
+
+
+class EventBatchSerializer(serializers.Serializer):
+    """
+    Batch of events from one visitor.
+    دفعة أحداث من زائر واحد.
+    """
+
+    session_id = serializers.CharField(
+        max_length=64,
+        required=False,
+        allow_blank=True,
+        help_text=_('Client-side visitor/session id (optional) / معرف الجلسة من العميل (اختياري)')
+    )
+    events = EventSerializer(many=True)
+
+    def validate_events(self, value):
+        """Reject empty or oversized batches / رفض الدفعات الفارغة أو الكبيرة"""
+        limit = getattr(settings, 'ANALYTICS_MAX_BATCH_EVENTS', 50)
+        if not value:
+            raise serializers.ValidationError(_('لا توجد أحداث / No events'))
+        if len(value) > limit:
+            raise serializers.ValidationError(
+                _('الحد الأقصى %(limit)s حدث / At most %(limit)s events per request') % {'limit': limit}
+            )
+        return value
@@ -0,0 +1,13 @@
+"""
+Analytics URL Configuration
+إعدادات URLs للتحليلات
+"""
+
+from django.urls import path
+
+from .views import EventIngestView
+
+urlpatterns = [
+    # POST /api/v1/analytics/events/
+    path('events/', EventIngestView.as_view(), name='analytics-events'),
+]
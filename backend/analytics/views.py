@@ -0,0 +1,82 @@
+"""
+Analytics Views
+عروض التحليلات
+
+Public event ingestion endpoint.
+نقطة استقبال الأحداث العامة.
+
+Endpoints:
+    POST /api/v1/analytics/events/ - Record a batch of storefront events
+"""
+
+import hashlib
+
+from django.utils.translation import gettext_lazy as _
+from drf_spectacular.utils import extend_schema
+from rest_framework import status
+from rest_framework.permissions import AllowAny
+from core.throttling import ScopedRateThrottle
+from rest_framework.views import APIView
+
+from core.utils import error_response, success_response
+
+from .ingestion import make_event, record_events
+from .serializers import EventBatchSerializer
+
+
+def visitor_key(request, session_id=''):
+    """
+    Stable visitor key: client session id, user id, or a hash of IP + user agent.
+    مفتاح زائر ثابت: معرف الجلسة أو المستخدم أو hash للـ IP ومتصفح العميل.
+    """
+    if session_id:
+        return session_id
+    if request.user.is_authenticated:
+        return f'u:{request.user.pk}'
+    raw = f"{request.META.get('REMOTE_ADDR', '')}|{request.META.get('HTTP_USER_AGENT', '')}"
+    return 'h:' + hashlib.sha1(raw.encode('utf-8')).hexdigest()[:32]
+
+
+class EventIngestView(APIView):
+    """
+    Record storefront events (product views, add-to-cart, banner/story impressions).
+    تسجيل أحداث واجهة المتجر (مشاهدات المنتجات، الإضافة للسلة، مشاهدات البانرات والقصص).
+
+    Events are buffered and written in batches - the request itself does
+    not touch the database.
+    الأحداث تُخزن مؤقتاً وتُكتب على دفعات - الطلب نفسه لا يكتب في قاعدة البيانات.
+    """
+
+    permission_classes = [AllowAny]
+    throttle_classes = [ScopedRateThrottle]
+    throttle_scope = 'analytics_events'
+
+    @extend_schema(
+        summary='Record Events',
+        description='Queue a batch of storefront events for analytics',
+        request=EventBatchSerializer,
+        responses={202: None},
+        tags=['Analytics'],
+    )
+    def post(self, request):
+        """Record a batch of events / تسجيل دفعة أحداث"""
+        serializer = EventBatchSerializer(data=request.data)
+        if not serializer.is_valid():
+            return error_response(
+                message=_('بيانات الأحداث غير صالحة / Invalid event data'),
+                errors=serializer.errors,
+            )
+
+        session_key = visitor_key(request, serializer.validated_data.get('session_id', ''))
+        user_id = request.user.pk if request.user.is_authenticated else None
+        events = [
+            make_event(event['type'], event['object_id'], session_key, user_id)
+            for event in serializer.validated_data['events']
+        ]
+        record_events(events)
+
+        return success_response(
+            data={'accepted': len(events)},
+            message=_('تم استلام الأحداث / Events accepted'),
+            status_code=status.HTTP_202_ACCEPTED,
+        )
@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-19 03:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cart', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cart',
+            name='coupon_code',
+            field=models.CharField(blank=True, help_text='Coupon applied to this cart (re-validated on every read) / الكوبون المطبق على السلة (يُعاد التحقق منه عند كل قراءة)', max_length=50, verbose_name='Coupon Code'),
+        ),
+    ]
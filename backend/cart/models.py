@@ -110,6 +110,18 @@ class Cart(models.Model):
         help_text=_('Session key for guest carts (null for authenticated users) / مفتاح الجلسة للسلل الضيفية (null للمستخدمين المسجلين)')
     )
     
+    # =========================================================================
+    # Coupon
+    # الكوبون
+    # =========================================================================
+    
+    coupon_code = models.CharField(
+        max_length=50,
+        blank=True,
+        verbose_name=_('Coupon Code'),
+        help_text=_('Coupon applied to this cart (re-validated on every read) / الكوبون المطبق على السلة (يُعاد التحقق منه عند كل قراءة)')
+    )
+    
     # =========================================================================
     # Timestamps
     # الطوابع الزمنية
@@ -166,6 +166,52 @@ class CartSerializer(serializers.ModelSerializer):
         read_only=True,
         help_text='Cart subtotal / المجموع الفرعي للسلة'
     )
+    coupon = serializers.SerializerMethodField(
+        help_text='Applied coupon / الكوبون المطبق'
+    )
+    discount = serializers.SerializerMethodField(
+        help_text='Coupon discount / خصم الكوبون'
+    )
+    total = serializers.SerializerMethodField(
+        help_text='Subtotal minus discount / المجموع بعد الخصم'
+    )
+    
+    def _coupon_quote(self, obj):
+        """
+        Quote the cart's coupon once per serialization
+        حساب خصم الكوبون مرة واحدة لكل تسلسل
+        """
+        if not hasattr(obj, '_coupon_quote'):
+            from promotions.coupons import quote_cart
+            obj._coupon_quote = quote_cart(obj)
+        return obj._coupon_quote
+    
+    def get_coupon(self, obj):
+        """
+        Applied coupon with its status; an invalid coupon stays on the cart
+        with valid=False so the customer sees why it no longer applies.
+        الكوبون المطبق وحالته؛ الكوبون غير الصالح يبقى مع valid=False.
+        """
+        if not obj.coupon_code:
+            return None
+        result, message = self._coupon_quote(obj)
+        return {
+            'code': obj.coupon_code,
+            'valid': result is not None,
+            'discount': str(result.discount if result else ZERO_DECIMAL),
+            'eligible_items': result.eligible_keys if result else [],
+            'message': message,
+        }
+    
+    def get_discount(self, obj):
+        result, _message = self._coupon_quote(obj)
+        return str(result.discount if result else ZERO_DECIMAL)
+    
+    def get_total(self, obj):
+        result, _message = self._coupon_quote(obj)
+        if result is None:
+            return str(Decimal(obj.subtotal).quantize(MONEY_Q))
+        return str(result.subtotal - result.discount)
     
     class Meta:
         model = Cart
@@ -175,12 +221,27 @@ class CartSerializer(serializers.ModelSerializer):
             'items',
             'item_count',
             'subtotal',
+            'coupon',
+            'discount',
+            'total',
             'created_at',
             'updated_at',
         ]
         read_only_fields = ['id', 'user', 'item_count', 'subtotal', 'created_at', 'updated_at']
 
 
+class CartApplyCouponSerializer(serializers.Serializer):
+    """
+    Cart Apply Coupon Serializer
+    مسلسل تطبيق كوبون على السلة
+    """
+    
+    code = serializers.CharField(
+        max_length=50,
+        help_text='Coupon code / رمز الكوبون'
+    )
+
+
 class CartAddItemSerializer(serializers.Serializer):
     """
     Cart Add Item Serializer
@@ -21,8 +21,10 @@ from .serializers import (
     CartItemSerializer,
     CartAddItemSerializer,
     CartUpdateItemSerializer,
+    CartApplyCouponSerializer,
 )
 from products.models import ProductVariant
+from promotions.coupons import CouponError, cart_lines, get_coupon_rules, quote
 
 
 # =============================================================================
@@ -76,6 +78,8 @@ class CartViewSet(viewsets.ModelViewSet):
     - PATCH /api/v1/cart/update_item/{item_id}/ - Update item quantity
     - DELETE /api/v1/cart/remove_item/{item_id}/ - Remove item from cart
     - DELETE /api/v1/cart/clear/ - Clear all items from cart
+    - POST /api/v1/cart/apply_coupon/ - Apply a coupon code
+    - DELETE /api/v1/cart/remove_coupon/ - Remove the applied coupon
     
     Permissions:
     - Anyone can access their own cart (authenticated or guest)
@@ -143,6 +147,9 @@ class CartViewSet(viewsets.ModelViewSet):
                         "items": [],
                         "item_count": 0,
                         "subtotal": "0.00",
+                        "coupon": None,
+                        "discount": "0.00",
+                        "total": "0.00",
                         "created_at": None,
                         "updated_at": None,
                     },
@@ -160,6 +167,9 @@ class CartViewSet(viewsets.ModelViewSet):
                     "items": [],
                     "item_count": 0,
                     "subtotal": "0.00",
+                    "coupon": None,
+                    "discount": "0.00",
+                    "total": "0.00",
                     "created_at": None,
                     "updated_at": None,
                 },
@@ -362,3 +372,65 @@ class CartViewSet(viewsets.ModelViewSet):
             data=serializer.data,
             message="Cart cleared successfully. / تم مسح السلة بنجاح."
         )
+    
+    @action(detail=False, methods=['post'], url_path='apply_coupon')
+    def apply_coupon(self, request):
+        """
+        Apply a coupon code to the cart
+        تطبيق رمز كوبون على السلة
+        
+        The coupon is validated against the current items (dates, usage,
+        minimum order, eligible products / categories / users). Usage is
+        only reserved at checkout.
+        يتم التحقق من الكوبون مقابل العناصر الحالية. الاستخدام يُحجز عند الطلب فقط.
+        """
+        serializer = CartApplyCouponSerializer(data=request.data)
+        if not serializer.is_valid():
+            return error_response(
+                errors=serializer.errors,
+                message="Invalid data. / بيانات غير صحيحة.",
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
+        
+        rules = get_coupon_rules(serializer.validated_data['code'])
+        if rules is None:
+            return error_response(
+                message="Coupon not found. / الكوبون غير موجود.",
+                status_code=status.HTTP_404_NOT_FOUND
+            )
+        
+        cart = get_or_create_cart(request)
+        try:
+            quote(rules, cart_lines(cart), user_id=cart.user_id)
+        except CouponError as e:
+            return error_response(
+                message=str(e),
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
+        
+        cart.coupon_code = rules.code
+        cart.updated_at = timezone.now()
+        cart.save(update_fields=['coupon_code', 'updated_at'])
+        
+        serializer = self.get_serializer(cart)
+        return success_response(
+            data=serializer.data,
+            message="Coupon applied successfully. / تم تطبيق الكوبون بنجاح."
+        )
+    
+    @action(detail=False, methods=['delete'], url_path='remove_coupon')
+    def remove_coupon(self, request):
+        """
+        Remove the applied coupon
+        إزالة الكوبون المطبق
+        """
+        cart = get_or_create_cart(request)
+        cart.coupon_code = ''
+        cart.updated_at = timezone.now()
+        cart.save(update_fields=['coupon_code', 'updated_at'])
+        
+        serializer = self.get_serializer(cart)
+        return success_response(
+            data=serializer.data,
+            message="Coupon removed successfully. / تم إزالة الكوبون بنجاح."
+        )
@@ -12,6 +12,7 @@ API Structure:
   /vendors/       - Vendor management endpoints
   /products/      - Product management endpoints
   /orders/        - Order management endpoints (future)
+  /analytics/     - Storefront event ingestion
 """
 
 from django.urls import path, include
@@ -25,6 +26,7 @@ from products.urls import urlpatterns as products_urls
 from cart.urls import urlpatterns as cart_urls
 from orders.urls import urlpatterns as orders_urls
 from vendor_api.urls import urlpatterns as vendor_api_urls
+from analytics.urls import urlpatterns as analytics_urls
 from .views import api_v1_home
 
 # ============================================================================
@@ -71,5 +73,10 @@ urlpatterns = [
     # نقاط نهاية API البائعين
     # /api/v1/vendor/dashboard/overview/, etc.
     path("vendor/", include(vendor_api_urls), name="api-v1-vendor"),
+    
+    # Analytics endpoints
+    # نقاط نهاية التحليلات
+    # /api/v1/analytics/events/
+    path("analytics/", include(analytics_urls), name="api-v1-analytics"),
 ]
 
@@ -0,0 +1,155 @@
+"""
+Background Task Runner
+مشغّل المهام في الخلفية
+
+This module runs slow work (imports, file processing) off the request thread.
+هذا الوحدة تشغّل الأعمال البطيئة (الاستيراد، معالجة الملفات) خارج خيط الطلب.
+
+Tasks are submitted to a small bounded thread pool after the current
+transaction commits, so the worker always sees the rows created by the request.
+تُرسل المهام إلى مجموعة خيوط محدودة بعد تثبيت الـ transaction الحالية،
+لذلك يرى العامل دائماً الصفوف التي أنشأها الطلب.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, connections, transaction
+
+logger = logging.getLogger(__name__)
+
+
+# =============================================================================
+# Executor
+# المنفذ
+# =============================================================================
+
+_executor = None
+
+
+def _get_executor():
+    """
+    Lazily create the shared executor (one per process).
+    إنشاء المنفذ المشترك عند الحاجة (واحد لكل عملية).
+    """
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'BACKGROUND_TASK_WORKERS', 2),
+            thread_name_prefix='background-task',
+        )
+    return _executor
+
+
+def _run_task(func, args, kwargs):
+    """
+    Execute a task and always release its DB connection.
+    تنفيذ المهمة وتحرير اتصال قاعدة البيانات دائماً.
+    """
+    close_old_connections()
+    try:
+        func(*args, **kwargs)
+    except Exception:
+        logger.exception(f'Background task {getattr(func, "__name__", func)} failed')
+    finally:
+        # Each worker thread owns its own connection - close it
+        # كل خيط عامل يملك اتصاله الخاص - أغلقه
+        connections.close_all()
+
+
+def _submit(func, args, kwargs):
+    """Start a task now: inline when eager, else on the executor"""
+    if getattr(settings, 'BACKGROUND_TASKS_EAGER', False):
+        func(*args, **kwargs)
+        return
+    _get_executor().submit(_run_task, func, args, kwargs)
+
+
+# =============================================================================
+# Public API
+# الواجهة العامة
+# =============================================================================
+
+def run_in_background(func, *args, **kwargs):
+    """
+    Run func(*args, **kwargs) in a background thread after commit.
+    تشغيل func(*args, **kwargs) في خيط خلفي بعد تثبيت الـ transaction.
+
+    When BACKGROUND_TASKS_EAGER is True the task runs inline (useful for tests
+    and management commands).
+    عندما يكون BACKGROUND_TASKS_EAGER مفعّلاً تُنفذ المهمة مباشرة (مفيد للاختبارات).
+
+    Example:
+        run_in_background(process_import_job, job.pk)
+    """
+    transaction.on_commit(lambda: _submit(func, args, kwargs))
+
+
+class PeriodicFlush:
+    """
+    Run a flush function in the background, one run at a time and at most
+    once every `interval` seconds unless forced.
+    تشغيل دالة تفريغ في الخلفية، تشغيل واحد في كل مرة وبحد أقصى مرة كل
+    `interval` ثانية ما لم يُفرض التشغيل.
+
+    Used by write-behind buffers (analytics events, counters): callers poke()
+    after queuing work and the flush happens off the request thread.
+    يُستخدم في المخازن المؤقتة: المستدعي يستدعي poke() بعد إضافة العمل.
+
+    Args:
+        func: Flush function (no arguments)
+        interval: Seconds, or a callable returning seconds (read on each poke)
+    """
+
+    def __init__(self, func, interval):
+        self.func = func
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._pending = False
+        self._last_run = time.monotonic()
+
+    def _interval(self):
+        return self.interval() if callable(self.interval) else self.interval
+
+    def _due(self, force):
+        # Caller holds self._lock / المستدعي يملك القفل
+        if self._pending:
+            return False
+        return force or time.monotonic() - self._last_run >= self._interval()
+
+    def poke(self, force=False):
+        """
+        Schedule a flush after commit if one is due and none is pending.
+        جدولة التفريغ بعد التثبيت إذا حان وقته ولم يكن هناك تفريغ معلق.
+
+        The flush is only marked pending once the commit callback fires: a
+        rolled back transaction or savepoint drops the callback and leaves
+        the flusher free for the next poke.
+        لا يُعلَّم التفريغ كمعلق إلا عند تنفيذ callback التثبيت، فالتراجع لا يعطله.
+
+        Returns:
+            bool: True if a flush was requested
+        """
+        with self._lock:
+            if not self._due(force):
+                return False
+        transaction.on_commit(lambda: self._start(force))
+        return True
+
+    def _start(self, force):
+        with self._lock:
+            if not self._due(force):
+                return
+            self._pending = True
+        _submit(self._run, (), {})
+
+    def _run(self):
+        try:
+            self.func()
+        finally:
+            with self._lock:
+                self._pending = False
+                self._last_run = time.monotonic()
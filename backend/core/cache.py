@@ -0,0 +1,655 @@
+"""
+Two-Tier Cache
+كاش بمستويين
+
+A bounded in-process LRU (tier 1) in front of the shared Django cache
+(tier 2: Redis in production, LocMemCache in development), for hot keys
+that every worker reads: the product list, product details, settings.
+
+كاش LRU محدود داخل العملية (المستوى 1) أمام الكاش المشترك (المستوى 2: Redis
+في الإنتاج) للمفاتيح الساخنة التي يقرأها كل عامل.
+
+1. Tier 1 keeps entries for a few seconds (TIERED_CACHE_LOCAL_TIMEOUT), so
+   a hot key costs no network round trip and a change reaches every
+   worker quickly
+2. Entries carry their logical expiry and the time they took to compute.
+   Reads refresh them early with probability growing near the expiry
+   (XFetch), so a hot key is usually recomputed by one request before it
+   expires instead of by all of them after
+3. Recomputation is single-flight: one thread per process (the others wait
+   for its result) and one process per key (a cache.add lock); while the
+   leader works, the others serve the previous value (entries outlive
+   their logical expiry by a grace period) or wait for the new one
+4. Namespaces are invalidated by bumping a generation stored in tier 2
+   (keys embed it), e.g. on post_save of the models they are built from
+5. Every lookup is counted per namespace and result (local_hit,
+   shared_hit, stale, coalesced, miss, early_refresh) and exported by
+   /metrics/ (core.instrumentation)
+6. Cached responses carry validators stored with the entry (ETag: hash of
+   the response data, Last-Modified: time it was computed), so a
+   revalidating client gets 304 Not Modified from one lookup, without
+   queries or serialization, and a 200 as soon as the data differs
+
+١. المستوى 1 يحفظ المدخلات لثوانٍ قليلة فلا يكلف المفتاح الساخن رحلة شبكة
+٢. كل مدخل يحمل انتهاءه المنطقي ومدة حسابه، والقراءات تعيد حسابه مبكراً
+   باحتمال يزداد قرب الانتهاء (XFetch) فيعيد حسابه طلب واحد فقط
+٣. إعادة الحساب أحادية: خيط واحد لكل عملية وعملية واحدة لكل مفتاح (قفل
+   cache.add)، والبقية تقدم القيمة السابقة أو تنتظر الجديدة
+٤. إبطال النطاق بزيادة "جيل" مخزن في المستوى 2 (المفاتيح تتضمنه)
+٥. كل عملية بحث تُعد لكل نطاق ونتيجة وتُعرض في /metrics/
+٦. الاستجابات المخزنة تحمل ETag (بصمة البيانات) و Last-Modified (وقت الحساب)،
+   فيحصل العميل على 304 دون استعلام أو تسلسل، وعلى 200 عند تغير البيانات
+
+Usage:
+    products_cache = TieredCache('products_list')
+    data = products_cache.get_or_compute(key, lambda: build(...))
+    products_cache.get_many(keys); products_cache.set_many({key: value})
+    products_cache.invalidate()
+
+    @cached('categories')
+    def category_tree(): ...
+
+    class ProductViewSet(viewsets.ReadOnlyModelViewSet):
+        @cache_response('products_list')
+        def list(self, request, *args, **kwargs): ...
+
+    invalidate_on_change(['products_list', 'product_detail'], Product, ProductVariant)
+"""
+
+import hashlib
+import json
+import logging
+import math
+import random
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from django.core.cache import cache as shared_cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_response_headers, quote_etag
+from django.utils.http import http_date
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+from core.instrumentation import record_cache
+from core.redis_utils import setting
+
+logger = logging.getLogger(__name__)
+
+
+MISSING = object()
+
+# Results of a lookup (metric labels)
+# نتائج عملية البحث (تسميات المقاييس)
+LOCAL_HIT = 'local_hit'
+SHARED_HIT = 'shared_hit'
+STALE = 'stale'
+COALESCED = 'coalesced'
+MISS = 'miss'
+EARLY_REFRESH = 'early_refresh'
+
+# Poll interval while another process computes a missing key
+# فترة الاستطلاع أثناء حساب عملية أخرى لمفتاح مفقود
+POLL_INTERVAL = 0.05
+
+
+def namespace_timeout(namespace, default=300):
+    """Timeout of a namespace from CACHE_TIMEOUTS / مهلة النطاق من CACHE_TIMEOUTS"""
+    return setting('CACHE_TIMEOUTS', {}).get(namespace, default)
+
+
+# =============================================================================
+# Tier 1: In-Process LRU
+# المستوى 1: LRU داخل العملية
+# =============================================================================
+
+class LocalLRU:
+    """
+    Thread-safe LRU with per-entry expiry, shared by every namespace of the
+    process (one bound for the whole process).
+    LRU آمن للخيوط مع انتهاء لكل مدخل، مشترك بين نطاقات العملية.
+    """
+
+    def __init__(self, max_entries=None):
+        self._max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def max_entries(self):
+        return self._max_entries or setting('TIERED_CACHE_LOCAL_SIZE', 1000)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            value, expires = entry
+            if expires <= time.monotonic():
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout):
+        if timeout <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + timeout)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+local_cache = LocalLRU()
+
+
+# =============================================================================
+# Single Flight (in-process)
+# الحساب الأحادي (داخل العملية)
+# =============================================================================
+
+class _Flight:
+    __slots__ = ('done', 'value')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = MISSING
+
+
+_flights = {}
+_flights_lock = threading.Lock()
+
+
+def _join_flight(key):
+    """(flight, is_leader) for a key being computed / الانضمام لحساب جارٍ"""
+    with _flights_lock:
+        flight = _flights.get(key)
+        if flight is not None:
+            return flight, False
+        flight = _flights[key] = _Flight()
+        return flight, True
+
+
+def _leave_flight(key, flight):
+    with _flights_lock:
+        if _flights.get(key) is flight:
+            del _flights[key]
+    flight.done.set()
+
+
+# =============================================================================
+# Two-Tier Cache
+# الكاش بمستويين
+# =============================================================================
+
+class TieredCache:
+    """
+    One namespace of the two-tier cache.
+    نطاق واحد من الكاش بمستويين.
+
+    Entries are stored as (value, logical expiry, compute seconds).
+    المدخلات تُخزن كـ (القيمة، الانتهاء المنطقي، مدة الحساب).
+
+    Args:
+        namespace: Name (metrics label, invalidation unit, CACHE_TIMEOUTS key)
+        timeout: Logical lifetime in seconds (default: CACHE_TIMEOUTS[namespace])
+        local_timeout: Tier 1 lifetime (default: TIERED_CACHE_LOCAL_TIMEOUT)
+        stale_grace: Seconds an expired entry is still served while it is
+                     recomputed by another worker
+        beta: XFetch aggressiveness (0 disables early refresh)
+        lock_timeout: Longest wait for another worker's computation
+    """
+
+    def __init__(self, namespace, timeout=None, local_timeout=None, stale_grace=60,
+                 beta=1.0, lock_timeout=None):
+        self.namespace = namespace
+        self._timeout = timeout
+        self._local_timeout = local_timeout
+        self.stale_grace = stale_grace
+        self.beta = beta
+        self._lock_timeout = lock_timeout
+
+    @property
+    def timeout(self):
+        return self._timeout if self._timeout is not None else namespace_timeout(self.namespace)
+
+    @property
+    def local_timeout(self):
+        if self._local_timeout is not None:
+            return self._local_timeout
+        return setting('TIERED_CACHE_LOCAL_TIMEOUT', 5)
+
+    @property
+    def lock_timeout(self):
+        if self._lock_timeout is not None:
+            return self._lock_timeout
+        return setting('TIERED_CACHE_LOCK_TIMEOUT', 10)
+
+    # -------------------------------------------------------------------------
+    # Keys and generations
+    # المفاتيح والأجيال
+    # -------------------------------------------------------------------------
+
+    @property
+    def _generation_key(self):
+        return f'tc:gen:{self.namespace}'
+
+    def generation(self):
+        """
+        Current generation of the namespace (cached in tier 1).
+        الجيل الحالي للنطاق (مخزن في المستوى 1).
+        """
+        key = self._generation_key
+        generation = local_cache.get(key)
+        if generation is MISSING:
+            generation = shared_cache.get(key)
+            if generation is None:
+                shared_cache.add(key, time.time_ns(), None)
+                generation = shared_cache.get(key) or 0
+            local_cache.set(key, generation, self.local_timeout)
+        return generation
+
+    def invalidate(self):
+        """
+        Drop every entry of the namespace (other workers follow within
+        local_timeout).
+        إبطال كل مدخلات النطاق (العمال الآخرون خلال local_timeout).
+        """
+        generation = time.time_ns()
+        shared_cache.set(self._generation_key, generation, None)
+        local_cache.set(self._generation_key, generation, self.local_timeout)
+
+    def make_key(self, key):
+        key = str(key)
+        if len(key) > 200:
+            key = hashlib.md5(key.encode('utf-8')).hexdigest()
+        return f'tc:{self.namespace}:{self.generation()}:{key}'
+
+    # -------------------------------------------------------------------------
+    # Entries
+    # المدخلات
+    # -------------------------------------------------------------------------
+
+    def _envelope(self, value, timeout, delta):
+        return (value, time.time() + timeout, delta)
+
+    def _store(self, full_key, envelope, timeout):
+        shared_cache.set(full_key, envelope, timeout + self.stale_grace)
+        local_cache.set(full_key, envelope, min(self.local_timeout, timeout))
+
+    def _should_refresh(self, envelope):
+        """
+        XFetch: refresh when now - delta * beta * ln(U) >= expiry.
+        XFetch: إعادة الحساب باحتمال يزداد قرب الانتهاء.
+        """
+        _, expiry, delta = envelope
+        now = time.time()
+        if now >= expiry:
+            return True
+        if delta <= 0 or self.beta <= 0:
+            return False
+        return now - delta * self.beta * math.log(1.0 - random.random()) >= expiry
+
+    def _record(self, result):
+        record_cache(result in (LOCAL_HIT, SHARED_HIT, STALE, COALESCED), self.namespace, result)
+
+    # -------------------------------------------------------------------------
+    # Low-level API
+    # الواجهة منخفضة المستوى
+    # -------------------------------------------------------------------------
+
+    def get(self, key, default=None):
+        """
+        Cached value or `default` (no computation, expired entries ignored).
+        القيمة المخزنة أو default.
+        """
+        return self.get_many([key]).get(key, default)
+
+    def get_many(self, keys):
+        """
+        {key: value} for the keys found: tier 1 first, then one tier 2
+        round trip for the rest.
+        {المفتاح: القيمة} للمفاتيح الموجودة: المستوى 1 ثم رحلة واحدة للمستوى 2.
+        """
+        now = time.time()
+        found = {}
+        missing = {}
+        for key in keys:
+            full_key = self.make_key(key)
+            envelope = local_cache.get(full_key)
+            if envelope is not MISSING and envelope[1] > now:
+                found[key] = envelope[0]
+                self._record(LOCAL_HIT)
+            else:
+                missing[full_key] = key
+
+        if missing:
+            shared_hits = 0
+            for full_key, envelope in shared_cache.get_many(list(missing)).items():
+                if envelope[1] > now:
+                    found[missing[full_key]] = envelope[0]
+                    local_cache.set(full_key, envelope, min(self.local_timeout, envelope[1] - now))
+                    shared_hits += 1
+            for _ in range(shared_hits):
+                self._record(SHARED_HIT)
+            for _ in range(len(missing) - shared_hits):
+                self._record(MISS)
+        return found
+
+    def set(self, key, value, timeout=None):
+        self.set_many({key: value}, timeout)
+
+    def set_many(self, mapping, timeout=None):
+        """Store several values with one tier 2 round trip / تخزين عدة قيم برحلة واحدة"""
+        timeout = self.timeout if timeout is None else timeout
+        envelopes = {self.make_key(key): self._envelope(value, timeout, 0.0) for key, value in mapping.items()}
+        shared_cache.set_many(envelopes, timeout + self.stale_grace)
+        for full_key, envelope in envelopes.items():
+            local_cache.set(full_key, envelope, min(self.local_timeout, timeout))
+
+    def delete(self, key):
+        full_key = self.make_key(key)
+        shared_cache.delete(full_key)
+        local_cache.delete(full_key)
+
+    # -------------------------------------------------------------------------
+    # Read-through
+    # القراءة مع الحساب
+    # -------------------------------------------------------------------------
+
+    def get_or_compute(self, key, compute, timeout=None):
+        """
+        Cached value of `key`, computing it with compute() when missing or
+        chosen for early refresh.
+        القيمة المخزنة للمفتاح، مع حسابها بـ compute() عند غيابها.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        full_key = self.make_key(key)
+
+        envelope = local_cache.get(full_key)
+        if envelope is not MISSING and not self._should_refresh(envelope):
+            self._record(LOCAL_HIT)
+            return envelope[0]
+
+        envelope = shared_cache.get(full_key)
+        if envelope is not None and not self._should_refresh(envelope):
+            local_cache.set(full_key, envelope, min(self.local_timeout, envelope[1] - time.time()))
+            self._record(SHARED_HIT)
+            return envelope[0]
+
+        return self._refresh(full_key, compute, timeout, stale=envelope)
+
+    def _refresh(self, full_key, compute, timeout, stale):
+        flight, leader = _join_flight(full_key)
+        if not leader:
+            # Another thread of this process is computing the key
+            # خيط آخر في هذه العملية يحسب المفتاح
+            if stale is not None:
+                self._record(STALE)
+                return stale[0]
+            if flight.done.wait(self.lock_timeout) and flight.value is not MISSING:
+                self._record(COALESCED)
+                return flight.value
+            return self._compute(full_key, compute, timeout, MISS)
+
+        try:
+            flight.value = self._refresh_shared(full_key, compute, timeout, stale)
+            return flight.value
+        finally:
+            _leave_flight(full_key, flight)
+
+    def _refresh_shared(self, full_key, compute, timeout, stale):
+        lock_key = f'{full_key}:lock'
+        if shared_cache.add(lock_key, 1, self.lock_timeout):
+            try:
+                return self._compute(full_key, compute, timeout, EARLY_REFRESH if stale else MISS)
+            finally:
+                shared_cache.delete(lock_key)
+
+        # Another process is computing the key
+        # عملية أخرى تحسب المفتاح
+        if stale is not None:
+            self._record(STALE)
+            return stale[0]
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            time.sleep(POLL_INTERVAL)
+            envelope = shared_cache.get(full_key)
+            if envelope is not None:
+                local_cache.set(full_key, envelope, min(self.local_timeout, envelope[1] - time.time()))
+                self._record(COALESCED)
+                return envelope[0]
+        logger.warning('Cache lock on %s timed out, computing anyway', full_key)
+        return self._compute(full_key, compute, timeout, MISS)
+
+    def _compute(self, full_key, compute, timeout, result):
+        started = time.perf_counter()
+        value = compute()
+        delta = time.perf_counter() - started
+        self._store(full_key, self._envelope(value, timeout, delta), timeout)
+        self._record(result)
+        return value
+
+
+# =============================================================================
+# Decorators
+# المزخرفات
+# =============================================================================
+
+def _arguments_key(args, kwargs):
+    return repr(args) + repr(sorted(kwargs.items()))
+
+
+def cached(namespace, timeout=None, key=None, **options):
+    """
+    Cache a function's result in the two-tier cache.
+    تخزين نتيجة دالة في الكاش بمستويين.
+
+    Args:
+        namespace: TieredCache namespace
+        timeout: Lifetime (default: CACHE_TIMEOUTS[namespace])
+        key: Callable(*args, **kwargs) -> key (default: repr of the arguments)
+        **options: Other TieredCache options
+
+    The wrapper exposes the namespace as `.cache` (e.g. func.cache.invalidate()).
+    """
+    tier = TieredCache(namespace, timeout=timeout, **options)
+
+    def decorator(func):
+        name = f'{func.__module__}.{func.__qualname__}'
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            cache_key = key(*args, **kwargs) if key else f'{name}:{_arguments_key(args, kwargs)}'
+            return tier.get_or_compute(cache_key, lambda: func(*args, **kwargs))
+
+        wrapper.cache = tier
+        return wrapper
+    return decorator
+
+
+def response_cache_key(request):
+    """
+    Key of a GET response: absolute URL (serializers build absolute media
+    URLs) with sorted query parameters, plus the negotiated media type.
+    مفتاح الاستجابة: الرابط المطلق مع ترتيب المعاملات ونوع المحتوى.
+    """
+    query = request.GET.copy()
+    ordered = '&'.join(f'{name}={value}' for name in sorted(query) for value in query.getlist(name))
+    media_type = getattr(request, 'accepted_media_type', '') or ''
+    return f'{request.build_absolute_uri(request.path)}?{ordered}|{media_type}'
+
+
+def cache_response(namespace, timeout=None, key=None, **options):
+    """
+    Cache the data of successful GET responses of an APIView / ViewSet
+    method in the two-tier cache (drop-in for method_decorator(cache_page)).
+    تخزين بيانات استجابات GET الناجحة لدالة عرض في الكاش بمستويين.
+
+    Only the response data is cached (rendering stays per request); the
+    response keeps cache_page's Expires / Cache-Control max-age headers.
+    تُخزن بيانات الاستجابة فقط؛ وتحتفظ الاستجابة بترويسات cache_page.
+
+    Conditional requests (If-None-Match / If-Modified-Since) are answered
+    from the validators stored with the entry: the ETag hashes the data
+    when it is computed, so a recomputed entry with new data gets a new
+    ETag even without an invalidation.
+    الطلبات الشرطية تُجاب من المدققات المخزنة مع المدخل: الـ ETag بصمة البيانات.
+
+    Args:
+        key: key(request) -> str, for responses that depend on only some
+             parameters (default: response_cache_key)
+    """
+    make_key = key or response_cache_key
+    tier = TieredCache(namespace, timeout=timeout, **options)
+
+    def decorator(method):
+        @wraps(method)
+        def wrapper(view, request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return method(view, request, *args, **kwargs)
+
+            cache_key = make_key(request)
+
+            def compute():
+                response = method(view, request, *args, **kwargs)
+                if response.status_code != 200 or not isinstance(response, Response):
+                    raise _Uncacheable(response)
+                return {
+                    'data': response.data,
+                    'status': response.status_code,
+                    'etag': _etag(cache_key, response.data),
+                    'modified': int(time.time()),
+                }
+
+            try:
+                cached_response = tier.get_or_compute(cache_key, compute)
+            except _Uncacheable as e:
+                return e.response
+
+            etag, last_modified = _validators(cache_key, cached_response)
+            headers = _validator_headers(tier, etag, last_modified)
+            conditional = get_conditional_response(
+                request, etag=etag, last_modified=last_modified, response=headers,
+            )
+            if conditional is not headers:
+                # 304 Not Modified (or 412): the client's copy is current
+                # 304: نسخة العميل محدثة
+                return conditional
+
+            response = Response(cached_response['data'], status=cached_response['status'])
+            for header, value in headers.items():
+                response[header] = value
+            return response
+
+        wrapper.cache = tier
+        return wrapper
+    return decorator
+
+
+def _etag(key, data):
+    """
+    Strong ETag of response data: md5 of the key (URL + media type) and
+    the data as JSON.
+    ETag قوي لبيانات الاستجابة: بصمة المفتاح والبيانات.
+    """
+    payload = json.dumps(data, cls=JSONEncoder, ensure_ascii=False)
+    return quote_etag(hashlib.md5(f'{key}|{payload}'.encode('utf-8')).hexdigest())
+
+
+def _validators(key, cached_response):
+    """
+    ETag and Last-Modified (epoch seconds) of a cached response, as stored
+    when it was computed.
+    الـ ETag و Last-Modified للاستجابة المخزنة كما حُسبا عند الحساب.
+    """
+    if 'etag' not in cached_response:
+        # Entry stored before validators were kept / مدخل أقدم بدون مدققات
+        return _etag(key, cached_response['data']), int(time.time())
+    return cached_response['etag'], cached_response['modified']
+
+
+def _validator_headers(tier, etag, last_modified):
+    """ETag / Last-Modified plus cache_page's Expires and Cache-Control"""
+    headers = HttpResponse()
+    headers['ETag'] = etag
+    headers['Last-Modified'] = http_date(last_modified)
+    patch_response_headers(headers, cache_timeout=tier.timeout)
+    return headers
+
+
+class _Uncacheable(Exception):
+    """Carries a response that must not be cached (errors, redirects)"""
+
+    def __init__(self, response):
+        super().__init__()
+        self.response = response
+
+
+# =============================================================================
+# Invalidation
+# الإبطال
+# =============================================================================
+
+def invalidate(*namespaces):
+    """Invalidate namespaces / إبطال النطاقات"""
+    for namespace in namespaces:
+        TieredCache(namespace).invalidate()
+
+
+# Model label -> namespaces built from its rows (invalidate_on_change)
+# اسم النموذج -> النطاقات المبنية من صفوفه
+MODEL_NAMESPACES = {}
+
+
+def invalidate_on_change(namespaces, *models):
+    """
+    Invalidate namespaces whenever a row of the models is saved or deleted.
+    إبطال النطاقات عند حفظ أو حذف أي صف من النماذج.
+
+    The generation is bumped after the writing transaction commits: a
+    request computing the entry in between would otherwise store the old
+    rows under the new generation for a full timeout.
+    الجيل يُزاد بعد تثبيت الـ transaction، وإلا خزّن طلب متزامن الصفوف
+    القديمة تحت الجيل الجديد طوال المهلة.
+
+    Call from AppConfig.ready(). Bulk operations (update(), bulk_create)
+    send no signals: call invalidate() or invalidate_for() after them.
+    تُستدعى من AppConfig.ready(). العمليات المجمعة لا ترسل إشارات.
+    """
+    namespaces = tuple(namespaces)
+
+    def handler(sender, **kwargs):
+        transaction.on_commit(lambda: invalidate(*namespaces))
+
+    for model in models:
+        MODEL_NAMESPACES.setdefault(model._meta.label, set()).update(namespaces)
+        uid = f'tiered-cache:{model._meta.label}:{",".join(namespaces)}'
+        post_save.connect(handler, sender=model, weak=False, dispatch_uid=uid)
+        post_delete.connect(handler, sender=model, weak=False, dispatch_uid=uid)
+
+
+def invalidate_for(model):
+    """
+    Invalidate the namespaces registered for a model after a signal-less
+    write (QuerySet.update()) to its rows, once the transaction commits.
+    إبطال النطاقات المسجلة لنموذج بعد كتابة بدون إشارات، عند التثبيت.
+    """
+    namespaces = sorted(MODEL_NAMESPACES.get(model._meta.label, ()))
+    transaction.on_commit(lambda: invalidate(*namespaces))
@@ -0,0 +1,385 @@
+"""
+Period Comparison Engine
+محرك مقارنة الفترات
+
+This module computes "current vs previous period" metrics for analytics,
+dashboard and report endpoints.
+هذا الوحدة تحسب مؤشرات "الفترة الحالية مقابل السابقة" لنقاط التحليلات
+ولوحة التحكم والتقارير.
+
+Instead of running the same filters once per period and summing rows in
+Python, every (metric, window) pair becomes one conditional aggregate
+(`Sum(..., filter=Q(created_at__range=...))`) in a single query. Results
+are memoized in the cache keyed by (scope, metrics, windows).
+
+بدلاً من تنفيذ نفس الفلاتر مرة لكل فترة وجمع الصفوف في Python، كل زوج
+(مؤشر، نافذة) يصبح تجميعاً شرطياً واحداً ضمن استعلام واحد. النتائج تُخزن
+مؤقتاً حسب (النطاق، المؤشرات، النوافذ).
+
+Usage:
+    metrics = {
+        'revenue': total(F('price') * F('quantity')),
+        'orders': count('order_id', distinct=True),
+    }
+    current = Window(start, end)
+    result = compare(items, metrics, current, date_field='order__created_at',
+                     scope=f'vendor:{vendor.pk}:sales')
+    result.current['revenue'], result.previous['revenue'], result.change('revenue')
+
+    chart = series(items, metrics, current, unit='day', date_field='order__created_at')
+    chart['labels'], chart['current']['revenue'], chart['previous']['revenue']
+
+Windows are inclusive on both ends (like `__range`); None means unbounded.
+النوافذ شاملة للطرفين (مثل `__range`)؛ None تعني بدون حد.
+"""
+
+from collections import namedtuple
+from datetime import date, timedelta
+from decimal import Decimal
+from functools import reduce
+import hashlib
+import operator
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, DecimalField, Q, Sum
+from django.db.models.functions import Trunc
+from django.utils import timezone
+
+from core.instrumentation import record_cache
+
+
+CACHE_PREFIX = 'comparison'
+
+ONE_MICROSECOND = timedelta(microseconds=1)
+
+CENT = Decimal('0.01')
+
+# Bucket units supported by series()
+# وحدات التجميع المدعومة في series()
+SERIES_UNITS = ('day', 'month')
+
+
+# =============================================================================
+# Windows
+# النوافذ الزمنية
+# =============================================================================
+
+Window = namedtuple('Window', ['start', 'end'])
+
+
+def previous_window(window):
+    """
+    Window of the same length ending right before `window` starts.
+    نافذة بنفس الطول تنتهي مباشرة قبل بداية `window`.
+
+    [Oct 11 00:00, Oct 20 23:59:59.999999] -> [Oct 1 00:00, Oct 10 23:59:59.999999]
+    """
+    length = window.end - window.start + ONE_MICROSECOND
+    return Window(window.start - length, window.start - ONE_MICROSECOND)
+
+
+def window_q(date_field, window):
+    """Q object selecting rows whose date_field falls in the window"""
+    if window is None:
+        return Q()
+    start, end = window
+    if start is not None and end is not None:
+        return Q(**{f'{date_field}__range': (start, end)})
+    if start is not None:
+        return Q(**{f'{date_field}__gte': start})
+    if end is not None:
+        return Q(**{f'{date_field}__lte': end})
+    return Q()
+
+
+def percent_change(current, previous):
+    """
+    Percentage change from previous to current (100.0 when previous is 0).
+    نسبة التغيير من السابق إلى الحالي (100.0 عندما يكون السابق 0).
+    """
+    if not previous:
+        return 100.0 if current and current > 0 else 0.0
+    return float((Decimal(current) - Decimal(previous)) / Decimal(previous) * 100)
+
+
+# =============================================================================
+# Metrics
+# المؤشرات
+# =============================================================================
+
+class Metric:
+    """
+    Aggregate definition that can be evaluated per window.
+    تعريف تجميع يمكن حسابه لكل نافذة.
+
+    Args:
+        function: Aggregate class (Sum, Count, ...)
+        expression: Field name or expression to aggregate
+        condition: Extra Q the rows must match (e.g. a status filter)
+        distinct: Aggregate distinct values only
+        output_field: Output field for the aggregate
+        empty: Value returned when no row matches
+    """
+
+    def __init__(self, function, expression, condition=None, distinct=False,
+                 output_field=None, empty=0):
+        self.function = function
+        self.expression = expression
+        self.condition = condition
+        self.distinct = distinct
+        self.output_field = output_field
+        self.empty = empty
+
+    def aggregate(self, window_condition):
+        """Build the conditional aggregate for one window"""
+        condition = window_condition & self.condition if self.condition else window_condition
+        options = {'distinct': self.distinct}
+        if self.output_field is not None:
+            options['output_field'] = self.output_field
+        if condition:
+            options['filter'] = condition
+        return self.function(self.expression, **options)
+
+    def clean(self, value):
+        """Normalize a raw result (None -> empty, money rounded to cents)"""
+        if value is None:
+            return self.empty
+        if isinstance(value, Decimal):
+            return value.quantize(CENT)
+        return value
+
+
+def total(expression, condition=None):
+    """Sum of a money expression (Decimal, rounded to cents)"""
+    return Metric(
+        Sum, expression, condition=condition,
+        output_field=DecimalField(max_digits=14, decimal_places=2),
+        empty=Decimal('0.00'),
+    )
+
+
+def count(expression='pk', condition=None, distinct=False):
+    """Row count (or distinct count of an expression)"""
+    return Metric(Count, expression, condition=condition, distinct=distinct)
+
+
+# =============================================================================
+# Memoization
+# التخزين المؤقت
+# =============================================================================
+
+def _stamp(window):
+    if window is None:
+        return '*'
+    return '~'.join(value.isoformat() if value else '*' for value in window)
+
+
+def _cache_key(kind, scope, metrics, windows, date_field, extra=''):
+    raw = '|'.join([
+        kind, scope, date_field, ','.join(metrics), extra,
+        ','.join(f'{name}={_stamp(window)}' for name, window in windows.items()),
+    ])
+    digest = hashlib.md5(raw.encode('utf-8')).hexdigest()
+    return f'{CACHE_PREFIX}:{kind}:{digest}'
+
+
+def _memoize(key, compute):
+    if key is None:
+        return compute()
+    result = cache.get(key)
+    record_cache(result is not None, 'comparisons')
+    if result is None:
+        result = compute()
+        timeout = getattr(settings, 'CACHE_TIMEOUTS', {}).get('comparisons', 60 * 2)
+        cache.set(key, result, timeout)
+    return result
+
+
+def _window_aggregates(metrics, windows, date_field):
+    """
+    Conditional aggregates for every (metric, window) pair.
+    تجميعات شرطية لكل زوج (مؤشر، نافذة).
+
+    Returns:
+        tuple: ({window: Q}, {alias: (window, metric)}, {alias: aggregate})
+    """
+    conditions = {name: window_q(date_field, window) for name, window in windows.items()}
+    aliases = {}
+    aggregates = {}
+    for w, window_name in enumerate(windows):
+        for m, (metric_name, metric) in enumerate(metrics.items()):
+            alias = f'm{m}_w{w}'
+            aliases[alias] = (window_name, metric_name)
+            aggregates[alias] = metric.aggregate(conditions[window_name])
+    return conditions, aliases, aggregates
+
+
+def _union_filter(queryset, conditions):
+    """Restrict the scan to the union of the windows (if all are bounded)"""
+    conditions = list(conditions)
+    if conditions and all(conditions):
+        return queryset.filter(reduce(operator.or_, conditions))
+    return queryset
+
+
+# =============================================================================
+# Totals
+# المجاميع
+# =============================================================================
+
+def aggregate_windows(queryset, metrics, windows, date_field='created_at', scope=None):
+    """
+    Evaluate every metric in every window with one query.
+    حساب كل مؤشر في كل نافذة باستعلام واحد.
+
+    Args:
+        queryset: Base rows (already scoped, e.g. a vendor's order items)
+        metrics: {name: Metric}
+        windows: {name: Window | None}
+        date_field: Field the windows apply to
+        scope: Cache scope (e.g. 'vendor:12:sales'); None disables memoization
+
+    Returns:
+        dict: {window_name: {metric_name: value}}
+    """
+    def compute():
+        conditions, aliases, aggregates = _window_aggregates(metrics, windows, date_field)
+
+        row = _union_filter(queryset, conditions.values()).aggregate(**aggregates)
+
+        result = {window_name: {} for window_name in windows}
+        for alias, (window_name, metric_name) in aliases.items():
+            result[window_name][metric_name] = metrics[metric_name].clean(row[alias])
+        return result
+
+    key = _cache_key('totals', scope, metrics, windows, date_field) if scope else None
+    return _memoize(key, compute)
+
+
+class Comparison:
+    """
+    Current vs previous values for a set of metrics.
+    القيم الحالية مقابل السابقة لمجموعة مؤشرات.
+    """
+
+    def __init__(self, current_window, previous_window, current, previous):
+        self.current_window = current_window
+        self.previous_window = previous_window
+        self.current = current
+        self.previous = previous
+
+    def change(self, name):
+        """Percentage change of a metric"""
+        return percent_change(self.current[name], self.previous[name])
+
+
+def compare(queryset, metrics, current, previous=None, date_field='created_at', scope=None):
+    """
+    Compare metrics between two windows with one query.
+    مقارنة المؤشرات بين نافذتين باستعلام واحد.
+
+    Args:
+        current: Current Window
+        previous: Previous Window (default: same length right before current)
+
+    Returns:
+        Comparison
+    """
+    previous = previous or previous_window(current)
+    values = aggregate_windows(
+        queryset, metrics, {'current': current, 'previous': previous},
+        date_field=date_field, scope=scope,
+    )
+    return Comparison(current, previous, values['current'], values['previous'])
+
+
+# =============================================================================
+# Series
+# السلاسل الزمنية
+# =============================================================================
+
+def _bucket_key(value, unit):
+    day = value if isinstance(value, date) and not hasattr(value, 'hour') else value.date()
+    return day if unit == 'day' else day.replace(day=1)
+
+
+def _buckets(window, unit, tz):
+    """Bucket keys (dates) covering a bounded window, oldest first"""
+    key = _bucket_key(window.start.astimezone(tz), unit)
+    last = _bucket_key(window.end.astimezone(tz), unit)
+    keys = []
+    while key <= last:
+        keys.append(key)
+        if unit == 'day':
+            key += timedelta(days=1)
+        else:
+            key = (key + timedelta(days=32)).replace(day=1)
+    return keys
+
+
+def series(queryset, metrics, current, previous=None, unit='day',
+           date_field='created_at', tz=None, scope=None):
+    """
+    Aligned per-bucket series for the current and previous windows.
+    سلاسل لكل فترة تجميع للنافذتين الحالية والسابقة، متحاذية بالموضع.
+
+    Position i of the previous series is the i-th bucket of the previous
+    window, so both lines can be drawn on the same x axis. Rows are split
+    between windows with conditional aggregates, so a bucket straddling a
+    window edge is still attributed correctly.
+
+    الموضع i في السلسلة السابقة هو الفترة رقم i من النافذة السابقة، لذلك
+    يمكن رسم الخطين على نفس المحور.
+
+    Returns:
+        dict: {
+            'labels': [date, ...],            # current window buckets
+            'previous_labels': [date, ...],
+            'current': {metric: [values]},
+            'previous': {metric: [values]},   # padded / truncated to len(labels)
+        }
+    """
+    if unit not in SERIES_UNITS:
+        raise ValueError(f'Unsupported series unit: {unit}')
+    previous = previous or previous_window(current)
+    tz = tz or timezone.get_current_timezone()
+    windows = {'current': current, 'previous': previous}
+
+    def compute():
+        conditions, aliases, aggregates = _window_aggregates(metrics, windows, date_field)
+
+        rows = (
+            _union_filter(queryset, conditions.values())
+            .annotate(bucket=Trunc(date_field, unit, tzinfo=tz))
+            .values('bucket')
+            .annotate(**aggregates)
+            .order_by()
+        )
+        by_bucket = {}
+        for row in rows:
+            bucket = row['bucket']
+            if hasattr(bucket, 'astimezone') and timezone.is_aware(bucket):
+                bucket = bucket.astimezone(tz)
+            by_bucket[_bucket_key(bucket, unit)] = row
+
+        labels = {name: _buckets(window, unit, tz) for name, window in windows.items()}
+        size = len(labels['current'])
+        result = {
+            'labels': labels['current'],
+            'previous_labels': labels['previous'][:size],
+            'current': {},
+            'previous': {},
+        }
+        for alias, (window_name, metric_name) in aliases.items():
+            metric = metrics[metric_name]
+            values = [
+                metric.clean(by_bucket.get(key, {}).get(alias))
+                for key in labels[window_name][:size]
+            ]
+            values += [metric.empty] * (size - len(values))
+            result[window_name][metric_name] = values
+        return result
+
+    key = _cache_key('series', scope, metrics, windows, date_field, f'{unit}:{tz}') if scope else None
+    return _memoize(key, compute)
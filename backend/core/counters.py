@@ -0,0 +1,235 @@
+"""
+Write-Coalescing Counters
+عدادات بكتابة مجمّعة
+
+Hot counters (banner views/clicks, story views) are incremented in Redis
+(or in-process without Redis) instead of running one row UPDATE per hit.
+Pending deltas are flushed to the database every COUNTER_FLUSH_INTERVAL
+seconds with a single UPDATE per model:
+
+    UPDATE promotions_banner
+       SET views  = views  + CASE id WHEN 1 THEN 40 WHEN 2 THEN 3 ELSE 0 END,
+           clicks = clicks + CASE id WHEN 1 THEN 2 ELSE 0 END
+     WHERE id IN (1, 2)
+
+العدادات الساخنة تُزاد في Redis (أو داخل العملية بدونه) بدلاً من UPDATE لكل
+زيارة. الفروقات المعلقة تُكتب في قاعدة البيانات كل COUNTER_FLUSH_INTERVAL
+ثانية بعملية UPDATE واحدة لكل نموذج.
+
+Usage:
+    BANNER_VIEWS = counter('promotions.Banner', 'views')
+
+    BANNER_VIEWS.incr(banner.pk)           # no database write
+    BANNER_VIEWS.value(banner)             # persisted value + pending delta
+    BANNER_VIEWS.prefetch(banners)         # one round trip for a whole list
+"""
+
+import logging
+import threading
+from collections import Counter, defaultdict
+
+from django.apps import apps
+from django.conf import settings
+from django.db.models import Case, F, IntegerField, Value, When
+
+from core.background import PeriodicFlush
+from core.redis_utils import redis_key, store_selector
+
+logger = logging.getLogger(__name__)
+
+
+# =============================================================================
+# Stores
+# المخازن
+# =============================================================================
+
+class MemoryCounterStore:
+    """Per-process pending deltas / فروقات معلقة داخل العملية"""
+
+    def __init__(self):
+        self._deltas = defaultdict(Counter)
+        self._lock = threading.Lock()
+
+    def incr(self, key, pk, amount):
+        with self._lock:
+            self._deltas[key][pk] += amount
+
+    def pending(self, key, pks):
+        with self._lock:
+            deltas = self._deltas[key]
+            return {pk: deltas[pk] for pk in pks if deltas[pk]}
+
+    def pending_total(self, key):
+        with self._lock:
+            return sum(self._deltas[key].values())
+
+    def drain(self, key):
+        with self._lock:
+            return dict(self._deltas.pop(key, {}))
+
+
+class RedisCounterStore:
+    """Pending deltas in one Redis hash per counter / hash في Redis لكل عداد"""
+
+    def __init__(self, client):
+        self.client = client
+
+    def _key(self, key):
+        return redis_key(f'counters:{key}')
+
+    def incr(self, key, pk, amount):
+        self.client.hincrby(self._key(key), pk, amount)
+
+    def pending(self, key, pks):
+        pks = list(pks)
+        if not pks:
+            return {}
+        values = self.client.hmget(self._key(key), pks)
+        return {pk: int(value) for pk, value in zip(pks, values) if value}
+
+    def pending_total(self, key):
+        return sum(int(value) for value in self.client.hvals(self._key(key)))
+
+    def drain(self, key):
+        # HGETALL + DEL in one MULTI: increments after it start a new hash
+        # HGETALL + DEL ضمن MULTI واحدة: الزيادات بعدها تبدأ hash جديداً
+        pipe = self.client.pipeline(transaction=True)
+        pipe.hgetall(self._key(key))
+        pipe.delete(self._key(key))
+        raw, _ = pipe.execute()
+        return {int(pk): int(value) for pk, value in raw.items()}
+
+
+_memory_store = MemoryCounterStore()
+get_store = store_selector(_memory_store, RedisCounterStore)
+
+
+# =============================================================================
+# Counters
+# العدادات
+# =============================================================================
+
+_registry = []
+
+
+class CoalescedCounter:
+    """
+    Integer model field incremented through the pending-delta store.
+    حقل عدد صحيح يُزاد عبر مخزن الفروقات المعلقة.
+
+    Args:
+        model_label: 'app_label.ModelName'
+        field: Name of the integer field
+    """
+
+    def __init__(self, model_label, field):
+        self.model_label = model_label
+        self.field = field
+        self.key = f'{model_label}.{field}'
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+    def incr(self, pk, amount=1):
+        """Add to the pending delta (no database write) / إضافة للفرق المعلق"""
+        get_store().incr(self.key, pk, amount)
+        _flusher.poke()
+
+    def pending(self, pks):
+        """{pk: pending delta} for the given primary keys"""
+        return get_store().pending(self.key, pks)
+
+    def pending_total(self):
+        """Sum of all pending deltas (for totals over the whole table)"""
+        return get_store().pending_total(self.key)
+
+    def _cache_attr(self):
+        return f'_pending_{self.field}'
+
+    def prefetch(self, objects):
+        """
+        Load the pending deltas of many instances in one round trip.
+        تحميل الفروقات المعلقة لعدة كائنات دفعة واحدة.
+        """
+        objects = list(objects)
+        deltas = self.pending(obj.pk for obj in objects)
+        for obj in objects:
+            setattr(obj, self._cache_attr(), deltas.get(obj.pk, 0))
+        return objects
+
+    def value(self, obj):
+        """
+        Near-real-time value: persisted value + pending delta.
+        القيمة شبه الفورية: القيمة المحفوظة + الفرق المعلق.
+        """
+        delta = getattr(obj, self._cache_attr(), None)
+        if delta is None:
+            delta = self.pending([obj.pk]).get(obj.pk, 0)
+        return getattr(obj, self.field) + delta
+
+
+def counter(model_label, field):
+    """Create and register a coalesced counter / إنشاء وتسجيل عداد"""
+    instance = CoalescedCounter(model_label, field)
+    _registry.append(instance)
+    return instance
+
+
+# =============================================================================
+# Flushing
+# التفريغ
+# =============================================================================
+
+def _delta_case(deltas):
+    """CASE pk WHEN ... THEN delta ... ELSE 0 END"""
+    return Case(
+        *[When(pk=pk, then=Value(delta)) for pk, delta in deltas.items()],
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+
+
+def flush_counters():
+    """
+    Write all pending deltas with one UPDATE per model.
+    كتابة جميع الفروقات المعلقة بعملية UPDATE واحدة لكل نموذج.
+
+    Returns:
+        int: Number of rows updated
+    """
+    store = get_store()
+    by_model = defaultdict(list)
+    for instance in _registry:
+        by_model[instance.model_label].append(instance)
+
+    updated = 0
+    for model_label, counters in by_model.items():
+        drained = {instance: store.drain(instance.key) for instance in counters}
+        drained = {instance: deltas for instance, deltas in drained.items() if deltas}
+        if not drained:
+            continue
+
+        pks = set().union(*drained.values())
+        changes = {
+            instance.field: F(instance.field) + _delta_case(deltas)
+            for instance, deltas in drained.items()
+        }
+        try:
+            updated += apps.get_model(model_label).objects.filter(pk__in=pks).update(**changes)
+        except Exception:
+            # Give the deltas back so the next flush retries them
+            # إعادة الفروقات حتى يعيد التفريغ التالي المحاولة
+            for instance, deltas in drained.items():
+                for pk, delta in deltas.items():
+                    store.incr(instance.key, pk, delta)
+            logger.exception(f'Failed to flush counters of {model_label}')
+            raise
+    return updated
+
+
+# One background flush per process at a time
+# تفريغ واحد في الخلفية لكل عملية في كل مرة
+_flusher = PeriodicFlush(
+    flush_counters, lambda: getattr(settings, 'COUNTER_FLUSH_INTERVAL', 5)
+)
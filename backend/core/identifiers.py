@@ -0,0 +1,200 @@
+"""
+Unique Identifier Allocation
+تخصيص المعرفات الفريدة
+
+This module allocates unique slugs / SKUs ("black-shoe", "black-shoe-2", ...).
+هذا الوحدة تخصص slugs / SKUs فريدة ("black-shoe"، "black-shoe-2"، ...).
+
+Instead of probing `.exists()` once per candidate suffix (O(k) queries), all
+existing values starting with the base are fetched in one LIKE query and the
+next free suffix is chosen in memory. The DB unique constraint stays the
+source of truth: saves retry with a fresh allocation on IntegrityError.
+
+بدلاً من فحص `.exists()` لكل لاحقة مرشحة (O(k) استعلامات)، تُجلب جميع القيم
+الموجودة التي تبدأ بالأساس باستعلام LIKE واحد ويُختار أول لاحقة متاحة في الذاكرة.
+قيد التفرد في قاعدة البيانات يبقى المرجع: يُعاد الحفظ بتخصيص جديد عند IntegrityError.
+
+Usage:
+    # Single value
+    slug = allocate_unique(Vendor.objects.all(), 'slug', slugify(name), max_length=100)
+
+    # Batch (bulk_create)
+    allocator = UniqueValueAllocator(Product.objects.filter(vendor=vendor), 'slug', max_length=200)
+    slugs = allocator.allocate_many([slugify(n) for n in names])
+
+    # Model.save() with retry on the unique constraint
+    save_with_unique_value(self, 'slug', base, queryset, super().save, max_length=200)
+"""
+
+from functools import reduce
+import operator
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+
+
+# Characters kept free at the end of the base for the "-N" suffix
+# أحرف محجوزة في نهاية الأساس للاحقة "-N"
+SUFFIX_RESERVE = 8
+
+# Number of bases matched per LIKE query when preloading a batch
+# عدد الأسس في كل استعلام LIKE عند التحميل المسبق لدفعة
+PRELOAD_BATCH_SIZE = 100
+
+
+# =============================================================================
+# Allocator
+# المخصص
+# =============================================================================
+
+class UniqueValueAllocator:
+    """
+    In-memory allocator for one unique field within a queryset scope.
+    مخصص في الذاكرة لحقل فريد واحد ضمن نطاق queryset.
+
+    Args:
+        queryset: Rows the value must be unique among (e.g. the vendor's products)
+        field: Field name (e.g. 'slug', 'sku')
+        max_length: Field max_length - bases are truncated to leave room for "-N"
+        start: First numeric suffix tried after the bare base (default: 2)
+        transform: Optional callable applied to every candidate (e.g. str.upper)
+        fallback: Base used when the given base is empty
+    """
+
+    def __init__(self, queryset, field, max_length, start=2, transform=None, fallback='item'):
+        self.queryset = queryset
+        self.field = field
+        self.max_length = max_length
+        self.start = start
+        self.transform = transform or (lambda value: value)
+        self.fallback = fallback
+        self.taken = set()
+        self._loaded_bases = set()
+        self._loaded_all = False
+
+    def normalize_base(self, base):
+        """Apply fallback, truncation and transform to a base"""
+        base = base or self.fallback
+        base = base[:max(1, self.max_length - SUFFIX_RESERVE)]
+        return self.transform(base)
+
+    # =========================================================================
+    # Preloading
+    # التحميل المسبق
+    # =========================================================================
+
+    def preload_all(self):
+        """
+        Load every value in the scope (one query). Use for small scopes.
+        تحميل جميع القيم في النطاق (استعلام واحد). للنطاقات الصغيرة.
+        """
+        if not self._loaded_all:
+            self.taken.update(self.queryset.values_list(self.field, flat=True))
+            self._loaded_all = True
+        return self
+
+    def preload(self, bases):
+        """
+        Load existing values for many bases with batched LIKE queries.
+        تحميل القيم الموجودة لعدة أسس باستعلامات LIKE مجمعة.
+        """
+        if self._loaded_all:
+            return self
+        pending = sorted({self.normalize_base(base) for base in bases} - self._loaded_bases)
+        for i in range(0, len(pending), PRELOAD_BATCH_SIZE):
+            batch = pending[i:i + PRELOAD_BATCH_SIZE]
+            condition = reduce(operator.or_, (
+                Q(**{f'{self.field}__startswith': base}) for base in batch
+            ))
+            self.taken.update(
+                self.queryset.filter(condition).values_list(self.field, flat=True)
+            )
+            self._loaded_bases.update(batch)
+        return self
+
+    def mark_taken(self, values):
+        """Reserve values chosen elsewhere (e.g. explicit SKUs in an import)"""
+        self.taken.update(values)
+
+    def is_taken(self, value):
+        """Check a value against the loaded/reserved set"""
+        return value in self.taken
+
+    # =========================================================================
+    # Allocation
+    # التخصيص
+    # =========================================================================
+
+    def allocate(self, base):
+        """
+        Return the first free value for base and reserve it.
+        إرجاع أول قيمة متاحة للأساس وحجزها.
+        """
+        base = self.normalize_base(base)
+        if not self._loaded_all and base not in self._loaded_bases:
+            self.preload([base])
+
+        candidate = base
+        counter = self.start
+        while candidate in self.taken:
+            candidate = self.transform(f"{base}-{counter}")[:self.max_length]
+            counter += 1
+
+        self.taken.add(candidate)
+        return candidate
+
+    def allocate_many(self, bases):
+        """
+        Allocate one value per base (duplicates get successive suffixes).
+        تخصيص قيمة لكل أساس (الأسس المكررة تحصل على لواحق متتالية).
+        """
+        bases = list(bases)
+        self.preload(bases)
+        return [self.allocate(base) for base in bases]
+
+
+# =============================================================================
+# Helpers
+# دوال مساعدة
+# =============================================================================
+
+def allocate_unique(queryset, field, base, max_length, **options):
+    """
+    Allocate a single unique value with one query.
+    تخصيص قيمة فريدة واحدة باستعلام واحد.
+    """
+    return UniqueValueAllocator(queryset, field, max_length, **options).allocate(base)
+
+
+def save_with_unique_value(instance, field, base, queryset, save, max_length, attempts=5, **options):
+    """
+    Allocate a unique value for instance.<field> and save, retrying on conflict.
+    تخصيص قيمة فريدة للحقل ثم الحفظ، مع إعادة المحاولة عند التعارض.
+
+    Two concurrent saves can pick the same value; the loser hits the unique
+    constraint and re-allocates from fresh data instead of failing the request.
+
+    حفظان متزامنان قد يختاران نفس القيمة؛ الخاسر يصطدم بقيد التفرد ويعيد
+    التخصيص من بيانات جديدة بدلاً من إفشال الطلب.
+
+    Args:
+        instance: Model instance being saved
+        field: Unique field name
+        base: Base value (e.g. slugify(name))
+        queryset: Uniqueness scope (exclude instance.pk for updates)
+        save: Callable performing the actual save (usually super().save)
+        max_length: Field max_length
+        attempts: Maximum number of allocations before giving up
+    """
+    for attempt in range(attempts):
+        value = allocate_unique(queryset, field, base, max_length, **options)
+        setattr(instance, field, value)
+        try:
+            # Savepoint so a conflict does not break the caller's transaction
+            # نقطة حفظ حتى لا يكسر التعارض transaction المستدعي
+            with transaction.atomic():
+                save()
+            return value
+        except IntegrityError as e:
+            if field not in str(e).lower() or attempt == attempts - 1:
+                raise
@@ -0,0 +1,305 @@
+"""
+Image Derivatives
+مشتقات الصور
+
+This module generates resized WebP / JPEG copies (thumb, card, zoom) of
+uploaded images, so list endpoints can serve small files instead of the
+original multi-megabyte photos.
+
+هذا الوحدة تنشئ نسخاً مصغرة بصيغة WebP / JPEG (thumb, card, zoom) للصور
+المرفوعة، حتى تخدم نقاط القائمة ملفات صغيرة بدلاً من الصور الأصلية الكبيرة.
+
+How it works:
+1. Models store generated paths in an `image_derivatives` JSONField
+2. register_image_field() connects a post_save handler for the image field
+3. When the stored 'source' differs from the current file, generation is
+   scheduled off the request thread (core.background)
+4. Serializers call derivative_urls() - None until derivatives are ready
+
+طريقة العمل:
+1. النماذج تخزن المسارات المولدة في حقل JSON باسم `image_derivatives`
+2. register_image_field() يربط معالج post_save لحقل الصورة
+3. عندما يختلف 'source' المخزن عن الملف الحالي، تُجدول المعالجة خارج خيط الطلب
+4. المسلسلات تستدعي derivative_urls() - تُرجع None حتى تجهز المشتقات
+
+Stored format (the default storage is content-addressed, core.storage, so
+derivatives land under cas/ like the uploads):
+    {
+        'source': 'cas/3f/a2/3fa2...c1.jpg',
+        'sizes': {
+            'thumb': {'width': 200, 'height': 150,
+                      'webp': 'cas/9b/04/9b04...e7.webp',
+                      'jpeg': 'cas/51/d8/51d8...0a.jpg'},
+            ...
+        }
+    }
+
+With a plain FileSystemStorage the names come from derivative_dir(), e.g.
+'products/derivatives/shoe-jpg/thumb.webp'.
+مع التخزين حسب المحتوى تُحفظ المشتقات تحت cas/؛ مع التخزين العادي تأتي
+الأسماء من derivative_dir().
+"""
+
+import io
+import logging
+import os
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db.models.signals import post_save
+from PIL import Image, ImageOps
+
+from core.background import run_in_background
+from core.cache import invalidate_for
+
+logger = logging.getLogger(__name__)
+
+
+DERIVATIVES_FIELD = 'image_derivatives'
+
+DERIVATIVE_SETTINGS = getattr(settings, 'IMAGE_DERIVATIVES', {})
+SIZES = DERIVATIVE_SETTINGS.get('SIZES', {
+    'thumb': (200, 200),
+    'card': (600, 600),
+    'zoom': (1600, 1600),
+})
+FORMATS = DERIVATIVE_SETTINGS.get('FORMATS', ('webp', 'jpeg'))
+QUALITY = DERIVATIVE_SETTINGS.get('QUALITY', {'webp': 80, 'jpeg': 82})
+
+# File extension and Pillow format per output format
+# امتداد الملف وصيغة Pillow لكل صيغة إخراج
+FORMAT_OPTIONS = {
+    'webp': ('webp', 'WEBP'),
+    'jpeg': ('jpg', 'JPEG'),
+}
+
+# (model, field_name) pairs registered with register_image_field()
+# أزواج (النموذج، اسم الحقل) المسجلة
+REGISTERED_FIELDS = []
+
+
+# =============================================================================
+# Rendering
+# المعالجة
+# =============================================================================
+
+def derivative_dir(name):
+    """
+    Directory for the derivatives of a stored file.
+    مجلد مشتقات الملف المخزن.
+
+    'products/shoe.jpg' -> 'products/derivatives/shoe-jpg'
+
+    Only used by name-preserving storages: ContentAddressedStorage keeps
+    the extension and names the file by its digest.
+    يُستخدم فقط مع التخزين الذي يحفظ الأسماء.
+    """
+    directory, filename = os.path.split(name)
+    stem, ext = os.path.splitext(filename)
+    if ext:
+        stem = f'{stem}-{ext.lstrip(".").lower()}'
+    return os.path.join(directory, 'derivatives', stem)
+
+
+def _render(image, size, output_format):
+    """
+    Resize (never upscale) and encode one derivative.
+    تغيير الحجم (بدون تكبير) وترميز مشتق واحد.
+    """
+    resized = image.copy()
+    resized.thumbnail(size, Image.Resampling.LANCZOS)
+
+    _ext, pil_format = FORMAT_OPTIONS[output_format]
+    if pil_format == 'JPEG' and resized.mode != 'RGB':
+        # JPEG has no alpha channel - flatten onto white
+        # JPEG لا يدعم الشفافية - دمج على خلفية بيضاء
+        background = Image.new('RGB', resized.size, (255, 255, 255))
+        rgba = resized.convert('RGBA')
+        background.paste(rgba, mask=rgba.getchannel('A'))
+        resized = background
+    elif resized.mode not in ('RGB', 'RGBA'):
+        resized = resized.convert('RGBA' if 'A' in resized.getbands() else 'RGB')
+
+    buffer = io.BytesIO()
+    resized.save(
+        buffer,
+        format=pil_format,
+        quality=QUALITY.get(output_format, 80),
+        optimize=pil_format == 'JPEG',
+    )
+    return resized.size, buffer.getvalue()
+
+
+def build_derivatives(field_file):
+    """
+    Generate every configured size/format for a stored image file.
+    إنشاء جميع الأحجام والصيغ المعرّفة لملف صورة مخزن.
+
+    Returns:
+        dict: Stored-format dict ('source' + 'sizes')
+    """
+    storage = field_file.storage
+    target_dir = derivative_dir(field_file.name)
+
+    with storage.open(field_file.name, 'rb') as f:
+        image = Image.open(f)
+        image = ImageOps.exif_transpose(image)
+        image.load()
+
+    sizes = {}
+    for size_name, box in SIZES.items():
+        entry = {}
+        for output_format in FORMATS:
+            (width, height), content = _render(image, box, output_format)
+            ext, _pil_format = FORMAT_OPTIONS[output_format]
+            path = os.path.join(target_dir, f'{size_name}.{ext}')
+            # Overwrite in place on name-preserving storages (storage.save
+            # would add a random suffix); content-addressed names are final
+            # الكتابة فوق الملف في التخزين العادي؛ أسماء cas/ نهائية
+            if storage.exists(path):
+                storage.delete(path)
+            entry[output_format] = storage.save(path, ContentFile(content))
+            entry['width'], entry['height'] = width, height
+        sizes[size_name] = entry
+
+    return {'source': field_file.name, 'sizes': sizes}
+
+
+def derivative_paths(derivatives):
+    """All file paths referenced by a stored derivatives dict"""
+    paths = set()
+    for entry in (derivatives or {}).get('sizes', {}).values():
+        paths.update(entry.get(output_format) for output_format in FORMAT_OPTIONS if entry.get(output_format))
+    return paths
+
+
+# =============================================================================
+# Background Task
+# المهمة الخلفية
+# =============================================================================
+
+def generate_derivatives(model_label, pk, field_name, force=False):
+    """
+    Generate derivatives for one instance (runs in a background thread).
+    إنشاء المشتقات لكائن واحد (تعمل في خيط خلفي).
+
+    Returns:
+        bool: True if derivatives were generated and stored
+    """
+    model = apps.get_model(model_label)
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None:
+        return False
+
+    field_file = getattr(instance, field_name)
+    if not field_file or not field_file.name:
+        return False
+
+    previous = getattr(instance, DERIVATIVES_FIELD) or {}
+    if previous.get('source') == field_file.name and not force:
+        return False
+
+    try:
+        derivatives = build_derivatives(field_file)
+    except FileNotFoundError:
+        logger.warning(f'Image derivatives skipped for {model_label} #{pk}: {field_file.name} is missing')
+        return False
+    except Exception:
+        logger.exception(f'Image derivatives failed for {model_label} #{pk} ({field_file.name})')
+        return False
+
+    # Only store if the image was not replaced meanwhile; update() skips signals
+    # الحفظ فقط إذا لم تُستبدل الصورة أثناء المعالجة؛ update() لا يطلق الإشارات
+    updated = model.objects.filter(pk=pk, **{field_name: field_file.name}).update(
+        **{DERIVATIVES_FIELD: derivatives}
+    )
+    if not updated:
+        return False
+    # Cached responses embedding this row now lack its derivatives
+    # الاستجابات المخزنة لهذا الصف تفتقد المشتقات الآن
+    invalidate_for(model)
+
+    # Remove files left over from the previous image
+    # حذف الملفات المتبقية من الصورة السابقة
+    for path in derivative_paths(previous) - derivative_paths(derivatives):
+        try:
+            field_file.storage.delete(path)
+        except Exception:
+            logger.warning(f'Could not delete stale derivative {path}')
+    return True
+
+
+def needs_derivatives(instance, field_name):
+    """Check if the stored derivatives are missing or outdated"""
+    field_file = getattr(instance, field_name)
+    if not field_file or not field_file.name:
+        return False
+    derivatives = getattr(instance, DERIVATIVES_FIELD) or {}
+    return derivatives.get('source') != field_file.name
+
+
+def schedule_derivatives(instance, field_name):
+    """
+    Schedule derivative generation after the current transaction commits.
+    جدولة إنشاء المشتقات بعد تثبيت الـ transaction الحالية.
+    """
+    run_in_background(generate_derivatives, instance._meta.label, instance.pk, field_name)
+
+
+def register_image_field(model, field_name):
+    """
+    Generate derivatives whenever model.<field_name> changes.
+    إنشاء المشتقات عند تغيّر model.<field_name>.
+
+    Call from AppConfig.ready():
+        register_image_field(self.get_model('ProductImage'), 'image')
+    """
+    def _on_save(sender, instance, raw=False, **kwargs):
+        if raw or not needs_derivatives(instance, field_name):
+            return
+        schedule_derivatives(instance, field_name)
+
+    REGISTERED_FIELDS.append((model, field_name))
+    post_save.connect(
+        _on_save,
+        sender=model,
+        weak=False,
+        dispatch_uid=f'image_derivatives_{model._meta.label_lower}_{field_name}',
+    )
+
+
+# =============================================================================
+# Serializer Helper
+# دالة مساعدة للمسلسلات
+# =============================================================================
+
+def derivative_urls(instance, field_name, request=None):
+    """
+    Build derivative URLs for API responses.
+    بناء روابط المشتقات لاستجابات الـ API.
+
+    Returns:
+        dict | None: {'thumb': {'width', 'height', 'webp', 'jpeg'}, ...}
+                     or None while derivatives are not generated yet
+                     (clients fall back to the original image URL)
+    """
+    if instance is None:
+        return None
+    field_file = getattr(instance, field_name)
+    derivatives = getattr(instance, DERIVATIVES_FIELD) or {}
+    if not field_file or derivatives.get('source') != field_file.name:
+        return None
+
+    storage = field_file.storage
+    urls = {}
+    for size_name, entry in derivatives.get('sizes', {}).items():
+        size_urls = {'width': entry.get('width'), 'height': entry.get('height')}
+        for output_format in FORMAT_OPTIONS:
+            path = entry.get(output_format)
+            if not path:
+                continue
+            url = storage.url(path)
+            size_urls[output_format] = request.build_absolute_uri(url) if request else url
+        urls[size_name] = size_urls
+    return urls
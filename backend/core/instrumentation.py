@@ -0,0 +1,420 @@
+"""
+Request Instrumentation
+قياس أداء الطلبات
+
+Per-request and per-route performance data:
+
+1. collect() wraps every database connection with execute_wrapper for the
+   duration of a request and counts queries and SQL time; record_cache()
+   counts cache hits / misses of the memoized lookups, also per cache
+   namespace (hit ratio exported next to the route metrics)
+2. InstrumentationMiddleware (core.middleware) adds a Server-Timing header
+   and records the request in its route's latency histogram
+3. Route histograms are accumulated in-process and flushed every
+   METRICS_FLUSH_INTERVAL seconds to Redis (shared by all workers) or to
+   the in-process store without Redis
+4. metrics_view serves them in Prometheus text format: cumulative
+   histograms plus p50 / p95 / p99 over the current and previous
+   METRICS_WINDOW
+
+بيانات الأداء لكل طلب ولكل مسار:
+1. collect() تلف اتصالات قاعدة البيانات بـ execute_wrapper وتعد الاستعلامات
+   ووقت SQL؛ record_cache() تعد إصابات وإخفاقات الكاش
+2. InstrumentationMiddleware تضيف ترويسة Server-Timing وتسجل الطلب في مدرج مساره
+3. المدرجات تُجمع داخل العملية وتُفرغ دورياً إلى Redis أو إلى مخزن داخلي
+4. metrics_view تعرضها بصيغة Prometheus مع p50 / p95 / p99 لآخر نافذة زمنية
+
+Routes are URL patterns ('/api/v1/vendor/products/<int:pk>/'), not paths,
+so the number of series stays bounded.
+المسارات هي أنماط URL وليست المسارات الفعلية حتى يبقى عدد السلاسل محدوداً.
+"""
+
+import hmac
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+
+from core.background import PeriodicFlush
+from core.redis_utils import redis_key, setting, store_selector
+
+
+# Upper bounds of the latency buckets (seconds)
+# الحدود العليا لفئات زمن الاستجابة (بالثواني)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+TOTALS = 'totals'
+
+# Series prefix of the per-namespace cache counters (route series are
+# "METHOD /route", so they never start with it)
+# بادئة سلاسل عدادات الكاش لكل نطاق
+CACHE_SERIES = 'cache:'
+
+
+# =============================================================================
+# Per-Request Stats
+# إحصائيات الطلب
+# =============================================================================
+
+class RequestStats:
+    """Counters of one request / عدادات طلب واحد"""
+
+    __slots__ = ('queries', 'sql_time', 'cache_hits', 'cache_misses')
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+
+_current = ContextVar('request_stats', default=None)
+
+
+def current_stats():
+    """Stats of the request being handled, or None / إحصائيات الطلب الحالي"""
+    return _current.get()
+
+
+def _record_sql(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.sql_time += time.perf_counter() - start
+
+
+@contextmanager
+def collect():
+    """
+    Count the queries, SQL time and cache lookups of the enclosed block.
+    عد الاستعلامات ووقت SQL وعمليات الكاش داخل الكتلة.
+
+    Usage:
+        with collect() as stats:
+            response = get_response(request)
+        stats.queries, stats.sql_time
+    """
+    stats = RequestStats()
+    token = _current.set(stats)
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(_record_sql))
+            yield stats
+    finally:
+        _current.reset(token)
+
+
+def record_cache(hit, namespace=None, result=None):
+    """
+    Count a cache lookup: on the current request (if any) and, with a
+    namespace, in the per-namespace totals exported by /metrics/.
+    عد عملية كاش: على الطلب الحالي، ومع النطاق في مجاميع النطاقات.
+
+    Args:
+        hit: Whether the value was served from the cache
+        namespace: Cache namespace (e.g. 'coupons', 'products_list')
+        result: Finer outcome label (default: shared_hit / miss)
+    """
+    stats = _current.get()
+    if stats is not None:
+        if hit:
+            stats.cache_hits += 1
+        else:
+            stats.cache_misses += 1
+    if namespace:
+        with _pending_lock:
+            _pending[f'{CACHE_SERIES}{namespace}|{result or ("shared_hit" if hit else "miss")}'] += 1
+            _pending[f'{CACHE_SERIES}{namespace}|{"hits" if hit else "misses"}'] += 1
+        _flusher.poke()
+
+
+def server_timing(stats, duration):
+    """Server-Timing header value / قيمة ترويسة Server-Timing"""
+    return (
+        f'db;dur={stats.sql_time * 1000:.1f};desc="{stats.queries} queries", '
+        f'cache;desc="{stats.cache_hits} hits {stats.cache_misses} misses", '
+        f'app;dur={duration * 1000:.1f}'
+    )
+
+
+# =============================================================================
+# Stores
+# المخازن
+# =============================================================================
+
+class MemoryMetricsStore:
+    """In-process metric hashes / جداول المقاييس داخل العملية"""
+
+    def __init__(self):
+        self._hashes = defaultdict(Counter)
+        self._lock = threading.Lock()
+
+    def add(self, name, fields, ttl=None):
+        with self._lock:
+            self._hashes[name].update(fields)
+
+    def read(self, name):
+        with self._lock:
+            return dict(self._hashes.get(name, {}))
+
+    def prune(self, keep):
+        """Drop window hashes not in `keep` / حذف النوافذ القديمة"""
+        with self._lock:
+            for name in list(self._hashes):
+                if name != TOTALS and name not in keep:
+                    del self._hashes[name]
+
+
+class RedisMetricsStore:
+    """Metric hashes in Redis, shared by all workers / جداول المقاييس في Redis"""
+
+    def __init__(self, client):
+        self.client = client
+
+    def _key(self, name):
+        return redis_key(f'metrics:{name}')
+
+    def add(self, name, fields, ttl=None):
+        pipe = self.client.pipeline(transaction=False)
+        for field, value in fields.items():
+            pipe.hincrbyfloat(self._key(name), field, value)
+        if ttl:
+            pipe.expire(self._key(name), ttl)
+        pipe.execute()
+
+    def read(self, name):
+        raw = self.client.hgetall(self._key(name))
+        return {field.decode(): float(value) for field, value in raw.items()}
+
+    def prune(self, keep):
+        # Window hashes expire on their own
+        # جداول النوافذ تنتهي صلاحيتها تلقائياً
+        pass
+
+
+_memory_store = MemoryMetricsStore()
+get_store = store_selector(_memory_store, RedisMetricsStore)
+
+
+# =============================================================================
+# Route Histograms
+# مدرجات المسارات
+# =============================================================================
+
+_pending = Counter()
+_pending_lock = threading.Lock()
+
+
+def _bucket_index(duration):
+    for index, bound in enumerate(LATENCY_BUCKETS):
+        if duration <= bound:
+            return index
+    return len(LATENCY_BUCKETS)
+
+
+def record_request(method, route, duration, stats):
+    """
+    Add a finished request to its route's histogram (in memory; flushed in
+    the background).
+    إضافة طلب منتهٍ إلى مدرج مساره (في الذاكرة؛ يُفرغ في الخلفية).
+    """
+    series = f'{method} {route}'
+    with _pending_lock:
+        _pending[f'{series}|b{_bucket_index(duration)}'] += 1
+        _pending[f'{series}|count'] += 1
+        _pending[f'{series}|sum'] += duration
+        _pending[f'{series}|queries'] += stats.queries
+        _pending[f'{series}|db'] += stats.sql_time
+        _pending[f'{series}|hits'] += stats.cache_hits
+        _pending[f'{series}|misses'] += stats.cache_misses
+    _flusher.poke()
+
+
+def _window(now=None):
+    size = setting('METRICS_WINDOW', 300)
+    return int((now or time.time()) // size), size
+
+
+def flush_metrics():
+    """
+    Move pending histogram data into the totals and the current window.
+    نقل بيانات المدرجات المعلقة إلى المجاميع والنافذة الحالية.
+    """
+    global _pending
+    with _pending_lock:
+        fields, _pending = _pending, Counter()
+    if not fields:
+        return 0
+    store = get_store()
+    index, size = _window()
+    store.add(TOTALS, fields)
+    store.add(f'window:{index}', fields, ttl=size * 2)
+    store.prune({f'window:{index}', f'window:{index - 1}'})
+    return len(fields)
+
+
+# One background flush per process at a time
+# تفريغ واحد في الخلفية لكل عملية في كل مرة
+_flusher = PeriodicFlush(flush_metrics, lambda: setting('METRICS_FLUSH_INTERVAL', 10))
+
+
+# =============================================================================
+# Prometheus Exposition
+# العرض بصيغة Prometheus
+# =============================================================================
+
+def _group(fields):
+    """{series: {suffix: value}} from 'series|suffix' fields"""
+    grouped = defaultdict(dict)
+    for field, value in fields.items():
+        series, _, suffix = field.rpartition('|')
+        grouped[series][suffix] = value
+    return grouped
+
+
+def _quantile(buckets, q):
+    """
+    Quantile estimated from bucket counts (linear interpolation inside the
+    bucket, like Prometheus' histogram_quantile).
+    تقدير الـ quantile من عدد كل فئة (استيفاء خطي داخل الفئة).
+    """
+    total = sum(buckets)
+    if not total:
+        return None
+    rank = q * total
+    seen = 0
+    for index, count in enumerate(buckets):
+        if count and seen + count >= rank:
+            lower = LATENCY_BUCKETS[index - 1] if index else 0.0
+            if index == len(LATENCY_BUCKETS):
+                return lower
+            return lower + (LATENCY_BUCKETS[index] - lower) * (rank - seen) / count
+        seen += count
+    return LATENCY_BUCKETS[-1]
+
+
+def _format_labels(labels):
+    body = ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"'))
+        for name, value in labels.items()
+    )
+    return '{' + body + '}'
+
+
+def _labels(series, **extra):
+    method, _, route = series.partition(' ')
+    return _format_labels({'method': method, 'route': route, **extra})
+
+
+def _buckets(values):
+    return [int(values.get(f'b{index}', 0)) for index in range(len(LATENCY_BUCKETS) + 1)]
+
+
+def render_prometheus():
+    """
+    Route metrics in Prometheus text exposition format.
+    مقاييس المسارات بصيغة Prometheus النصية.
+    """
+    flush_metrics()
+    store = get_store()
+    totals = _group(store.read(TOTALS))
+    caches = {
+        series[len(CACHE_SERIES):]: totals.pop(series)
+        for series in list(totals) if series.startswith(CACHE_SERIES)
+    }
+    index, size = _window()
+    recent = defaultdict(Counter)
+    for name in (f'window:{index - 1}', f'window:{index}'):
+        for series, values in _group(store.read(name)).items():
+            if not series.startswith(CACHE_SERIES):
+                recent[series].update(values)
+
+    lines = [
+        '# HELP http_request_duration_seconds Request latency by route.',
+        '# TYPE http_request_duration_seconds histogram',
+    ]
+    for series in sorted(totals):
+        values = totals[series]
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS + ('+Inf',), _buckets(values)):
+            cumulative += count
+            lines.append(f'http_request_duration_seconds_bucket{_labels(series, le=bound)} {cumulative}')
+        lines.append(f'http_request_duration_seconds_sum{_labels(series)} {values.get("sum", 0):.6f}')
+        lines.append(f'http_request_duration_seconds_count{_labels(series)} {int(values.get("count", 0))}')
+
+    counters = [
+        ('http_request_db_queries_total', 'queries', 'Database queries by route.', '{:.0f}'),
+        ('http_request_db_seconds_total', 'db', 'Time spent in SQL by route.', '{:.6f}'),
+        ('http_request_cache_hits_total', 'hits', 'Cache hits by route.', '{:.0f}'),
+        ('http_request_cache_misses_total', 'misses', 'Cache misses by route.', '{:.0f}'),
+    ]
+    for metric, suffix, help_text, fmt in counters:
+        lines.append(f'# HELP {metric} {help_text}')
+        lines.append(f'# TYPE {metric} counter')
+        for series in sorted(totals):
+            lines.append(f'{metric}{_labels(series)} {fmt.format(totals[series].get(suffix, 0))}')
+
+    lines.append(
+        f'# HELP http_request_duration_recent_seconds Latency quantiles over the last {size * 2}s by route.'
+    )
+    lines.append('# TYPE http_request_duration_recent_seconds gauge')
+    for series in sorted(recent):
+        buckets = _buckets(recent[series])
+        for q in QUANTILES:
+            value = _quantile(buckets, q)
+            if value is not None:
+                lines.append(f'http_request_duration_recent_seconds{_labels(series, quantile=q)} {value:.6f}')
+    lines.extend(_cache_lines(caches))
+    return '\n'.join(lines) + '\n'
+
+
+def _cache_lines(caches):
+    """Per-namespace cache lookups and hit ratio / عمليات الكاش ونسبة الإصابة لكل نطاق"""
+    lines = [
+        '# HELP cache_lookups_total Cache lookups by namespace and result.',
+        '# TYPE cache_lookups_total counter',
+    ]
+    for namespace in sorted(caches):
+        for result, value in sorted(caches[namespace].items()):
+            if result not in ('hits', 'misses'):
+                lines.append(
+                    f'cache_lookups_total{_format_labels({"namespace": namespace, "result": result})} {value:.0f}'
+                )
+    lines.append('# HELP cache_hit_ratio Share of cache lookups served without recomputing, by namespace.')
+    lines.append('# TYPE cache_hit_ratio gauge')
+    for namespace in sorted(caches):
+        hits, misses = caches[namespace].get('hits', 0), caches[namespace].get('misses', 0)
+        if hits + misses:
+            lines.append(
+                f'cache_hit_ratio{_format_labels({"namespace": namespace})} {hits / (hits + misses):.4f}'
+            )
+    return lines
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint.
+    نقطة جمع مقاييس Prometheus.
+
+    Requires `Authorization: Bearer <METRICS_TOKEN>` or a staff session.
+    يتطلب رمز METRICS_TOKEN أو جلسة موظف.
+    """
+    token = setting('METRICS_TOKEN', '')
+    authorized = bool(token) and hmac.compare_digest(
+        request.META.get('HTTP_AUTHORIZATION', ''), f'Bearer {token}'
+    )
+    if not authorized and not (request.user.is_authenticated and request.user.is_staff):
+        return HttpResponseForbidden('Forbidden')
+    return HttpResponse(render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
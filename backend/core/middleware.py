@@ -20,10 +20,43 @@ import logging
 from django.utils.deprecation import MiddlewareMixin
 from django.http import JsonResponse
 from django.conf import settings
+from django.utils.functional import SimpleLazyObject, empty
+
+from core.instrumentation import collect, record_request, server_timing
 
 logger = logging.getLogger(__name__)
 
 
+# ============================================================================
+# Readiness Middleware
+# Middleware لفحص الجاهزية
+# ============================================================================
+
+class ReadinessMiddleware:
+    """
+    Answer the readiness probe before any other middleware runs.
+    الرد على فحص الجاهزية قبل تشغيل أي middleware آخر.
+    
+    GET /health/ready/ returns 200 as soon as the worker has loaded the app.
+    It never touches the database, sessions or cache, skips host validation
+    and the HTTPS redirect, so load balancers and container health checks
+    can poll it cheaply on every worker.
+    
+    يُرجع 200 بمجرد تحميل العامل للتطبيق، دون لمس قاعدة البيانات أو الجلسات
+    أو الكاش، ودون التحقق من المضيف أو إعادة التوجيه إلى HTTPS.
+    """
+    
+    READINESS_PATH = '/health/ready/'
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        if request.path_info == self.READINESS_PATH:
+            return JsonResponse({'status': 'ready'})
+        return self.get_response(request)
+
+
 # ============================================================================
 # Proxy HTTPS Middleware
 # Middleware للتعامل مع HTTPS خلف البروكسي
@@ -78,7 +111,8 @@ class RequestLoggingMiddleware(MiddlewareMixin):
     - Request method and path
     - Response status code
     - Processing time
-    - User information (if authenticated)
+    - Query count, SQL time and cache hits / misses (InstrumentationMiddleware)
+    - User id (only if already authenticated; never triggers a lookup)
     """
     
     def process_request(self, request):
@@ -86,7 +120,7 @@ class RequestLoggingMiddleware(MiddlewareMixin):
         Store request start time
         تخزين وقت بداية الطلب
         """
-        request._start_time = time.time()
+        request._start_time = time.perf_counter()
         return None
     
     def process_response(self, request, response):
@@ -94,35 +128,99 @@ class RequestLoggingMiddleware(MiddlewareMixin):
         Log request and response information
         تسجيل معلومات الطلب والاستجابة
         """
+        # Log API requests only (skip static files, admin, etc.)
+        # تسجيل طلبات API فقط (تخطي الملفات الثابتة، admin، إلخ)
+        if not request.path.startswith('/api/'):
+            return response
+        
         # Calculate processing time
         # حساب وقت المعالجة
-        if hasattr(request, '_start_time'):
-            duration = time.time() - request._start_time
-        else:
-            duration = 0
+        start = getattr(request, '_start_time', None)
+        duration = time.perf_counter() - start if start is not None else 0
         
-        # Log API requests only (skip static files, admin, etc.)
-        # تسجيل طلبات API فقط (تخطي الملفات الثابتة، admin، إلخ)
-        if request.path.startswith('/api/'):
-            # Get user info if authenticated
-            # الحصول على معلومات المستخدم إذا كان مسجلاً
-            user_info = None
-            if hasattr(request, 'user') and request.user.is_authenticated:
-                user_info = {
-                    "id": request.user.id,
-                    "email": request.user.email,
-                    "role": request.user.role,
-                }
-            
-            # Log request
-            # تسجيل الطلب
-            logger.info(
-                f"API Request: {request.method} {request.path} | "
-                f"Status: {response.status_code} | "
-                f"Duration: {duration:.3f}s | "
-                f"User: {user_info}"
-            )
+        # The user resolved by DRF authentication, without evaluating a lazy
+        # session user
+        # المستخدم الذي حلّته مصادقة DRF دون تقييم مستخدم الجلسة الكسول
+        user = request.__dict__.get('user')
+        if isinstance(user, SimpleLazyObject) and user._wrapped is empty:
+            user = None
+        user_id = user.pk if user is not None and user.is_authenticated else None
+        
+        stats = getattr(request, '_stats', None)
+        logger.info(
+            'API Request: %s %s | Status: %s | Duration: %.3fs | Queries: %s | DB: %.3fs | '
+            'Cache: %s/%s | User: %s',
+            request.method, request.path, response.status_code, duration,
+            stats.queries if stats else '-', stats.sql_time if stats else 0,
+            stats.cache_hits if stats else '-', stats.cache_misses if stats else '-',
+            user_id,
+        )
+        return response
+
+
+# ============================================================================
+# Instrumentation Middleware
+# Middleware لقياس الأداء
+# ============================================================================
+
+class InstrumentationMiddleware:
+    """
+    Count queries, SQL time and cache lookups per request, add a
+    Server-Timing header and record the route's latency histogram
+    (see core.instrumentation).
+    عد الاستعلامات ووقت SQL وعمليات الكاش لكل طلب، وإضافة ترويسة
+    Server-Timing وتسجيل زمن الاستجابة في مدرج المسار.
+    """
+    
+    METHODS = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'}
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        start = time.perf_counter()
+        with collect() as stats:
+            request._stats = stats
+            response = self.get_response(request)
+        duration = time.perf_counter() - start
         
+        if getattr(settings, 'SERVER_TIMING_ENABLED', True):
+            response['Server-Timing'] = server_timing(stats, duration)
+        
+        # URL pattern, not path: keeps the number of series bounded
+        # نمط الـ URL وليس المسار: يبقي عدد السلاسل محدوداً
+        match = getattr(request, 'resolver_match', None)
+        route = '/' + match.route if match is not None else 'unmatched'
+        method = request.method if request.method in self.METHODS else 'OTHER'
+        record_request(method, route, duration, stats)
+        return response
+
+
+# ============================================================================
+# Rate Limit Headers Middleware
+# Middleware لترويسات تحديد المعدل
+# ============================================================================
+
+class RateLimitHeadersMiddleware:
+    """
+    Add RateLimit-Limit / RateLimit-Remaining / RateLimit-Reset (and
+    Retry-After on throttled responses) from the decision recorded by the
+    core.throttling throttles.
+    إضافة ترويسات RateLimit-* (و Retry-After عند التقييد) من القرار الذي
+    سجلته الـ throttles في core.throttling.
+    """
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        response = self.get_response(request)
+        result = getattr(request, '_rate_limit', None)
+        if result is not None:
+            from core.throttling import rate_limit_headers
+            for header, value in rate_limit_headers(result).items():
+                if header not in response:
+                    response[header] = value
         return response
 
 
@@ -9,7 +9,7 @@ web (page-based) and mobile (cursor-based) applications.
 الويب (مبني على الصفحات) والموبايل (مبني على المؤشر).
 """
 
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 from rest_framework.response import Response
 
 
@@ -108,3 +108,45 @@ class LargeResultsSetPagination(PageNumberPagination):
     page_size_query_param = 'page_size'
     max_page_size = 500
 
+
+
+# ============================================================================
+# Report Cursor Pagination
+# تقسيم التقارير بالمؤشر
+# ============================================================================
+
+class ReportCursorPagination(CursorPagination):
+    """
+    Cursor pagination for report detail sections (newest first)
+    تقسيم بالمؤشر لأقسام التفاصيل في التقارير (الأحدث أولاً)
+    
+    DRF cursor pagination keys on the first ordering field only: the
+    cursor holds the last created_at seen plus an offset (rows sharing
+    that created_at already returned). Each page seeks with
+    created_at <= position instead of a growing OFFSET, so pages cost the
+    same however deep; ties on created_at are skipped by the small offset
+    and ordered by -id, so no row is repeated or lost.
+    مؤشر DRF يعتمد على حقل الترتيب الأول فقط: آخر created_at مع إزاحة للصفوف
+    المتساوية فيه. كل صفحة تبحث بـ created_at <= الموضع بدلاً من OFFSET متزايد.
+    
+    Used inside report payloads (not as a view's pagination_class):
+        paginator = ReportCursorPagination()
+        rows = paginator.paginate_queryset(queryset, request, view=self)
+        data['orders_pagination'] = paginator.get_pagination_data()
+    """
+    
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    ordering = ('-created_at', '-id')
+    
+    def get_pagination_data(self):
+        """
+        Pagination metadata for embedding in a response
+        بيانات التقسيم لتضمينها في الاستجابة
+        """
+        return {
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "page_size": self.page_size,
+        }
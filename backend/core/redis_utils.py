@@ -0,0 +1,64 @@
+"""
+Redis Helpers
+أدوات Redis
+
+Raw Redis access for subsystems that need more than get/set (lists,
+hashes, scripts). Redis is optional: store_selector() picks the Redis store
+when it is configured and an in-process implementation otherwise.
+
+وصول مباشر إلى Redis للأنظمة التي تحتاج أكثر من get/set (قوائم، hashes،
+سكربتات). Redis اختياري: store_selector() يختار مخزن Redis إذا كان مُعداً
+وإلا البديل داخل العملية.
+"""
+
+from django.conf import settings
+
+
+def uses_redis():
+    """Whether the default cache is django-redis / هل الـ cache الافتراضي هو Redis"""
+    return settings.CACHES['default']['BACKEND'].startswith('django_redis')
+
+
+def redis_client():
+    """Raw client of the default cache connection / عميل Redis لاتصال الـ cache الافتراضي"""
+    from django_redis import get_redis_connection
+
+    return get_redis_connection('default')
+
+
+def redis_key(name):
+    """
+    Key namespaced with the cache KEY_PREFIX (raw clients don't apply it).
+    مفتاح مع بادئة الـ cache (العميل المباشر لا يضيفها).
+    """
+    prefix = settings.CACHES['default'].get('KEY_PREFIX', '')
+    return f'{prefix}:{name}' if prefix else name
+
+
+def store_selector(memory_store, redis_store_class):
+    """
+    Build a get_store(): a `redis_store_class` instance on the default
+    connection if Redis is configured, else `memory_store`.
+    بناء get_store(): مخزن Redis على الاتصال الافتراضي إذا كان مُعداً،
+    وإلا المخزن داخل العملية.
+
+    The Redis store is created once, on first use.
+    مخزن Redis يُنشأ مرة واحدة عند أول استخدام.
+    """
+    redis_store = None
+
+    def get_store():
+        """Redis store if configured, else the in-process store"""
+        nonlocal redis_store
+        if not uses_redis():
+            return memory_store
+        if redis_store is None:
+            redis_store = redis_store_class(redis_client())
+        return redis_store
+
+    return get_store
+
+
+def setting(name, default):
+    """Optional setting with its default / إعداد اختياري مع قيمته الافتراضية"""
+    return getattr(settings, name, default)
@@ -72,11 +72,14 @@ INSTALLED_APPS = [
     "promotions",     # Promotions (Banners, Stories, Coupons)
     "settings_app",   # Site settings and configuration
     "notifications",  # Notifications for admin users
+    "analytics",      # Storefront event ingestion and daily rollups - أحداث المتجر
     "admin_api",      # Admin Dashboard API - إدارة لوحة التحكم
     "vendor_api",     # Vendor Dashboard API - لوحة تحكم البائعين
 ]
 
 MIDDLEWARE = [
+    "core.middleware.ReadinessMiddleware",  # DB-free readiness probe - فحص الجاهزية (يجب أن يكون أولاً)
+    "core.middleware.InstrumentationMiddleware",  # Query count, Server-Timing, route histograms - قياس الأداء
     "django.middleware.security.SecurityMiddleware",
     "django.middleware.gzip.GZipMiddleware",  # GZip compression for responses - ضغط الاستجابات
     "core.middleware.ProxyHTTPSMiddleware",  # Handle HTTPS behind proxy - التعامل مع HTTPS خلف البروكسي
@@ -90,6 +93,7 @@ MIDDLEWARE = [
     # Custom Middleware
     # Middleware مخصص
     "core.middleware.RequestLoggingMiddleware",  # Request logging for API monitoring
+    "core.middleware.RateLimitHeadersMiddleware",  # RateLimit-* headers - ترويسات تحديد المعدل
     "core.middleware.ErrorHandlingMiddleware",  # Standardized error handling
 ]
 
@@ -255,6 +259,17 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Uploads are stored by SHA-256 digest (deduplicated, immutable paths under media/cas/)
+# الملفات المرفوعة تُخزن حسب بصمة SHA-256 (بدون تكرار، مسارات ثابتة تحت media/cas/)
+STORAGES = {
+    "default": {
+        "BACKEND": "core.storage.ContentAddressedStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
+    },
+}
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
@@ -302,19 +317,23 @@ REST_FRAMEWORK = {
     # Throttling (Rate Limiting)
     # تحديد معدل الطلبات - حماية من الإفراط في الاستخدام
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",  # للمستخدمين غير المسجلين
-        "rest_framework.throttling.UserRateThrottle",  # للمستخدمين المسجلين
+        # Atomic GCRA throttles (Redis script, in-process without Redis)
+        # throttles ذرية بخوارزمية GCRA (سكربت Redis، أو داخل العملية بدونه)
+        "core.throttling.AnonRateThrottle",  # للمستخدمين غير المسجلين
+        "core.throttling.UserRateThrottle",  # للمستخدمين المسجلين
     ],
     "DEFAULT_THROTTLE_RATES": {
         # In development: higher limits for easier testing
         # في التطوير: حدود أعلى لتسهيل الاختبار
         # In production: stricter limits for security
         # في الإنتاج: حدود أكثر صرامة للأمان
-        "anon": "100/hour" if not DEBUG else "1000/hour",      # 100 طلب في الساعة (1000 في التطوير)
-        "user": "1000/hour" if not DEBUG else "10000/hour",    # 1000 طلب في الساعة (10000 في التطوير)
+        # THROTTLE_*_RATE env vars override them (e.g. for load tests)
+        "anon": config('THROTTLE_ANON_RATE', default="100/hour" if not DEBUG else "1000/hour"),      # 100 طلب في الساعة (1000 في التطوير)
+        "user": config('THROTTLE_USER_RATE', default="1000/hour" if not DEBUG else "10000/hour"),    # 1000 طلب في الساعة (10000 في التطوير)
         "admin": "5000/hour" if not DEBUG else "50000/hour",   # 5000 طلب في الساعة للـ admin (50000 في التطوير)
         "login": "5/minute",     # 5 محاولات تسجيل دخول في الدقيقة
         "register": "3/minute",  # 3 محاولات تسجيل في الدقيقة
+        "analytics_events": config('THROTTLE_ANALYTICS_RATE', default="120/minute"),  # دفعات أحداث التحليلات
     },
 }
 
@@ -710,14 +729,50 @@ else:
 CACHE_TIMEOUTS = {
     'products_list': 60 * 10,      # 10 minutes - قائمة المنتجات (reduced for freshness)
     'product_detail': 60 * 20,     # 20 minutes - تفاصيل المنتج (reduced for freshness)
+    'product_cards': 60 * 20,      # 20 minutes - بطاقات المنتجات (batch endpoint)
+    'product_facets': 60 * 10,     # 10 minutes - عدادات الفلاتر (like the product list)
+    'product_related': 60 * 60,    # 1 hour - يُشترى معاً غالباً (rebuilt by update_recommendations)
     'categories': 60 * 60,          # 1 hour - الفئات (rarely change)
     'vendors': 60 * 30,             # 30 minutes - البائعين
     'settings': 60 * 60,            # 1 hour - الإعدادات (rarely change)
-    'homepage': 60 * 5,             # 5 minutes - الصفحة الرئيسية (frequent updates)
+    'homepage': 60 * 5,             # 5 minutes - الصفحة الرئيسية (top lists, frequent updates)
     'product_variants': 60 * 15,   # 15 minutes - متغيرات المنتج
     'product_images': 60 * 30,     # 30 minutes - صور المنتج
+    'vendor_analytics': 60 * 5,    # 5 minutes - تحليلات البائع (SQL aggregates)
+    'comparisons': 60 * 2,         # 2 minutes - مقارنات الفترات (core.comparison)
+    'coupons': 60 * 5,             # 5 minutes - قواعد الكوبونات حسب الرمز
 }
 
+# Two-tier cache (core.cache): per-process LRU in front of the shared cache
+# الكاش ذو الطبقتين: LRU داخل العملية أمام الكاش المشترك
+TIERED_CACHE_LOCAL_SIZE = config('TIERED_CACHE_LOCAL_SIZE', default=1000, cast=int)  # entries per process
+TIERED_CACHE_LOCAL_TIMEOUT = config('TIERED_CACHE_LOCAL_TIMEOUT', default=5, cast=int)  # seconds a process may lag
+TIERED_CACHE_LOCK_TIMEOUT = config('TIERED_CACHE_LOCK_TIMEOUT', default=10, cast=int)  # max wait for a recompute
+
+# Price buckets of the catalog facets (upper bounds; the last bucket is open)
+# شرائح السعر لعدادات الفلاتر
+CATALOG_PRICE_BUCKETS = [
+    float(edge) if '.' in edge else int(edge)
+    for edge in config('CATALOG_PRICE_BUCKETS', default='25,50,100,200').split(',') if edge
+]
+
+# Frequently bought together (products.recommendations, `manage.py update_recommendations`)
+# يُشترى معاً غالباً
+RECOMMENDATIONS_TOP_K = config('RECOMMENDATIONS_TOP_K', default=12, cast=int)  # neighbors kept per product
+RECOMMENDATIONS_MIN_SUPPORT = config('RECOMMENDATIONS_MIN_SUPPORT', default=2, cast=int)  # min shared orders
+
+# Trending / best-seller ranking (products.ranking, `manage.py update_rankings`)
+# ترتيب الرائج والأكثر مبيعاً
+RANKING_TRENDING_HALF_LIFE_HOURS = config('RANKING_TRENDING_HALF_LIFE_HOURS', default=72, cast=float)
+RANKING_BEST_SELLING_HALF_LIFE_DAYS = config('RANKING_BEST_SELLING_HALF_LIFE_DAYS', default=30, cast=float)
+RANKING_TRENDING_WEIGHTS = {'product_view': 1, 'add_to_cart': 5, 'purchase': 20}  # per event / unit sold
+
+# Cache warm-up (core.warmup, `manage.py warm_caches`)
+# تسخين الكاش بعد النشر
+CACHE_WARM_ON_MIGRATE = config('CACHE_WARM_ON_MIGRATE', default=False, cast=bool)  # warm after `migrate`
+CACHE_WARM_HOSTS = [h for h in config('CACHE_WARM_HOSTS', default='').split(',') if h]  # default: ALLOWED_HOSTS
+CACHE_WARM_SECURE = config('CACHE_WARM_SECURE', default=not DEBUG, cast=bool)  # clients use https URLs
+
 # ============================================================================
 # Data Upload Limits
 # حدود رفع البيانات
@@ -727,3 +782,89 @@ CACHE_TIMEOUTS = {
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10 MB
 FILE_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10 MB
 DATA_UPLOAD_MAX_NUMBER_FIELDS = 1000  # Maximum form fields
+
+# ============================================================================
+# Background Tasks
+# المهام في الخلفية
+# ============================================================================
+# Slow work (catalog imports, media processing) runs in a bounded thread pool
+# الأعمال البطيئة (استيراد الكتالوج، معالجة الوسائط) تعمل في مجموعة خيوط محدودة
+BACKGROUND_TASK_WORKERS = config('BACKGROUND_TASK_WORKERS', default=2, cast=int)
+
+# Run tasks inline instead of in a thread (tests / debugging)
+# تشغيل المهام مباشرة بدلاً من خيط (للاختبارات / التصحيح)
+BACKGROUND_TASKS_EAGER = config('BACKGROUND_TASKS_EAGER', default=False, cast=bool)
+
+# ============================================================================
+# Analytics Events
+# أحداث التحليلات
+# ============================================================================
+# Events are buffered (Redis or in-process) and written in batches
+# الأحداث تُخزن مؤقتاً (Redis أو داخل العملية) وتُكتب على دفعات
+ANALYTICS_FLUSH_SIZE = config('ANALYTICS_FLUSH_SIZE', default=500, cast=int)        # flush when this many events are queued
+ANALYTICS_FLUSH_INTERVAL = config('ANALYTICS_FLUSH_INTERVAL', default=5, cast=int)  # ...or this many seconds passed
+ANALYTICS_INSERT_BATCH_SIZE = 1000  # rows per INSERT - صفوف لكل إدخال
+ANALYTICS_MAX_BATCH_EVENTS = 50     # events per request - أحداث لكل طلب
+ANALYTICS_MAX_ATTEMPTS = 5          # failed writes before an event is dropped (logged) - محاولات قبل الإهمال
+
+# ============================================================================
+# Counters
+# العدادات
+# ============================================================================
+# Banner/Story views and clicks are accumulated (Redis or in-process) and
+# written with one batched UPDATE every COUNTER_FLUSH_INTERVAL seconds
+# مشاهدات ونقرات البانرات والقصص تُجمع وتُكتب بعملية UPDATE واحدة دورياً
+COUNTER_FLUSH_INTERVAL = config('COUNTER_FLUSH_INTERVAL', default=5, cast=int)
+
+# ============================================================================
+# Instrumentation
+# قياس الأداء
+# ============================================================================
+# Per-request query count / SQL time / cache lookups (Server-Timing header)
+# and per-route latency histograms served at /metrics/ for Prometheus
+# عدد الاستعلامات ووقت SQL لكل طلب، ومدرجات زمن الاستجابة لكل مسار على /metrics/
+SERVER_TIMING_ENABLED = config('SERVER_TIMING_ENABLED', default=True, cast=bool)
+METRICS_TOKEN = config('METRICS_TOKEN', default='')  # Bearer token for scrapers (staff sessions also allowed)
+METRICS_FLUSH_INTERVAL = config('METRICS_FLUSH_INTERVAL', default=10, cast=int)
+METRICS_WINDOW = 300  # seconds per quantile window (p50/p95/p99 cover the last two)
+
+# ============================================================================
+# Outbox
+# صندوق الصادر
+# ============================================================================
+# Order / vendor-application side effects (notifications, emails, analytics)
+# are produced after commit from OutboxEvent rows - see notifications.outbox
+# الآثار الجانبية للطلبات وطلبات الانضمام تُنتج بعد التثبيت من صفوف OutboxEvent
+OUTBOX_BATCH_SIZE = 100      # events per dispatch batch - أحداث لكل دفعة
+OUTBOX_MAX_ATTEMPTS = 5      # failed attempts before an event is left for inspection
+OUTBOX_DISPATCH_INTERVAL = config('OUTBOX_DISPATCH_INTERVAL', default=2, cast=int)
+
+# Order confirmation / application receipt emails
+# رسائل تأكيد الطلب واستلام طلب الانضمام
+TRANSACTIONAL_EMAILS_ENABLED = config('TRANSACTIONAL_EMAILS_ENABLED', default=False, cast=bool)
+
+# ============================================================================
+# Catalog Import
+# استيراد الكتالوج
+# ============================================================================
+CATALOG_IMPORT = {
+    'CHUNK_SIZE': 500,                      # Rows validated and written per batch - صفوف لكل دفعة
+    'MAX_FILE_SIZE': 50 * 1024 * 1024,      # 50 MB - الحجم الأقصى لملف الاستيراد
+    'MAX_STORED_ERRORS': 500,               # Per-row errors kept on the job - أخطاء الصفوف المحفوظة
+}
+
+# ============================================================================
+# Image Derivatives
+# مشتقات الصور
+# ============================================================================
+# Resized copies generated in the background after upload (core.images)
+# نسخ مصغرة تُنشأ في الخلفية بعد الرفع
+IMAGE_DERIVATIVES = {
+    'SIZES': {
+        'thumb': (200, 200),     # Grids, carts, admin tables - الشبكات والسلة
+        'card': (600, 600),      # Product / category cards - بطاقات المنتجات
+        'zoom': (1600, 1600),    # Product detail zoom - تكبير صفحة المنتج
+    },
+    'FORMATS': ('webp', 'jpeg'),  # WebP first, JPEG for older clients
+    'QUALITY': {'webp': 80, 'jpeg': 82},
+}
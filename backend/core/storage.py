@@ -0,0 +1,126 @@
+"""
+Content-Addressed Media Storage
+تخزين الوسائط حسب المحتوى
+
+This module stores uploaded files under the SHA-256 digest of their bytes.
+هذا الوحدة تخزن الملفات المرفوعة باسم بصمة SHA-256 لمحتواها.
+
+- Identical uploads share one file (deduplication)
+- A path never changes content, so nginx serves /media/cas/ with a
+  far-future immutable Cache-Control
+- The upload_to directory is ignored; only the extension is kept so the
+  web server still sends the right Content-Type
+
+- الملفات المتطابقة تتشارك ملفاً واحداً (إزالة التكرار)
+- المسار لا يتغير محتواه أبداً، لذلك يخدم nginx المسار /media/cas/ بتخزين مؤقت دائم
+- مجلد upload_to يُتجاهل؛ يُحفظ الامتداد فقط ليرسل الخادم Content-Type الصحيح
+
+Layout:
+    cas/ab/cd/abcd1234...ef.jpg
+"""
+
+import hashlib
+import os
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+
+
+# Directory (relative to MEDIA_ROOT) holding content-addressed files
+# المجلد (نسبةً إلى MEDIA_ROOT) الذي يحتوي الملفات حسب المحتوى
+CAS_DIR = 'cas'
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    FileSystemStorage that names files by their SHA-256 digest.
+    FileSystemStorage يسمي الملفات ببصمة SHA-256.
+
+    Because one file can be referenced by many rows, delete() keeps
+    content-addressed files; unreferenced ones are pruned in bulk.
+
+    لأن الملف الواحد قد يُشار إليه من عدة صفوف، delete() يبقي الملفات
+    المخزنة حسب المحتوى؛ الملفات غير المستخدمة تُحذف بشكل مجمع.
+    """
+
+    def is_shared(self, name):
+        """Check if a stored name is a (possibly shared) content-addressed file"""
+        return bool(name) and name.replace('\\', '/').startswith(f'{CAS_DIR}/')
+
+    @staticmethod
+    def hashed_name(digest, ext):
+        """Build the storage name for a digest: cas/ab/cd/<digest><ext>"""
+        return f'{CAS_DIR}/{digest[:2]}/{digest[2:4]}/{digest}{ext}'
+
+    def delete(self, name):
+        """
+        Keep shared files; orphans are removed by `dedupe_media --prune`.
+        الإبقاء على الملفات المشتركة؛ الملفات اليتيمة تُحذف عبر `dedupe_media --prune`.
+
+        Another row may still reference the same digest, so deleting one
+        reference (e.g. replacing an avatar) must not remove the bytes.
+        Legacy (non content-addressed) files are deleted normally.
+        """
+        if self.is_shared(name):
+            return
+        super().delete(name)
+
+    def purge(self, name):
+        """Physically delete a content-addressed file (used by dedupe_media --prune)"""
+        super().delete(name)
+
+    def get_available_name(self, name, max_length=None):
+        """
+        The final name is derived from the content in _save(); no probing needed.
+        الاسم النهائي يُشتق من المحتوى في _save()؛ لا حاجة للفحص.
+        """
+        return name
+
+    def _save(self, name, content):
+        """
+        Stream content to a temp file while hashing, then move it into place.
+        كتابة المحتوى في ملف مؤقت مع حساب البصمة، ثم نقله لمكانه.
+        """
+        ext = os.path.splitext(name)[1].lower()
+        tmp_dir = self.path(CAS_DIR)
+        os.makedirs(tmp_dir, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir, prefix='.upload-')
+        try:
+            digest = hashlib.sha256()
+            with os.fdopen(fd, 'wb') as f:
+                if hasattr(content, 'seek'):
+                    content.seek(0)
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    f.write(chunk)
+
+            hashed = self.hashed_name(digest.hexdigest(), ext)
+            full_path = self.path(hashed)
+
+            if os.path.exists(full_path):
+                # Duplicate - reuse the stored copy; touch it so a concurrent
+                # prune (grace period on mtime) does not remove it
+                # مكرر - إعادة استخدام النسخة المخزنة وتحديث وقت تعديلها
+                os.unlink(tmp_path)
+                os.utime(full_path)
+                return hashed
+
+            directory = os.path.dirname(full_path)
+            if self.directory_permissions_mode is not None:
+                os.makedirs(directory, mode=self.directory_permissions_mode, exist_ok=True)
+            else:
+                os.makedirs(directory, exist_ok=True)
+
+            # mkstemp creates 0600 files - make them readable by the web server
+            # mkstemp ينشئ ملفات 0600 - جعلها قابلة للقراءة من خادم الويب
+            os.chmod(tmp_path, self.file_permissions_mode or 0o644)
+
+            # Atomic; a concurrent identical upload just replaces equal bytes
+            # عملية ذرية؛ رفع متزامن لنفس المحتوى يستبدل بايتات متطابقة فقط
+            os.replace(tmp_path, full_path)
+            return hashed
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
@@ -0,0 +1,697 @@
+"""
+Synthetic Marketplace Generator
+مولّد بيانات سوق اصطناعية
+
+Populates vendors, categories, products, variants, customers, orders,
+carts and admin notifications with realistic shapes, deterministically
+from a seed (same seed + same end date = same rows):
+
+- Vendor sizes follow a Zipf law: a few large vendors, a long tail of
+  small ones; busy vendors also receive more orders
+- Product popularity inside a vendor is Zipf-skewed as well
+- Order timestamps follow a growth trend, a weekly cycle (Friday/Saturday
+  peaks), a yearly season (December peak) and a diurnal curve
+- A share of orders and carts are guest ones; registered customers repeat
+  (Zipf-skewed activity)
+- Statuses depend on the order's age (old orders delivered, recent ones
+  pending / confirmed / shipped, a few cancelled)
+
+Rows are written in chunks (one transaction per chunk): with COPY on
+PostgreSQL, with bulk_create elsewhere. Memory is bounded by the chunk
+size plus compact arrays of the variant and customer ids, so millions of
+orders can be generated.
+
+يملأ البائعين والفئات والمنتجات والمتغيرات والعملاء والطلبات والسلال
+والإشعارات بأشكال واقعية وبشكل حتمي من بذرة: أحجام البائعين وشعبية المنتجات
+بتوزيع Zipf، وتوقيت الطلبات بنمو واتجاه أسبوعي وموسمي ويومي، ونسبة من الزوار،
+والحالات حسب عمر الطلب. الكتابة على دفعات بـ COPY على PostgreSQL وبـ
+bulk_create في غيرها، والذاكرة محدودة بحجم الدفعة.
+
+Usage:
+    summary = MarketplaceGenerator(seed=42, scale='small').run()
+    summary['orders'], summary['order_items']
+"""
+
+import math
+import random
+from array import array
+from bisect import bisect_left
+from collections import namedtuple
+from datetime import timedelta
+from decimal import Decimal
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection, transaction
+from django.utils import timezone
+
+from cart.models import Cart, CartItem
+from notifications.models import Notification
+from orders.models import Order, OrderItem
+from products.catalog_import import update_search_vectors
+from products.models import Category, Product, ProductVariant
+from users.models import User, VendorUser
+from vendors.models import Vendor
+
+
+# Dataset sizes
+# أحجام مجموعات البيانات
+Scale = namedtuple(
+    'Scale',
+    ['vendors', 'categories', 'products', 'customers', 'orders', 'carts', 'notifications'],
+    defaults=(0, 0),
+)
+
+SCALES = {
+    'tiny': Scale(vendors=3, categories=6, products=60, customers=40, orders=300,
+                  carts=20, notifications=50),
+    'small': Scale(vendors=20, categories=30, products=2000, customers=1000, orders=10000,
+                   carts=500, notifications=1000),
+    'benchmark': Scale(vendors=50, categories=60, products=5000, customers=20000, orders=100000,
+                       carts=5000, notifications=5000),
+    'large': Scale(vendors=500, categories=120, products=200000, customers=500000, orders=2000000,
+                   carts=100000, notifications=50000),
+}
+
+CHUNK_SIZE = 2000
+
+MONEY_Q = Decimal('0.01')
+
+
+# =============================================================================
+# Vocabulary
+# المفردات
+# =============================================================================
+
+CATEGORY_NAMES = [
+    ('Sneakers', 'أحذية رياضية'), ('Boots', 'جزم'), ('Sandals', 'صنادل'),
+    ('Heels', 'كعب عالي'), ('Loafers', 'أحذية كلاسيكية'), ('Slippers', 'شباشب'),
+    ('Handbags', 'حقائب يد'), ('Backpacks', 'حقائب ظهر'), ('Wallets', 'محافظ'),
+    ('Totes', 'حقائب تسوق'), ('Clutches', 'حقائب سهرة'), ('Travel Bags', 'حقائب سفر'),
+]
+
+ADJECTIVES = ['Classic', 'Urban', 'Premium', 'Everyday', 'Sport', 'Vintage', 'Soft', 'Leather', 'Slim', 'Comfort']
+NOUNS = {
+    'shoes': ['Runner', 'Boot', 'Sneaker', 'Loafer', 'Sandal', 'Trainer'],
+    'bags': ['Tote', 'Backpack', 'Satchel', 'Clutch', 'Messenger', 'Duffel'],
+}
+COLORS = [('Black', '#000000'), ('White', '#FFFFFF'), ('Brown', '#8B4513'), ('Navy', '#000080'), ('Red', '#C0392B'), ('Beige', '#F5F5DC')]
+SIZES = {'shoes': ['38', '39', '40', '41', '42', '43', '44'], 'bags': ['S', 'M', 'L']}
+
+FIRST_NAMES = ['Ahmad', 'Lina', 'Omar', 'Rama', 'Khaled', 'Noor', 'Sami', 'Hala', 'Yousef', 'Maya']
+LAST_NAMES = ['Haddad', 'Khoury', 'Saleh', 'Nasser', 'Hamdan', 'Darwish', 'Issa', 'Aziz']
+FULL_NAMES = [f'{first} {last}' for first in FIRST_NAMES for last in LAST_NAMES]
+CITIES = ['Damascus', 'Aleppo', 'Homs', 'Latakia', 'Hama', 'Tartus']
+
+# Relative order volume per weekday (Monday = 0) and per hour of day
+# حجم الطلبات النسبي لكل يوم من الأسبوع ولكل ساعة
+WEEKDAY_WEIGHTS = [1.0, 0.95, 0.95, 1.0, 1.3, 1.4, 1.1]
+HOUR_WEIGHTS = [
+    0.2, 0.1, 0.05, 0.05, 0.05, 0.1, 0.3, 0.6, 0.9, 1.0, 1.1, 1.2,
+    1.2, 1.1, 1.0, 1.0, 1.1, 1.3, 1.6, 1.9, 2.0, 1.7, 1.1, 0.5,
+]
+
+# Open carts were last touched within this many days
+# السلال المفتوحة عُدلت آخر مرة خلال هذا العدد من الأيام
+CART_DAYS = 30
+
+
+def zipf_weights(count, exponent=1.1):
+    """Weights 1 / rank^exponent for ranks 1..count (lazy) / أوزان Zipf"""
+    return (1.0 / (rank ** exponent) for rank in range(1, count + 1))
+
+
+def split_by_weights(total, weights, minimum=1):
+    """
+    Integer shares of `total` proportional to weights (each at least
+    `minimum`; the rounding remainder goes to the largest weights).
+    حصص صحيحة من total بنسبة الأوزان.
+    """
+    weights = list(weights)
+    base = sum(weights)
+    shares = [max(minimum, int(total * weight / base)) for weight in weights]
+    for index in range(max(total - sum(shares), 0)):
+        shares[index % len(shares)] += 1
+    return shares
+
+
+class WeightedChoice:
+    """
+    O(log n) weighted sampling from precomputed cumulative weights (kept in
+    a float array: 8 bytes per item).
+    اختيار موزون بتعقيد O(log n) من أوزان تراكمية محسوبة مسبقاً.
+    """
+
+    def __init__(self, items, weights):
+        self.items = items
+        self.cumulative = array('d', accumulate(weights))
+
+    def pick_index(self, rng):
+        return bisect_left(self.cumulative, rng.random() * self.cumulative[-1])
+
+    def pick(self, rng):
+        return self.items[self.pick_index(rng)]
+
+
+class VariantPool:
+    """
+    A vendor's variants, Zipf-weighted in a random popularity order, as
+    parallel arrays of ids and prices in cents.
+    متغيرات البائع بأوزان Zipf كمصفوفات معرفات وأسعار بالسنتات.
+    """
+
+    def __init__(self, entries, rng):
+        rng.shuffle(entries)
+        self.ids = array('q', (variant_id for variant_id, _ in entries))
+        self.cents = array('q', (cents for _, cents in entries))
+        self.choice = WeightedChoice(range(len(entries)), zipf_weights(len(entries), 0.9))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def pick(self, rng):
+        """(variant_id, price)"""
+        index = self.choice.pick_index(rng)
+        return self.ids[index], Decimal(self.cents[index]).scaleb(-2)
+
+
+# =============================================================================
+# Row Writers
+# كاتبو الصفوف
+# =============================================================================
+
+def _timestamp_fields(model):
+    return [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+
+
+class BulkCreateWriter:
+    """
+    bulk_create, then restore the timestamps set on the objects (bulk_create
+    overwrites auto_now / auto_now_add fields).
+    bulk_create ثم استعادة الطوابع الزمنية المحددة على الكائنات.
+    """
+
+    def insert(self, model, objs):
+        fields = _timestamp_fields(model)
+        preset = [[getattr(obj, field.attname) for field in fields] for obj in objs]
+        objs = model.objects.bulk_create(objs)
+
+        restored = [
+            field for index, field in enumerate(fields)
+            if any(values[index] is not None for values in preset)
+        ]
+        if restored:
+            for obj, values in zip(objs, preset):
+                for field, value in zip(fields, values):
+                    if value is not None:
+                        setattr(obj, field.attname, value)
+            model.objects.bulk_update(objs, [field.name for field in restored], batch_size=500)
+        return objs
+
+
+class CopyWriter:
+    """
+    PostgreSQL COPY: ids are drawn from the table's sequence first (one
+    query), then the rows are streamed with COPY ... FROM STDIN. Timestamps
+    set on the objects are written as they are; unset ones get now().
+    COPY في PostgreSQL: المعرفات تُسحب من تسلسل الجدول أولاً ثم تُبث الصفوف.
+    """
+
+    def insert(self, model, objs):
+        if not objs:
+            return objs
+        meta = model._meta
+        fields = meta.concrete_fields
+        stamps = set(_timestamp_fields(model))
+        now = timezone.now()
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT nextval(pg_get_serial_sequence(%s, %s)) FROM generate_series(1, %s)',
+                [meta.db_table, meta.pk.column, len(objs)],
+            )
+            for obj, (pk,) in zip(objs, cursor.fetchall()):
+                obj.pk = pk
+
+            columns = ', '.join(connection.ops.quote_name(field.column) for field in fields)
+            sql = f'COPY {connection.ops.quote_name(meta.db_table)} ({columns}) FROM STDIN'
+            with cursor.copy(sql) as copy:
+                for obj in objs:
+                    row = []
+                    for field in fields:
+                        value = getattr(obj, field.attname)
+                        if value is None and field in stamps:
+                            value = now
+                            setattr(obj, field.attname, value)
+                        row.append(field.get_db_prep_save(value, connection))
+                    copy.write_row(row)
+
+        for obj in objs:
+            obj._state.adding = False
+            obj._state.db = connection.alias
+        return objs
+
+
+def default_writer():
+    """COPY on PostgreSQL, bulk_create elsewhere"""
+    return CopyWriter() if connection.vendor == 'postgresql' else BulkCreateWriter()
+
+
+# =============================================================================
+# Generator
+# المولّد
+# =============================================================================
+
+class MarketplaceGenerator:
+    """
+    Deterministic synthetic marketplace.
+    سوق اصطناعية حتمية.
+
+    Args:
+        seed: Random seed (also tags every generated identifier, so two
+              seeds can coexist in one database)
+        scale: Name in SCALES or a Scale
+        end: Newest order timestamp (default: now); orders span `days` before it
+        days: Length of the order history
+        guest_ratio: Share of guest orders and carts
+        vendor_skew: Zipf exponent of vendor sizes (0 = equal vendors)
+        seasonality: Strength of the December peak (0 = flat year)
+        chunk_size: Rows per insert / transaction
+        writer: Row writer (default: COPY on PostgreSQL, else bulk_create)
+        log: Optional callable for progress messages
+    """
+
+    def __init__(self, seed=0, scale='small', end=None, days=365, guest_ratio=0.3,
+                 vendor_skew=1.1, seasonality=0.25, chunk_size=CHUNK_SIZE, writer=None, log=None):
+        self.seed = seed
+        self.scale = SCALES[scale] if isinstance(scale, str) else scale
+        self.end = end or timezone.now()
+        self.days = days
+        self.guest_ratio = guest_ratio
+        self.vendor_skew = vendor_skew
+        self.seasonality = seasonality
+        self.chunk_size = chunk_size
+        self.writer = writer or default_writer()
+        self.log = log or (lambda message: None)
+        self.rng = random.Random(seed)
+        self.tag = f's{seed}'
+
+    def run(self):
+        """
+        Generate everything; returns the number of rows per model.
+        توليد كل شيء؛ يُرجع عدد الصفوف لكل نموذج.
+        """
+        if Vendor.objects.filter(slug__startswith=f'synthetic-{self.tag}-').exists():
+            raise ValueError(f'Seed {self.seed} was already generated in this database.')
+
+        vendors = self._vendors()
+        categories = self._categories()
+        catalogue = self._catalogue(vendors, categories)
+        customers = self._customers()
+        orders, items, notifications = self._orders(catalogue, customers)
+        carts, cart_items = self._carts(catalogue, customers)
+        return {
+            'vendors': len(vendors),
+            'categories': self.category_count,
+            'products': sum(entry['products'] for entry in catalogue.values()),
+            'variants': sum(len(entry['variants']) for entry in catalogue.values()),
+            'customers': len(customers['ids']),
+            'orders': orders,
+            'order_items': items,
+            'notifications': notifications,
+            'carts': carts,
+            'cart_items': cart_items,
+        }
+
+    def _insert(self, model, objs):
+        return self.writer.insert(model, objs)
+
+    # -------------------------------------------------------------------------
+    # Catalogue
+    # الكتالوج
+    # -------------------------------------------------------------------------
+
+    def _vendors(self):
+        """Vendors with an owner account each / بائعون مع حساب مالك لكل منهم"""
+        rng = self.rng
+        vendors = self._insert(Vendor, [
+            Vendor(
+                name=f'Synthetic Vendor {self.tag}-{index:04d}',
+                slug=f'synthetic-{self.tag}-{index:04d}',
+                description='Synthetic vendor for load testing',
+                commission_rate=Decimal(rng.choice(['8.00', '10.00', '12.00', '15.00'])),
+                is_active=True,
+            )
+            for index in range(self.scale.vendors)
+        ])
+        password = make_password(None)
+        owners = self._insert(User, [
+            User(
+                email=f'vendor{index}.{self.tag}@synthetic.example',
+                phone=f'+8{self.seed % 1000:03d}{index:09d}',
+                full_name=f'Vendor Owner {index}',
+                role=User.Role.VENDOR,
+                password=password,
+            )
+            for index in range(len(vendors))
+        ])
+        self._insert(VendorUser, [
+            VendorUser(user=owner, vendor=vendor, is_owner=True)
+            for owner, vendor in zip(owners, vendors)
+        ])
+        self.log(f'{len(vendors)} vendors')
+        return vendors
+
+    def _categories(self):
+        """Two-level category tree / شجرة فئات بمستويين"""
+        count = self.scale.categories
+        roots = self._insert(Category, [
+            Category(name='Shoes', name_ar='أحذية', slug=f'synthetic-{self.tag}-shoes', display_order=0),
+            Category(name='Bags', name_ar='حقائب', slug=f'synthetic-{self.tag}-bags', display_order=1),
+        ])
+        children = []
+        for index in range(max(count - len(roots), 0)):
+            name, name_ar = CATEGORY_NAMES[index % len(CATEGORY_NAMES)]
+            round_ = index // len(CATEGORY_NAMES)
+            suffix = f' {round_ + 1}' if round_ else ''
+            children.append(Category(
+                name=f'{name}{suffix}',
+                name_ar=f'{name_ar}{suffix}',
+                slug=f'synthetic-{self.tag}-{index:04d}',
+                parent=roots[0] if (index % len(CATEGORY_NAMES)) < 6 else roots[1],
+                display_order=index,
+            ))
+        children = self._insert(Category, children)
+        self.category_count = len(roots) + len(children)
+        self.log(f'{self.category_count} categories')
+        return children or roots
+
+    def _catalogue(self, vendors, categories):
+        """
+        Products (Zipf-sized per vendor) and 1-4 variants each.
+        المنتجات (بأحجام Zipf لكل بائع) ومن 1 إلى 4 متغيرات لكل منتج.
+
+        Returns:
+            dict: {vendor_id: {'vendor': Vendor, 'products': int, 'weight': float,
+                               'variants': VariantPool}}
+        """
+        rng = self.rng
+        sizes = split_by_weights(self.scale.products, zipf_weights(len(vendors), self.vendor_skew))
+        catalogue = {}
+        created = 0
+        for vendor, size in zip(vendors, sizes):
+            entries = []
+            for start in range(0, size, self.chunk_size):
+                batch = min(self.chunk_size, size - start)
+                with transaction.atomic():
+                    products = []
+                    for index in range(start, start + batch):
+                        product_type = rng.choice(['shoes', 'bags'])
+                        category = rng.choice(categories)
+                        name = f'{rng.choice(ADJECTIVES)} {rng.choice(NOUNS[product_type])} {index}'
+                        products.append(Product(
+                            vendor=vendor,
+                            category=category,
+                            name=name,
+                            slug=f'{self.tag}-{vendor.pk}-{index}',
+                            description=f'{name} by {vendor.name}',
+                            base_price=Decimal(str(max(3.0, round(rng.lognormvariate(3.3, 0.6), 2)))),
+                            product_type=product_type,
+                            is_active=rng.random() > 0.05,
+                        ))
+                    products = self._insert(Product, products)
+
+                    variants = []
+                    for product in products:
+                        colors = rng.sample(COLORS, rng.randint(1, 2))
+                        sizes_ = rng.sample(SIZES[product.product_type], rng.randint(1, 2))
+                        for color, color_hex in colors:
+                            for size_ in sizes_:
+                                override = None
+                                if rng.random() < 0.2:
+                                    override = (product.base_price * Decimal('1.1')).quantize(MONEY_Q)
+                                variants.append(ProductVariant(
+                                    product=product,
+                                    color=color,
+                                    color_hex=color_hex,
+                                    size=size_,
+                                    sku=f'SYN-{self.tag}-{product.pk}-{len(variants)}',
+                                    stock_quantity=rng.randint(0, 60),
+                                    price_override=override,
+                                    is_available=rng.random() > 0.03,
+                                ))
+                    variants = self._insert(ProductVariant, variants)
+                    update_search_vectors([product.pk for product in products])
+                entries.extend(
+                    (variant.pk, int((variant.price_override or variant.product.base_price) * 100))
+                    for variant in variants
+                )
+                created += batch
+            catalogue[vendor.pk] = {
+                'vendor': vendor,
+                'products': size,
+                'weight': size,
+                'variants': VariantPool(entries, rng),
+            }
+        self.log(f'{created} products')
+        return catalogue
+
+    def _customers(self):
+        """
+        Registered customers, kept as ids plus an index into FULL_NAMES
+        (phones are derived from the position).
+        العملاء المسجلون كمعرفات مع فهرس الاسم (الهاتف مشتق من الموقع).
+        """
+        password = make_password(None)
+        ids, names = array('q'), array('H')
+        for start in range(0, self.scale.customers, self.chunk_size):
+            stop = min(start + self.chunk_size, self.scale.customers)
+            chunk = []
+            for index in range(start, stop):
+                name = self.rng.randrange(len(FULL_NAMES))
+                names.append(name)
+                chunk.append(User(
+                    email=f'customer{index}.{self.tag}@synthetic.example',
+                    phone=self._customer_phone(index),
+                    full_name=FULL_NAMES[name],
+                    role=User.Role.CUSTOMER,
+                    password=password,
+                ))
+            with transaction.atomic():
+                ids.extend(customer.pk for customer in self._insert(User, chunk))
+        self.log(f'{len(ids)} customers')
+        return {'ids': ids, 'names': names}
+
+    def _customer_phone(self, index):
+        return f'+9{self.seed % 1000:03d}{index:09d}'
+
+    # -------------------------------------------------------------------------
+    # Orders
+    # الطلبات
+    # -------------------------------------------------------------------------
+
+    def _day_sampler(self):
+        """Weighted day offsets: trend x weekday x December season"""
+        start = self.end - timedelta(days=self.days)
+        weights = []
+        for offset in range(self.days):
+            day = start + timedelta(days=offset)
+            trend = 1 + 0.5 * offset / max(self.days, 1)
+            season = 1 + self.seasonality * math.cos(2 * math.pi * (day.timetuple().tm_yday - 350) / 365)
+            weights.append(trend * season * WEEKDAY_WEIGHTS[day.weekday()])
+        return start, WeightedChoice(range(self.days), weights)
+
+    def _timestamp(self, start, days, hours):
+        rng = self.rng
+        moment = start + timedelta(
+            days=days.pick(rng), hours=hours.pick(rng), seconds=rng.randrange(3600),
+        )
+        return min(moment, self.end)
+
+    def _status(self, age_days):
+        rng = self.rng
+        if rng.random() < 0.05:
+            return 'cancelled'
+        if age_days > 14:
+            return 'delivered'
+        if age_days > 5:
+            return rng.choice(['shipped', 'delivered'])
+        return rng.choice(['pending', 'confirmed', 'shipped'])
+
+    def _vendor_choice(self, catalogue):
+        entries = [entry for entry in catalogue.values() if len(entry['variants'])]
+        return WeightedChoice(entries, [entry['weight'] for entry in entries])
+
+    def _customer_choice(self, customers):
+        count = len(customers['ids'])
+        return WeightedChoice(range(count), zipf_weights(count, 0.8)) if count else None
+
+    def _order_notification(self, order, content_type):
+        """Admin "new order" notification, as notify_admins_of_orders writes it"""
+        is_read = self.end - order.created_at > timedelta(days=2) or self.rng.random() < 0.3
+        return Notification(
+            type=Notification.NotificationType.ORDER,
+            message=f'New order received: #{order.order_number}',
+            message_ar=f'تم استلام طلب جديد: #{order.order_number}',
+            action='order_created',
+            target_content_type=content_type,
+            target_object_id=order.pk,
+            is_read=is_read,
+            read_at=order.created_at + timedelta(hours=1) if is_read else None,
+            metadata={
+                'order_number': order.order_number,
+                'total_amount': str(order.total),
+                'customer_name': order.customer_name,
+            },
+            created_at=order.created_at,
+        )
+
+    def _orders(self, catalogue, customers):
+        """
+        Orders, items and a share of admin notifications in chunks (one
+        transaction per chunk).
+        الطلبات والعناصر وجزء من إشعارات الإدارة على دفعات.
+
+        Returns:
+            tuple: (orders created, items created, notifications created)
+        """
+        rng = self.rng
+        start, days = self._day_sampler()
+        hours = WeightedChoice(range(24), HOUR_WEIGHTS)
+        vendor_choice = self._vendor_choice(catalogue)
+        customer_choice = self._customer_choice(customers)
+        notify_ratio = min(1.0, self.scale.notifications / self.scale.orders) if self.scale.orders else 0
+        content_type = ContentType.objects.get_for_model(Order)
+
+        total_orders = total_items = total_notifications = 0
+        for chunk_start in range(0, self.scale.orders, self.chunk_size):
+            chunk_stop = min(chunk_start + self.chunk_size, self.scale.orders)
+            orders, lines = [], []
+            for number in range(chunk_start, chunk_stop):
+                entry = vendor_choice.pick(rng)
+                created_at = self._timestamp(start, days, hours)
+
+                quantities = {}
+                for _ in range(1 + min(int(rng.expovariate(1.5)), 4)):
+                    variant = entry['variants'].pick(rng)
+                    quantities[variant] = quantities.get(variant, 0) + rng.choice([1, 1, 1, 2])
+                subtotal = sum((price * quantity for (_, price), quantity in quantities.items()), Decimal('0'))
+
+                if customer_choice is None or rng.random() < self.guest_ratio:
+                    user_id = None
+                    name = f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}'
+                    phone = f'+96399{rng.randrange(10 ** 7):07d}'
+                else:
+                    index = customer_choice.pick_index(rng)
+                    user_id = customers['ids'][index]
+                    name = FULL_NAMES[customers['names'][index]]
+                    phone = self._customer_phone(index)
+                order_type = 'online' if rng.random() < 0.85 else 'pos'
+
+                order = Order(
+                    order_number=f'SYN-{self.tag}-{number:09d}',
+                    user_id=user_id,
+                    vendor=entry['vendor'],
+                    customer_name=name,
+                    customer_phone=phone,
+                    customer_address=f'{rng.choice(CITIES)}, Street {rng.randint(1, 300)}',
+                    order_type=order_type,
+                    subtotal=subtotal.quantize(MONEY_Q),
+                    delivery_fee=Decimal('5.00') if order_type == 'online' else Decimal('0.00'),
+                    commission_rate=entry['vendor'].commission_rate,
+                    created_at=created_at,
+                    updated_at=created_at,
+                )
+                # Totals are only computed for non-final orders: price first
+                # الإجماليات تُحسب للطلبات غير النهائية فقط: التسعير أولاً
+                order._prepare_order_data()
+                order.status = self._status((self.end - created_at).days)
+                orders.append(order)
+                lines.append(quantities)
+
+            with transaction.atomic():
+                orders = self._insert(Order, orders)
+                items = self._insert(OrderItem, [
+                    OrderItem(
+                        order=order,
+                        product_variant_id=variant_id,
+                        vendor=order.vendor,
+                        quantity=quantity,
+                        price=price,
+                        created_at=order.created_at,
+                    )
+                    for order, quantities in zip(orders, lines)
+                    for (variant_id, price), quantity in quantities.items()
+                ])
+                notifications = self._insert(Notification, [
+                    self._order_notification(order, content_type)
+                    for order in orders if rng.random() < notify_ratio
+                ])
+
+            total_orders += len(orders)
+            total_items += len(items)
+            total_notifications += len(notifications)
+            self.log(f'{total_orders} / {self.scale.orders} orders')
+        return total_orders, total_items, total_notifications
+
+    # -------------------------------------------------------------------------
+    # Carts
+    # السلال
+    # -------------------------------------------------------------------------
+
+    def _carts(self, catalogue, customers):
+        """
+        Open carts (a registered customer holds at most one, guest carts are
+        keyed by session) with 1-4 items from one vendor each.
+        سلال مفتوحة (سلة واحدة على الأكثر لكل عميل مسجل، والزوار حسب الجلسة).
+
+        Returns:
+            tuple: (carts created, items created)
+        """
+        rng = self.rng
+        vendor_choice = self._vendor_choice(catalogue)
+        registered = min(int(self.scale.carts * (1 - self.guest_ratio)), len(customers['ids']))
+        owners = rng.sample(range(len(customers['ids'])), registered)
+
+        total_carts = total_items = 0
+        for chunk_start in range(0, self.scale.carts, self.chunk_size):
+            chunk_stop = min(chunk_start + self.chunk_size, self.scale.carts)
+            carts, lines = [], []
+            for number in range(chunk_start, chunk_stop):
+                updated_at = self.end - timedelta(seconds=rng.randrange(CART_DAYS * 86400))
+                if number < registered:
+                    cart = Cart(user_id=customers['ids'][owners[number]])
+                else:
+                    cart = Cart(session_key=f'{self.tag}-{rng.getrandbits(128):032x}'[:40])
+                cart.created_at = updated_at - timedelta(seconds=rng.randrange(3 * 86400))
+                cart.updated_at = updated_at
+                carts.append(cart)
+
+                entry = vendor_choice.pick(rng)
+                lines.append(dict(
+                    entry['variants'].pick(rng) for _ in range(1 + min(int(rng.expovariate(1.2)), 3))
+                ))
+
+            with transaction.atomic():
+                carts = self._insert(Cart, carts)
+                items = self._insert(CartItem, [
+                    CartItem(
+                        cart=cart,
+                        variant_id=variant_id,
+                        quantity=rng.choice([1, 1, 1, 2, 3]),
+                        price=price,
+                        created_at=cart.created_at,
+                        updated_at=cart.updated_at,
+                    )
+                    for cart, variants in zip(carts, lines)
+                    for variant_id, price in variants.items()
+                ])
+
+            total_carts += len(carts)
+            total_items += len(items)
+        self.log(f'{total_carts} carts')
+        return total_carts, total_items
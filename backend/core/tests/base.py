@@ -0,0 +1,85 @@
+"""
+Shared Fixtures for the Performance Suite
+تجهيزات مشتركة لاختبارات الأداء
+
+A synthetic marketplace (core.synthetic) plus the three callers the
+endpoints are measured as: the owner of the largest vendor, a superuser
+admin and an anonymous visitor.
+سوق اصطناعية مع ثلاثة مستدعين: مالك أكبر بائع، أدمن، وزائر مجهول.
+"""
+
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.cache import local_cache
+from core.synthetic import MarketplaceGenerator
+from core.throttling import MemoryRateLimitStore, get_store
+from users.models import User, VendorUser
+
+
+SEED = 42
+
+# Callers / المستدعون
+VENDOR = 'vendor'
+ADMIN = 'admin'
+ANONYMOUS = 'anonymous'
+
+
+def generate_marketplace(testcase_class, scale, seed=SEED):
+    """
+    Generate the dataset and the callers on a TestCase class.
+    توليد البيانات والمستدعين على كلاس الاختبار.
+
+    Orders end one hour ago so "today" / "last 7 days" widgets have data.
+    """
+    testcase_class.summary = MarketplaceGenerator(
+        seed=seed, scale=scale, end=timezone.now() - timedelta(hours=1),
+    ).run()
+    testcase_class.vendor_owner = (
+        VendorUser.objects
+        .select_related('user')
+        .get(vendor__slug=f'synthetic-s{seed}-0000', is_owner=True)
+        .user
+    )
+    testcase_class.admin_user = User.objects.create_superuser(
+        email=f'admin.s{seed}@synthetic.example',
+        phone='+963900000000',
+        password='unused-password',
+    )
+
+
+class MarketplaceClientMixin:
+    """
+    Issue cold requests (empty cache, fresh rate limits) as a caller.
+    إرسال طلبات باردة (كاش فارغ وحدود معدل جديدة) باسم مستدعٍ.
+    """
+
+    def caller(self, who):
+        return {VENDOR: self.vendor_owner, ADMIN: self.admin_user, ANONYMOUS: None}[who]
+
+    def cold_get(self, who, url):
+        """
+        GET `url` with empty caches.
+        تنفيذ GET بكاش فارغ.
+
+        Returns:
+            tuple: (response, list of executed SQL dicts)
+        """
+        cache.clear()
+        local_cache.clear()
+        store = get_store()
+        if isinstance(store, MemoryRateLimitStore):
+            store.clear()
+
+        client = APIClient(SERVER_NAME='localhost')
+        user = self.caller(who)
+        if user is not None:
+            client.force_authenticate(user)
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        return response, queries.captured_queries
@@ -0,0 +1,56 @@
+"""
+Background Flushers
+المفرّغات في الخلفية
+
+A PeriodicFlush poked inside a transaction or savepoint that rolls back
+must stay usable (core.background).
+المفرّغ الذي يُستدعى داخل transaction أو savepoint متراجع يجب أن يبقى صالحاً.
+
+Run:
+    python manage.py test core.tests.test_background
+"""
+
+from django.db import transaction
+from django.test import TestCase, override_settings
+
+from analytics import ingestion
+from analytics.buffer import get_buffer
+from analytics.ingestion import make_event, record_events
+from analytics.models import EventType
+from notifications import outbox
+from notifications.models import OutboxEvent
+
+
+class Rollback(Exception):
+    pass
+
+
+class RolledBackPokeTests(TestCase):
+    """
+    A poke whose commit callback is dropped leaves no pending flush.
+    الاستدعاء الذي يُسقط callback التثبيت الخاص به لا يترك تفريغاً معلقاً.
+    """
+
+    def tearDown(self):
+        get_buffer().pop(10**6)
+
+    def assertFlusherFree(self, flusher):
+        self.assertFalse(flusher._pending)
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.assertTrue(flusher.poke(force=True))
+        self.assertEqual(len(callbacks), 1)
+
+    def test_rolled_back_publish(self):
+        with self.assertRaises(Rollback), transaction.atomic():
+            outbox.publish(OutboxEvent.Topic.ORDER_CREATED, {'order_id': 0})
+            raise Rollback
+        self.assertFlusherFree(outbox._dispatcher)
+
+    @override_settings(ANALYTICS_FLUSH_SIZE=1)
+    def test_failed_savepoint_after_recording_events(self):
+        # Like an outbox handler savepoint failing after record_purchases
+        # مثل فشل savepoint معالج بعد record_purchases
+        with self.assertRaises(Rollback), transaction.atomic():
+            record_events([make_event(EventType.PURCHASE, 1, session_key='o:1')])
+            raise Rollback
+        self.assertFlusherFree(ingestion._flusher)
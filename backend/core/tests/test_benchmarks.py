@@ -0,0 +1,173 @@
+"""
+Wall-Clock Benchmarks
+قياسات زمن الاستجابة
+
+Times the main endpoints over a large synthetic marketplace (100k orders
+by default) and writes the results to JSON. Opt-in: generating the data
+takes minutes, so the test is skipped unless BENCHMARK=1.
+
+يقيس زمن أهم الـ endpoints على سوق اصطناعية كبيرة (100 ألف طلب افتراضياً)
+ويكتب النتائج إلى JSON. اختياري: لا يعمل إلا مع BENCHMARK=1.
+
+Environment:
+    BENCHMARK=1                  enable the benchmark
+    BENCHMARK_SCALE=benchmark    dataset size (a name in core.synthetic.SCALES)
+    BENCHMARK_REPEAT=5           timed requests per endpoint (after one warm-up)
+    BENCHMARK_OUTPUT=benchmark.json
+    BENCHMARK_BASELINE=path      previous output to compare against
+    BENCHMARK_TOLERANCE=0.25     allowed p50 slowdown vs the baseline (25%)
+
+Each endpoint gets cold (empty cache) and warm timings: p50 / p95 / mean in
+milliseconds, plus the query count of the cold request. With a baseline, an
+endpoint whose cold p50 is slower by more than the tolerance (and by more
+than 5 ms, to ignore noise on fast endpoints) fails the test.
+
+Run:
+    BENCHMARK=1 BENCHMARK_OUTPUT=before.json python manage.py test core.tests.test_benchmarks
+    BENCHMARK=1 BENCHMARK_BASELINE=before.json python manage.py test core.tests.test_benchmarks
+"""
+
+import json
+import os
+import platform
+import statistics
+import time
+import unittest
+
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .base import ADMIN, ANONYMOUS, VENDOR, SEED, MarketplaceClientMixin, generate_marketplace
+
+
+BENCHMARK_ENDPOINTS = [
+    (VENDOR, '/api/v1/vendor/dashboard/overview/'),
+    (VENDOR, '/api/v1/vendor/dashboard/sales-chart/'),
+    (VENDOR, '/api/v1/vendor/products/'),
+    (VENDOR, '/api/v1/vendor/analytics/overview/'),
+    (VENDOR, '/api/v1/vendor/analytics/products/'),
+    (VENDOR, '/api/v1/vendor/analytics/customers/'),
+    (VENDOR, '/api/v1/vendor/analytics/time-analysis/'),
+    (VENDOR, '/api/v1/orders/orders/'),
+    (ADMIN, '/api/v1/admin/dashboard/overview/'),
+    (ADMIN, '/api/v1/admin/products/'),
+    (ADMIN, '/api/v1/admin/orders/'),
+    (ADMIN, '/api/v1/admin/vendors/'),
+    (ADMIN, '/api/v1/admin/reports/sales/'),
+    (ANONYMOUS, '/api/v1/products/products/'),
+    (ANONYMOUS, '/api/v1/products/products/?search=classic'),
+    (ANONYMOUS, '/api/v1/vendors/vendors/'),
+]
+
+# Slowdowns below this many milliseconds are noise
+# التباطؤ أقل من هذا العدد من الميلي ثانية ضجيج
+MIN_REGRESSION_MS = 5.0
+
+
+def summarize(durations):
+    """p50 / p95 / mean of durations (seconds) in milliseconds"""
+    ordered = sorted(durations)
+    p95_index = min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))
+    return {
+        'p50_ms': round(statistics.median(ordered) * 1000, 2),
+        'p95_ms': round(ordered[p95_index] * 1000, 2),
+        'mean_ms': round(statistics.fmean(ordered) * 1000, 2),
+    }
+
+
+def regressions(results, baseline, tolerance):
+    """
+    Endpoints whose cold p50 regressed against a baseline.
+    الـ endpoints التي تباطأ وسيطها البارد مقارنة بالمرجع.
+
+    Returns:
+        list: Human-readable lines
+    """
+    previous = {entry['name']: entry for entry in baseline.get('endpoints', [])}
+    lines = []
+    for entry in results:
+        before = previous.get(entry['name'])
+        if before is None:
+            continue
+        old, new = before['cold']['p50_ms'], entry['cold']['p50_ms']
+        if new > old * (1 + tolerance) and new - old > MIN_REGRESSION_MS:
+            lines.append(f'{entry["name"]}: p50 {old} ms -> {new} ms')
+    return lines
+
+
+@unittest.skipUnless(os.environ.get('BENCHMARK') == '1', 'Set BENCHMARK=1 to run the benchmarks')
+class EndpointBenchmark(MarketplaceClientMixin, TestCase):
+    """
+    Endpoint timings over the benchmark marketplace.
+    أزمنة الـ endpoints على سوق القياس.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.scale_name = os.environ.get('BENCHMARK_SCALE', 'benchmark')
+        started = time.perf_counter()
+        generate_marketplace(cls, cls.scale_name)
+        cls.generation_seconds = round(time.perf_counter() - started, 1)
+
+    def time_endpoint(self, who, url, repeat):
+        """
+        Cold and warm timings of one endpoint.
+        أزمنة باردة ودافئة لـ endpoint واحد.
+        """
+        response, queries = self.cold_get(who, url)
+        self.assertEqual(response.status_code, 200, f'{url}: {response.content[:300]}')
+
+        cold = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            self.cold_get(who, url)
+            cold.append(time.perf_counter() - started)
+
+        client = APIClient(SERVER_NAME='localhost')
+        user = self.caller(who)
+        if user is not None:
+            client.force_authenticate(user)
+        warm = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            client.get(url)
+            warm.append(time.perf_counter() - started)
+
+        return {
+            'name': f'{who} {url}',
+            'queries': len(queries),
+            'cold': summarize(cold),
+            'warm': summarize(warm),
+        }
+
+    def test_endpoints(self):
+        repeat = int(os.environ.get('BENCHMARK_REPEAT', '5'))
+        results = [self.time_endpoint(who, url, repeat) for who, url in BENCHMARK_ENDPOINTS]
+
+        report = {
+            'created_at': timezone.now().isoformat(),
+            'seed': SEED,
+            'scale': self.scale_name,
+            'dataset': self.summary,
+            'generation_seconds': self.generation_seconds,
+            'repeat': repeat,
+            'database': connection.vendor,
+            'cache': settings.CACHES['default']['BACKEND'],
+            'python': platform.python_version(),
+            'endpoints': results,
+        }
+        output = os.environ.get('BENCHMARK_OUTPUT', 'benchmark.json')
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+        baseline_path = os.environ.get('BENCHMARK_BASELINE')
+        if baseline_path:
+            with open(baseline_path, encoding='utf-8') as f:
+                baseline = json.load(f)
+            tolerance = float(os.environ.get('BENCHMARK_TOLERANCE', '0.25'))
+            slower = regressions(results, baseline, tolerance)
+            if slower:
+                self.fail('Slower than the baseline:\n' + '\n'.join(slower))
@@ -0,0 +1,171 @@
+"""
+Cached Response Freshness
+حداثة الاستجابات المخزنة
+
+Writes that bypass the model signals must not leave stale payloads in the
+two-tier cache (core.cache).
+الكتابات التي تتجاوز إشارات النماذج يجب ألا تترك بيانات قديمة في الكاش.
+
+Run:
+    python manage.py test core.tests.test_cache
+"""
+
+import io
+import shutil
+import tempfile
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from PIL import Image
+from rest_framework.test import APIClient
+
+from analytics.models import Event, EventType
+from core.cache import TieredCache, local_cache, namespace_timeout
+from core.images import generate_derivatives
+from products.models import Category, Product, ProductImage
+from products.ranking import update_rankings
+
+from .base import generate_marketplace
+
+
+def png_upload(name='photo.png', size=(800, 600)):
+    """A small in-memory PNG / صورة PNG صغيرة في الذاكرة"""
+    buffer = io.BytesIO()
+    Image.new('RGB', size, (200, 80, 40)).save(buffer, format='PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+class CachedResponseTestCase(TestCase):
+    """
+    A tiny marketplace, its first active product and a client on empty caches.
+    سوق صغيرة وأول منتج فعال وعميل على كاش فارغ.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        generate_marketplace(cls, 'tiny')
+        cls.product = Product.objects.filter(is_active=True).order_by('pk').first()
+        cls.url = f'/api/v1/products/products/{cls.product.pk}/'
+
+    def setUp(self):
+        cache.clear()
+        local_cache.clear()
+        self.client = APIClient(SERVER_NAME='localhost')
+
+
+class DerivativeInvalidationTests(CachedResponseTestCase):
+    """
+    Derivatives are stored with QuerySet.update(): the cached product
+    detail must still pick them up.
+    المشتقات تُحفظ عبر update(): يجب أن يظهرها تفصيل المنتج المخزن.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.media_root = tempfile.mkdtemp()
+        cls.media = override_settings(MEDIA_ROOT=cls.media_root)
+        cls.media.enable()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.media.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+
+    def images(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return {image['id']: image for image in response.data['images']}
+
+    def test_detail_refreshes_after_derivatives(self):
+        # on_commit never fires in a TestCase: no derivatives yet
+        # لا تُنفذ on_commit داخل TestCase: لا مشتقات بعد
+        image = ProductImage.objects.create(product=self.product, image=png_upload(), is_primary=True)
+        self.assertIsNone(self.images()[image.pk]['image_derivatives'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertTrue(generate_derivatives('products.ProductImage', image.pk, 'image'))
+
+        derivatives = self.images()[image.pk]['image_derivatives']
+        self.assertIsNotNone(derivatives)
+        self.assertIn('thumb', derivatives)
+
+
+class CommitInvalidationTests(TestCase):
+    """
+    Signal invalidation waits for the writing transaction to commit.
+    الإبطال عبر الإشارات ينتظر تثبيت الـ transaction.
+    """
+
+    def test_generation_bumped_on_commit(self):
+        categories = TieredCache('categories')
+        before = categories.generation()
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(name='Commit Test', slug='commit-test')
+            # A concurrent recompute would still read the old rows here
+            # الحساب المتزامن هنا ما زال يقرأ الصفوف القديمة
+            self.assertEqual(categories.generation(), before)
+        self.assertNotEqual(categories.generation(), before)
+
+
+class ConditionalRequestTests(CachedResponseTestCase):
+    """
+    ETag / Last-Modified come from the cached data: a revalidating client
+    gets the new data once the entry is recomputed, invalidated or not.
+    المدققات مشتقة من البيانات المخزنة: العميل يحصل على الجديد بعد إعادة الحساب.
+    """
+
+    def test_unchanged_data_is_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_signal_less_write_refreshes_after_expiry(self):
+        first = self.client.get(self.url)
+        etag = first['ETag']
+
+        # QuerySet.update() sends no post_save: the namespace is not invalidated
+        # update() لا يرسل post_save: النطاق لا يُبطل
+        Product.objects.filter(pk=self.product.pk).update(name='Renamed Without Signals')
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # Past the entry's logical expiry / بعد انتهاء صلاحية المدخل
+        later = time.time() + namespace_timeout('product_detail') + 1
+        with mock.patch('core.cache.time.time', return_value=later):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['name'], 'Renamed Without Signals')
+        self.assertNotEqual(response['ETag'], etag)
+
+
+class RankingInvalidationTests(CachedResponseTestCase):
+    """
+    A ranking run reorders the cached product list sorted by the scores.
+    تشغيل الترتيب يعيد ترتيب قائمة المنتجات المخزنة المرتبة بالدرجات.
+    """
+
+    list_url = '/api/v1/products/products/?ordering=-trending'
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        update_rankings()
+
+    @override_settings(RANKING_TRENDING_WEIGHTS={'product_view': 10**9})
+    def test_list_follows_new_scores(self):
+        first = self.client.get(self.list_url)
+        results = first.data['data']['results']
+        target = results[-1]['id']
+        self.assertNotEqual(results[0]['id'], target)
+
+        Event.objects.create(event_type=EventType.PRODUCT_VIEW, object_id=target, occurred_at=timezone.now())
+        update_rankings()
+
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['data']['results'][0]['id'], target)
@@ -0,0 +1,171 @@
+"""
+Query-Count Budgets
+ميزانيات عدد الاستعلامات
+
+Every endpoint below has a maximum number of SQL queries for one cold
+request (empty cache) over the tiny synthetic marketplace. A change that
+adds a query per row, drops a select_related or bypasses a cache fails
+here with the captured SQL.
+
+لكل endpoint حد أقصى لعدد استعلامات SQL لطلب بارد واحد على السوق الاصطناعية
+الصغيرة. أي تغيير يضيف استعلاماً لكل صف أو يُسقط select_related يفشل هنا.
+
+DoubledQueryBudgetTests replays the same budgets over a marketplace twice
+as large: an endpoint whose query count grows with the data fails there.
+The endpoints already known to grow are listed in SCALES_WITH_DATA; they
+keep their tiny-dataset budget until their loops are batched (remove them
+from the set when fixed).
+يعيد DoubledQueryBudgetTests نفس الميزانيات على سوق بضعف الحجم.
+
+Not covered yet (they fail with a server error on any dataset):
+    /api/v1/vendor/orders/            NameError (vendor_order_items) in get()
+    /api/v1/vendor/customers/         NameError (vendor_order_items) in get()
+    /api/v1/vendor/analytics/sales/   sorts TruncDate expressions
+    /api/v1/admin/search/             filters Vendor by a non-existent `email`
+
+Raising a budget is a deliberate change: update QUERY_BUDGETS in the same
+commit and explain why.
+رفع الميزانية تغيير مقصود: حدّث QUERY_BUDGETS في نفس الـ commit مع السبب.
+
+Run:
+    python manage.py test core.tests.test_query_budgets
+"""
+
+from django.test import TestCase
+
+from core.synthetic import SCALES, Scale
+
+from .base import ADMIN, ANONYMOUS, VENDOR, MarketplaceClientMixin, generate_marketplace
+
+
+# (caller, url): maximum queries per cold request
+# (المستدعي، الرابط): الحد الأقصى للاستعلامات لكل طلب بارد
+QUERY_BUDGETS = {
+    # Vendor panel / لوحة البائع
+    (VENDOR, '/api/v1/vendor/dashboard/overview/'): 75,
+    (VENDOR, '/api/v1/vendor/dashboard/sales-chart/'): 4,
+    (VENDOR, '/api/v1/vendor/dashboard/tips/'): 6,  # 4-6 depending on the tip shown
+    (VENDOR, '/api/v1/vendor/dashboard/recent-orders/'): 13,
+    (VENDOR, '/api/v1/vendor/categories/'): 2,
+    (VENDOR, '/api/v1/vendor/products/'): 29,
+    (VENDOR, '/api/v1/vendor/analytics/overview/'): 7,
+    (VENDOR, '/api/v1/vendor/analytics/products/'): 80,
+    (VENDOR, '/api/v1/vendor/analytics/customers/'): 4,
+    (VENDOR, '/api/v1/vendor/analytics/time-analysis/'): 4,
+    (VENDOR, '/api/v1/vendor/analytics/comparison/'): 3,
+    (VENDOR, '/api/v1/vendor/notifications/'): 24,
+    (VENDOR, '/api/v1/orders/orders/'): 24,
+
+    # Admin panel / لوحة الأدمن
+    (ADMIN, '/api/v1/admin/dashboard/overview/'): 27,
+    (ADMIN, '/api/v1/admin/dashboard/sales-chart/'): 1,
+    (ADMIN, '/api/v1/admin/dashboard/recent-orders/'): 1,
+    (ADMIN, '/api/v1/admin/dashboard/recent-activity/'): 6,
+    (ADMIN, '/api/v1/admin/categories/'): 32,
+    (ADMIN, '/api/v1/admin/categories/tree/'): 7,
+    (ADMIN, '/api/v1/admin/products/'): 28,
+    (ADMIN, '/api/v1/admin/orders/'): 6,
+    (ADMIN, '/api/v1/admin/orders/stats/'): 5,
+    (ADMIN, '/api/v1/admin/vendors/'): 8,
+    (ADMIN, '/api/v1/admin/vendors/stats/'): 4,
+    (ADMIN, '/api/v1/admin/users/'): 27,
+    (ADMIN, '/api/v1/admin/users/stats/'): 9,
+    (ADMIN, '/api/v1/admin/reports/sales/'): 4,
+    (ADMIN, '/api/v1/admin/reports/products/'): 3,
+    (ADMIN, '/api/v1/admin/reports/users/'): 5,
+    (ADMIN, '/api/v1/admin/reports/commissions/'): 2,
+    (ADMIN, '/api/v1/admin/carts/'): 48,
+
+    # Storefront / الواجهة العامة
+    (ANONYMOUS, '/api/v1/products/products/'): 16,
+    (ANONYMOUS, '/api/v1/products/products/facets/'): 1,
+    (ANONYMOUS, '/api/v1/products/products/?ordering=-trending'): 13,
+    (ANONYMOUS, '/api/v1/products/products/top/?by=best_selling'): 1,
+    (ANONYMOUS, '/api/v1/products/categories/'): 27,
+    (ANONYMOUS, '/api/v1/products/categories/tree/'): 27,
+    (ANONYMOUS, '/api/v1/vendors/vendors/'): 2,
+    (ANONYMOUS, '/api/v1/settings/all/'): 25,
+}
+
+# Known per-row loops: budgets hold on the tiny dataset only. Their counts
+# also move a little with the calendar (rows inside "this week" etc.), so
+# their budgets carry some headroom.
+# حلقات معروفة لكل صف: الميزانيات صالحة على البيانات الصغيرة فقط، مع هامش
+# لأن العدد يتغير قليلاً مع التاريخ.
+SCALES_WITH_DATA = {
+    (VENDOR, '/api/v1/vendor/dashboard/overview/'),
+    (VENDOR, '/api/v1/vendor/analytics/products/'),
+    (VENDOR, '/api/v1/orders/orders/'),
+    (ADMIN, '/api/v1/admin/vendors/'),
+    (ADMIN, '/api/v1/admin/carts/'),
+}
+
+
+def doubled(scale):
+    """Scale with twice as many rows of everything but categories"""
+    return scale._replace(**{
+        field: getattr(scale, field) * 2 for field in Scale._fields if field != 'categories'
+    })
+
+
+class QueryBudgetTests(MarketplaceClientMixin, TestCase):
+    """
+    Query budgets over the tiny marketplace.
+    ميزانيات الاستعلامات على السوق الصغيرة.
+    """
+
+    scale = SCALES['tiny']
+
+    @classmethod
+    def setUpTestData(cls):
+        generate_marketplace(cls, cls.scale)
+
+    def budgets(self):
+        return QUERY_BUDGETS.items()
+
+    def test_query_budgets(self):
+        for (who, url), budget in self.budgets():
+            with self.subTest(caller=who, url=url):
+                response, queries = self.cold_get(who, url)
+                self.assertEqual(response.status_code, 200, response.content[:500])
+                if len(queries) > budget:
+                    sql = '\n'.join(f'{n}. {query["sql"]}' for n, query in enumerate(queries, 1))
+                    self.fail(
+                        f'{url} as {who}: {len(queries)} queries, budget is {budget}\n{sql}'
+                    )
+
+    def test_budgets_are_tight(self):
+        """
+        A budget far above the actual count hides regressions: lower it.
+        ميزانية أعلى بكثير من العدد الفعلي تخفي التراجعات: اخفضها.
+        """
+        for (who, url), budget in self.budgets():
+            if (who, url) in SCALES_WITH_DATA:
+                continue
+            with self.subTest(caller=who, url=url):
+                _, queries = self.cold_get(who, url)
+                self.assertGreaterEqual(
+                    len(queries), budget - max(2, budget // 10),
+                    f'{url} as {who} now runs {len(queries)} queries: lower its budget ({budget})',
+                )
+
+
+class DoubledQueryBudgetTests(QueryBudgetTests):
+    """
+    Same budgets over a marketplace twice as large: query counts must not
+    grow with the data.
+    نفس الميزانيات على سوق بضعف الحجم: عدد الاستعلامات يجب ألا ينمو مع البيانات.
+    """
+
+    scale = doubled(SCALES['tiny'])
+
+    def budgets(self):
+        return [
+            (endpoint, budget) for endpoint, budget in QUERY_BUDGETS.items()
+            if endpoint not in SCALES_WITH_DATA
+        ]
+
+    def test_budgets_are_tight(self):
+        # Tightness is checked on the reference dataset only
+        # الدقة تُفحص على البيانات المرجعية فقط
+        pass
@@ -0,0 +1,162 @@
+"""
+Atomic Rate Limiting
+تحديد المعدل الذري
+
+GCRA decisions, their headers, scope resolution and the fallback when the
+Redis store fails (core.throttling), on the in-process store.
+قرارات GCRA وترويساتها وحل النطاق والرجوع عند فشل مخزن Redis.
+
+Run:
+    python manage.py test core.tests.test_throttling
+"""
+
+from unittest import mock
+
+from django.test import SimpleTestCase
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+from rest_framework.views import APIView
+
+from core import throttling
+from core.middleware import RateLimitHeadersMiddleware
+from core.throttling import MemoryRateLimitStore, ScopedRateThrottle, hit, rate_limit_headers
+
+RATES = {'burst': '3/minute', 'other': '3/minute'}
+
+
+class ClockMixin:
+    """
+    Freeze time.monotonic(); tests move it with self.now.
+    تجميد time.monotonic()؛ الاختبارات تحركه عبر self.now.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.now = 1000.0
+        patcher = mock.patch('core.throttling.time.monotonic', side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        throttling._memory_store.clear()
+        self.addCleanup(throttling._memory_store.clear)
+
+
+class GCRATests(ClockMixin, SimpleTestCase):
+    """
+    5 requests per 60 seconds: one every 12 seconds, bursts up to 5.
+    5 طلبات لكل 60 ثانية: طلب كل 12 ثانية، ودفعة حتى 5.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.store = MemoryRateLimitStore()
+
+    def hit(self):
+        return self.store.hit('client', 5, 60)
+
+    def test_burst_up_to_limit_then_denied(self):
+        results = [self.hit() for _ in range(5)]
+        self.assertTrue(all(result.allowed for result in results))
+        self.assertEqual([result.remaining for result in results], [4, 3, 2, 1, 0])
+        self.assertEqual(results[-1].reset, 60)
+
+        denied = self.hit()
+        self.assertFalse(denied.allowed)
+        self.assertEqual((denied.remaining, denied.reset, denied.retry_after), (0, 60, 12))
+
+        # A denied request does not push the next one further away
+        # الطلب المرفوض لا يؤخر الطلب التالي
+        self.now += 12
+        self.assertTrue(self.hit().allowed)
+        self.assertFalse(self.hit().allowed)
+
+    def test_bucket_refills_after_period(self):
+        for _ in range(5):
+            self.hit()
+        self.now += 60
+        self.assertEqual(self.hit().remaining, 4)
+
+    def test_headers(self):
+        for _ in range(5):
+            allowed = self.hit()
+        self.assertEqual(rate_limit_headers(allowed), {
+            'RateLimit-Limit': '5', 'RateLimit-Remaining': '0', 'RateLimit-Reset': '60',
+        })
+
+        self.now += 0.5
+        self.assertEqual(rate_limit_headers(self.hit()), {
+            'RateLimit-Limit': '5', 'RateLimit-Remaining': '0', 'RateLimit-Reset': '60',
+            'Retry-After': '12',
+        })
+
+    def test_unreachable_redis_falls_back_to_memory(self):
+        broken = mock.Mock()
+        broken.hit.side_effect = ConnectionError('redis down')
+        with mock.patch('core.throttling.get_store', return_value=broken), \
+                self.assertLogs('core.throttling', 'WARNING'):
+            first = hit('fallback', 5, 60)
+            second = hit('fallback', 5, 60)
+
+        self.assertTrue(first.allowed)
+        # Both requests were counted by the in-process store
+        # الطلبان احتُسبا في المخزن الداخلي
+        self.assertEqual((first.remaining, second.remaining), (4, 3))
+        self.assertEqual(broken.hit.call_count, 2)
+
+
+class BurstView(APIView):
+    authentication_classes = []
+    permission_classes = []
+    throttle_classes = [ScopedRateThrottle]
+    throttle_scope = 'burst'
+
+    def get(self, request):
+        return Response({'ok': True})
+
+
+class OtherView(BurstView):
+    throttle_scope = 'other'
+
+
+class UnscopedView(BurstView):
+    throttle_scope = None
+
+
+@mock.patch.object(ScopedRateThrottle, 'THROTTLE_RATES', RATES)
+class ScopedThrottleTests(ClockMixin, SimpleTestCase):
+    """
+    The scope and its rate come from the view; headers from the middleware.
+    النطاق ومعدله يأتيان من العرض؛ والترويسات من الـ middleware.
+    """
+
+    factory = APIRequestFactory()
+
+    def get(self, view):
+        return RateLimitHeadersMiddleware(view.as_view())(self.factory.get('/'))
+
+    def test_view_scope_and_headers(self):
+        responses = [self.get(BurstView) for _ in range(3)]
+        self.assertEqual([response.status_code for response in responses], [200] * 3)
+        self.assertEqual([response['RateLimit-Remaining'] for response in responses], ['2', '1', '0'])
+        self.assertEqual(responses[0]['RateLimit-Limit'], '3')
+        self.assertNotIn('Retry-After', responses[-1])
+
+        denied = self.get(BurstView)
+        self.assertEqual(denied.status_code, 429)
+        self.assertEqual(denied['Retry-After'], '20')
+        self.assertEqual(denied['RateLimit-Remaining'], '0')
+        self.assertEqual(denied['RateLimit-Reset'], '60')
+
+    def test_scopes_are_counted_separately(self):
+        for _ in range(3):
+            self.get(BurstView)
+        self.assertEqual(self.get(BurstView).status_code, 429)
+
+        response = self.get(OtherView)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['RateLimit-Remaining'], '2')
+
+    def test_view_without_scope_is_not_limited(self):
+        for _ in range(5):
+            response = self.get(UnscopedView)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('RateLimit-Limit', response)
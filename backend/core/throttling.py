@@ -0,0 +1,245 @@
+"""
+Atomic Rate Limiting
+تحديد المعدل الذري
+
+DRF's SimpleRateThrottle keeps a list of request timestamps per client in
+the cache and reads, trims and rewrites it on every request: the cost grows
+with the rate (a 5000/hour admin serializes up to 5000 floats per call) and
+concurrent workers overwrite each other's lists.
+
+The throttles here use GCRA (generic cell rate algorithm, a token bucket
+with burst = the whole limit). Each client has a single number, its
+"theoretical arrival time"; a request is allowed if it is at most one
+period ahead of now and then pushes it by period / limit. The check-and-set
+runs as one Lua script on Redis (atomic across workers, O(1) at any rate),
+or under a lock in-process when Redis is not configured (tests, dev).
+
+الـ throttles هنا تستخدم GCRA (دلو رموز بسعة الحد كاملاً). لكل عميل رقم واحد
+فقط؛ الطلب مسموح إذا لم يتجاوز فترة واحدة للأمام ثم يُزاد بـ الفترة / الحد.
+الفحص والكتابة يعملان كسكربت Lua واحد على Redis (ذري بين العمال و O(1) بأي
+معدل)، أو بقفل داخل العملية بدون Redis.
+
+Each decision is recorded on the request; RateLimitHeadersMiddleware turns
+it into RateLimit-Limit / RateLimit-Remaining / RateLimit-Reset headers, and
+throttled responses carry Retry-After (DRF's exception handler).
+كل قرار يُسجل على الطلب ويتحول إلى ترويسات RateLimit-* و Retry-After.
+
+Usage:
+    class AdminUserRateThrottle(UserRateThrottle):   # from core.throttling
+        scope = 'admin'
+"""
+
+import logging
+import math
+import threading
+import time
+from collections import namedtuple
+
+from rest_framework import throttling
+
+from core.redis_utils import redis_key, store_selector
+
+logger = logging.getLogger(__name__)
+
+
+# Outcome of one check
+# نتيجة فحص واحد
+#   remaining: requests still allowed right now
+#   reset: seconds until the bucket is full again
+#   retry_after: seconds until the next request is allowed (0 if allowed)
+RateLimitResult = namedtuple('RateLimitResult', ['allowed', 'limit', 'remaining', 'reset', 'retry_after'])
+
+
+def _decide(tat, now, limit, period):
+    """
+    GCRA step shared by both stores.
+    خطوة GCRA المشتركة بين المخزنين.
+
+    Returns:
+        tuple: (RateLimitResult, new theoretical arrival time or None if denied)
+    """
+    interval = period / limit
+    tat = max(tat or now, now)
+    new_tat = tat + interval
+    allow_at = new_tat - period
+    if allow_at > now:
+        return RateLimitResult(False, limit, 0, tat - now, allow_at - now), None
+    remaining = int((now - allow_at) / interval)
+    return RateLimitResult(True, limit, remaining, new_tat - now, 0.0), new_tat
+
+
+# =============================================================================
+# Stores
+# المخازن
+# =============================================================================
+
+class MemoryRateLimitStore:
+    """
+    In-process GCRA store (tests, development, Redis outages).
+    مخزن GCRA داخل العملية (الاختبارات، التطوير، انقطاع Redis).
+    """
+
+    # Expired buckets are dropped when the table grows past this size
+    # الدلاء المنتهية تُحذف عندما يتجاوز الجدول هذا الحجم
+    PRUNE_THRESHOLD = 10000
+
+    def __init__(self):
+        self._tats = {}
+        self._lock = threading.Lock()
+
+    def hit(self, key, limit, period):
+        with self._lock:
+            now = time.monotonic()
+            result, new_tat = _decide(self._tats.get(key), now, limit, period)
+            if new_tat is not None:
+                self._tats[key] = new_tat
+                if len(self._tats) > self.PRUNE_THRESHOLD:
+                    self._tats = {k: tat for k, tat in self._tats.items() if tat > now}
+            return result
+
+    def clear(self):
+        with self._lock:
+            self._tats.clear()
+
+
+class RedisRateLimitStore:
+    """
+    GCRA in one Lua script; the key holds the arrival time and expires with
+    the bucket. Time comes from the Redis server so workers agree on it.
+    GCRA في سكربت Lua واحد؛ الوقت من خادم Redis حتى تتفق العمال عليه.
+    """
+
+    # Floats are returned as strings (Lua numbers are truncated to integers)
+    # الأعداد العشرية تُرجع كنصوص (Redis يقتطع أعداد Lua إلى صحيحة)
+    SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local limit = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local interval = period / limit
+local tat = tonumber(redis.call('GET', KEYS[1])) or now
+if tat < now then tat = now end
+local new_tat = tat + interval
+local allow_at = new_tat - period
+if allow_at > now then
+    return {0, 0, tostring(tat - now), tostring(allow_at - now)}
+end
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000))
+return {1, math.floor((now - allow_at) / interval), tostring(new_tat - now), '0'}
+"""
+
+    def __init__(self, client):
+        self.client = client
+        self._script = client.register_script(self.SCRIPT)
+
+    def hit(self, key, limit, period):
+        allowed, remaining, reset, retry_after = self._script(
+            keys=[redis_key(f'ratelimit:{key}')], args=[limit, period],
+        )
+        return RateLimitResult(bool(allowed), limit, int(remaining), float(reset), float(retry_after))
+
+
+_memory_store = MemoryRateLimitStore()
+get_store = store_selector(_memory_store, RedisRateLimitStore)
+
+
+def hit(key, limit, period):
+    """
+    Count one request against `limit` per `period` seconds for `key`.
+    احتساب طلب واحد مقابل `limit` لكل `period` ثانية للمفتاح.
+
+    Falls back to the in-process store if Redis is unreachable, so an
+    outage degrades to per-worker limits instead of failing requests.
+    يرجع للمخزن الداخلي إذا تعذر الوصول إلى Redis.
+
+    Returns:
+        RateLimitResult
+    """
+    store = get_store()
+    try:
+        return store.hit(key, limit, period)
+    except Exception:
+        if store is _memory_store:
+            raise
+        logger.warning('Rate limit store unavailable, using in-process limits', exc_info=True)
+        return _memory_store.hit(key, limit, period)
+
+
+# =============================================================================
+# DRF Throttles
+# الـ Throttles لـ DRF
+# =============================================================================
+
+class AtomicRateThrottleMixin:
+    """
+    Replace SimpleRateThrottle's timestamp history with a GCRA hit.
+    استبدال سجل الطوابع الزمنية في SimpleRateThrottle بفحص GCRA.
+
+    Keeps the subclass's scope, rate and get_cache_key(); only the storage
+    changes.
+    يحافظ على scope والمعدل و get_cache_key() للكلاس؛ يتغير التخزين فقط.
+    """
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return True
+
+        self.result = hit(key, self.num_requests, self.duration)
+        record_result(request, self.result)
+        return self.result.allowed
+
+    def wait(self):
+        return self.result.retry_after
+
+
+class AnonRateThrottle(AtomicRateThrottleMixin, throttling.AnonRateThrottle):
+    pass
+
+
+class UserRateThrottle(AtomicRateThrottleMixin, throttling.UserRateThrottle):
+    pass
+
+
+class ScopedRateThrottle(AtomicRateThrottleMixin, throttling.ScopedRateThrottle):
+
+    def allow_request(self, request, view):
+        # The scope comes from the view (resolved by DRF's allow_request,
+        # which the mixin replaces)
+        # النطاق يأتي من العرض (كان يُحل في allow_request الخاصة بـ DRF)
+        self.scope = getattr(view, self.scope_attr, None)
+        if not self.scope:
+            return True
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        return super().allow_request(request, view)
+
+
+# =============================================================================
+# Headers
+# الترويسات
+# =============================================================================
+
+def record_result(request, result):
+    """
+    Keep the most restrictive decision of the request for its headers.
+    حفظ القرار الأكثر تقييداً للطلب من أجل الترويسات.
+    """
+    http_request = getattr(request, '_request', request)
+    current = getattr(http_request, '_rate_limit', None)
+    if current is None or (result.allowed, result.remaining) < (current.allowed, current.remaining):
+        http_request._rate_limit = result
+
+
+def rate_limit_headers(result):
+    """RateLimit-* (and Retry-After when denied) header values"""
+    headers = {
+        'RateLimit-Limit': str(result.limit),
+        'RateLimit-Remaining': str(result.remaining),
+        'RateLimit-Reset': str(math.ceil(result.reset)),
+    }
+    if not result.allowed:
+        headers['Retry-After'] = str(math.ceil(result.retry_after))
+    return headers
@@ -14,6 +14,8 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from django.http import JsonResponse
+
+from core.instrumentation import metrics_view
 from drf_spectacular.views import (
     SpectacularAPIView,      # View للحصول على schema الـ API
     SpectacularRedocView,    # View لـ ReDoc documentation
@@ -65,6 +67,10 @@ urlpatterns = [
     # لوحة إدارة Django
     path("admin/", admin.site.urls),
     
+    # Prometheus metrics (METRICS_TOKEN bearer or staff session)
+    # مقاييس Prometheus (رمز METRICS_TOKEN أو جلسة موظف)
+    path("metrics/", metrics_view, name="metrics"),
+    
     # API Documentation (drf-spectacular)
     # توثيق الـ API - Swagger UI
     # الوصول: http://localhost:8000/api/schema/swagger-ui/
@@ -0,0 +1,339 @@
+"""
+Cache Warmer
+تسخين الكاش
+
+Fills the shared cache (core.cache) with the storefront responses that the
+first wave of visitors requests after a deploy or a Redis flush, so they
+never pay for the cold path:
+
+1. Catalog pages: the first pages of the product list, for the whole
+   catalog, the largest vendors and the categories (featured ones first),
+   in each storefront sort order, and the filter facets and top lists
+   (trending / best selling) of each of them
+2. Category list, featured categories and the category tree
+3. The settings bundle and the individual settings endpoints
+4. Details of the newest products (the first page of the catalog) and
+   their frequently-bought-together lists
+
+يملأ الكاش المشترك باستجابات الواجهة التي تطلبها أول موجة من الزوار بعد
+النشر أو مسح Redis: صفحات الكتالوج لكل بائع وفئة وترتيب، شجرة الفئات،
+حزمة الإعدادات وتفاصيل أحدث المنتجات.
+
+Requests go through the real views (same serializers, same cache keys as
+cache_response) with RequestFactory, skipping middleware and throttling,
+on a bounded thread pool. Cache keys embed the absolute URL, so each host
+clients use (CACHE_WARM_HOSTS, default: ALLOWED_HOSTS without wildcards)
+is warmed separately.
+الطلبات تمر عبر العروض الحقيقية (نفس مفاتيح cache_response) بدون
+middleware أو تحديد معدل، في مجموعة خيوط محدودة، لكل host يستخدمه العملاء.
+
+Warming only helps when the cache is shared between processes (Redis):
+with LocMemCache it fills this process only.
+التسخين مفيد فقط مع كاش مشترك بين العمليات (Redis).
+
+Usage:
+    python manage.py warm_caches
+    CACHE_WARM_ON_MIGRATE=True  # also warm after `migrate` (deploys)
+"""
+
+import logging
+import math
+import statistics
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from itertools import product as cartesian
+
+from django.conf import settings
+from django.db import close_old_connections, connections
+from django.db.models import Count, Q
+from django.test import RequestFactory
+from django.urls import resolve
+
+from core.cache import invalidate
+from core.pagination import StandardResultsSetPagination
+
+logger = logging.getLogger(__name__)
+
+
+# =============================================================================
+# Targets
+# الأهداف
+# =============================================================================
+
+PRODUCTS_PATH = '/api/v1/products/products/'
+CATEGORIES_PATH = '/api/v1/products/categories/'
+SETTINGS_PATHS = (
+    '/api/v1/settings/all/',
+    '/api/v1/settings/site/',
+    '/api/v1/settings/social/',
+    '/api/v1/settings/languages/',
+    '/api/v1/settings/navigation/',
+    '/api/v1/settings/trust-signals/',
+    '/api/v1/settings/payment-methods/',
+    '/api/v1/settings/shipping-methods/',
+)
+
+# Namespaces refilled by a full warm-up (--refresh invalidates them first)
+# النطاقات التي يعيد التسخين الكامل ملأها
+WARMED_CACHES = (
+    'products_list', 'product_detail', 'product_facets', 'product_related', 'categories', 'homepage',
+    'settings',
+)
+
+# Storefront sort orders ('' = default ordering, no parameter)
+# ترتيبات الواجهة ('' = الترتيب الافتراضي بدون معامل)
+DEFAULT_ORDERINGS = ('', 'base_price', '-base_price', '-trending', '-best_selling')
+DEFAULT_PAGES = 3
+DEFAULT_VENDORS = 20
+DEFAULT_CATEGORIES = 50
+DEFAULT_DETAILS = StandardResultsSetPagination.page_size
+DEFAULT_WORKERS = 4
+
+WarmTarget = namedtuple('WarmTarget', 'group path params')
+WarmResult = namedtuple('WarmResult', 'target host status seconds')
+
+
+def _pages(count, pages):
+    """Number of list pages to warm for `count` products"""
+    return max(1, min(pages, math.ceil(count / StandardResultsSetPagination.page_size)))
+
+
+def catalog_targets(pages=DEFAULT_PAGES, vendors=DEFAULT_VENDORS, categories=DEFAULT_CATEGORIES,
+                    orderings=DEFAULT_ORDERINGS):
+    """
+    First `pages` product-list pages per scope (whole catalog, largest
+    vendors, featured then largest categories) and sort order, plus the
+    facets and top lists of each scope.
+    أول صفحات قائمة المنتجات لكل نطاق (الكتالوج، أكبر البائعين، الفئات) وترتيب.
+    """
+    from products.models import Category, Product
+    from products.ranking import RANKINGS
+    from vendors.models import Vendor
+
+    active = Q(products__is_active=True)
+    scopes = [('catalog', {}, Product.objects.filter(is_active=True).count())]
+
+    vendor_rows = (
+        Vendor.objects.filter(is_active=True)
+        .annotate(product_count=Count('products', filter=active))
+        .filter(product_count__gt=0)
+        .order_by('-product_count', 'pk')
+        .values_list('slug', 'product_count')[:vendors]
+    )
+    scopes += [('vendor', {'vendor_slug': slug}, count) for slug, count in vendor_rows]
+
+    # The category filter also matches direct subcategories
+    # فلتر الفئة يشمل الفئات الفرعية المباشرة
+    category_rows = list(
+        Category.objects.filter(is_active=True)
+        .annotate(product_count=Count('products', filter=active))
+        .values('pk', 'parent_id', 'slug', 'is_featured', 'product_count')
+    )
+    totals = {row['pk']: row['product_count'] for row in category_rows}
+    for row in category_rows:
+        if row['parent_id'] in totals:
+            totals[row['parent_id']] += row['product_count']
+    category_rows.sort(key=lambda row: (not row['is_featured'], -totals[row['pk']], row['pk']))
+    scopes += [
+        ('category', {'category': row['slug']}, totals[row['pk']])
+        for row in category_rows[:categories] if totals[row['pk']]
+    ]
+
+    targets = []
+    for group, scope, count in scopes:
+        targets.append(WarmTarget('facets', f'{PRODUCTS_PATH}facets/', dict(scope)))
+        targets += [WarmTarget('top', f'{PRODUCTS_PATH}top/', {**scope, 'by': by}) for by in RANKINGS]
+        for ordering in orderings:
+            for page in range(1, _pages(count, pages) + 1):
+                params = dict(scope)
+                if ordering:
+                    params['ordering'] = ordering
+                if page > 1:
+                    params['page'] = str(page)
+                targets.append(WarmTarget(group, PRODUCTS_PATH, params))
+    return targets
+
+
+def category_targets():
+    """Category list, featured categories and tree / قائمة وشجرة الفئات"""
+    return [
+        WarmTarget('categories', CATEGORIES_PATH, {}),
+        WarmTarget('categories', CATEGORIES_PATH, {'is_featured': 'true'}),
+        WarmTarget('categories', f'{CATEGORIES_PATH}tree/', {}),
+    ]
+
+
+def settings_targets():
+    """Settings bundle and sections / حزمة الإعدادات وأقسامها"""
+    return [WarmTarget('settings', path, {}) for path in SETTINGS_PATHS]
+
+
+def detail_targets(details=DEFAULT_DETAILS):
+    """
+    Details and related products of the newest active products.
+    تفاصيل أحدث المنتجات والمنتجات المرتبطة بها.
+    """
+    from products.models import Product
+
+    ids = (
+        Product.objects.filter(is_active=True)
+        .order_by('-created_at')
+        .values_list('pk', flat=True)[:details]
+    )
+    return [
+        WarmTarget('details', f'{PRODUCTS_PATH}{pk}/{suffix}', {})
+        for pk in ids for suffix in ('', 'related/')
+    ]
+
+
+# =============================================================================
+# Runner
+# المشغل
+# =============================================================================
+
+def default_hosts():
+    """
+    Hosts to warm: CACHE_WARM_HOSTS, else ALLOWED_HOSTS without wildcards.
+    الـ hosts المراد تسخينها.
+    """
+    hosts = getattr(settings, 'CACHE_WARM_HOSTS', None) or [
+        host for host in settings.ALLOWED_HOSTS if host and host != '*' and not host.startswith('.')
+    ]
+    return hosts or ['localhost']
+
+
+def cache_is_shared():
+    """Whether other processes see what this one caches / هل الكاش مشترك بين العمليات"""
+    backend = settings.CACHES['default']['BACKEND']
+    return not backend.endswith(('LocMemCache', 'DummyCache'))
+
+
+def _unthrottled_view(path):
+    """
+    The view serving `path`, rebuilt without throttles: hundreds of
+    warm-up requests from one address would exhaust the anonymous rate.
+    العرض الذي يخدم المسار بدون تحديد معدل.
+    """
+    match = resolve(path)
+    func = match.func
+    initkwargs = dict(func.initkwargs, throttle_classes=())
+    actions = getattr(func, 'actions', None)
+    view = func.cls.as_view(actions, **initkwargs) if actions else func.cls.as_view(**initkwargs)
+    return view, match
+
+
+def warm_target(target, host, secure):
+    """
+    Request one target through its view (computing and caching it on a miss).
+    طلب هدف واحد عبر عرضه (يُحسب ويُخزن عند غيابه).
+
+    Returns:
+        WarmResult: status is None when the view raised
+    """
+    close_old_connections()
+    started = time.perf_counter()
+    status = None
+    try:
+        request = RequestFactory().get(
+            target.path, target.params,
+            HTTP_HOST=host, HTTP_ACCEPT='application/json', secure=secure,
+        )
+        view, match = _unthrottled_view(target.path)
+        status = view(request, *match.args, **match.kwargs).status_code
+    except Exception:
+        logger.exception(f'Cache warm-up of {target.path} {target.params} failed')
+    finally:
+        # Each worker thread owns its own connection - close it
+        # كل خيط عامل يملك اتصاله الخاص - أغلقه
+        connections.close_all()
+    return WarmResult(target, host, status, time.perf_counter() - started)
+
+
+def warm(targets, hosts=None, secure=None, workers=DEFAULT_WORKERS):
+    """
+    Warm every target for every host on at most `workers` threads.
+    تسخين كل هدف لكل host بعدد خيوط محدود.
+
+    Returns:
+        list[WarmResult]
+    """
+    hosts = hosts or default_hosts()
+    if secure is None:
+        secure = getattr(settings, 'CACHE_WARM_SECURE', not settings.DEBUG)
+    jobs = list(cartesian(targets, hosts))
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='cache-warm') as executor:
+        return list(executor.map(lambda job: warm_target(job[0], job[1], secure), jobs))
+
+
+def summarize(results):
+    """
+    Timings per group: requests, errors, total / p50 / max milliseconds.
+    الأزمنة لكل مجموعة.
+
+    Returns:
+        dict: group -> stats
+    """
+    groups = {}
+    for result in results:
+        groups.setdefault(result.target.group, []).append(result)
+    summary = {}
+    for group, items in groups.items():
+        durations = [item.seconds * 1000 for item in items]
+        summary[group] = {
+            'requests': len(items),
+            'errors': sum(1 for item in items if item.status != 200),
+            'total_ms': round(sum(durations), 1),
+            'p50_ms': round(statistics.median(durations), 1),
+            'max_ms': round(max(durations), 1),
+        }
+    return summary
+
+
+def warm_caches(pages=DEFAULT_PAGES, vendors=DEFAULT_VENDORS, categories=DEFAULT_CATEGORIES,
+                orderings=DEFAULT_ORDERINGS, details=DEFAULT_DETAILS, hosts=None, secure=None,
+                workers=DEFAULT_WORKERS, refresh=False):
+    """
+    Full warm-up: settings, categories, catalog pages and product details.
+    التسخين الكامل: الإعدادات والفئات وصفحات الكتالوج وتفاصيل المنتجات.
+
+    Args:
+        refresh: Invalidate the warmed namespaces first, so responses are
+                 rebuilt (e.g. after a deploy that changed a serializer)
+
+    Returns:
+        list[WarmResult]
+    """
+    if refresh:
+        invalidate(*WARMED_CACHES)
+    targets = (
+        settings_targets()
+        + category_targets()
+        + catalog_targets(pages, vendors, categories, orderings)
+        + detail_targets(details)
+    )
+    return warm(targets, hosts=hosts, secure=secure, workers=workers)
+
+
+def warm_after_migrate(sender, using='default', **kwargs):
+    """
+    post_migrate receiver: warm the caches after deploy migrations when
+    CACHE_WARM_ON_MIGRATE is on. Never fails the migration.
+    مستقبل post_migrate: تسخين الكاش بعد ترحيلات النشر دون إفشالها.
+    """
+    if not getattr(settings, 'CACHE_WARM_ON_MIGRATE', False) or using != 'default':
+        return
+    if not cache_is_shared():
+        logger.info('Cache warm-up skipped: the default cache is local to this process')
+        return
+    started = time.perf_counter()
+    try:
+        results = warm_caches()
+    except Exception:
+        logger.exception('Cache warm-up after migrate failed')
+        return
+    errors = sum(1 for result in results if result.status != 200)
+    logger.info(
+        f'Cache warm-up: {len(results)} responses in {time.perf_counter() - started:.1f}s '
+        f'({errors} errors)'
+    )
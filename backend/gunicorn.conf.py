@@ -0,0 +1,133 @@
+"""
+Gunicorn Production Profile
+إعدادات Gunicorn للإنتاج
+
+Pre-fork server for core.wsgi (default) or core.asgi (uvicorn workers).
+خادم متعدد العمليات لـ core.wsgi (افتراضي) أو core.asgi (عمال uvicorn).
+
+Usage:
+    gunicorn -c gunicorn.conf.py                          # WSGI, gthread workers
+    SERVER_MODE=asgi gunicorn -c gunicorn.conf.py         # ASGI, uvicorn workers
+
+Operations:
+    kill -HUP <master-pid>    # Graceful reload: new workers start, old ones finish requests
+    kill -TTIN / -TTOU        # Add / remove one worker at runtime
+    kill -TERM <master-pid>   # Graceful shutdown (waits graceful_timeout)
+
+العمليات:
+    kill -HUP   إعادة تحميل سلسة: عمال جدد يبدأون والقدامى ينهون طلباتهم
+    kill -TTIN / -TTOU   زيادة / إنقاص عامل أثناء التشغيل
+    kill -TERM  إيقاف سلس
+
+Every value can be overridden with an environment variable (GUNICORN_*).
+كل قيمة يمكن تجاوزها بمتغير بيئة (GUNICORN_*).
+
+Note: each worker process has its own DB connection pool (DB_POOL_SIZE +
+DB_MAX_OVERFLOW). Keep workers * (pool + overflow) below PostgreSQL
+max_connections.
+ملاحظة: كل عامل يملك مجموعة اتصالات خاصة به؛ يجب أن يبقى المجموع أقل من max_connections.
+"""
+
+import multiprocessing
+import os
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+# =============================================================================
+# Server Mode
+# وضع الخادم
+# =============================================================================
+
+SERVER_MODE = os.environ.get('SERVER_MODE', 'wsgi').lower()
+
+if SERVER_MODE == 'asgi':
+    # Async event-loop workers (requires uvicorn)
+    # عمال بحلقة أحداث غير متزامنة (يتطلب uvicorn)
+    wsgi_app = 'core.asgi:application'
+    worker_class = 'uvicorn.workers.UvicornWorker'
+else:
+    # Sync Django code: processes x threads (threads overlap DB / IO waits)
+    # كود Django متزامن: عمليات × خيوط (الخيوط تتداخل أثناء انتظار قاعدة البيانات)
+    wsgi_app = 'core.wsgi:application'
+    worker_class = 'gthread'
+    threads = _env_int('GUNICORN_THREADS', 4)
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+
+
+# =============================================================================
+# Workers
+# العمال
+# =============================================================================
+
+# Classic (2 x cores) + 1, capped so small hosts are not oversubscribed
+# الصيغة التقليدية (2 × الأنوية) + 1، مع حد أعلى
+workers = _env_int(
+    'GUNICORN_WORKERS',
+    min(multiprocessing.cpu_count() * 2 + 1, _env_int('GUNICORN_MAX_WORKERS', 12)),
+)
+
+# Pending connections queued by the kernel
+# الاتصالات المعلقة في طابور النواة
+backlog = _env_int('GUNICORN_BACKLOG', 2048)
+
+# Do not preload: workers import the app themselves, so HUP reloads new code
+# and no DB pool / thread pool is shared across fork()
+# بدون تحميل مسبق: كل عامل يحمل التطبيق بنفسه لتعمل إعادة التحميل مع الكود الجديد
+preload_app = False
+
+
+# =============================================================================
+# Worker Recycling
+# تدوير العمال
+# =============================================================================
+
+# Restart a worker after N requests (bounds memory growth); jitter avoids
+# all workers restarting at the same moment
+# إعادة تشغيل العامل بعد N طلب (يحد من نمو الذاكرة)؛ العشوائية تمنع إعادة التشغيل المتزامنة
+max_requests = _env_int('GUNICORN_MAX_REQUESTS', 2000)
+max_requests_jitter = _env_int('GUNICORN_MAX_REQUESTS_JITTER', 200)
+
+
+# =============================================================================
+# Timeouts & Keep-Alive
+# المهلات و Keep-Alive
+# =============================================================================
+
+# Matches nginx proxy_read_timeout for /api/ (120s)
+# مطابق لـ proxy_read_timeout في nginx
+timeout = _env_int('GUNICORN_TIMEOUT', 120)
+
+# Time given to in-flight requests on reload / shutdown
+# الوقت الممنوح للطلبات الجارية عند إعادة التحميل / الإيقاف
+graceful_timeout = _env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+
+# Must exceed nginx upstream keepalive_timeout (60s) so nginx always closes
+# idle connections first (avoids 502 on a connection gunicorn just closed)
+# يجب أن يتجاوز keepalive_timeout في nginx حتى يغلق nginx الاتصالات الخاملة أولاً
+keepalive = _env_int('GUNICORN_KEEPALIVE', 75)
+
+# Worker heartbeat files in RAM instead of a possibly slow container FS
+# ملفات نبض العمال في الذاكرة بدلاً من نظام ملفات الحاوية
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+
+# =============================================================================
+# Proxy & Logging
+# البروكسي والسجلات
+# =============================================================================
+
+# nginx is the only client; trust its X-Forwarded-* headers
+# nginx هو العميل الوحيد؛ الوثوق بترويسات X-Forwarded-*
+forwarded_allow_ips = os.environ.get('GUNICORN_FORWARDED_ALLOW_IPS', '*')
+
+accesslog = os.environ.get('GUNICORN_ACCESSLOG', '-')
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOGLEVEL', 'info')
+access_log_format = '%(h)s "%(r)s" %(s)s %(b)s %(M)sms'
+
+proc_name = 'yallabuy-backend'
@@ -4,7 +4,7 @@ Notifications Admin
 """
 
 from django.contrib import admin
-from .models import Notification, NotificationPreference
+from .models import Notification, NotificationPreference, OutboxEvent
 
 
 @admin.register(Notification)
@@ -112,3 +112,17 @@ class NotificationPreferenceAdmin(admin.ModelAdmin):
     list_filter = ['email_notifications_enabled']
     search_fields = ['user__email', 'user__full_name']
 
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(admin.ModelAdmin):
+    """
+    Outbox events (read-only; written by the system, drained by the dispatcher)
+    أحداث صندوق الصادر (للقراءة فقط)
+    """
+    list_display = ['id', 'topic', 'created_at', 'processed_at', 'attempts']
+    list_filter = ['topic', ('processed_at', admin.EmptyFieldListFilter)]
+    readonly_fields = ['topic', 'payload', 'created_at', 'processed_at', 'attempts', 'handled', 'last_error']
+    date_hierarchy = 'created_at'
+    
+    def has_add_permission(self, request):
+        return False
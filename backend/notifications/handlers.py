@@ -0,0 +1,181 @@
+"""
+Outbox Handlers
+معالجات صندوق الصادر
+
+Side effects produced by the outbox dispatcher (notifications.outbox).
+Each handler receives every pending event of its topic in the batch and
+loads what it needs with one query per batch.
+
+الآثار الجانبية التي ينتجها موزّع صندوق الصادر. كل معالج يستلم جميع أحداث
+موضوعه في الدفعة ويحمّل ما يحتاجه باستعلام واحد لكل دفعة.
+
+Handlers of a topic run in registration order, each in its own savepoint,
+and are retried on their own (OutboxEvent.handled): database writes
+first, emails last.
+معالجات الموضوع تعمل بترتيب التسجيل، كل منها في savepoint خاص ويُعاد
+تنفيذه وحده: الكتابة أولاً والبريد أخيراً.
+"""
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.mail import send_mass_mail
+
+from analytics.ingestion import make_event, record_events
+from analytics.models import EventType
+from orders.models import Order, OrderItem
+from vendors.models import VendorApplication
+
+from .models import Notification, OutboxEvent
+from .outbox import handles
+
+
+def _emails_enabled():
+    return getattr(settings, 'TRANSACTIONAL_EMAILS_ENABLED', False)
+
+
+def _send(messages):
+    """Send (subject, body, from, [to]) tuples over one SMTP connection"""
+    if messages:
+        send_mass_mail(messages, fail_silently=False)
+
+
+# =============================================================================
+# Orders
+# الطلبات
+# =============================================================================
+
+def _orders(events):
+    """{pk: Order} for a batch of order events (one query)"""
+    ids = [event.payload['order_id'] for event in events]
+    return Order.objects.select_related('user').in_bulk(ids)
+
+
+@handles(OutboxEvent.Topic.ORDER_CREATED)
+def notify_admins_of_orders(events):
+    """
+    Admin notification per new order (one INSERT per batch)
+    إشعار للإدارة لكل طلب جديد (إدخال واحد لكل دفعة)
+    """
+    content_type = ContentType.objects.get_for_model(Order)
+    Notification.objects.bulk_create([
+        Notification(
+            type=Notification.NotificationType.ORDER,
+            message=f"New order received: #{order.order_number}",
+            message_ar=f"تم استلام طلب جديد: #{order.order_number}",
+            action='order_created',
+            target_content_type=content_type,
+            target_object_id=order.pk,
+            metadata={
+                'order_number': order.order_number,
+                'total_amount': str(order.total),
+                'customer_name': (order.user.full_name if order.user else '') or order.customer_name,
+            },
+        )
+        for order in _orders(events).values()
+    ])
+
+
+@handles(OutboxEvent.Topic.ORDER_CREATED)
+def record_purchases(events):
+    """
+    Feed purchases to the analytics pipeline (one event per ordered product)
+    تمرير المشتريات إلى مسار التحليلات (حدث لكل منتج مطلوب)
+    """
+    ids = [event.payload['order_id'] for event in events]
+    rows = (
+        OrderItem.objects
+        .filter(order_id__in=ids)
+        .values_list(
+            'product_variant__product_id', 'order__user_id', 'order__order_number', 'order__created_at',
+        )
+        .distinct()
+    )
+    record_events([
+        make_event(
+            EventType.PURCHASE, product_id,
+            session_key=f'u:{user_id}' if user_id else f'o:{order_number}',
+            user_id=user_id,
+            occurred_at=created_at,
+        )
+        for product_id, user_id, order_number, created_at in rows
+        if product_id
+    ])
+
+
+@handles(OutboxEvent.Topic.ORDER_CREATED)
+def email_order_confirmations(events):
+    """
+    Order confirmation to registered customers
+    تأكيد الطلب للعملاء المسجلين
+    """
+    if not _emails_enabled():
+        return
+    _send([
+        (
+            f"{settings.EMAIL_SUBJECT_PREFIX}Order #{order.order_number}",
+            f"مرحباً {order.customer_name},\n\n"
+            f"تم استلام طلبك رقم {order.order_number} بإجمالي {order.total}.\n"
+            f"We received your order {order.order_number} (total {order.total}).\n",
+            settings.DEFAULT_FROM_EMAIL,
+            [order.user.email],
+        )
+        for order in _orders(events).values()
+        if order.user and order.user.email
+    ])
+
+
+# =============================================================================
+# Vendor Applications
+# طلبات انضمام البائعين
+# =============================================================================
+
+def _applications(events):
+    """{pk: VendorApplication} for a batch of application events (one query)"""
+    ids = [event.payload['application_id'] for event in events]
+    return VendorApplication.objects.in_bulk(ids)
+
+
+@handles(OutboxEvent.Topic.VENDOR_APPLICATION_CREATED)
+def notify_admins_of_applications(events):
+    """
+    Admin notification per new vendor application
+    إشعار للإدارة لكل طلب انضمام بائع جديد
+    """
+    content_type = ContentType.objects.get_for_model(VendorApplication)
+    Notification.objects.bulk_create([
+        Notification(
+            type=Notification.NotificationType.VENDOR,
+            message=f"New vendor application from '{application.store_name}'",
+            message_ar=f"طلب انضمام بائع جديد من '{application.store_name}'",
+            action='vendor_application_created',
+            target_content_type=content_type,
+            target_object_id=application.pk,
+            metadata={
+                'store_name': application.store_name,
+                'applicant_name': application.applicant_name,
+            },
+        )
+        for application in _applications(events).values()
+    ])
+
+
+@handles(OutboxEvent.Topic.VENDOR_APPLICATION_CREATED)
+def email_application_receipts(events):
+    """
+    Acknowledge the application to the applicant
+    تأكيد استلام الطلب للمتقدم
+    """
+    if not _emails_enabled():
+        return
+    _send([
+        (
+            f"{settings.EMAIL_SUBJECT_PREFIX}Vendor Application Received",
+            f"مرحباً {application.applicant_name},\n\n"
+            f"تم استلام طلب انضمام متجر '{application.store_name}' وسيتم مراجعته قريباً.\n"
+            f"We received the application for '{application.store_name}' and will review it soon.\n",
+            settings.DEFAULT_FROM_EMAIL,
+            [application.applicant_email],
+        )
+        for application in _applications(events).values()
+        if application.applicant_email
+    ])
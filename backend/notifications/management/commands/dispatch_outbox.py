@@ -0,0 +1,45 @@
+"""
+Dispatch Outbox Command
+أمر توزيع صندوق الصادر
+
+Produces the side effects of pending outbox events (admin notifications,
+emails, analytics). Servers dispatch in the background after each commit;
+run this from cron so events left behind (restarts, failed attempts) are
+retried.
+
+ينتج الآثار الجانبية لأحداث صندوق الصادر المعلقة. الخوادم توزعها في الخلفية
+بعد كل تثبيت؛ شغّله من cron لإعادة محاولة الأحداث المتبقية.
+
+Usage:
+    python manage.py dispatch_outbox
+    python manage.py dispatch_outbox --limit 500
+    python manage.py dispatch_outbox --purge-days 30
+"""
+
+from django.core.management.base import BaseCommand
+
+from notifications.outbox import dispatch_pending, purge_processed
+
+
+class Command(BaseCommand):
+    help = 'Dispatch pending outbox events / توزيع أحداث صندوق الصادر المعلقة'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            help='Handle at most this many events (default: all pending)',
+        )
+        parser.add_argument(
+            '--purge-days',
+            type=int,
+            help='Also delete events processed more than this many days ago',
+        )
+
+    def handle(self, *args, **options):
+        processed = dispatch_pending(limit=options['limit'])
+        self.stdout.write(self.style.SUCCESS(f'Processed {processed} event(s)'))
+
+        if options['purge_days'] is not None:
+            deleted = purge_processed(options['purge_days'])
+            self.stdout.write(f'Purged {deleted} processed event(s)')
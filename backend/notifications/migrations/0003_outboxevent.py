@@ -0,0 +1,31 @@
+# Generated by Django 5.0 on 2026-10-19 03:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0002_remove_notification_target_id_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('topic', models.CharField(choices=[('order.created', 'Order Created'), ('vendor_application.created', 'Vendor Application Created')], help_text='What happened', max_length=50)),
+                ('payload', models.JSONField(blank=True, default=dict, help_text='Event payload')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='When this event was written')),
+                ('processed_at', models.DateTimeField(blank=True, help_text='When the side effects were produced (null = pending)', null=True)),
+                ('attempts', models.PositiveSmallIntegerField(default=0, help_text='Failed dispatch attempts')),
+                ('last_error', models.TextField(blank=True, help_text='Error of the last failed attempt')),
+            ],
+            options={
+                'verbose_name': 'Outbox Event',
+                'verbose_name_plural': 'Outbox Events',
+                'ordering': ['id'],
+                'indexes': [models.Index(condition=models.Q(('processed_at__isnull', True)), fields=['id'], name='outbox_pending_idx'), models.Index(fields=['processed_at'], name='notificatio_process_0790d4_idx')],
+            },
+        ),
+    ]
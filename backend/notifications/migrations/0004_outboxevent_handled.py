@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-19 04:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0003_outboxevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboxevent',
+            name='handled',
+            field=models.JSONField(blank=True, default=list, help_text='Handlers that produced their side effects'),
+        ),
+    ]
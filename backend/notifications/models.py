@@ -204,6 +204,85 @@ class Notification(models.Model):
         return self.target_object is not None
 
 
+# =============================================================================
+# Outbox Event Model
+# نموذج حدث صندوق الصادر
+# =============================================================================
+
+class OutboxEvent(models.Model):
+    """
+    Transactional Outbox Event
+    حدث صندوق الصادر ضمن الـ transaction
+    
+    Written in the same transaction as the change that caused it (e.g. a
+    new order); notifications, emails and analytics are produced later by
+    the dispatcher (notifications.outbox.dispatch_pending).
+    يُكتب في نفس الـ transaction مع التغيير المسبب له (مثل طلب جديد)؛
+    الإشعارات والبريد والتحليلات يُنتجها الموزّع لاحقاً.
+    """
+    
+    class Topic(models.TextChoices):
+        ORDER_CREATED = 'order.created', _('Order Created')
+        VENDOR_APPLICATION_CREATED = 'vendor_application.created', _('Vendor Application Created')
+    
+    topic = models.CharField(
+        max_length=50,
+        choices=Topic.choices,
+        help_text=_('What happened')
+    )
+    
+    # Compact payload (ids); handlers load current rows at dispatch time
+    # محتوى مختصر (معرفات)؛ المعالجات تحمّل الصفوف الحالية عند التوزيع
+    payload = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text=_('Event payload')
+    )
+    
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        help_text=_('When this event was written')
+    )
+    processed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text=_('When the side effects were produced (null = pending)')
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        help_text=_('Failed dispatch attempts')
+    )
+    # Handlers already run: a retry only runs the ones that failed
+    # المعالجات المنفذة: إعادة المحاولة تنفذ الفاشلة فقط
+    handled = models.JSONField(
+        default=list,
+        blank=True,
+        help_text=_('Handlers that produced their side effects')
+    )
+    last_error = models.TextField(
+        blank=True,
+        help_text=_('Error of the last failed attempt')
+    )
+    
+    class Meta:
+        ordering = ['id']
+        verbose_name = _('Outbox Event')
+        verbose_name_plural = _('Outbox Events')
+        indexes = [
+            # Pending rows only - the dispatcher's scan stays small
+            # الصفوف المعلقة فقط - يبقى مسح الموزّع صغيراً
+            models.Index(
+                fields=['id'],
+                condition=models.Q(processed_at__isnull=True),
+                name='outbox_pending_idx',
+            ),
+            models.Index(fields=['processed_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.topic} #{self.pk}"
+
+
 # =============================================================================
 # Notification Preferences (Future Enhancement)
 # تفضيلات الإشعارات (تحسين مستقبلي)
@@ -0,0 +1,224 @@
+"""
+Transactional Outbox
+صندوق الصادر ضمن الـ transaction
+
+Side effects of a write (admin notifications, emails, analytics) are not
+produced inside the request. The write publishes one OutboxEvent row in its
+own transaction; after commit a background dispatcher drains pending rows
+in batches and hands each topic's batch to its handlers.
+
+آثار الكتابة الجانبية (إشعارات الإدارة، البريد، التحليلات) لا تُنتج داخل
+الطلب. الكتابة تنشر صف OutboxEvent واحداً في نفس الـ transaction؛ وبعد
+التثبيت يفرّغ موزّع في الخلفية الصفوف المعلقة على دفعات ويمررها للمعالجات.
+
+Usage:
+    publish(OutboxEvent.Topic.ORDER_CREATED, {'order_id': order.pk})
+
+    @handles(OutboxEvent.Topic.ORDER_CREATED)
+    def notify_admins(events):
+        ...                                # events: list of OutboxEvent
+
+Rows left behind (dispatcher busy, process restarted, handler failure) are
+picked up by the dispatch_outbox command from cron.
+الصفوف المتبقية يلتقطها أمر dispatch_outbox من cron.
+
+Each handler runs in its own savepoint and the handlers that succeeded
+are recorded on the event (OutboxEvent.handled): a retry only runs the
+ones that failed, so a failing email never repeats the analytics or
+notifications of the same event. Delivery is at-least-once per handler.
+كل معالج يعمل في savepoint خاص به وتُسجل المعالجات الناجحة على الحدث:
+إعادة المحاولة تنفذ الفاشلة فقط. التسليم مرة واحدة على الأقل لكل معالج.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from core.background import PeriodicFlush
+from core.redis_utils import setting
+
+from .models import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+
+# =============================================================================
+# Publishing
+# النشر
+# =============================================================================
+
+def publish(topic, payload):
+    """
+    Write an outbox event in the current transaction.
+    كتابة حدث في صندوق الصادر ضمن الـ transaction الحالية.
+
+    The dispatcher is scheduled after commit; a rolled back transaction
+    leaves neither the event nor its side effects.
+    الموزّع يُجدول بعد التثبيت؛ التراجع لا يترك الحدث ولا آثاره.
+    """
+    event = OutboxEvent.objects.create(topic=topic, payload=payload)
+    _dispatcher.poke(force=True)
+    return event
+
+
+def publish_many(topic, payloads):
+    """
+    Write several events of one topic with a single INSERT (bulk writes
+    don't send post_save, so their callers publish explicitly).
+    كتابة عدة أحداث لموضوع واحد بعملية إدخال واحدة.
+    """
+    events = OutboxEvent.objects.bulk_create(
+        [OutboxEvent(topic=topic, payload=payload) for payload in payloads]
+    )
+    if events:
+        _dispatcher.poke(force=True)
+    return events
+
+
+# =============================================================================
+# Handlers
+# المعالجات
+# =============================================================================
+
+_handlers = defaultdict(list)
+
+
+def handles(topic):
+    """
+    Register a batch handler for a topic (decorator).
+    تسجيل معالج دفعات لموضوع (decorator).
+    """
+    def decorator(func):
+        _handlers[topic].append(func)
+        return func
+    return decorator
+
+
+def _load_handlers():
+    # Handlers live in notifications.handlers; import on first dispatch
+    # المعالجات في notifications.handlers؛ تُستورد عند أول توزيع
+    from . import handlers  # noqa: F401
+
+
+# =============================================================================
+# Dispatching
+# التوزيع
+# =============================================================================
+
+def _run_handler(handler, events):
+    """Run one handler in its own savepoint; return the error or None"""
+    try:
+        with transaction.atomic():
+            handler(events)
+    except Exception as e:
+        logger.exception(f'Outbox handler {handler.__name__} failed ({len(events)} events)')
+        return e
+    return None
+
+
+def _run_topic(topic, events):
+    """
+    Run the handlers of a topic on the events they haven't handled yet.
+    تنفيذ معالجات الموضوع على الأحداث التي لم تعالجها بعد.
+
+    Returns:
+        dict: {event pk: error} for the events with a failed handler
+    """
+    errors = {}
+    for handler in _handlers.get(topic, []):
+        name = handler.__name__
+        todo = [event for event in events if name not in event.handled]
+        if not todo:
+            continue
+        error = _run_handler(handler, todo)
+        for event in todo:
+            if error is None:
+                event.handled.append(name)
+            else:
+                errors[event.pk] = error
+    return errors
+
+
+def dispatch_pending(limit=None):
+    """
+    Produce the side effects of pending outbox events.
+    إنتاج الآثار الجانبية لأحداث صندوق الصادر المعلقة.
+
+    Pending rows are read in id order, OUTBOX_BATCH_SIZE at a time, and
+    locked with SKIP LOCKED where the database supports it, so concurrent
+    dispatchers never handle the same event. An event with a failing
+    handler stays pending (attempts + 1) until OUTBOX_MAX_ATTEMPTS; only
+    that handler runs again.
+    الصفوف المعلقة تُقرأ بترتيب المعرف على دفعات وتُقفل بـ SKIP LOCKED حيث
+    يدعمها قاعدة البيانات. الحدث ذو المعالج الفاشل يبقى معلقاً حتى
+    OUTBOX_MAX_ATTEMPTS ويُعاد تنفيذ ذلك المعالج فقط.
+
+    Args:
+        limit: Maximum number of events to handle (default: all pending)
+
+    Returns:
+        int: Number of events processed
+    """
+    _load_handlers()
+    batch_size = setting('OUTBOX_BATCH_SIZE', 100)
+    max_attempts = setting('OUTBOX_MAX_ATTEMPTS', 5)
+    processed = seen = 0
+    last_id = 0
+
+    # One pass over the table: failed rows are retried on the next run
+    # مرور واحد على الجدول: الصفوف الفاشلة يُعاد تنفيذها في التشغيل التالي
+    while limit is None or seen < limit:
+        size = batch_size if limit is None else min(batch_size, limit - seen)
+        with transaction.atomic():
+            batch = list(
+                OutboxEvent.objects
+                .select_for_update(skip_locked=True)
+                .filter(processed_at__isnull=True, attempts__lt=max_attempts, pk__gt=last_id)
+                .order_by('pk')[:size]
+            )
+            if not batch:
+                break
+            seen += len(batch)
+            last_id = batch[-1].pk
+
+            by_topic = defaultdict(list)
+            for event in batch:
+                by_topic[event.topic].append(event)
+
+            errors = {}
+            for topic, events in by_topic.items():
+                errors.update(_run_topic(topic, events))
+
+            # Rows are locked: one UPDATE records every outcome of the batch
+            # الصفوف مقفلة: تحديث واحد يسجل نتائج الدفعة كلها
+            now = timezone.now()
+            for event in batch:
+                if event.pk in errors:
+                    event.attempts += 1
+                    event.last_error = repr(errors[event.pk])[:2000]
+                else:
+                    event.processed_at = now
+            OutboxEvent.objects.bulk_update(batch, ['processed_at', 'attempts', 'handled', 'last_error'])
+            processed += len(batch) - len(errors)
+    return processed
+
+
+def purge_processed(days):
+    """
+    Delete events processed more than `days` days ago.
+    حذف الأحداث المعالجة منذ أكثر من `days` يوماً.
+
+    Returns:
+        int: Number of rows deleted
+    """
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _ = OutboxEvent.objects.filter(processed_at__lt=cutoff).delete()
+    return deleted
+
+
+# One background dispatch per process at a time
+# توزيع واحد في الخلفية لكل عملية في كل مرة
+_dispatcher = PeriodicFlush(dispatch_pending, lambda: setting('OUTBOX_DISPATCH_INTERVAL', 2))
@@ -2,70 +2,37 @@
 Notifications Signals - Triggers for system events
 إشارات الإشعارات - محفزات أحداث النظام
 
-This module contains signal receivers that create notifications when specific events occur.
+Signal receivers only publish compact outbox events in the transaction of
+the write; notifications, emails and analytics are produced by the outbox
+dispatcher (see notifications.outbox and notifications.handlers).
+مستقبلات الإشارات تنشر فقط أحداثاً مختصرة في صندوق الصادر ضمن transaction
+الكتابة؛ الإشعارات والبريد والتحليلات ينتجها الموزّع.
 """
 
 from django.db.models.signals import post_save
 from django.dispatch import receiver
-from django.contrib.auth import get_user_model
-from django.db.models import Q
 
 from vendors.models import VendorApplication
 from orders.models import Order
-from .models import Notification
+from .models import OutboxEvent
+from .outbox import publish
 
-User = get_user_model()
 
 @receiver(post_save, sender=VendorApplication)
 def notify_new_vendor_application(sender, instance, created, **kwargs):
     """
-    Create a notification when a new vendor application is submitted
-    إنشاء إشعار عند تقديم طلب انضمام بائع جديد
+    Publish an event when a new vendor application is submitted
+    نشر حدث عند تقديم طلب انضمام بائع جديد
     """
     if created:
-        # Message in both languages
-        message_en = f"New vendor application from '{instance.store_name}'"
-        message_ar = f"طلب انضمام بائع جديد من '{instance.store_name}'"
-        
-        # Target: Admins and Support Staff
-        # If recipient is None, it appears for all authorized users in some systems,
-        # but here we follow the recipient logic or create for specific roles.
-        
-        # We can either create one notification without a recipient (for all admins)
-        # or create specific ones. The model supports recipient=None for "all admins".
-        
-        Notification.objects.create(
-            type=Notification.NotificationType.VENDOR,
-            message=message_en,
-            message_ar=message_ar,
-            action='vendor_application_created',
-            target_content_type_id=None, # Will set below
-            target_object_id=instance.pk,
-            metadata={
-                'store_name': instance.store_name,
-                'applicant_name': instance.applicant_name
-            }
-        ).set_target(instance)
+        publish(OutboxEvent.Topic.VENDOR_APPLICATION_CREATED, {'application_id': instance.pk})
+
 
 @receiver(post_save, sender=Order)
 def notify_new_order(sender, instance, created, **kwargs):
     """
-    Create a notification when a new order is placed
-    إنشاء إشعار عند تقديم طلب جديد
+    Publish an event when a new order is placed
+    نشر حدث عند تقديم طلب جديد
     """
     if created:
-        message_en = f"New order received: #{instance.order_number}"
-        message_ar = f"تم استلام طلب جديد: #{instance.order_number}"
-        
-        Notification.objects.create(
-            type=Notification.NotificationType.ORDER,
-            message=message_en,
-            message_ar=message_ar,
-            action='order_created',
-            target_object_id=instance.pk,
-            metadata={
-                'order_number': instance.order_number,
-                'total_amount': str(instance.total_amount),
-                'customer_name': instance.user.full_name if instance.user else "Guest"
-            }
-        ).set_target(instance)
+        publish(OutboxEvent.Topic.ORDER_CREATED, {'order_id': instance.pk})
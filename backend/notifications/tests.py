@@ -0,0 +1,94 @@
+"""
+Outbox Dispatch Tests
+اختبارات توزيع صندوق الصادر
+
+Run:
+    python manage.py test notifications
+"""
+
+from smtplib import SMTPException
+from unittest import mock
+
+from django.core import mail
+from django.test import TestCase, override_settings
+
+from analytics.buffer import get_buffer
+from core.tests.base import generate_marketplace
+from orders.models import Order, OrderItem
+
+from .models import Notification, OutboxEvent
+from .outbox import dispatch_pending, publish
+
+ORDER_HANDLERS = ['notify_admins_of_orders', 'record_purchases', 'email_order_confirmations']
+
+
+@override_settings(TRANSACTIONAL_EMAILS_ENABLED=True, OUTBOX_MAX_ATTEMPTS=3)
+class OutboxDispatchTests(TestCase):
+    """
+    Side effects of an order.created event, with a failing email handler.
+    الآثار الجانبية لحدث order.created مع فشل معالج البريد.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        generate_marketplace(cls, 'tiny')
+        cls.order = Order.objects.filter(user__isnull=False).exclude(user__email='').order_by('pk').first()
+        cls.products = (
+            OrderItem.objects.filter(order=cls.order)
+            .values('product_variant__product').distinct().count()
+        )
+
+    def setUp(self):
+        self.buffer = get_buffer()
+        self.buffer.pop(10**6)
+        self.event = publish(OutboxEvent.Topic.ORDER_CREATED, {'order_id': self.order.pk})
+
+    def tearDown(self):
+        self.buffer.pop(10**6)
+
+    def notifications(self):
+        return Notification.objects.filter(action='order_created', target_object_id=self.order.pk).count()
+
+    def test_dispatch_produces_side_effects(self):
+        self.assertEqual(dispatch_pending(), 1)
+
+        self.event.refresh_from_db()
+        self.assertIsNotNone(self.event.processed_at)
+        self.assertEqual(self.event.handled, ORDER_HANDLERS)
+        self.assertEqual(self.notifications(), 1)
+        self.assertEqual(len(self.buffer), self.products)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(dispatch_pending(), 0)
+
+    def test_failed_handler_is_retried_alone(self):
+        with mock.patch('notifications.handlers._send', side_effect=SMTPException('down')), \
+                self.assertLogs('notifications.outbox', 'ERROR'):
+            self.assertEqual(dispatch_pending(), 0)
+            self.assertEqual(dispatch_pending(), 0)
+
+        self.event.refresh_from_db()
+        self.assertIsNone(self.event.processed_at)
+        self.assertEqual(self.event.attempts, 2)
+        self.assertIn('SMTPException', self.event.last_error)
+        self.assertEqual(self.event.handled, ORDER_HANDLERS[:2])
+        # Notifications and purchase events are not repeated by the retries
+        # الإشعارات وأحداث الشراء لا تتكرر مع إعادة المحاولة
+        self.assertEqual(self.notifications(), 1)
+        self.assertEqual(len(self.buffer), self.products)
+
+        self.assertEqual(dispatch_pending(), 1)
+        self.event.refresh_from_db()
+        self.assertIsNotNone(self.event.processed_at)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(len(self.buffer), self.products)
+
+    def test_stops_at_max_attempts(self):
+        with mock.patch('notifications.handlers._send', side_effect=SMTPException('down')) as send, \
+                self.assertLogs('notifications.outbox', 'ERROR'):
+            for _ in range(5):
+                dispatch_pending()
+
+        self.assertEqual(send.call_count, 3)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.attempts, 3)
+        self.assertIsNone(self.event.processed_at)
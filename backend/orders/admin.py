@@ -14,18 +14,18 @@ class OrderAdmin(admin.ModelAdmin):
     list_display = ['order_number', 'customer_name', 'status', 'order_type', 'total', 'platform_commission', 'created_at']
     list_filter = ['status', 'order_type', 'created_at']
     search_fields = ['order_number', 'customer_name', 'customer_phone']
-    readonly_fields = ['order_number', 'subtotal', 'total', 'platform_commission', 'created_at', 'updated_at']
+    readonly_fields = ['order_number', 'checkout', 'subtotal', 'discount', 'total', 'commission_rate', 'platform_commission', 'created_at', 'updated_at']
     inlines = [OrderItemInline]
     
     fieldsets = (
         ('Order Info', {
-            'fields': ('order_number', 'order_type', 'status')
+            'fields': ('order_number', 'checkout', 'order_type', 'status')
         }),
         ('Customer Info', {
             'fields': ('customer_name', 'customer_phone', 'customer_address')
         }),
         ('Pricing', {
-            'fields': ('subtotal', 'delivery_fee', 'total', 'platform_commission')
+            'fields': ('subtotal', 'discount', 'delivery_fee', 'total', 'commission_rate', 'platform_commission')
         }),
         ('Additional', {
             'fields': ('notes', 'created_at', 'updated_at')
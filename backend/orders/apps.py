@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class OrdersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'orders'
+
+    def ready(self):
+        """
+        Give coupon uses back when orders are deleted
+        إعادة استخدامات الكوبونات عند حذف الطلبات
+        """
+        import orders.signals  # noqa: F401
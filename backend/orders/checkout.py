@@ -0,0 +1,283 @@
+"""
+Checkout Splitter
+مقسّم عملية الشراء
+
+Turns one customer submission into one Order per vendor, linked by a
+Checkout group, in a single transaction:
+
+1. Load every variant with its product and vendor (one query)
+2. Group the lines by vendor and compute subtotals, coupon discount,
+   delivery fee share, commission (Vendor.commission_rate) and totals in
+   memory
+3. Insert the checkout, bulk_create the orders and the items, and publish
+   the order.created outbox events with one INSERT
+
+يحوّل إرسالاً واحداً من العميل إلى طلب لكل بائع مرتبط بمجموعة شراء، ضمن
+transaction واحدة:
+1. تحميل المتغيرات مع المنتجات والبائعين (استعلام واحد)
+2. تجميع الأسطر حسب البائع وحساب المجاميع والخصم والرسوم والعمولة في الذاكرة
+3. إنشاء مجموعة الشراء والطلبات والعناصر بـ bulk_create ونشر أحداث الطلبات
+
+Usage:
+    checkout = place_checkout(
+        user, [{'variant_id': 5, 'quantity': 2}],
+        customer_name='...', customer_phone='...', customer_address='...',
+        coupon_code='SAVE10',
+    )
+    checkout.placed_orders   # [Order, ...] one per vendor
+"""
+
+from collections import OrderedDict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+
+from notifications.models import OutboxEvent
+from notifications.outbox import publish_many
+from products.models import ProductVariant
+from promotions.coupons import (
+    CouponError, CouponLine, allocate, get_coupon_rules, invalidate_coupon, quote, release_usage,
+    reserve_usage,
+)
+from promotions.models import Coupon
+
+from .models import Checkout, Order, OrderItem
+
+
+ZERO = Decimal('0.00')
+MONEY_Q = Order.MONEY_Q
+
+# Attempts at inserting the orders when a random order number collides
+# محاولات إدخال الطلبات عند تصادم رقم طلب عشوائي
+ORDER_NUMBER_ATTEMPTS = 10
+
+
+class CheckoutError(Exception):
+    """
+    Checkout cannot be placed (message is bilingual, safe to show).
+    لا يمكن إتمام الشراء (الرسالة ثنائية اللغة وآمنة للعرض).
+
+    Args:
+        message: Error message
+        field: Input field the error belongs to (optional)
+    """
+
+    def __init__(self, message, field=None):
+        super().__init__(message)
+        self.field = field
+
+
+def _merge_items(items):
+    """{variant_id: quantity} with repeated variants added up (submission order kept)"""
+    quantities = OrderedDict()
+    for item in items:
+        quantities[item['variant_id']] = quantities.get(item['variant_id'], 0) + item['quantity']
+    return quantities
+
+
+def _apply_coupon(coupon_code, lines, user):
+    """
+    Quote the coupon over the whole checkout and reserve one use.
+    حساب خصم الكوبون على كامل عملية الشراء وحجز استخدام واحد.
+
+    Returns:
+        CouponQuote
+    """
+    rules = get_coupon_rules(coupon_code)
+    if rules is None:
+        raise CheckoutError('Coupon not found. / الكوبون غير موجود.', field='coupon_code')
+    try:
+        result = quote(rules, lines, user_id=user.pk if user else None)
+    except CouponError as e:
+        raise CheckoutError(str(e), field='coupon_code')
+
+    # Conditional UPDATE inside this transaction: concurrent checkouts can't
+    # exceed usage_limit, and a failed checkout gives the use back
+    # UPDATE شرطي داخل هذه الـ transaction: لا يُتجاوز usage_limit
+    if not reserve_usage(rules.pk):
+        invalidate_coupon(rules.code)
+        raise CheckoutError('Coupon usage limit reached. / تم استنفاد الكوبون.', field='coupon_code')
+    return result
+
+
+def _insert_orders(orders):
+    """
+    bulk_create the orders, drawing new numbers on a unique collision.
+    إنشاء الطلبات دفعة واحدة مع إعادة توليد الأرقام عند التصادم.
+    """
+    for _ in range(ORDER_NUMBER_ATTEMPTS):
+        for order in orders:
+            order.order_number = Order.new_order_number()
+        try:
+            with transaction.atomic():
+                return Order.objects.bulk_create(orders)
+        except IntegrityError as e:
+            if 'order_number' not in str(e).lower():
+                raise
+    raise IntegrityError('Failed to generate unique order numbers after 10 attempts')
+
+
+@transaction.atomic
+def place_checkout(user, items, customer_name, customer_phone, customer_address,
+                   delivery_fee=ZERO, notes='', order_type='online', coupon_code=''):
+    """
+    Place a checkout: one Order per vendor in one transaction.
+    إتمام الشراء: طلب لكل بائع ضمن transaction واحدة.
+
+    The coupon discount is split over the vendors by its per-line
+    allocation; the delivery fee is split proportionally to the vendors'
+    subtotals. Each order's commission uses its vendor's commission rate.
+    خصم الكوبون يُوزع على البائعين حسب توزيعه على الأسطر؛ رسوم التوصيل تُوزع
+    بنسبة المجاميع الفرعية. عمولة كل طلب تستخدم نسبة عمولة بائعه.
+
+    Args:
+        user: Customer (None for guests)
+        items: [{'variant_id': int, 'quantity': int}]
+        delivery_fee: Delivery fee for the whole checkout
+        coupon_code: Optional coupon code
+
+    Returns:
+        Checkout: with `placed_orders` (list of Order, one per vendor)
+
+    Raises:
+        CheckoutError: Unknown variant or coupon not applicable
+    """
+    quantities = _merge_items(items)
+    variants = ProductVariant.objects.select_related('product__vendor').in_bulk(list(quantities))
+
+    # Price every line and group the lines by vendor
+    # تسعير كل سطر وتجميع الأسطر حسب البائع
+    lines = []
+    vendor_lines = OrderedDict()
+    for variant_id, quantity in quantities.items():
+        variant = variants.get(variant_id)
+        if variant is None:
+            raise CheckoutError(
+                'One or more product variants not found. / واحد أو أكثر من متغيرات المنتج غير موجودة.',
+                field='items',
+            )
+        line = CouponLine(variant.pk, variant.product_id, variant.product.category_id, quantity, variant.final_price)
+        lines.append(line)
+        vendor_lines.setdefault(variant.product.vendor, []).append((variant, line))
+
+    vendor_subtotals = OrderedDict(
+        (vendor, sum((line.price * line.quantity for _, line in group), ZERO))
+        for vendor, group in vendor_lines.items()
+    )
+
+    coupon_quote = _apply_coupon(coupon_code, lines, user) if coupon_code else None
+    delivery_shares = allocate(delivery_fee or ZERO, vendor_subtotals)
+
+    orders = []
+    for vendor, group in vendor_lines.items():
+        discount = ZERO
+        if coupon_quote:
+            discount = sum((coupon_quote.allocations.get(line.key, ZERO) for _, line in group), ZERO)
+        order = Order(
+            user=user,
+            vendor=vendor,
+            customer_name=customer_name,
+            customer_phone=customer_phone,
+            customer_address=customer_address,
+            order_type=order_type,
+            notes=notes,
+            subtotal=vendor_subtotals[vendor].quantize(MONEY_Q),
+            discount=discount,
+            coupon_id=coupon_quote.coupon.pk if coupon_quote and discount else None,
+            delivery_fee=delivery_shares[vendor],
+            commission_rate=vendor.commission_rate,
+        )
+        # bulk_create skips save(): compute flags, commission and total here
+        # bulk_create لا يستدعي save(): حساب العلامات والعمولة والإجمالي هنا
+        order._prepare_order_data()
+        orders.append(order)
+
+    checkout = Checkout.objects.create(
+        user=user,
+        subtotal=sum((order.subtotal for order in orders), ZERO),
+        discount=sum((order.discount for order in orders), ZERO),
+        delivery_fee=sum((order.delivery_fee for order in orders), ZERO),
+        total=sum((order.total for order in orders), ZERO),
+    )
+    for order in orders:
+        order.checkout = checkout
+    _insert_orders(orders)
+
+    OrderItem.objects.bulk_create([
+        OrderItem(
+            order=order,
+            product_variant=variant,
+            vendor=vendor,
+            quantity=line.quantity,
+            price=line.price,
+        )
+        for order, (vendor, group) in zip(orders, vendor_lines.items())
+        for variant, line in group
+    ])
+
+    # bulk_create sends no post_save: publish the order events explicitly
+    # bulk_create لا يرسل post_save: نشر أحداث الطلبات صراحةً
+    publish_many(OutboxEvent.Topic.ORDER_CREATED, [{'order_id': order.pk} for order in orders])
+
+    checkout.placed_orders = orders
+    return checkout
+
+
+
+# =============================================================================
+# Coupon Release
+# إعادة الكوبون
+# =============================================================================
+
+def coupon_holders(order):
+    """
+    Pks of the live (not cancelled) orders holding the coupon use reserved
+    for `order`: its checkout's orders with the same coupon, or the order
+    itself when placed outside a checkout.
+    معرفات الطلبات الفعالة التي تحمل استخدام الكوبون المحجوز للطلب.
+    """
+    if not order.coupon_id:
+        return set()
+    holders = Order.objects.filter(coupon_id=order.coupon_id).exclude(status='cancelled')
+    if order.checkout_id:
+        holders = holders.filter(checkout_id=order.checkout_id)
+    else:
+        holders = holders.filter(pk=order.pk)
+    return set(holders.values_list('pk', flat=True))
+
+
+def release_coupon_uses(coupon_ids):
+    """
+    Give back one use per coupon id and drop the cached rules (their
+    used_count). Call it in the transaction of the cancel / delete.
+    إعادة استخدام واحد لكل كوبون وحذف القواعد المخزنة.
+
+    Returns:
+        int: Uses released
+    """
+    released = [coupon_id for coupon_id in coupon_ids if release_usage(coupon_id)]
+    for code in Coupon.objects.filter(pk__in=released).values_list('code', flat=True):
+        invalidate_coupon(code)
+    return len(released)
+
+
+def release_coupons(orders):
+    """
+    Give back the coupon uses of orders just cancelled (after the write).
+    إعادة استخدامات الكوبون للطلبات الملغاة للتو (بعد الكتابة).
+
+    A checkout reserved one use for all its orders: it is released once
+    none of them is live. Deleted orders are handled by orders.signals.
+    مجموعة الشراء حجزت استخداماً واحداً لكل طلباتها: يُعاد عند إلغائها كلها.
+
+    Returns:
+        int: Uses released
+    """
+    groups = {}
+    for order in orders:
+        if order.coupon_id:
+            key = ('checkout', order.checkout_id) if order.checkout_id else ('order', order.pk)
+            groups.setdefault(key, order)
+    return release_coupon_uses([
+        order.coupon_id for order in groups.values() if not coupon_holders(order)
+    ])
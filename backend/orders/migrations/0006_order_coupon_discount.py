@@ -0,0 +1,31 @@
+# Generated by Django 5.0 on 2026-10-19 03:22
+
+import django.db.models.deletion
+import orders.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0005_add_vendor_fields'),
+        ('promotions', '0002_banner_image_derivatives_story_image_derivatives'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='coupon',
+            field=models.ForeignKey(blank=True, help_text='Coupon used for this order / الكوبون المستخدم في الطلب', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='orders', to='promotions.coupon', verbose_name='Coupon'),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='discount',
+            field=models.DecimalField(decimal_places=2, default=orders.models.zero_decimal, help_text='Coupon discount / خصم الكوبون', max_digits=10, verbose_name='Discount'),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='total',
+            field=models.DecimalField(decimal_places=2, default=orders.models.zero_decimal, help_text='Order total (subtotal - discount + delivery fee) / الإجمالي (المجموع الفرعي - الخصم + رسوم التوصيل)', max_digits=10, verbose_name='Total'),
+        ),
+    ]
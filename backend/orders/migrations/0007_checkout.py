@@ -0,0 +1,54 @@
+# Generated by Django 5.0 on 2026-10-19 03:32
+
+import django.db.models.deletion
+import orders.models
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0006_order_coupon_discount'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Checkout',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subtotal', models.DecimalField(decimal_places=2, default=orders.models.zero_decimal, help_text='Sum of the orders subtotals / مجموع المجاميع الفرعية للطلبات', max_digits=10, verbose_name='Subtotal')),
+                ('discount', models.DecimalField(decimal_places=2, default=orders.models.zero_decimal, help_text='Coupon discount over all orders / خصم الكوبون على جميع الطلبات', max_digits=10, verbose_name='Discount')),
+                ('delivery_fee', models.DecimalField(decimal_places=2, default=orders.models.zero_decimal, help_text='Delivery fee over all orders / رسوم التوصيل على جميع الطلبات', max_digits=10, verbose_name='Delivery Fee')),
+                ('total', models.DecimalField(decimal_places=2, default=orders.models.zero_decimal, help_text='Amount paid by the customer / المبلغ الذي يدفعه العميل', max_digits=10, verbose_name='Total')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='When the checkout was placed / تاريخ الشراء', verbose_name='Created At')),
+            ],
+            options={
+                'verbose_name': 'Checkout',
+                'verbose_name_plural': 'Checkouts',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='commission_rate',
+            field=models.DecimalField(decimal_places=2, default=Decimal('10.00'), help_text="Vendor's commission percentage at order time / نسبة عمولة البائع وقت الطلب", max_digits=5, verbose_name='Commission Rate'),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='platform_commission',
+            field=models.DecimalField(decimal_places=2, default=orders.models.zero_decimal, help_text='Platform commission (commission rate of subtotal) / عمولة المنصة (نسبة العمولة من المجموع الفرعي)', max_digits=10, verbose_name='Platform Commission'),
+        ),
+        migrations.AddField(
+            model_name='checkout',
+            name='user',
+            field=models.ForeignKey(blank=True, help_text='Customer (null for guests) / العميل (null للضيوف)', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='checkouts', to=settings.AUTH_USER_MODEL, verbose_name='User'),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='checkout',
+            field=models.ForeignKey(blank=True, help_text='Checkout group this order was split from / مجموعة الشراء التي قُسم منها الطلب', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='orders', to='orders.checkout', verbose_name='Checkout'),
+        ),
+    ]
@@ -24,6 +24,74 @@ def zero_decimal():
     return Decimal("0.00")
 
 
+class Checkout(models.Model):
+    """
+    Checkout group
+    مجموعة الشراء
+    
+    One customer submission. A cart with products from several vendors
+    becomes one Order per vendor, all linked to the same Checkout.
+    إرسال واحد من العميل. السلة التي تحتوي منتجات من عدة بائعين تصبح طلباً
+    لكل بائع، وجميعها مرتبطة بنفس مجموعة الشراء.
+    """
+    
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='checkouts',
+        verbose_name=_('User'),
+        help_text=_('Customer (null for guests) / العميل (null للضيوف)')
+    )
+    
+    subtotal = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        default=zero_decimal,
+        verbose_name=_('Subtotal'),
+        help_text=_('Sum of the orders subtotals / مجموع المجاميع الفرعية للطلبات')
+    )
+    
+    discount = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        default=zero_decimal,
+        verbose_name=_('Discount'),
+        help_text=_('Coupon discount over all orders / خصم الكوبون على جميع الطلبات')
+    )
+    
+    delivery_fee = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        default=zero_decimal,
+        verbose_name=_('Delivery Fee'),
+        help_text=_('Delivery fee over all orders / رسوم التوصيل على جميع الطلبات')
+    )
+    
+    total = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        default=zero_decimal,
+        verbose_name=_('Total'),
+        help_text=_('Amount paid by the customer / المبلغ الذي يدفعه العميل')
+    )
+    
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name=_('Created At'),
+        help_text=_('When the checkout was placed / تاريخ الشراء')
+    )
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = _('Checkout')
+        verbose_name_plural = _('Checkouts')
+    
+    def __str__(self):
+        return f"Checkout #{self.pk}"
+
+
 class Order(models.Model):
     """
     Customer order
@@ -93,6 +161,16 @@ class Order(models.Model):
         help_text=_('Vendor associated with this order / البائع المرتبط بهذا الطلب')
     )
     
+    checkout = models.ForeignKey(
+        Checkout,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='orders',
+        verbose_name=_('Checkout'),
+        help_text=_('Checkout group this order was split from / مجموعة الشراء التي قُسم منها الطلب')
+    )
+    
     # =========================================================================
     # Customer Information
     # معلومات العميل
@@ -171,12 +249,38 @@ class Order(models.Model):
         help_text=_('Yalla Go delivery fee / رسوم التوصيل (Yalla Go)')
     )
     
+    coupon = models.ForeignKey(
+        'promotions.Coupon',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='orders',
+        verbose_name=_('Coupon'),
+        help_text=_('Coupon used for this order / الكوبون المستخدم في الطلب')
+    )
+    
+    discount = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        default=zero_decimal,
+        verbose_name=_('Discount'),
+        help_text=_('Coupon discount / خصم الكوبون')
+    )
+    
     total = models.DecimalField(
         max_digits=10,
         decimal_places=2,
         default=zero_decimal,
         verbose_name=_('Total'),
-        help_text=_('Order total (subtotal + delivery fee) / الإجمالي (المجموع الفرعي + رسوم التوصيل)')
+        help_text=_('Order total (subtotal - discount + delivery fee) / الإجمالي (المجموع الفرعي - الخصم + رسوم التوصيل)')
+    )
+    
+    commission_rate = models.DecimalField(
+        max_digits=5,
+        decimal_places=2,
+        default=Decimal("10.00"),
+        verbose_name=_('Commission Rate'),
+        help_text=_("Vendor's commission percentage at order time / نسبة عمولة البائع وقت الطلب")
     )
     
     platform_commission = models.DecimalField(
@@ -184,7 +288,7 @@ class Order(models.Model):
         decimal_places=2,
         default=zero_decimal,
         verbose_name=_('Platform Commission'),
-        help_text=_('Platform commission (10% of subtotal) / عمولة المنصة (10% من المجموع الفرعي)')
+        help_text=_('Platform commission (commission rate of subtotal) / عمولة المنصة (نسبة العمولة من المجموع الفرعي)')
     )
     
     # =========================================================================
@@ -243,7 +347,7 @@ class Order(models.Model):
         # إنشاء رقم الطلب إذا لم يكن موجوداً (مع معالجة التصادم)
         if not self.order_number:
             for _ in range(10):
-                self.order_number = f"ORD-{uuid.uuid4().hex[:8].upper()}"
+                self.order_number = self.new_order_number()
                 # Prepare order data before saving
                 # تحضير بيانات الطلب قبل الحفظ
                 self._prepare_order_data()
@@ -263,6 +367,14 @@ class Order(models.Model):
         self._prepare_order_data()
         super().save(*args, **kwargs)
     
+    @staticmethod
+    def new_order_number():
+        """
+        Random order number (callers retry on the rare unique collision)
+        رقم طلب عشوائي (المستدعي يعيد المحاولة عند التصادم النادر)
+        """
+        return f"ORD-{uuid.uuid4().hex[:8].upper()}"
+    
     def _prepare_order_data(self):
         """
         Prepare order data before saving (calculate totals, set flags)
@@ -275,15 +387,17 @@ class Order(models.Model):
         # Only recalculate if order is not finalized
         # إعادة الحساب فقط إذا لم يكن الطلب نهائياً
         if not self.is_finalized:
-            # Calculate commission using Decimal (10% of subtotal)
-            # حساب العمولة باستخدام Decimal (10% من المجموع الفرعي)
+            # Calculate commission using Decimal (commission rate of subtotal)
+            # حساب العمولة باستخدام Decimal (نسبة العمولة من المجموع الفرعي)
             subtotal = self.subtotal or zero_decimal()
-            self.platform_commission = (subtotal * Decimal("0.10")).quantize(self.MONEY_Q)
+            rate = self.commission_rate if self.commission_rate is not None else Decimal("10.00")
+            self.platform_commission = (subtotal * rate / 100).quantize(self.MONEY_Q)
             
             # Calculate total safely (handle null/empty values)
             # حساب الإجمالي بطريقة آمنة (التعامل مع القيم الفارغة)
             delivery_fee = self.delivery_fee or zero_decimal()
-            self.total = (subtotal + delivery_fee).quantize(self.MONEY_Q)
+            discount = self.discount or zero_decimal()
+            self.total = (subtotal - discount + delivery_fee).quantize(self.MONEY_Q)
     
     @property
     def is_finalized(self):
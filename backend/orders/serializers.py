@@ -7,11 +7,12 @@ This module defines serializers for Order and OrderItem models.
 """
 
 from rest_framework import serializers
-from django.db import transaction
 from decimal import Decimal
 
-from .models import Order, OrderItem
+from .checkout import CheckoutError, place_checkout
+from .models import Checkout, Order, OrderItem
 from products.models import ProductVariant
+from promotions.coupons import get_coupon_rules
 from products.serializers import ProductVariantSerializer
 
 
@@ -150,6 +151,13 @@ class OrderCreateSerializer(serializers.ModelSerializer):
         allow_blank=True,
         help_text='Order notes'
     )
+    coupon_code = serializers.CharField(
+        required=False,
+        allow_blank=True,
+        max_length=50,
+        write_only=True,
+        help_text='Coupon code / رمز الكوبون'
+    )
     
     class Meta:
         model = Order
@@ -161,6 +169,7 @@ class OrderCreateSerializer(serializers.ModelSerializer):
             'delivery_fee',
             'notes',
             'order_type',
+            'coupon_code',
         ]
     
     def validate_items(self, value):
@@ -181,7 +190,9 @@ class OrderCreateSerializer(serializers.ModelSerializer):
         """
         # Validate that all variants exist and are available
         # التحقق من أن جميع المتغيرات موجودة ومتاحة
-        variant_ids = [item['variant_id'] for item in data['items']]
+        # (a variant may appear in several lines; quantities are merged at checkout)
+        # (قد يتكرر المتغير في عدة أسطر؛ تُدمج الكميات عند الشراء)
+        variant_ids = {item['variant_id'] for item in data['items']}
         variants = ProductVariant.objects.filter(id__in=variant_ids)
         
         if variants.count() != len(variant_ids):
@@ -199,6 +210,13 @@ class OrderCreateSerializer(serializers.ModelSerializer):
                 f"المتغيرات التالية غير متاحة: {', '.join(variant_names)}"
             )
         
+        # Coupon must exist (applicability is checked against the priced lines in create)
+        # الكوبون يجب أن يكون موجوداً (قابلية التطبيق تُفحص على الأسطر المسعّرة في create)
+        if data.get('coupon_code') and get_coupon_rules(data['coupon_code']) is None:
+            raise serializers.ValidationError({
+                'coupon_code': "Coupon not found. / الكوبون غير موجود."
+            })
+        
         # Note: Stock quantity check will be added when Inventory Sync is implemented
         # ملاحظة: فحص كمية المخزون سيُضاف عند تنفيذ Inventory Sync
         # For now, we only check if variants are marked as available
@@ -206,11 +224,14 @@ class OrderCreateSerializer(serializers.ModelSerializer):
         
         return data
     
-    @transaction.atomic
     def create(self, validated_data):
         """
-        Create order with items
-        إنشاء طلب مع العناصر
+        Place the checkout: one order per vendor
+        إتمام الشراء: طلب لكل بائع
+        
+        Returns the Checkout (see orders.checkout.place_checkout); its
+        `placed_orders` holds the created orders.
+        يعيد مجموعة الشراء؛ `placed_orders` تحتوي الطلبات المنشأة.
         
         Note: This implementation does NOT automatically reduce stock quantities.
         This will be added when Inventory Sync system is implemented.
@@ -218,55 +239,22 @@ class OrderCreateSerializer(serializers.ModelSerializer):
         ملاحظة: هذا التنفيذ لا يقلل كميات المخزون تلقائياً.
         سيتم إضافته عند تنفيذ نظام Inventory Sync.
         """
-        items_data = validated_data.pop('items')
         user = self.context['request'].user if self.context['request'].user.is_authenticated else None
         
-        # Create order
-        # إنشاء الطلب
-        order = Order.objects.create(
-            user=user,
-            customer_name=validated_data['customer_name'],
-            customer_phone=validated_data['customer_phone'],
-            customer_address=validated_data['customer_address'],
-            delivery_fee=validated_data.get('delivery_fee', ZERO_DECIMAL),
-            notes=validated_data.get('notes', ''),
-            order_type=validated_data.get('order_type', 'online'),
-        )
-        
-        # Calculate subtotal and create order items
-        # حساب المجموع الفرعي وإنشاء عناصر الطلب
-        subtotal = ZERO_DECIMAL
-        
-        for item_data in items_data:
-            variant = ProductVariant.objects.get(id=item_data['variant_id'])
-            quantity = item_data['quantity']
-            price = variant.final_price
-            
-            # Create order item
-            # إنشاء عنصر الطلب
-            OrderItem.objects.create(
-                order=order,
-                product_variant=variant,
-                quantity=quantity,
-                price=price,
+        try:
+            return place_checkout(
+                user,
+                validated_data['items'],
+                customer_name=validated_data['customer_name'],
+                customer_phone=validated_data['customer_phone'],
+                customer_address=validated_data['customer_address'],
+                delivery_fee=validated_data.get('delivery_fee', ZERO_DECIMAL),
+                notes=validated_data.get('notes', ''),
+                order_type=validated_data.get('order_type', 'online'),
+                coupon_code=validated_data.get('coupon_code', ''),
             )
-            
-            # Add to subtotal (using Decimal for precision)
-            # إضافة إلى المجموع الفرعي (باستخدام Decimal للدقة)
-            item_subtotal = (price * Decimal(str(quantity))).quantize(Order.MONEY_Q)
-            subtotal += item_subtotal
-            
-            # TODO: When Inventory Sync is implemented, reduce stock here:
-            # TODO: عند تنفيذ Inventory Sync، قلل المخزون هنا:
-            # variant.stock_quantity -= quantity
-            # variant.save()
-        
-        # Update order subtotal (this will trigger commission and total calculation in save method)
-        # تحديث المجموع الفرعي للطلب (هذا سيؤدي إلى حساب العمولة والإجمالي في طريقة save)
-        order.subtotal = subtotal
-        order.save()
-        
-        return order
+        except CheckoutError as e:
+            raise serializers.ValidationError({e.field or 'non_field_errors': str(e)})
 
 
 # ============================================================================
@@ -292,6 +280,7 @@ class OrderSerializer(serializers.ModelSerializer):
         fields = [
             'id',
             'order_number',
+            'checkout',
             'user',
             'user_email',
             'is_guest_order',
@@ -304,6 +293,7 @@ class OrderSerializer(serializers.ModelSerializer):
             'status_display',
             'subtotal',
             'delivery_fee',
+            'discount',
             'platform_commission',
             'total',
             'notes',
@@ -322,6 +312,42 @@ class OrderSerializer(serializers.ModelSerializer):
         ]
 
 
+# ============================================================================
+# Checkout Serializer
+# مسلسل مجموعة الشراء
+# ============================================================================
+
+class CheckoutSerializer(serializers.ModelSerializer):
+    """
+    Serializer for Checkout (read) with its per-vendor orders
+    مسلسل لمجموعة الشراء (قراءة) مع طلباتها لكل بائع
+    """
+    orders = serializers.SerializerMethodField()
+    
+    def get_orders(self, obj):
+        """Orders placed with this checkout / الطلبات المنشأة مع مجموعة الشراء"""
+        orders = getattr(obj, 'placed_orders', None)
+        if orders is None:
+            orders = obj.orders.all()
+        return [
+            {
+                'id': order.pk,
+                'order_number': order.order_number,
+                'vendor': order.vendor_id,
+                'subtotal': str(order.subtotal),
+                'discount': str(order.discount),
+                'delivery_fee': str(order.delivery_fee),
+                'total': str(order.total),
+            }
+            for order in orders
+        ]
+    
+    class Meta:
+        model = Checkout
+        fields = ['id', 'subtotal', 'discount', 'delivery_fee', 'total', 'orders', 'created_at']
+        read_only_fields = fields
+
+
 # ============================================================================
 # Order Status Update Serializer
 # مسلسل تحديث حالة الطلب
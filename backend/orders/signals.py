@@ -0,0 +1,36 @@
+"""
+Orders Signals
+إشارات الطلبات
+
+Give a coupon use back when the last live order holding it is deleted
+(orders.checkout.release_coupons handles cancellations).
+إعادة استخدام الكوبون عند حذف آخر طلب فعال يحمله.
+"""
+
+from django.db.models.signals import post_delete, pre_delete
+from django.dispatch import receiver
+
+from .checkout import coupon_holders, release_coupon_uses
+from .models import Order
+
+
+@receiver(pre_delete, sender=Order)
+def remember_coupon_holders(sender, instance, **kwargs):
+    """Live orders sharing the coupon use, before the delete"""
+    if instance.coupon_id and instance.status != 'cancelled':
+        instance._coupon_holders = coupon_holders(instance)
+
+
+@receiver(post_delete, sender=Order)
+def release_deleted_order_coupon(sender, instance, **kwargs):
+    """
+    Release the use once no holder is left. Orders deleted together (a
+    checkout cascade) all see that: only the highest pk releases it.
+    إعادة الاستخدام عند عدم بقاء أي حامل؛ يعيده أعلى معرف فقط عند الحذف المجمع.
+    """
+    holders = getattr(instance, '_coupon_holders', None)
+    if not holders or instance.pk != max(holders):
+        return
+    if Order.objects.filter(pk__in=holders).exclude(status='cancelled').exists():
+        return
+    release_coupon_uses([instance.coupon_id])
@@ -0,0 +1,117 @@
+"""
+Checkout Splitter Tests
+اختبارات مقسّم عملية الشراء
+
+Run:
+    python manage.py test orders
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from core.tests.base import generate_marketplace
+from notifications.models import OutboxEvent
+from products.models import ProductVariant
+from promotions.models import Coupon
+from vendors.models import Vendor
+
+from .checkout import CheckoutError, place_checkout
+from .models import Checkout, Order, OrderItem
+
+RATES = [Decimal('8.00'), Decimal('12.50'), Decimal('15.00')]
+
+
+class CheckoutSplitTests(TestCase):
+    """
+    One checkout over three vendors: per-vendor shares add up to the totals.
+    عملية شراء على ثلاثة بائعين: حصص البائعين تساوي الإجماليات.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        generate_marketplace(cls, 'tiny')
+        cls.vendors = list(Vendor.objects.filter(products__isnull=False).distinct().order_by('pk')[:3])
+        for vendor, rate in zip(cls.vendors, RATES):
+            Vendor.objects.filter(pk=vendor.pk).update(commission_rate=rate)
+        cls.items = [
+            {
+                'variant_id': ProductVariant.objects.filter(product__vendor=vendor).order_by('pk').first().pk,
+                'quantity': quantity,
+            }
+            for vendor, quantity in zip(cls.vendors, (1, 2, 3))
+        ]
+        cls.coupon = Coupon.objects.create(
+            code='SPLIT15', discount_value=Decimal('15'), usage_limit=10,
+            start_date=timezone.now() - timedelta(days=1),
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def place(self, **kwargs):
+        kwargs.setdefault('coupon_code', 'SPLIT15')
+        return place_checkout(
+            self.admin_user, self.items,
+            customer_name='Split Customer', customer_phone='+963922222222',
+            customer_address='Aleppo', delivery_fee=Decimal('10.00'), **kwargs,
+        )
+
+    def test_vendor_shares_add_up(self):
+        checkout = self.place()
+        orders = checkout.placed_orders
+        self.assertEqual(len(orders), 3)
+        self.assertEqual(checkout.delivery_fee, Decimal('10.00'))
+        self.assertGreater(checkout.discount, 0)
+
+        for field in ('subtotal', 'discount', 'delivery_fee', 'total'):
+            with self.subTest(field=field):
+                self.assertEqual(sum(getattr(order, field) for order in orders), getattr(checkout, field))
+        for order in orders:
+            self.assertEqual(order.total, order.subtotal - order.discount + order.delivery_fee)
+            self.assertEqual(order.coupon_id, self.coupon.pk)
+
+        stored = Checkout.objects.get(pk=checkout.pk)
+        self.assertEqual(stored.total, checkout.total)
+        self.assertEqual(Order.objects.filter(checkout=checkout).count(), 3)
+
+    def test_commission_uses_vendor_rate(self):
+        orders = Order.objects.filter(checkout=self.place()).select_related('vendor').order_by('vendor')
+        self.assertEqual([order.commission_rate for order in orders], RATES)
+        for order in orders:
+            self.assertEqual(order.platform_commission, (order.subtotal * order.commission_rate / 100).quantize(Decimal('0.01')))
+
+    def test_orders_and_items_carry_their_vendor(self):
+        checkout = self.place()
+        for order in checkout.placed_orders:
+            items = OrderItem.objects.filter(order=order).select_related('product_variant__product')
+            self.assertTrue(items)
+            for item in items:
+                self.assertEqual(item.vendor_id, order.vendor_id)
+                self.assertEqual(item.product_variant.product.vendor_id, order.vendor_id)
+        self.assertEqual({order.vendor_id for order in checkout.placed_orders}, {vendor.pk for vendor in self.vendors})
+
+    def test_coupon_failure_places_nothing(self):
+        Coupon.objects.filter(pk=self.coupon.pk).update(used_count=10)
+        counts = Checkout.objects.count(), Order.objects.count(), OrderItem.objects.count(), OutboxEvent.objects.count()
+
+        with self.assertRaises(CheckoutError) as caught:
+            self.place()
+        self.assertEqual(caught.exception.field, 'coupon_code')
+        self.assertEqual(
+            (Checkout.objects.count(), Order.objects.count(), OrderItem.objects.count(), OutboxEvent.objects.count()),
+            counts,
+        )
+
+    def test_later_failure_gives_the_coupon_use_back(self):
+        orders = Order.objects.count()
+        with mock.patch('orders.checkout.publish_many', side_effect=RuntimeError('outbox down')), \
+                self.assertRaises(RuntimeError):
+            self.place()
+        self.coupon.refresh_from_db()
+        self.assertEqual(self.coupon.used_count, 0)
+        self.assertEqual(Order.objects.count(), orders)
@@ -11,18 +11,22 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from django_filters.rest_framework import DjangoFilterBackend
+from django.db import transaction
 from django.db.models import Q
 
 from core.utils import success_response, error_response
 from core.pagination import StandardResultsSetPagination
 
+from .checkout import release_coupons
 from .models import Order, OrderItem
 from .serializers import (
     OrderSerializer,
     OrderCreateSerializer,
     OrderStatusUpdateSerializer,
+    CheckoutSerializer,
 )
 from users.permissions import IsCustomer, IsVendor, IsAdmin
+from users.principal import get_principal
 from .permissions import IsVendorOrAdmin
 
 
@@ -136,8 +140,7 @@ class OrderViewSet(viewsets.ModelViewSet):
         if user.role == 'vendor':
             # Get vendor IDs associated with this user
             # الحصول على معرفات البائعين المرتبطة بهذا المستخدم
-            from users.models import VendorUser
-            vendor_ids = VendorUser.objects.filter(user=user).values_list('vendor_id', flat=True)
+            vendor_ids = get_principal(self.request).vendor_ids
             
             if not vendor_ids:
                 return Order.objects.none()
@@ -160,10 +163,16 @@ class OrderViewSet(viewsets.ModelViewSet):
         """
         serializer = self.get_serializer(data=request.data, context={'request': request})
         serializer.is_valid(raise_exception=True)
-        order = serializer.save()
+        checkout = serializer.save()
+        
+        # A cart spanning several vendors becomes one order per vendor: the
+        # response keeps the first order's shape and lists all of them
+        # السلة متعددة البائعين تصبح طلباً لكل بائع: الاستجابة تحافظ على شكل الطلب الأول
+        data = OrderSerializer(checkout.placed_orders[0], context={'request': request}).data
+        data['checkout'] = CheckoutSerializer(checkout).data
         
         return success_response(
-            data=OrderSerializer(order, context={'request': request}).data,
+            data=data,
             message='Order created successfully.',
             status_code=status.HTTP_201_CREATED
         )
@@ -191,7 +200,7 @@ class OrderViewSet(viewsets.ModelViewSet):
         # Admin can update any order
         # المسؤول يمكنه تحديث أي طلب
         if user.role == 'admin' or user.is_superuser:
-            serializer.save()
+            self._save_status(serializer, order)
             return success_response(
                 data=OrderSerializer(order, context={'request': request}).data,
                 message='Order status updated successfully.',
@@ -201,8 +210,7 @@ class OrderViewSet(viewsets.ModelViewSet):
         # Vendor can only update orders containing their products
         # البائع يمكنه تحديث الطلبات التي تحتوي على منتجاته فقط
         if user.role == 'vendor':
-            from users.models import VendorUser
-            vendor_ids = VendorUser.objects.filter(user=user).values_list('vendor_id', flat=True)
+            vendor_ids = get_principal(request).vendor_ids
             
             # Check if order belongs to this vendor (using denormalized vendor field)
             # التحقق من إذا كان الطلب ينتمي لهذا البائع (باستخدام حقل vendor المطبيع)
@@ -212,7 +220,7 @@ class OrderViewSet(viewsets.ModelViewSet):
                     status_code=status.HTTP_403_FORBIDDEN
                 )
             
-            serializer.save()
+            self._save_status(serializer, order)
             return success_response(
                 data=OrderSerializer(order, context={'request': request}).data,
                 message='Order status updated successfully.',
@@ -224,3 +232,14 @@ class OrderViewSet(viewsets.ModelViewSet):
             status_code=status.HTTP_403_FORBIDDEN
         )
 
+    def _save_status(self, serializer, order):
+        """
+        Save a status change; a cancellation gives its coupon use back
+        حفظ تغيير الحالة؛ الإلغاء يعيد استخدام الكوبون
+        """
+        was_cancelled = order.status == 'cancelled'
+        with transaction.atomic():
+            serializer.save()
+            if not was_cancelled and order.status == 'cancelled':
+                release_coupons([order])
+
@@ -15,7 +15,7 @@ from django.contrib import messages
 from django.http import HttpResponse
 import csv
 
-from .models import Category, Product, ProductVariant, ProductImage
+from .models import Category, Product, ProductVariant, ProductImage, CatalogImportJob
 
 
 # ============================================================================
@@ -726,3 +726,43 @@ class ProductImageAdmin(admin.ModelAdmin):
     def get_queryset(self, request):
         """Optimize queryset"""
         return super().get_queryset(request).select_related('product', 'product__vendor', 'product__category')
+
+
+
+# ============================================================================
+# Catalog Import Job Admin
+# إدارة مهام استيراد الكتالوج
+# ============================================================================
+
+@admin.register(CatalogImportJob)
+class CatalogImportJobAdmin(admin.ModelAdmin):
+    """
+    Read-only view of catalog import jobs
+    عرض للقراءة فقط لمهام استيراد الكتالوج
+    """
+    
+    list_display = [
+        'id',
+        'vendor',
+        'file_format',
+        'status',
+        'processed_rows',
+        'total_rows',
+        'created_products',
+        'created_variants',
+        'error_count',
+        'created_at',
+    ]
+    list_filter = ['status', 'file_format', 'created_at']
+    search_fields = ['vendor__name', 'file']
+    readonly_fields = [
+        'vendor', 'uploaded_by', 'file', 'file_format', 'status',
+        'total_rows', 'processed_rows', 'created_products', 'created_variants',
+        'error_count', 'errors', 'failure_reason',
+        'started_at', 'finished_at', 'created_at', 'updated_at',
+    ]
+    ordering = ['-created_at']
+    
+    def get_queryset(self, request):
+        """Optimize queryset"""
+        return super().get_queryset(request).select_related('vendor', 'uploaded_by')
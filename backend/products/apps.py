@@ -1,6 +1,44 @@
 from django.apps import AppConfig
 
 
+# Two-tier cache namespaces built from catalog rows (core.cache)
+# نطاقات الكاش المبنية من صفوف الكتالوج
+CATALOG_CACHES = (
+    'products_list', 'product_detail', 'product_variants', 'product_cards', 'product_facets',
+    'product_related', 'categories', 'homepage',
+)
+
+
 class ProductsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'products'
+
+    def ready(self):
+        """
+        Generate image derivatives (thumb/card/zoom) on upload, drop the
+        cached catalog responses when the catalog changes, and warm the
+        caches after migrate (CACHE_WARM_ON_MIGRATE)
+        إنشاء مشتقات الصور عند الرفع، إبطال كاش الكتالوج عند تغييره،
+        وتسخين الكاش بعد الترحيل
+        """
+        from django.db.models.signals import post_migrate
+
+        from core.cache import invalidate_on_change
+        from core.warmup import warm_after_migrate
+        from core.images import register_image_field
+        from vendors.models import Vendor
+
+        register_image_field(self.get_model('Category'), 'image')
+        register_image_field(self.get_model('ProductImage'), 'image')
+        register_image_field(self.get_model('ProductVariant'), 'image')
+
+        invalidate_on_change(
+            CATALOG_CACHES,
+            self.get_model('Product'),
+            self.get_model('ProductVariant'),
+            self.get_model('ProductImage'),
+            self.get_model('Category'),
+            Vendor,
+        )
+
+        post_migrate.connect(warm_after_migrate, sender=self, dispatch_uid='core.warmup')
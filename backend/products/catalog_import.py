@@ -0,0 +1,448 @@
+"""
+Catalog Import Pipeline
+خط استيراد الكتالوج
+
+This module imports products and variants in bulk from CSV / JSONL files.
+هذا الوحدة تستورد المنتجات والمتغيرات بشكل مجمع من ملفات CSV / JSONL.
+
+Pipeline:
+1. The file is streamed row by row (never fully loaded in memory)
+2. Rows are validated in chunks (CATALOG_IMPORT['CHUNK_SIZE'])
+3. Slugs and SKUs are allocated in memory (core.identifiers), pre-fetched once per job
+4. Products and variants are written with bulk_create (one transaction per chunk)
+5. Progress and per-row errors are saved on the CatalogImportJob after each chunk
+
+خط المعالجة:
+1. يُقرأ الملف صفاً بصف (لا يُحمل كاملاً في الذاكرة)
+2. يتم التحقق من الصفوف على دفعات
+3. تُخصص الـ slugs و SKUs في الذاكرة من مجموعات محملة مرة واحدة لكل مهمة
+4. تُكتب المنتجات والمتغيرات بـ bulk_create (transaction واحدة لكل دفعة)
+5. يُحفظ التقدم وأخطاء الصفوف في CatalogImportJob بعد كل دفعة
+
+Row format (CSV headers or JSONL keys):
+    product_name, description, base_price, product_type, category (ID or slug),
+    is_active, color, color_hex, size, model, sku, stock_quantity,
+    price_override, is_available
+"""
+
+import csv
+import io
+import json
+import logging
+from itertools import islice
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+from core.background import run_in_background
+from core.cache import invalidate
+from core.identifiers import UniqueValueAllocator
+from .apps import CATALOG_CACHES
+from .models import CatalogImportJob, Category, Product, ProductVariant
+from .serializers import CatalogImportRowSerializer
+
+logger = logging.getLogger(__name__)
+
+
+IMPORT_SETTINGS = getattr(settings, 'CATALOG_IMPORT', {})
+CHUNK_SIZE = IMPORT_SETTINGS.get('CHUNK_SIZE', 500)
+MAX_STORED_ERRORS = IMPORT_SETTINGS.get('MAX_STORED_ERRORS', 500)
+
+
+# =============================================================================
+# File Readers
+# قارئات الملفات
+# =============================================================================
+
+def _normalize_row(data):
+    """
+    Normalize keys and drop empty values so serializer defaults apply.
+    توحيد المفاتيح وحذف القيم الفارغة لتطبيق القيم الافتراضية للمسلسل.
+    """
+    row = {}
+    for key, value in data.items():
+        if key is None:
+            # Extra CSV cells without a header
+            # خلايا CSV إضافية بدون عنوان
+            continue
+        if isinstance(value, str):
+            value = value.strip()
+        if value in ('', None):
+            continue
+        row[str(key).strip().lower()] = value
+    return row
+
+
+def iter_rows(binary_file, file_format):
+    """
+    Stream rows from an import file.
+    قراءة الصفوف من ملف الاستيراد بشكل متدفق.
+
+    Yields:
+        (row_number, data, parse_error) - data is None when parse_error is set
+    """
+    text = io.TextIOWrapper(binary_file, encoding='utf-8-sig', newline='')
+
+    if file_format == CatalogImportJob.FileFormat.CSV:
+        reader = csv.DictReader(text)
+        # Row numbers match the spreadsheet (header is line 1)
+        # أرقام الصفوف تطابق جدول البيانات (العنوان هو السطر 1)
+        for row_number, row in enumerate(reader, start=2):
+            yield row_number, _normalize_row(row), None
+        return
+
+    for line_number, line in enumerate(text, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            data = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_number, None, f'Invalid JSON: {e.msg}'
+            continue
+        if not isinstance(data, dict):
+            yield line_number, None, 'Each line must be a JSON object'
+            continue
+        yield line_number, _normalize_row(data), None
+
+
+def count_rows(job):
+    """
+    Count data rows with a cheap streaming pass (used for progress).
+    عد صفوف البيانات بقراءة متدفقة سريعة (لحساب التقدم).
+    """
+    with job.file.open('rb') as f:
+        return sum(1 for _ in iter_rows(f, job.file_format))
+
+
+def _plain_errors(errors):
+    """Convert DRF ErrorDetail structures to plain JSON types"""
+    if isinstance(errors, dict):
+        return {str(key): _plain_errors(value) for key, value in errors.items()}
+    if isinstance(errors, (list, tuple)):
+        return [_plain_errors(item) for item in errors]
+    return str(errors)
+
+
+def update_search_vectors(product_ids):
+    """
+    Refresh search_vector for bulk-created products (PostgreSQL only).
+    bulk_create skips Product.save(), so the vector is set in one UPDATE.
+
+    تحديث search_vector للمنتجات المنشأة بشكل مجمع (PostgreSQL فقط).
+    bulk_create يتجاوز Product.save()، لذلك يُعيّن الـ vector بـ UPDATE واحد.
+    """
+    if not product_ids or connection.vendor != 'postgresql':
+        return
+    from django.contrib.postgres.search import SearchVector
+    Product.objects.filter(pk__in=product_ids).update(
+        search_vector=SearchVector('name', weight='A', config='arabic') +
+                      SearchVector('description', weight='B', config='arabic')
+    )
+
+
+# =============================================================================
+# Catalog Importer
+# مستورد الكتالوج
+# =============================================================================
+
+class CatalogImporter:
+    """
+    Runs one CatalogImportJob.
+    ينفذ مهمة استيراد كتالوج واحدة.
+
+    Existing slugs (per vendor) and generated SKUs (prefixed by vendor ID) are
+    fetched once, so uniqueness checks cost no queries per row.
+
+    الـ slugs الموجودة (لكل بائع) و SKUs المولدة (تبدأ بمعرف البائع) تُحمل
+    مرة واحدة، لذلك فحوصات التفرد لا تكلف استعلامات لكل صف.
+    """
+
+    def __init__(self, job):
+        self.job = job
+        self.vendor = job.vendor
+
+        # Lookup maps loaded once per job
+        # خرائط بحث تُحمل مرة واحدة لكل مهمة
+        self.categories = self._load_categories()
+        self.slugs = UniqueValueAllocator(
+            Product.objects.filter(vendor=self.vendor), 'slug',
+            max_length=Product._meta.get_field('slug').max_length,
+            fallback='product',
+        ).preload_all()
+        self.skus = UniqueValueAllocator(
+            ProductVariant.objects.filter(sku__startswith=f'{self.vendor.pk}-'), 'sku',
+            max_length=ProductVariant._meta.get_field('sku').max_length,
+            transform=str.upper,
+            fallback='sku',
+        ).preload_all()
+
+        # Products created by this job, keyed by normalized name
+        # المنتجات المنشأة في هذه المهمة، مفهرسة بالاسم الموحد
+        self.products_by_key = {}
+
+        # Counters
+        # العدادات
+        self.processed_rows = 0
+        self.created_products = 0
+        self.created_variants = 0
+        self.error_count = 0
+        self.errors = []
+
+    def _load_categories(self):
+        """Map category ID and slug to category ID"""
+        categories = {}
+        for pk, slug in Category.objects.values_list('pk', 'slug'):
+            categories[str(pk)] = pk
+            if slug:
+                categories[slug.lower()] = pk
+        return categories
+
+    def run(self):
+        """
+        Stream the file and process it chunk by chunk.
+        قراءة الملف ومعالجته دفعة بدفعة.
+        """
+        with self.job.file.open('rb') as f:
+            rows = iter_rows(f, self.job.file_format)
+            while True:
+                chunk = list(islice(rows, CHUNK_SIZE))
+                if not chunk:
+                    break
+                self._process_chunk(chunk)
+                self._save_progress()
+
+    # =========================================================================
+    # Chunk Processing
+    # معالجة الدفعة
+    # =========================================================================
+
+    def _process_chunk(self, chunk):
+        """Validate, allocate identifiers and bulk-insert one chunk"""
+        self.processed_rows += len(chunk)
+
+        accepted = self._validate_chunk(chunk)
+        if not accepted:
+            return
+
+        new_products = []
+        try:
+            with transaction.atomic():
+                # Create products that are new in this chunk
+                # إنشاء المنتجات الجديدة في هذه الدفعة
+                new_rows = {}
+                for _row_number, row in accepted:
+                    key = self._product_key(row['product_name'])
+                    if key not in self.products_by_key:
+                        new_rows.setdefault(key, row)
+                slugs = self.slugs.allocate_many(
+                    slugify(row['product_name']) for row in new_rows.values()
+                )
+                for (key, row), slug in zip(new_rows.items(), slugs):
+                    product = Product(
+                        vendor=self.vendor,
+                        category_id=row['category_id'],
+                        name=row['product_name'],
+                        slug=slug,
+                        description=row['description'],
+                        base_price=row['base_price'],
+                        product_type=row['product_type'],
+                        is_active=row['is_active'],
+                    )
+                    self.products_by_key[key] = product
+                    new_products.append(product)
+
+                Product.objects.bulk_create(new_products)
+
+                # Create variants
+                # إنشاء المتغيرات
+                variants = []
+                for _row_number, row in accepted:
+                    product = self.products_by_key[self._product_key(row['product_name'])]
+                    variants.append(ProductVariant(
+                        product=product,
+                        color=row['color'],
+                        color_hex=row['color_hex'],
+                        size=row['size'],
+                        model=row['model'],
+                        sku=row['sku'] or self._allocate_sku(product, row),
+                        stock_quantity=row['stock_quantity'],
+                        price_override=row['price_override'],
+                        is_available=row['is_available'],
+                    ))
+
+                ProductVariant.objects.bulk_create(variants)
+                update_search_vectors([product.pk for product in new_products])
+
+        except IntegrityError as e:
+            # A concurrent write took one of our identifiers - fail the chunk
+            # كتابة متزامنة أخذت أحد المعرفات - فشل الدفعة كاملة
+            logger.warning(f'Catalog import {self.job.pk}: chunk rolled back: {e}')
+            for product in new_products:
+                self.products_by_key.pop(self._product_key(product.name), None)
+            for row_number, _row in accepted:
+                self._add_error(row_number, {
+                    'non_field_errors': ['تعارض في قاعدة البيانات / Database conflict, please retry this row']
+                })
+            return
+
+        self.created_products += len(new_products)
+        self.created_variants += len(variants)
+
+    def _validate_chunk(self, chunk):
+        """
+        Validate rows and return the accepted (row_number, data) pairs.
+        التحقق من الصفوف وإرجاع الأزواج المقبولة (رقم الصف، البيانات).
+        """
+        valid = []
+        for row_number, data, parse_error in chunk:
+            if parse_error:
+                self._add_error(row_number, {'non_field_errors': [parse_error]})
+                continue
+
+            serializer = CatalogImportRowSerializer(data=data)
+            if not serializer.is_valid():
+                self._add_error(row_number, serializer.errors)
+                continue
+
+            row = dict(serializer.validated_data)
+            category_ref = row.pop('category').strip().lower()
+            row['category_id'] = None
+            if category_ref:
+                row['category_id'] = self.categories.get(category_ref)
+                if row['category_id'] is None:
+                    self._add_error(row_number, {'category': ['الفئة غير موجودة / Category not found']})
+                    continue
+            valid.append((row_number, row))
+
+        # Explicit SKUs are unique globally - check the chunk in one query
+        # SKUs المحددة فريدة على مستوى النظام - فحص الدفعة باستعلام واحد
+        explicit_skus = {row['sku'] for _row_number, row in valid if row['sku']}
+        if explicit_skus:
+            self.skus.mark_taken(
+                ProductVariant.objects.filter(sku__in=explicit_skus).values_list('sku', flat=True)
+            )
+
+        accepted = []
+        for row_number, row in valid:
+            if row['sku']:
+                if self.skus.is_taken(row['sku']):
+                    self._add_error(row_number, {'sku': ['SKU مستخدم مسبقاً / SKU already exists']})
+                    continue
+                self.skus.mark_taken([row['sku']])
+            accepted.append((row_number, row))
+        return accepted
+
+    # =========================================================================
+    # Identifier Allocation
+    # تخصيص المعرفات
+    # =========================================================================
+
+    @staticmethod
+    def _product_key(name):
+        """Rows with the same (case-insensitive) name share one product"""
+        return name.strip().casefold()
+
+    def _allocate_sku(self, product, row):
+        """Generate a SKU the same way ProductVariant.save() does"""
+        return self.skus.allocate(ProductVariant.sku_base(
+            self.vendor.pk, product.pk, row['color'], row['size'], row['model'],
+        ))
+
+    # =========================================================================
+    # Progress & Errors
+    # التقدم والأخطاء
+    # =========================================================================
+
+    def _add_error(self, row_number, errors):
+        """Record a row error (only the first MAX_STORED_ERRORS are kept)"""
+        self.error_count += 1
+        if len(self.errors) < MAX_STORED_ERRORS:
+            self.errors.append({'row': row_number, 'errors': _plain_errors(errors)})
+
+    def _save_progress(self, **extra):
+        """Persist counters on the job row"""
+        CatalogImportJob.objects.filter(pk=self.job.pk).update(
+            processed_rows=self.processed_rows,
+            created_products=self.created_products,
+            created_variants=self.created_variants,
+            error_count=self.error_count,
+            errors=self.errors,
+            updated_at=timezone.now(),
+            **extra
+        )
+
+
+# =============================================================================
+# Job Entry Points
+# نقاط دخول المهمة
+# =============================================================================
+
+def process_import_job(job_id):
+    """
+    Process a pending import job (runs in a background thread or command).
+    معالجة مهمة استيراد معلقة (تعمل في خيط خلفي أو أمر إدارة).
+    """
+    # Claim the job atomically so it is never processed twice
+    # حجز المهمة بشكل ذري حتى لا تُعالج مرتين
+    claimed = CatalogImportJob.objects.filter(
+        pk=job_id,
+        status=CatalogImportJob.Status.PENDING,
+    ).update(
+        status=CatalogImportJob.Status.PROCESSING,
+        started_at=timezone.now(),
+    )
+    if not claimed:
+        return
+
+    job = CatalogImportJob.objects.select_related('vendor').get(pk=job_id)
+    importer = None
+    try:
+        total_rows = count_rows(job)
+        CatalogImportJob.objects.filter(pk=job_id).update(total_rows=total_rows)
+
+        importer = CatalogImporter(job)
+        importer.run()
+    except (UnicodeDecodeError, csv.Error) as e:
+        _fail_job(job_id, importer, f'تعذر قراءة الملف / Could not read file: {e}')
+    except Exception as e:
+        logger.exception(f'Catalog import {job_id} failed')
+        _fail_job(job_id, importer, f'خطأ غير متوقع / Unexpected error: {e}')
+    else:
+        importer._save_progress(
+            status=CatalogImportJob.Status.COMPLETED,
+            finished_at=timezone.now(),
+        )
+        logger.info(
+            f'Catalog import {job_id} completed: {importer.created_products} products, '
+            f'{importer.created_variants} variants, {importer.error_count} errors'
+        )
+    finally:
+        # Rows are bulk-inserted (no post_save): drop cached catalog responses,
+        # also after a failure (earlier chunks are committed)
+        # الصفوف تُدخل دفعة واحدة (بدون post_save): إبطال كاش الكتالوج
+        if importer is not None:
+            invalidate(*CATALOG_CACHES)
+
+
+def _fail_job(job_id, importer, reason):
+    """Mark job as failed, keeping the counters reached so far"""
+    fields = {
+        'status': CatalogImportJob.Status.FAILED,
+        'failure_reason': reason,
+        'finished_at': timezone.now(),
+    }
+    if importer is not None:
+        importer._save_progress(**fields)
+    else:
+        CatalogImportJob.objects.filter(pk=job_id).update(**fields)
+
+
+def start_import_job(job):
+    """
+    Schedule a job for background processing after the request commits.
+    جدولة مهمة للمعالجة في الخلفية بعد تثبيت الطلب.
+    """
+    run_in_background(process_import_job, job.pk)
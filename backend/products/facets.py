@@ -0,0 +1,182 @@
+"""
+Catalog Facets
+عدادات فلاتر الكتالوج
+
+Counts of matching products per filter option (color, size, vendor,
+product type, price bucket) for the storefront filter chips, plus the
+price range for the slider.
+
+عدد المنتجات المطابقة لكل خيار فلتر (اللون، المقاس، البائع، نوع المنتج،
+شريحة السعر) لشرائح الفلاتر في الواجهة، مع نطاق السعر لشريط التمرير.
+
+Counts are disjunctive: each facet applies every active filter except its
+own, so the chips of a facet show what choosing another option would give
+(picking "Red" keeps the other colors visible). Every facet is a grouped
+aggregate over the product (and variant) join; all of them run as a
+single UNION ALL query.
+العدادات منفصلة: كل فلتر يطبق كل الفلاتر النشطة إلا نفسه، وكل العدادات
+تُحسب في استعلام UNION ALL واحد.
+
+Usage:
+    facets = product_facets(request, queryset, ProductFilter, view)  # ProductViewSet.facets
+"""
+
+from django.conf import settings
+from django.db.models import Case, CharField, Count, F, Max, Min, Value, When
+from django.db.models.functions import Cast
+from rest_framework import filters
+
+from .models import Product
+
+
+# Facet -> query parameters of ProductFilter it ignores (its own filter)
+# الفلتر -> معاملات ProductFilter التي يتجاهلها (فلتره الخاص)
+FACET_PARAMS = {
+    'color': ('color',),
+    'size': ('size',),
+    'vendor': ('vendor', 'vendor_slug'),
+    'product_type': ('product_type',),
+    'price': ('min_price', 'max_price'),
+}
+
+# Query parameters that change the counts (cache key of the facets)
+# المعاملات التي تغير العدادات (مفتاح كاش العدادات)
+FILTER_PARAMS = (
+    'vendor', 'vendor_slug', 'category', 'product_type', 'color', 'size',
+    'min_price', 'max_price', 'is_active', 'search',
+)
+
+# Case-insensitive filters (iexact / icontains): normalized to lower case
+# الفلاتر غير الحساسة لحالة الأحرف
+CASELESS_PARAMS = ('vendor_slug', 'category', 'color', 'size', 'search')
+
+
+def price_edges():
+    """Bucket boundaries, ascending (CATALOG_PRICE_BUCKETS)"""
+    return sorted(getattr(settings, 'CATALOG_PRICE_BUCKETS', (25, 50, 100, 200)))
+
+
+def facets_cache_key(request):
+    """
+    Normalized filter key: only the parameters that change the counts,
+    sorted, trimmed and lower-cased where the filter ignores case.
+    مفتاح الفلاتر الموحد: المعاملات المؤثرة فقط، مرتبة وموحدة.
+    """
+    items = []
+    for name in FILTER_PARAMS:
+        value = request.query_params.get(name, '').strip()
+        if value:
+            items.append(f'{name}={value.lower() if name in CASELESS_PARAMS else value}')
+    return 'facets?' + '&'.join(items)
+
+
+def _part(queryset, facet, value, label=None):
+    """Grouped counts of one facet as (facet, value, label, count) rows"""
+    return (
+        queryset.order_by()
+        .annotate(
+            facet=Value(facet, output_field=CharField()),
+            value=Cast(value, CharField()),
+            label=Cast(label if label is not None else Value(''), CharField()),
+        )
+        .values('facet', 'value', 'label')
+        .annotate(count=Count('pk', distinct=True))
+    )
+
+
+def _price_bucket(edges):
+    """Lower edge of the price bucket of base_price (as text)"""
+    if not edges:
+        return Value('0')
+    whens = [When(base_price__lt=edge, then=Value(str(lower))) for lower, edge in zip([0] + edges, edges)]
+    return Case(*whens, default=Value(str(edges[-1])), output_field=CharField())
+
+
+def product_facets(request, queryset, filterset_class, view=None):
+    """
+    Facet counts for the filters of `request`.
+    عدادات الفلاتر لطلب معين.
+
+    Args:
+        request: DRF request (filters in query_params)
+        queryset: Base product queryset (active products by default)
+        filterset_class: ProductFilter
+        view: View for SearchFilter (search_fields)
+
+    Returns:
+        dict: {'total', 'facets': {color, size, vendor, product_type: [..],
+               price: {'min', 'max', 'buckets': [..]}}}
+    """
+    queryset = queryset.select_related(None).prefetch_related(None)
+    if view is not None:
+        queryset = filters.SearchFilter().filter_queryset(request, queryset, view)
+
+    def filtered(excluded=()):
+        data = request.query_params.copy()
+        for name in excluded:
+            data.pop(name, None)
+        return filterset_class(data, queryset=queryset, request=request).qs
+
+    edges = price_edges()
+    price_queryset = filtered(FACET_PARAMS['price'])
+    parts = [
+        _part(filtered(FACET_PARAMS['color']), 'color', F('variants__color')),
+        _part(filtered(FACET_PARAMS['size']), 'size', F('variants__size')),
+        _part(filtered(FACET_PARAMS['vendor']), 'vendor', F('vendor__slug'), F('vendor__name')),
+        _part(filtered(FACET_PARAMS['product_type']), 'product_type', F('product_type')),
+        _part(price_queryset, 'price', _price_bucket(edges)),
+        # Price range of the slider (ignores the price filter) and total
+        # نطاق السعر لشريط التمرير (يتجاهل فلتر السعر) والإجمالي
+        price_queryset.order_by()
+        .annotate(facet=Value('price_range', output_field=CharField()))
+        .values('facet')
+        .annotate(
+            value=Cast(Min('base_price'), CharField()),
+            label=Cast(Max('base_price'), CharField()),
+            count=Count('pk', distinct=True),
+        ),
+        filtered().order_by()
+        .annotate(facet=Value('total', output_field=CharField()), value=Value(''), label=Value(''))
+        .values('facet', 'value', 'label')
+        .annotate(count=Count('pk', distinct=True)),
+    ]
+    rows = parts[0].union(*parts[1:], all=True)
+
+    type_labels = dict(Product.PRODUCT_TYPES)
+    facets = {name: [] for name in FACET_PARAMS if name != 'price'}
+    buckets = {}
+    price_range = {'min': None, 'max': None}
+    total = 0
+    for row in rows:
+        facet, value, count = row['facet'], row['value'], row['count']
+        if facet == 'total':
+            total = count
+        elif facet == 'price_range':
+            price_range = {'min': value, 'max': row['label']}
+        elif facet == 'price':
+            buckets[value] = count
+        elif value not in (None, ''):
+            # Products without variants / type have no option to count
+            # المنتجات بدون متغيرات أو نوع لا خيار لها
+            option = {'value': value, 'count': count}
+            if facet == 'vendor':
+                option['label'] = row['label']
+            elif facet == 'product_type':
+                option['label'] = str(type_labels.get(value, value))
+            facets[facet].append(option)
+
+    for options in facets.values():
+        options.sort(key=lambda option: (-option['count'], option['value']))
+    lowers = [0] + edges
+    facets['price'] = {
+        **price_range,
+        'buckets': [
+            {
+                'min': lower,
+                'max': upper,
+                'count': buckets.get(str(lower), 0),
+            }
+            for lower, upper in zip(lowers, edges + [None])
+        ],
+    }
+    return {'total': total, 'facets': facets}
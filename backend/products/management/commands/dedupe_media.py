@@ -0,0 +1,207 @@
+"""
+Dedupe Media Command
+أمر إزالة تكرار الوسائط
+
+Moves legacy uploads (stored under their upload_to path) into the
+content-addressed store (core.storage), so identical files are kept once,
+and rewrites every FileField reference in bulk.
+
+ينقل الملفات القديمة (المخزنة في مسار upload_to) إلى التخزين حسب المحتوى،
+بحيث تُحفظ الملفات المتطابقة مرة واحدة، ويعيد كتابة مراجع FileField بشكل مجمع.
+
+Usage:
+    python manage.py dedupe_media --dry-run
+    python manage.py dedupe_media
+    python manage.py dedupe_media --delete-originals
+    python manage.py dedupe_media --prune
+"""
+
+import hashlib
+import os
+import time
+
+from django.apps import apps
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import models, transaction
+from django.db.models import Case, Value, When
+
+from core.images import DERIVATIVES_FIELD, derivative_paths
+from core.storage import CAS_DIR, ContentAddressedStorage
+
+
+# Rows rewritten per UPDATE statement
+# عدد الصفوف في كل استعلام UPDATE
+UPDATE_BATCH_SIZE = 500
+
+# Content-addressed files younger than this are never pruned (in-flight uploads)
+# الملفات الأحدث من هذه المدة لا تُحذف أبداً (عمليات رفع جارية)
+PRUNE_GRACE_SECONDS = 60 * 60
+
+
+def _file_fields():
+    """(model, field_name, storage) for every FileField on content-addressed storage"""
+    fields = []
+    for model in apps.get_models():
+        for field in model._meta.concrete_fields:
+            if isinstance(field, models.FileField) and isinstance(field.storage, ContentAddressedStorage):
+                fields.append((model, field.name, field.storage))
+    return fields
+
+
+def _digest(storage, name):
+    """SHA-256 of a stored file, read in chunks"""
+    digest = hashlib.sha256()
+    with storage.open(name, 'rb') as f:
+        for chunk in f.chunks():
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Command(BaseCommand):
+    help = 'Deduplicate media files into content-addressed storage / إزالة تكرار ملفات الوسائط'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report duplicates, change nothing',
+        )
+        parser.add_argument(
+            '--delete-originals',
+            action='store_true',
+            help='Delete legacy files once their references are rewritten',
+        )
+        parser.add_argument(
+            '--prune',
+            action='store_true',
+            help=f'Delete content-addressed files no row references '
+                 f'(older than {PRUNE_GRACE_SECONDS // 60} minutes)',
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        fields = _file_fields()
+
+        mapping, storage_by_name = self._collect(fields, dry_run)
+
+        if mapping and not dry_run:
+            self._rewrite_references(fields, mapping)
+            # Derivatives still point at the old source - regenerate them
+            # المشتقات ما زالت تشير للمصدر القديم - إعادة إنشائها
+            call_command('generate_image_derivatives', stdout=self.stdout)
+
+            if options['delete_originals']:
+                for name, storage in storage_by_name.items():
+                    storage.delete(name)
+                self.stdout.write(f'Deleted {len(storage_by_name)} original file(s)')
+
+        if options['prune']:
+            self._prune(fields, dry_run)
+
+    # =========================================================================
+    # Steps
+    # الخطوات
+    # =========================================================================
+
+    def _collect(self, fields, dry_run):
+        """
+        Hash every legacy file and store it by digest.
+        حساب بصمة كل ملف قديم وتخزينه حسب البصمة.
+
+        Returns:
+            (mapping old name -> new name, storage per old name)
+        """
+        mapping = {}
+        storage_by_name = {}
+        seen_digests = set()
+        missing = duplicates = reclaimable = 0
+
+        for model, field_name, storage in fields:
+            names = (
+                model.objects.exclude(**{field_name: ''})
+                .exclude(**{f'{field_name}__isnull': True})
+                .exclude(**{f'{field_name}__startswith': f'{CAS_DIR}/'})
+                .values_list(field_name, flat=True)
+                .distinct()
+            )
+            for name in names.iterator():
+                if name in mapping or name in storage_by_name:
+                    continue
+                if not storage.exists(name):
+                    missing += 1
+                    continue
+
+                digest = _digest(storage, name)
+                new_name = storage.hashed_name(digest, os.path.splitext(name)[1].lower())
+                if digest in seen_digests or storage.exists(new_name):
+                    duplicates += 1
+                    reclaimable += storage.size(name)
+                seen_digests.add(digest)
+
+                if not dry_run and not storage.exists(new_name):
+                    with storage.open(name, 'rb') as f:
+                        new_name = storage.save(name, f)
+
+                mapping[name] = new_name
+                storage_by_name[name] = storage
+
+        self.stdout.write(
+            f'{len(mapping)} legacy file(s), {duplicates} duplicate(s), '
+            f'{reclaimable / (1024 * 1024):.1f} MB reclaimable, {missing} missing on disk'
+        )
+        return mapping, storage_by_name
+
+    def _rewrite_references(self, fields, mapping):
+        """
+        Point every row at its content-addressed name with batched CASE updates.
+        توجيه كل صف إلى اسمه الجديد باستعلامات CASE مجمعة.
+        """
+        old_names = list(mapping)
+        updated = 0
+        with transaction.atomic():
+            for model, field_name, _storage in fields:
+                for i in range(0, len(old_names), UPDATE_BATCH_SIZE):
+                    batch = old_names[i:i + UPDATE_BATCH_SIZE]
+                    updated += model.objects.filter(**{f'{field_name}__in': batch}).update(**{
+                        field_name: Case(
+                            *[When(**{field_name: old}, then=Value(mapping[old])) for old in batch],
+                            output_field=models.CharField(),
+                        )
+                    })
+        self.stdout.write(self.style.SUCCESS(f'Rewrote {updated} reference(s)'))
+
+    def _prune(self, fields, dry_run):
+        """
+        Delete content-addressed files referenced by no file field or derivative.
+        حذف الملفات غير المشار إليها من أي حقل ملف أو مشتق.
+        """
+        referenced = set()
+        for model, field_name, _storage in fields:
+            referenced.update(
+                model.objects.filter(**{f'{field_name}__startswith': f'{CAS_DIR}/'})
+                .values_list(field_name, flat=True)
+            )
+            if any(f.name == DERIVATIVES_FIELD for f in model._meta.concrete_fields):
+                for derivatives in model.objects.values_list(DERIVATIVES_FIELD, flat=True).iterator():
+                    referenced.update(derivative_paths(derivatives))
+
+        cutoff = time.time() - PRUNE_GRACE_SECONDS
+        storages = {id(storage): storage for _model, _field, storage in fields}
+        pruned = 0
+        for storage in storages.values():
+            root = storage.path(CAS_DIR)
+            for directory, _dirs, files in os.walk(root):
+                for filename in files:
+                    full_path = os.path.join(directory, filename)
+                    name = os.path.relpath(full_path, storage.location).replace(os.sep, '/')
+                    if filename.startswith('.upload-') or name in referenced:
+                        continue
+                    if os.path.getmtime(full_path) > cutoff:
+                        continue
+                    if not dry_run:
+                        storage.purge(name)
+                    pruned += 1
+
+        action = 'Would prune' if dry_run else 'Pruned'
+        self.stdout.write(f'{action} {pruned} unreferenced file(s)')
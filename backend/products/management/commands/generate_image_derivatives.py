@@ -0,0 +1,65 @@
+"""
+Generate Image Derivatives Command
+أمر إنشاء مشتقات الصور
+
+Generates missing thumb/card/zoom derivatives for every model registered with
+core.images.register_image_field(). Use it to backfill images uploaded before
+the pipeline existed, or with --force after changing IMAGE_DERIVATIVES sizes.
+
+ينشئ المشتقات الناقصة لكل النماذج المسجلة. يُستخدم لمعالجة الصور المرفوعة
+قبل وجود خط المعالجة، أو مع --force بعد تغيير أحجام IMAGE_DERIVATIVES.
+
+Usage:
+    python manage.py generate_image_derivatives
+    python manage.py generate_image_derivatives --model products.ProductImage
+    python manage.py generate_image_derivatives --force
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.images import REGISTERED_FIELDS, generate_derivatives, needs_derivatives
+
+
+class Command(BaseCommand):
+    help = 'Generate missing image derivatives / إنشاء مشتقات الصور الناقصة'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--model',
+            help='Only process this model (app_label.ModelName)',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Regenerate derivatives even if they are up to date',
+        )
+
+    def handle(self, *args, **options):
+        fields = REGISTERED_FIELDS
+        if options['model']:
+            fields = [
+                (model, field_name) for model, field_name in REGISTERED_FIELDS
+                if model._meta.label_lower == options['model'].lower()
+            ]
+            if not fields:
+                raise CommandError(f'No image field registered for {options["model"]}')
+
+        total = 0
+        for model, field_name in fields:
+            label = model._meta.label
+            queryset = (
+                model.objects.exclude(**{field_name: ''})
+                .exclude(**{f'{field_name}__isnull': True})
+                .only('pk', field_name, 'image_derivatives')
+                .order_by('pk')
+            )
+            generated = 0
+            for instance in queryset.iterator(chunk_size=500):
+                if not options['force'] and not needs_derivatives(instance, field_name):
+                    continue
+                if generate_derivatives(label, instance.pk, field_name, force=options['force']):
+                    generated += 1
+            self.stdout.write(f'{label}.{field_name}: {generated} generated')
+            total += generated
+
+        self.stdout.write(self.style.SUCCESS(f'Generated derivatives for {total} image(s)'))
@@ -0,0 +1,70 @@
+"""
+Process Catalog Imports Command
+أمر معالجة مهام استيراد الكتالوج
+
+Processes pending catalog import jobs synchronously. Useful after a restart
+(jobs queued in a stopped process) or from a scheduled worker.
+
+يعالج مهام استيراد الكتالوج المعلقة بشكل متزامن. مفيد بعد إعادة التشغيل
+(مهام كانت في عملية متوقفة) أو من عامل مجدول.
+
+Usage:
+    python manage.py process_catalog_imports
+    python manage.py process_catalog_imports --job 12
+    python manage.py process_catalog_imports --fail-stale 30
+"""
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from products.catalog_import import process_import_job
+from products.models import CatalogImportJob
+
+
+class Command(BaseCommand):
+    help = 'Process pending catalog import jobs / معالجة مهام استيراد الكتالوج المعلقة'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--job',
+            type=int,
+            help='Process only this job ID',
+        )
+        parser.add_argument(
+            '--fail-stale',
+            type=int,
+            metavar='MINUTES',
+            help='Mark jobs stuck in "processing" for more than MINUTES as failed '
+                 '(a partial import cannot be resumed without duplicating rows)',
+        )
+
+    def handle(self, *args, **options):
+        if options['fail_stale']:
+            cutoff = timezone.now() - timedelta(minutes=options['fail_stale'])
+            failed = CatalogImportJob.objects.filter(
+                status=CatalogImportJob.Status.PROCESSING,
+                updated_at__lt=cutoff,
+            ).update(
+                status=CatalogImportJob.Status.FAILED,
+                failure_reason='توقفت المعالجة / Processing was interrupted',
+                finished_at=timezone.now(),
+            )
+            self.stdout.write(f'Marked {failed} stale job(s) as failed')
+
+        jobs = CatalogImportJob.objects.filter(status=CatalogImportJob.Status.PENDING)
+        if options['job']:
+            jobs = jobs.filter(pk=options['job'])
+
+        job_ids = list(jobs.order_by('created_at').values_list('pk', flat=True))
+        for job_id in job_ids:
+            self.stdout.write(f'Processing import job {job_id}...')
+            process_import_job(job_id)
+            job = CatalogImportJob.objects.get(pk=job_id)
+            self.stdout.write(
+                f'  {job.status}: {job.created_products} products, '
+                f'{job.created_variants} variants, {job.error_count} errors'
+            )
+
+        self.stdout.write(self.style.SUCCESS(f'Processed {len(job_ids)} job(s)'))
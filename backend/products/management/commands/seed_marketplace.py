@@ -0,0 +1,137 @@
+"""
+Seed Marketplace Command
+أمر توليد بيانات السوق
+
+Fills the database with a synthetic marketplace (core.synthetic) for load
+and capacity testing: vendors, categories, products, variants, customers,
+orders, carts and admin notifications, with Zipf-skewed vendor sizes,
+seasonal order timestamps and guest / registered mixes.
+
+يملأ قاعدة البيانات بسوق اصطناعية لاختبارات الحمل والسعة: بائعون وفئات
+ومنتجات ومتغيرات وعملاء وطلبات وسلال وإشعارات بتوزيعات واقعية.
+
+The same seed and --end give the same rows; different seeds can coexist
+(identifiers are tagged with the seed). Rows are written with COPY on
+PostgreSQL (bulk_create elsewhere) in chunks, one transaction per chunk.
+نفس البذرة ونفس --end تعطي نفس الصفوف؛ البذور المختلفة تتعايش.
+
+Refuses to run with DEBUG off unless --force is given.
+يرفض العمل عندما يكون DEBUG معطلاً إلا مع --force.
+
+Usage:
+    python manage.py seed_marketplace --scale small
+    python manage.py seed_marketplace --scale large --seed 7
+    python manage.py seed_marketplace --scale benchmark --orders 1000000 --guest-ratio 0.5
+    python manage.py seed_marketplace --scale small --end 2026-12-31 --seasonality 0.6
+"""
+
+import time
+from datetime import datetime, time as dt_time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.synthetic import SCALES, BulkCreateWriter, MarketplaceGenerator, Scale
+
+
+class Command(BaseCommand):
+    help = 'Generate a synthetic marketplace for load testing / توليد سوق اصطناعية لاختبارات الحمل'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale',
+            choices=sorted(SCALES),
+            default='small',
+            help='Preset dataset size (individual sizes below override it)',
+        )
+        parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+        for field in Scale._fields:
+            parser.add_argument(f'--{field}', type=int, help=f'Number of {field}')
+        parser.add_argument(
+            '--end',
+            help='Date of the newest order, YYYY-MM-DD (default: now)',
+        )
+        parser.add_argument('--days', type=int, default=365, help='Length of the order history in days')
+        parser.add_argument(
+            '--guest-ratio',
+            type=float,
+            default=0.3,
+            help='Share of guest orders and carts, 0-1 (default: 0.3)',
+        )
+        parser.add_argument(
+            '--vendor-skew',
+            type=float,
+            default=1.1,
+            help='Zipf exponent of vendor sizes; 0 makes all vendors equal (default: 1.1)',
+        )
+        parser.add_argument(
+            '--seasonality',
+            type=float,
+            default=0.25,
+            help='Strength of the December peak; 0 is a flat year (default: 0.25)',
+        )
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Rows per insert / transaction')
+        parser.add_argument(
+            '--no-copy',
+            action='store_true',
+            help='Use bulk_create even on PostgreSQL',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Run even with DEBUG off',
+        )
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options['force']:
+            raise CommandError('DEBUG is off: refusing to seed synthetic data without --force.')
+        if not 0 <= options['guest_ratio'] <= 1:
+            raise CommandError('--guest-ratio must be between 0 and 1.')
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be positive.')
+
+        scale = SCALES[options['scale']]._replace(**{
+            field: options[field] for field in Scale._fields if options[field] is not None
+        })
+        if scale.vendors < 1 or scale.categories < 1:
+            raise CommandError('At least one vendor and one category are required.')
+
+        end = None
+        if options['end']:
+            try:
+                day = datetime.strptime(options['end'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError('--end must be a date in YYYY-MM-DD format.')
+            end = timezone.make_aware(datetime.combine(day, dt_time(23, 59, 59)))
+
+        self.stdout.write(
+            f'Seed {options["seed"]}: ' + ', '.join(f'{getattr(scale, field)} {field}' for field in Scale._fields)
+        )
+        generator = MarketplaceGenerator(
+            seed=options['seed'],
+            scale=scale,
+            end=end,
+            days=options['days'],
+            guest_ratio=options['guest_ratio'],
+            vendor_skew=options['vendor_skew'],
+            seasonality=options['seasonality'],
+            chunk_size=options['chunk_size'],
+            writer=BulkCreateWriter() if options['no_copy'] else None,
+            log=self.stdout.write if options['verbosity'] > 0 else None,
+        )
+
+        started = time.monotonic()
+        try:
+            summary = generator.run()
+        except ValueError as e:
+            raise CommandError(str(e))
+        elapsed = time.monotonic() - started
+
+        rows = sum(summary.values())
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Created {rows} row(s) in {elapsed:.1f}s ({rows / max(elapsed, 0.001):.0f} rows/s): '
+                + ', '.join(f'{count} {name}' for name, count in summary.items())
+            )
+        )
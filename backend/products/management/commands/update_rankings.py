@@ -0,0 +1,53 @@
+"""
+Update Rankings Command
+أمر تحديث الترتيب
+
+Folds the orders and analytics events recorded since the last run into
+the trending / best-selling scores (products.ranking) and refreshes the
+cached product lists and homepage top lists ordered by them. Run it from
+cron every few minutes, after process_analytics_events; the first run
+reads the whole history.
+
+يضيف الطلبات وأحداث التحليلات منذ آخر تشغيل إلى درجات الرائج والأكثر
+مبيعاً ويحدث قوائم المنتجات وقوائم الأفضل المرتبة بها. يُشغّل من cron
+كل بضع دقائق بعد process_analytics_events.
+
+Usage:
+    python manage.py update_rankings
+    python manage.py update_rankings --batch-size 20000
+    python manage.py update_rankings --full
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from products.ranking import DEFAULT_BATCH_SIZE, update_rankings
+
+
+class Command(BaseCommand):
+    help = 'Update the trending / best-selling product scores / تحديث درجات الرائج والأكثر مبيعاً'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f'Orders and events per batch / transaction (default: {DEFAULT_BATCH_SIZE})',
+        )
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Drop the scores and recompute them from the whole history',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive.')
+
+        started = time.monotonic()
+        totals = update_rankings(batch_size=options['batch_size'], full=options['full'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Folded {totals["read"]} order(s) / event(s) in {totals["batches"]} batch(es), '
+            f'updated {totals["products"]} score(s) in {time.monotonic() - started:.1f}s'
+        ))
@@ -0,0 +1,51 @@
+"""
+Update Recommendations Command
+أمر تحديث التوصيات
+
+Folds the orders placed since the last run into the co-purchase matrix
+and rebuilds the "frequently bought together" lists of their products
+(products.recommendations). Run it from cron (e.g. hourly); the first run
+reads the whole order history.
+
+يضيف الطلبات منذ آخر تشغيل إلى مصفوفة الشراء المشترك ويعيد بناء قوائم
+"يُشترى معاً غالباً" لمنتجاتها. يُشغّل من cron (كل ساعة مثلاً).
+
+Usage:
+    python manage.py update_recommendations
+    python manage.py update_recommendations --batch-size 5000
+    python manage.py update_recommendations --full
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from products.recommendations import DEFAULT_BATCH_SIZE, update_recommendations
+
+
+class Command(BaseCommand):
+    help = 'Update the frequently-bought-together recommendations / تحديث توصيات الشراء المشترك'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f'Orders per batch / transaction (default: {DEFAULT_BATCH_SIZE})',
+        )
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Drop the matrix and rebuild it from the whole order history',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive.')
+
+        started = time.monotonic()
+        totals = update_recommendations(batch_size=options['batch_size'], full=options['full'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Folded {totals["orders"]} order(s) in {totals["batches"]} batch(es), '
+            f'refreshed {totals["products"]} product list(s) in {time.monotonic() - started:.1f}s'
+        ))
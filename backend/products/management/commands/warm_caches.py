@@ -0,0 +1,102 @@
+"""
+Warm Caches Command
+أمر تسخين الكاش
+
+Precomputes the storefront responses that go cold after a deploy or a
+Redis flush (core.warmup): catalog pages per vendor / category / sort,
+the category tree, the settings bundle and the newest product details.
+
+يحسب مسبقاً استجابات الواجهة التي تبرد بعد النشر أو مسح Redis: صفحات
+الكتالوج لكل بائع وفئة وترتيب، شجرة الفئات، حزمة الإعدادات وتفاصيل المنتجات.
+
+Usage:
+    python manage.py warm_caches
+    python manage.py warm_caches --pages 5 --vendors 50 --workers 8
+    python manage.py warm_caches --host shop.example.com --refresh
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.warmup import (
+    DEFAULT_CATEGORIES,
+    DEFAULT_DETAILS,
+    DEFAULT_ORDERINGS,
+    DEFAULT_PAGES,
+    DEFAULT_VENDORS,
+    DEFAULT_WORKERS,
+    cache_is_shared,
+    default_hosts,
+    summarize,
+    warm_caches,
+)
+
+
+class Command(BaseCommand):
+    help = 'Warm the storefront caches / تسخين كاش الواجهة'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', type=int, default=DEFAULT_PAGES, help='List pages per scope and sort')
+        parser.add_argument('--vendors', type=int, default=DEFAULT_VENDORS, help='Largest vendors to warm')
+        parser.add_argument('--categories', type=int, default=DEFAULT_CATEGORIES, help='Categories to warm (featured first)')
+        parser.add_argument(
+            '--orderings',
+            default=','.join(DEFAULT_ORDERINGS),
+            help=f"Comma-separated sort orders; an empty item is the default order (default: '{','.join(DEFAULT_ORDERINGS)}')",
+        )
+        parser.add_argument('--details', type=int, default=DEFAULT_DETAILS, help='Newest product details to warm')
+        parser.add_argument(
+            '--host',
+            action='append',
+            dest='hosts',
+            help='Host clients use (repeatable; default: CACHE_WARM_HOSTS or ALLOWED_HOSTS)',
+        )
+        scheme = parser.add_mutually_exclusive_group()
+        scheme.add_argument('--https', action='store_true', dest='secure', default=None, help='Warm https URLs')
+        scheme.add_argument('--http', action='store_false', dest='secure', help='Warm http URLs')
+        parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='Parallel requests')
+        parser.add_argument(
+            '--refresh',
+            action='store_true',
+            help='Invalidate the warmed caches first and rebuild every response',
+        )
+
+    def handle(self, *args, **options):
+        for name in ('pages', 'workers'):
+            if options[name] < 1:
+                raise CommandError(f'--{name} must be positive.')
+        if not cache_is_shared():
+            self.stdout.write(self.style.WARNING(
+                'The default cache is local to this process: the server workers will not see the warmed entries.'
+            ))
+
+        hosts = options['hosts'] or default_hosts()
+        self.stdout.write(f'Warming for {", ".join(hosts)} with {options["workers"]} worker(s)...')
+        started = time.monotonic()
+        results = warm_caches(
+            pages=options['pages'],
+            vendors=options['vendors'],
+            categories=options['categories'],
+            orderings=[ordering.strip() for ordering in options['orderings'].split(',')],
+            details=options['details'],
+            hosts=hosts,
+            secure=options['secure'],
+            workers=options['workers'],
+            refresh=options['refresh'],
+        )
+        elapsed = time.monotonic() - started
+
+        for group, stats in summarize(results).items():
+            self.stdout.write(
+                f'  {group:<10} {stats["requests"]:>5} requests  {stats["errors"]:>3} errors  '
+                f'total {stats["total_ms"]:>9.1f} ms  p50 {stats["p50_ms"]:>7.1f} ms  max {stats["max_ms"]:>7.1f} ms'
+            )
+        failed = [result for result in results if result.status != 200]
+        for result in failed[:10]:
+            self.stdout.write(self.style.ERROR(
+                f'  {result.status or "error"} {result.host}{result.target.path} {result.target.params}'
+            ))
+
+        message = f'Warmed {len(results) - len(failed)} of {len(results)} responses in {elapsed:.1f}s'
+        self.stdout.write(self.style.WARNING(message) if failed else self.style.SUCCESS(message))
@@ -0,0 +1,45 @@
+# Generated by Django 5.0 on 2026-10-19 02:45
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0006_product_search_vector_alter_product_name_and_more'),
+        ('vendors', '0005_vendorsettings'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogImportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file', models.FileField(help_text='ملف الاستيراد (CSV أو JSONL)', upload_to='imports/catalog/', verbose_name='Import File')),
+                ('file_format', models.CharField(choices=[('csv', 'CSV'), ('jsonl', 'JSON Lines')], default='csv', max_length=10, verbose_name='File Format')),
+                ('status', models.CharField(choices=[('pending', 'Pending / قيد الانتظار'), ('processing', 'Processing / قيد المعالجة'), ('completed', 'Completed / مكتمل'), ('failed', 'Failed / فشل')], db_index=True, default='pending', max_length=20, verbose_name='Status')),
+                ('total_rows', models.PositiveIntegerField(default=0)),
+                ('processed_rows', models.PositiveIntegerField(default=0)),
+                ('created_products', models.PositiveIntegerField(default=0)),
+                ('created_variants', models.PositiveIntegerField(default=0)),
+                ('error_count', models.PositiveIntegerField(default=0)),
+                ('errors', models.JSONField(blank=True, default=list, help_text='أخطاء الصفوف: [{"row": 3, "errors": {...}}]')),
+                ('failure_reason', models.TextField(blank=True, help_text='سبب فشل المهمة بالكامل (إن وجد)')),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('uploaded_by', models.ForeignKey(blank=True, help_text='المستخدم الذي رفع الملف', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='catalog_imports', to=settings.AUTH_USER_MODEL, verbose_name='Uploaded By')),
+                ('vendor', models.ForeignKey(help_text='البائع الذي تُستورد له المنتجات', on_delete=django.db.models.deletion.CASCADE, related_name='catalog_imports', to='vendors.vendor', verbose_name='Vendor')),
+            ],
+            options={
+                'verbose_name': 'Catalog Import Job',
+                'verbose_name_plural': 'Catalog Import Jobs',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['vendor', 'created_at'], name='products_ca_vendor__e8f36a_idx'), models.Index(fields=['status', 'created_at'], name='products_ca_status_75520b_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.0 on 2026-10-19 02:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0007_catalogimportjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='image_derivatives',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='نسخ مصغرة مولدة تلقائياً (core.images)', verbose_name='Image Derivatives'),
+        ),
+        migrations.AddField(
+            model_name='productimage',
+            name='image_derivatives',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='نسخ مصغرة مولدة تلقائياً (core.images)', verbose_name='Image Derivatives'),
+        ),
+        migrations.AddField(
+            model_name='productvariant',
+            name='image_derivatives',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.0 on 2026-10-19 04:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0008_category_image_derivatives_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogJobCursor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('position', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Catalog Job Cursor',
+                'verbose_name_plural': 'Catalog Job Cursors',
+            },
+        ),
+        migrations.CreateModel(
+            name='ProductRecommendation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('score', models.FloatField()),
+                ('orders', models.PositiveIntegerField(help_text='طلبات تحتوي المنتجين معاً')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recommendations', to='products.product')),
+                ('recommended', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='products.product')),
+            ],
+            options={
+                'verbose_name': 'Product Recommendation',
+                'verbose_name_plural': 'Product Recommendations',
+                'ordering': ['product', 'rank'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ProductCoPurchase',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('orders', models.PositiveIntegerField(default=0, help_text='طلبات تحتوي المنتجين معاً')),
+                ('other', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='products.product')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='products.product')),
+            ],
+            options={
+                'verbose_name': 'Product Co-Purchase',
+                'verbose_name_plural': 'Product Co-Purchases',
+                'indexes': [models.Index(fields=['product', '-orders'], name='products_copurchase_top_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='productcopurchase',
+            constraint=models.UniqueConstraint(fields=('product', 'other'), name='uq_product_copurchase_pair'),
+        ),
+        migrations.AddConstraint(
+            model_name='productrecommendation',
+            constraint=models.UniqueConstraint(fields=('product', 'rank'), name='uq_product_recommendation_rank'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.0 on 2026-10-19 04:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0009_product_recommendations'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductRanking',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='ranking', serialize=False, to='products.product')),
+                ('trending', models.FloatField(default=0)),
+                ('best_selling', models.FloatField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Product Ranking',
+                'verbose_name_plural': 'Product Rankings',
+                'indexes': [models.Index(fields=['-trending'], name='products_ranking_trend_idx'), models.Index(fields=['-best_selling'], name='products_ranking_best_idx')],
+            },
+        ),
+    ]
@@ -1,8 +1,13 @@
+from functools import partial
+
+from django.conf import settings
 from django.db import models
+from django.utils.functional import cached_property
 from django.utils.text import slugify
 from django.utils.translation import gettext_lazy as _
 from django.core.validators import RegexValidator
 from vendors.models import Vendor
+from core.identifiers import save_with_unique_value
 
 # PostgreSQL Full-Text Search (optional - only if using PostgreSQL)
 # البحث النصي الكامل لـ PostgreSQL (اختياري - فقط إذا كان يستخدم PostgreSQL)
@@ -101,6 +106,13 @@ class Category(models.Model):
         verbose_name=_('Category Image'),
         help_text=_('صورة الفئة (مربعة، 400x400 بكسل)')
     )
+    image_derivatives = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name=_('Image Derivatives'),
+        help_text=_('نسخ مصغرة مولدة تلقائياً (core.images)')
+    )
     icon = models.CharField(
         max_length=100,
         blank=True,
@@ -161,16 +173,19 @@ class Category(models.Model):
     
     def save(self, *args, **kwargs):
         """Auto-generate slug from name if not provided"""
-        if not self.slug:
-            self.slug = slugify(self.name)
-            # Ensure uniqueness
-            # ضمان التفرد
-            original_slug = self.slug
-            counter = 1
-            while Category.objects.filter(slug=self.slug).exclude(pk=self.pk).exists():
-                self.slug = f"{original_slug}-{counter}"
-                counter += 1
-        super().save(*args, **kwargs)
+        if self.slug:
+            super().save(*args, **kwargs)
+            return
+        # Ensure uniqueness (one query + retry on the unique constraint)
+        # ضمان التفرد (استعلام واحد + إعادة المحاولة عند تعارض القيد)
+        save_with_unique_value(
+            self, 'slug', slugify(self.name),
+            queryset=Category.objects.exclude(pk=self.pk),
+            save=partial(super().save, *args, **kwargs),
+            max_length=self._meta.get_field('slug').max_length,
+            start=1,
+            fallback='category',
+        )
     
     def __str__(self):
         if self.parent:
@@ -292,19 +307,21 @@ class Product(models.Model):
     
     def save(self, *args, **kwargs):
         """Generate unique slug from name if not provided and update search vector"""
-        if not self.slug:
-            base = slugify(self.name)
-            slug = base
-            i = 2
-            while Product.objects.filter(vendor=self.vendor, slug=slug).exclude(pk=self.pk).exists():
-                slug = f"{base}-{i}"
-                i += 1
-            self.slug = slug
-        
         # Save first (for insert) or update (for existing)
         # حفظ أولاً (للإدراج) أو تحديث (للموجود)
         is_new = self.pk is None
-        super().save(*args, **kwargs)
+        if self.slug:
+            super().save(*args, **kwargs)
+        else:
+            # Unique per vendor (one query + retry on the unique constraint)
+            # فريد لكل بائع (استعلام واحد + إعادة المحاولة عند تعارض القيد)
+            save_with_unique_value(
+                self, 'slug', slugify(self.name),
+                queryset=Product.objects.filter(vendor_id=self.vendor_id).exclude(pk=self.pk),
+                save=partial(super().save, *args, **kwargs),
+                max_length=self._meta.get_field('slug').max_length,
+                fallback='product',
+            )
         
         # Update search vector for Full-Text Search (PostgreSQL only)
         # تحديث search vector للبحث النصي الكامل (PostgreSQL فقط)
@@ -329,23 +346,40 @@ class Product(models.Model):
     @property
     def primary_image(self):
         """Get primary product image"""
+        # Use prefetched images if available (list and batch views)
+        # استخدام الصور المجلوبة مسبقاً إذا كانت متاحة
+        if 'images' in getattr(self, '_prefetched_objects_cache', {}):
+            images = list(self.images.all())
+            return next((image for image in images if image.is_primary), images[0] if images else None)
         primary = self.images.filter(is_primary=True).first()
         if primary:
             return primary
         # Fallback to first image if no primary set
         return self.images.first()
     
-    @property
-    def main_image_url(self):
-        """Get main image URL for backward compatibility"""
+    @cached_property
+    def main_image_source(self):
+        """
+        Object holding the main image: primary ProductImage, or first variant with an image.
+        الكائن الذي يحمل الصورة الرئيسية: الصورة الأساسية، أو أول متغير له صورة.
+        """
         primary = self.primary_image
         if primary and primary.image:
-            return primary.image.url
+            return primary
         # Fallback to first variant image if no product images
-        first_variant = self.variants.filter(image__isnull=False).first()
+        if 'variants' in getattr(self, '_prefetched_objects_cache', {}):
+            first_variant = next((variant for variant in self.variants.all() if variant.image), None)
+        else:
+            first_variant = self.variants.filter(image__isnull=False).exclude(image='').first()
         if first_variant and first_variant.image:
-            return first_variant.image.url
+            return first_variant
         return None
+    
+    @property
+    def main_image_url(self):
+        """Get main image URL for backward compatibility"""
+        source = self.main_image_source
+        return source.image.url if source else None
 
 
 # =============================================================================
@@ -382,6 +416,13 @@ class ProductImage(models.Model):
         verbose_name=_('Image'),
         help_text=_('صورة المنتج')
     )
+    image_derivatives = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name=_('Image Derivatives'),
+        help_text=_('نسخ مصغرة مولدة تلقائياً (core.images)')
+    )
     
     display_order = models.PositiveIntegerField(
         default=0,
@@ -461,6 +502,7 @@ class ProductVariant(models.Model):
     
     # Images
     image = models.ImageField(upload_to='products/', null=True, blank=True)
+    image_derivatives = models.JSONField(default=dict, blank=True, editable=False)  # core.images
     
     # Status
     is_available = models.BooleanField(default=True)
@@ -488,24 +530,34 @@ class ProductVariant(models.Model):
     
     def save(self, *args, **kwargs):
         """Generate unique SKU if not provided"""
-        if not self.sku:
-            # Generate SKU from vendor, product, color, size, model
-            # توليد SKU من البائع، المنتج، اللون، الحجم، الموديل
-            sku_parts = [
-                str(self.product.vendor_id),
-                str(self.product_id),
-                self.color or 'none',
-                self.size or 'none',
-                self.model or 'none'
-            ]
-            base = slugify('-'.join(sku_parts))[:70]
-            sku = base or "sku"
-            i = 2
-            while ProductVariant.objects.filter(sku=sku).exclude(pk=self.pk).exists():
-                sku = f"{base}-{i}"[:100]
-                i += 1
-            self.sku = sku.upper()
-        super().save(*args, **kwargs)
+        if self.sku:
+            super().save(*args, **kwargs)
+            return
+        # Candidates are compared in their stored (upper-case) form
+        # المرشحون يُقارنون بصيغتهم المخزنة (أحرف كبيرة)
+        save_with_unique_value(
+            self, 'sku', self.sku_base(self.product.vendor_id, self.product_id, self.color, self.size, self.model),
+            queryset=ProductVariant.objects.exclude(pk=self.pk),
+            save=partial(super().save, *args, **kwargs),
+            max_length=self._meta.get_field('sku').max_length,
+            transform=str.upper,
+            fallback='sku',
+        )
+    
+    @staticmethod
+    def sku_base(vendor_id, product_id, color, size, model):
+        """
+        Build the SKU base from vendor, product, color, size, model.
+        بناء أساس SKU من البائع، المنتج، اللون، الحجم، الموديل.
+        """
+        sku_parts = [
+            str(vendor_id),
+            str(product_id),
+            color or 'none',
+            size or 'none',
+            model or 'none'
+        ]
+        return slugify('-'.join(sku_parts))[:70]
     
     @property
     def final_price(self):
@@ -519,3 +571,255 @@ class ProductVariant(models.Model):
         if self.model:
             parts.append(self.model)
         return " - ".join(parts)
+
+
+# =============================================================================
+# Catalog Import Job Model
+# نموذج مهمة استيراد الكتالوج
+# =============================================================================
+
+class CatalogImportJob(models.Model):
+    """
+    Bulk catalog import job (CSV / JSONL upload)
+    مهمة استيراد كتالوج مجمعة (رفع CSV / JSONL)
+    
+    Each row of the uploaded file is one variant; rows sharing the same
+    product_name are grouped into one product. The file is processed in the
+    background in chunks and progress is recorded on this row.
+    
+    كل صف في الملف المرفوع يمثل متغيراً واحداً؛ الصفوف التي تشترك في نفس
+    product_name تُجمع في منتج واحد. يُعالج الملف في الخلفية على دفعات
+    ويُسجل التقدم في هذا الصف.
+    
+    Fields:
+        - vendor: البائع الذي تُستورد له المنتجات
+        - uploaded_by: المستخدم الذي رفع الملف
+        - file: ملف الاستيراد
+        - file_format: صيغة الملف (csv/jsonl)
+        - status: حالة المهمة
+        - total_rows / processed_rows: عدد الصفوف الكلي / المعالج
+        - created_products / created_variants: عدد المنتجات / المتغيرات المنشأة
+        - error_count / errors: عدد الأخطاء / تفاصيل أخطاء الصفوف
+    """
+    
+    class Status(models.TextChoices):
+        PENDING = 'pending', _('Pending / قيد الانتظار')
+        PROCESSING = 'processing', _('Processing / قيد المعالجة')
+        COMPLETED = 'completed', _('Completed / مكتمل')
+        FAILED = 'failed', _('Failed / فشل')
+    
+    class FileFormat(models.TextChoices):
+        CSV = 'csv', _('CSV')
+        JSONL = 'jsonl', _('JSON Lines')
+    
+    vendor = models.ForeignKey(
+        Vendor,
+        on_delete=models.CASCADE,
+        related_name='catalog_imports',
+        verbose_name=_('Vendor'),
+        help_text=_('البائع الذي تُستورد له المنتجات')
+    )
+    uploaded_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='catalog_imports',
+        verbose_name=_('Uploaded By'),
+        help_text=_('المستخدم الذي رفع الملف')
+    )
+    
+    # Source file
+    # ملف المصدر
+    file = models.FileField(
+        upload_to='imports/catalog/',
+        verbose_name=_('Import File'),
+        help_text=_('ملف الاستيراد (CSV أو JSONL)')
+    )
+    file_format = models.CharField(
+        max_length=10,
+        choices=FileFormat.choices,
+        default=FileFormat.CSV,
+        verbose_name=_('File Format')
+    )
+    
+    # Status & progress
+    # الحالة والتقدم
+    status = models.CharField(
+        max_length=20,
+        choices=Status.choices,
+        default=Status.PENDING,
+        db_index=True,
+        verbose_name=_('Status')
+    )
+    total_rows = models.PositiveIntegerField(default=0)
+    processed_rows = models.PositiveIntegerField(default=0)
+    created_products = models.PositiveIntegerField(default=0)
+    created_variants = models.PositiveIntegerField(default=0)
+    error_count = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(
+        default=list,
+        blank=True,
+        help_text=_('أخطاء الصفوف: [{"row": 3, "errors": {...}}]')
+    )
+    failure_reason = models.TextField(
+        blank=True,
+        help_text=_('سبب فشل المهمة بالكامل (إن وجد)')
+    )
+    
+    # Timestamps
+    # الطوابع الزمنية
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = _('Catalog Import Job')
+        verbose_name_plural = _('Catalog Import Jobs')
+        indexes = [
+            models.Index(fields=['vendor', 'created_at']),
+            models.Index(fields=['status', 'created_at']),
+        ]
+    
+    def __str__(self):
+        return f"Import #{self.pk} - {self.vendor.name} ({self.status})"
+    
+    @property
+    def progress(self) -> int:
+        """Get progress percentage (0-100)"""
+        if self.status == self.Status.COMPLETED:
+            return 100
+        if not self.total_rows:
+            return 0
+        return min(100, int(self.processed_rows * 100 / self.total_rows))
+
+
+# =============================================================================
+# Recommendation Models
+# نماذج التوصيات
+# =============================================================================
+
+class ProductCoPurchase(models.Model):
+    """
+    Sparse product x product co-purchase matrix
+    مصفوفة الشراء المشترك المتفرقة (منتج × منتج)
+    
+    One row per pair of products bought in the same order at least once,
+    stored in both directions so the neighbors of a product are one index
+    range. The diagonal row (product, product) counts the orders that
+    contain the product. Maintained offline by products.recommendations.
+    
+    صف لكل زوج منتجات اشتُري في نفس الطلب مرة على الأقل، مخزن بالاتجاهين.
+    الصف القطري (المنتج، المنتج) يعد الطلبات التي تحتوي المنتج.
+    """
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='+')
+    other = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='+')
+    orders = models.PositiveIntegerField(default=0, help_text=_('طلبات تحتوي المنتجين معاً'))
+    
+    class Meta:
+        verbose_name = _('Product Co-Purchase')
+        verbose_name_plural = _('Product Co-Purchases')
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'other'], name='uq_product_copurchase_pair'),
+        ]
+        indexes = [
+            # Top neighbors of a product / أكثر المنتجات شراءً مع منتج
+            models.Index(fields=['product', '-orders'], name='products_copurchase_top_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.product_id} + {self.other_id}: {self.orders}"
+
+
+class ProductRecommendation(models.Model):
+    """
+    Frequently bought together: top-K neighbors of a product
+    يُشترى معاً غالباً: أفضل K منتجات مجاورة لمنتج
+    
+    Rebuilt from ProductCoPurchase for the products of each batch of new
+    orders. score is the share of the product's orders that also contain
+    the recommended product.
+    يُعاد بناؤها من مصفوفة الشراء المشترك. score هو نسبة طلبات المنتج التي
+    تحتوي المنتج المقترح أيضاً.
+    """
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='recommendations')
+    recommended = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='+')
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+    orders = models.PositiveIntegerField(help_text=_('طلبات تحتوي المنتجين معاً'))
+    
+    class Meta:
+        ordering = ['product', 'rank']
+        verbose_name = _('Product Recommendation')
+        verbose_name_plural = _('Product Recommendations')
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'rank'], name='uq_product_recommendation_rank'),
+        ]
+    
+    def __str__(self):
+        return f"{self.product_id} -> {self.recommended_id} (#{self.rank})"
+
+
+class CatalogJobCursor(models.Model):
+    """
+    Progress of an incremental offline catalog job
+    تقدم مهمة كتالوج تزايدية
+    
+    `position` is the last source row the job folded in (e.g. the last
+    order id for the recommender); the row is locked while a batch runs,
+    so concurrent runs never process the same rows twice.
+    `position` هو آخر صف مصدر عالجته المهمة؛ يُقفل الصف أثناء كل دفعة.
+    """
+    name = models.CharField(max_length=50, unique=True)
+    position = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = _('Catalog Job Cursor')
+        verbose_name_plural = _('Catalog Job Cursors')
+    
+    def __str__(self):
+        return f"{self.name}: {self.position}"
+
+
+# =============================================================================
+# Ranking Model
+# نموذج الترتيب
+# =============================================================================
+
+class ProductRanking(models.Model):
+    """
+    Time-decayed popularity scores of a product
+    درجات الشعبية المتناقصة مع الزمن لمنتج
+    
+    - trending: views, cart adds and units sold, short half-life
+    - best_selling: units sold, long half-life
+    
+    Maintained incrementally by products.ranking. Scores are relative to
+    the ranking epoch (a shared scale factor), so they order products but
+    are not comparable across rebases; a side table keeps the frequent
+    updates away from the product rows edited in the admin.
+    تُحدث تزايدياً؛ الدرجات نسبية لحقبة الترتيب (عامل مشترك) فهي للترتيب فقط.
+    """
+    product = models.OneToOneField(
+        Product,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='ranking',
+    )
+    trending = models.FloatField(default=0)
+    best_selling = models.FloatField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = _('Product Ranking')
+        verbose_name_plural = _('Product Rankings')
+        indexes = [
+            models.Index(fields=['-trending'], name='products_ranking_trend_idx'),
+            models.Index(fields=['-best_selling'], name='products_ranking_best_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.product_id}: trending {self.trending:.3g}, best selling {self.best_selling:.3g}"
@@ -0,0 +1,274 @@
+"""
+Product Ranking
+ترتيب المنتجات
+
+Precomputed popularity scores (ProductRanking) behind the `trending` and
+`best_selling` orderings of the product list and the homepage top lists
+(ProductViewSet.top):
+
+- trending: product views, cart adds and units sold (RANKING_TRENDING_WEIGHTS),
+  half-life RANKING_TRENDING_HALF_LIFE_HOURS
+- best_selling: units sold, half-life RANKING_BEST_SELLING_HALF_LIFE_DAYS
+
+درجات شعبية محسوبة مسبقاً لترتيبي `trending` و `best_selling` ولقوائم
+الأفضل في الصفحة الرئيسية: الرائج (مشاهدات، إضافات للسلة، وحدات مباعة بعمر
+نصف قصير) والأكثر مبيعاً (وحدات مباعة بعمر نصف طويل).
+
+Exponential decay without rewriting every row: a signal at time t adds
+weight * 2^((t - epoch) / half_life) to its product. All scores share the
+factor 2^(-(now - epoch) / half_life), so they order products exactly as
+the decayed scores would, and a run only touches the products with new
+signals. When the factor grows large the epoch moves forward and every
+score is scaled down in one UPDATE (rebase).
+
+تناقص أسي دون إعادة كتابة كل الصفوف: كل إشارة تضيف وزنها مضروباً بعامل
+الحقبة؛ كل الدرجات تشترك في نفس العامل فيبقى الترتيب صحيحاً، وكل تشغيل يعدل
+المنتجات ذات الإشارات الجديدة فقط. عند كبر العامل تتقدم الحقبة بتحديث واحد.
+
+Incremental: sales come from the orders after one cursor, views and cart
+adds from the analytics events after another (CatalogJobCursor), grouped
+per product and hour in one query each. Cancelled orders are skipped.
+تزايدي: المبيعات من الطلبات بعد مؤشر، والمشاهدات والإضافات من أحداث
+التحليلات بعد مؤشر آخر، مجمعة لكل منتج وساعة.
+
+Usage:
+    python manage.py update_rankings          # from cron
+    python manage.py update_rankings --full   # recompute from scratch
+"""
+
+import logging
+import time
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, FloatField, Sum, Value
+from django.db.models.functions import Coalesce, TruncHour
+from django.utils import timezone
+
+from core.cache import invalidate
+from core.redis_utils import setting
+
+from .models import CatalogJobCursor, Product, ProductRanking
+from .recommendations import SETTLE_DELAY
+
+logger = logging.getLogger(__name__)
+
+
+TRENDING = 'trending'
+BEST_SELLING = 'best_selling'
+RANKINGS = (TRENDING, BEST_SELLING)
+
+EPOCH_CURSOR = 'ranking_epoch'  # unix seconds; also serializes runs / يسلسل التشغيلات
+ORDERS_CURSOR = 'ranking_orders'
+EVENTS_CURSOR = 'ranking_events'
+DEFAULT_BATCH_SIZE = 5000  # orders and events per batch / طلبات وأحداث لكل دفعة
+
+# Cached responses ordered by the scores (?ordering=-trending, top lists)
+# الاستجابات المخزنة المرتبة بالدرجات
+RANKED_CACHES = ('products_list', 'homepage')
+
+# Rebase once the shortest half-life elapsed this many times since the epoch
+# (scores grew by 2^32); doubles overflow near 2^1023
+# إعادة ضبط الحقبة بعد هذا العدد من أعمار النصف
+REBASE_HALF_LIVES = 32
+
+
+def half_lives():
+    """Half-life of each ranking in seconds / عمر النصف لكل ترتيب بالثواني"""
+    return {
+        TRENDING: setting('RANKING_TRENDING_HALF_LIFE_HOURS', 72) * 3600,
+        BEST_SELLING: setting('RANKING_BEST_SELLING_HALF_LIFE_DAYS', 30) * 86400,
+    }
+
+
+def annotate_rankings(queryset):
+    """
+    Product queryset with `trending` / `best_selling` (0 without a ranking row),
+    for the list orderings.
+    إضافة درجات الترتيب إلى queryset المنتجات.
+    """
+    return queryset.annotate(**{
+        name: Coalesce(F(f'ranking__{name}'), Value(0.0), output_field=FloatField())
+        for name in RANKINGS
+    })
+
+
+# =============================================================================
+# Signals
+# الإشارات
+# =============================================================================
+
+def _locked_cursor(name, default=0):
+    CatalogJobCursor.objects.get_or_create(name=name, defaults={'position': default})
+    return CatalogJobCursor.objects.select_for_update().get(name=name)
+
+
+def _rebase(epoch_cursor):
+    """
+    Move the epoch to now when the scale factor grew too large.
+    تقديم الحقبة إلى الآن عند كبر العامل.
+    """
+    now = int(time.time())
+    elapsed = now - epoch_cursor.position
+    lives = half_lives()
+    if elapsed < REBASE_HALF_LIVES * min(lives.values()):
+        return epoch_cursor.position
+    ProductRanking.objects.update(**{
+        name: F(name) * 2 ** (-elapsed / lives[name]) for name in RANKINGS
+    })
+    epoch_cursor.position = now
+    epoch_cursor.save(update_fields=['position', 'updated_at'])
+    logger.info(f'Rankings rebased by {elapsed}s')
+    return now
+
+
+def fold_sales(cursor, batch_size, add):
+    """
+    Units sold in the next batch of settled orders, per product and hour.
+    الوحدات المباعة في الدفعة التالية من الطلبات المستقرة.
+
+    Returns:
+        int: Orders read
+    """
+    from orders.models import Order, OrderItem
+
+    order_ids = list(
+        Order.objects.filter(pk__gt=cursor.position, created_at__lte=timezone.now() - SETTLE_DELAY)
+        .order_by('pk')
+        .values_list('pk', flat=True)[:batch_size]
+    )
+    if not order_ids:
+        return 0
+    rows = (
+        OrderItem.objects.filter(order_id__in=order_ids)
+        .exclude(order__status='cancelled')
+        .values(product=F('product_variant__product'), hour=TruncHour('order__created_at'))
+        .annotate(units=Sum('quantity'))
+        .values_list('product', 'hour', 'units')
+    )
+    weight = setting('RANKING_TRENDING_WEIGHTS', {}).get('purchase', 20)
+    for product, hour, units in rows:
+        add(product, hour, {TRENDING: units * weight, BEST_SELLING: units})
+    cursor.position = order_ids[-1]
+    cursor.save(update_fields=['position', 'updated_at'])
+    return len(order_ids)
+
+
+def fold_events(cursor, batch_size, add):
+    """
+    Product views and cart adds in the next batch of analytics events.
+    مشاهدات المنتجات والإضافات للسلة في الدفعة التالية من الأحداث.
+
+    Returns:
+        int: Events read
+    """
+    from analytics.models import Event, EventType
+
+    weights = setting('RANKING_TRENDING_WEIGHTS', {})
+    weights = {
+        EventType.PRODUCT_VIEW: weights.get('product_view', 1),
+        EventType.ADD_TO_CART: weights.get('add_to_cart', 5),
+    }
+    event_ids = list(
+        Event.objects.filter(pk__gt=cursor.position)
+        .order_by('pk')
+        .values_list('pk', flat=True)[:batch_size]
+    )
+    if not event_ids:
+        return 0
+    rows = (
+        Event.objects.filter(pk__gt=cursor.position, pk__lte=event_ids[-1], event_type__in=weights)
+        .values('object_id', 'event_type', hour=TruncHour('occurred_at'))
+        .annotate(events=Count('id'))
+        .order_by()
+        .values_list('object_id', 'event_type', 'hour', 'events')
+    )
+    for product, event_type, hour, events in rows:
+        add(product, hour, {TRENDING: events * weights[event_type]})
+    cursor.position = event_ids[-1]
+    cursor.save(update_fields=['position', 'updated_at'])
+    return len(event_ids)
+
+
+def add_scores(deltas):
+    """
+    Add score deltas to ProductRanking: one read, one bulk create, one bulk update.
+    إضافة فروقات الدرجات إلى جدول الترتيب.
+    """
+    # Events may name deleted products / قد تشير الأحداث إلى منتجات محذوفة
+    known = set(Product.objects.filter(pk__in=deltas).values_list('pk', flat=True))
+    existing = ProductRanking.objects.in_bulk(known)
+    now = timezone.now()
+    created, updated = [], []
+    for product in known:
+        row = existing.get(product)
+        if row is None:
+            created.append(ProductRanking(product_id=product, **deltas[product]))
+            continue
+        for name, delta in deltas[product].items():
+            setattr(row, name, getattr(row, name) + delta)
+        row.updated_at = now
+        updated.append(row)
+    ProductRanking.objects.bulk_create(created, batch_size=1000)
+    ProductRanking.objects.bulk_update(updated, [*RANKINGS, 'updated_at'], batch_size=1000)
+    return len(known)
+
+
+# =============================================================================
+# Job
+# المهمة
+# =============================================================================
+
+def process_batch(batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Fold the next batch of orders and events into the scores.
+    إضافة الدفعة التالية من الطلبات والأحداث إلى الدرجات.
+
+    Returns:
+        tuple: (orders and events read, products updated); (0, 0) when caught up
+    """
+    with transaction.atomic():
+        epoch = _rebase(_locked_cursor(EPOCH_CURSOR, default=int(time.time())))
+        lives = half_lives()
+        deltas = defaultdict(lambda: dict.fromkeys(RANKINGS, 0.0))
+
+        def add(product, moment, weights):
+            for name, weight in weights.items():
+                deltas[product][name] += weight * 2 ** ((moment.timestamp() - epoch) / lives[name])
+
+        read = fold_sales(_locked_cursor(ORDERS_CURSOR), batch_size, add)
+        read += fold_events(_locked_cursor(EVENTS_CURSOR), batch_size, add)
+        updated = add_scores(deltas) if deltas else 0
+    return read, updated
+
+
+def update_rankings(batch_size=DEFAULT_BATCH_SIZE, full=False):
+    """
+    Fold every settled order and event since the last run; `full` starts over.
+    إضافة كل الطلبات والأحداث منذ آخر تشغيل؛ `full` يبدأ من الصفر.
+
+    When scores changed, the cached responses ordered by them (RANKED_CACHES:
+    product lists sorted by a ranking, homepage top lists) are invalidated.
+    عند تغير الدرجات تُبطل الاستجابات المرتبة بها (قوائم المنتجات وقوائم الأفضل).
+
+    Returns:
+        dict: {'read', 'products', 'batches'}
+    """
+    if full:
+        with transaction.atomic():
+            ProductRanking.objects.all().delete()
+            CatalogJobCursor.objects.filter(name__in=[EPOCH_CURSOR, ORDERS_CURSOR, EVENTS_CURSOR]).delete()
+
+    totals = {'read': 0, 'products': 0, 'batches': 0}
+    while True:
+        read, updated = process_batch(batch_size)
+        if not read:
+            break
+        totals['read'] += read
+        totals['products'] += updated
+        totals['batches'] += 1
+        logger.info(f'Rankings: {read} orders / events folded, {updated} products updated')
+
+    if totals['products'] or full:
+        invalidate(*RANKED_CACHES)
+    return totals
@@ -0,0 +1,218 @@
+"""
+Frequently Bought Together
+يُشترى معاً غالباً
+
+Offline recommender: folds new orders into a sparse product x product
+co-purchase matrix (ProductCoPurchase) and keeps the top-K neighbors of
+every product in ProductRecommendation, which ProductViewSet.related
+serves from the cache.
+
+موصي يعمل خارج الطلبات: يضيف الطلبات الجديدة إلى مصفوفة الشراء المشترك
+المتفرقة ويحتفظ بأفضل K منتجات لكل منتج، ويخدمها ProductViewSet.related.
+
+Incremental: orders are read in id order after a cursor (CatalogJobCursor),
+in batches. Each batch is one transaction:
+1. One grouped self-join of OrderItem counts, per (product, other) pair,
+   the batch orders containing both (the diagonal counts the product)
+2. The counts are added to the matrix (bulk create / bulk update)
+3. The top-K lists of the products in the batch are rebuilt with one
+   window query over the matrix
+4. The cursor moves past the batch
+
+تزايدي: تُقرأ الطلبات بعد المؤشر على دفعات، كل دفعة transaction واحدة:
+استعلام تجميعي واحد لأزواج المنتجات، إضافة العدادات إلى المصفوفة، إعادة بناء
+قوائم أفضل K لمنتجات الدفعة، ثم تحريك المؤشر.
+
+The ranking (orders bought together) only depends on the product's own
+row of the matrix, so rebuilding the products of the batch keeps every
+list exact. Cancelled orders are skipped; an order cancelled after it was
+counted stays counted (one order among many).
+الترتيب يعتمد على صف المنتج فقط، لذلك تبقى كل القوائم دقيقة.
+
+Usage:
+    python manage.py update_recommendations          # from cron
+    python manage.py update_recommendations --full   # rebuild from scratch
+"""
+
+import logging
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from core.cache import invalidate
+from core.redis_utils import setting
+
+from .models import CatalogJobCursor, ProductCoPurchase, ProductRecommendation
+
+logger = logging.getLogger(__name__)
+
+
+CURSOR_NAME = 'co_purchases'
+DEFAULT_BATCH_SIZE = 1000  # orders per batch / طلبات لكل دفعة
+
+# Orders younger than this are left for the next run: their items may
+# still be written by the checkout transaction
+# الطلبات الأحدث من هذا تُترك للتشغيل التالي
+SETTLE_DELAY = timedelta(minutes=5)
+
+
+# =============================================================================
+# Matrix
+# المصفوفة
+# =============================================================================
+
+def batch_pairs(order_ids):
+    """
+    Co-purchase counts of a batch of orders, in one grouped query.
+    عدادات الشراء المشترك لدفعة طلبات في استعلام تجميعي واحد.
+
+    OrderItem joined to the other items of its order: every (product,
+    other) pair with the number of distinct orders containing both.
+
+    Returns:
+        dict: (product_id, other_id) -> orders
+    """
+    from orders.models import OrderItem
+
+    rows = (
+        OrderItem.objects.filter(order_id__in=order_ids)
+        .exclude(order__status='cancelled')
+        .values(product=F('product_variant__product'), other=F('order__items__product_variant__product'))
+        .annotate(count=Count('order', distinct=True))
+        .values_list('product', 'other', 'count')
+    )
+    return {(product, other): count for product, other, count in rows}
+
+
+def merge_pairs(counts):
+    """
+    Add batch counts to the matrix: one read, one bulk create, one bulk update.
+    إضافة عدادات الدفعة إلى المصفوفة.
+    """
+    products = {product for product, _ in counts}
+    existing = {
+        (row.product_id, row.other_id): row
+        for row in ProductCoPurchase.objects.filter(product_id__in=products, other_id__in=products)
+    }
+    created, updated = [], []
+    for (product, other), count in counts.items():
+        row = existing.get((product, other))
+        if row is None:
+            created.append(ProductCoPurchase(product_id=product, other_id=other, orders=count))
+        else:
+            row.orders += count
+            updated.append(row)
+    ProductCoPurchase.objects.bulk_create(created, batch_size=1000)
+    ProductCoPurchase.objects.bulk_update(updated, ['orders'], batch_size=1000)
+
+
+def refresh_recommendations(product_ids, top_k=None, min_support=None):
+    """
+    Rebuild the top-K lists of `product_ids` from the matrix.
+    إعادة بناء قوائم أفضل K للمنتجات من المصفوفة.
+
+    Neighbors need at least `min_support` shared orders; ties go to the
+    older product id so lists are stable between runs.
+    """
+    top_k = top_k or setting('RECOMMENDATIONS_TOP_K', 12)
+    min_support = min_support or setting('RECOMMENDATIONS_MIN_SUPPORT', 2)
+    product_ids = list(product_ids)
+
+    totals = dict(
+        ProductCoPurchase.objects.filter(product_id__in=product_ids, other_id=F('product_id'))
+        .values_list('product_id', 'orders')
+    )
+    neighbors = (
+        ProductCoPurchase.objects.filter(product_id__in=product_ids, orders__gte=min_support)
+        .exclude(other_id=F('product_id'))
+        .annotate(rank=Window(
+            RowNumber(),
+            partition_by=[F('product_id')],
+            order_by=[F('orders').desc(), F('other_id').asc()],
+        ))
+        .filter(rank__lte=top_k)
+        .values_list('product_id', 'other_id', 'orders', 'rank')
+    )
+    recommendations = [
+        ProductRecommendation(
+            product_id=product,
+            recommended_id=other,
+            rank=rank,
+            score=round(orders / totals[product], 4),
+            orders=orders,
+        )
+        for product, other, orders, rank in neighbors
+    ]
+    ProductRecommendation.objects.filter(product_id__in=product_ids).delete()
+    ProductRecommendation.objects.bulk_create(recommendations, batch_size=1000)
+    return len(recommendations)
+
+
+# =============================================================================
+# Job
+# المهمة
+# =============================================================================
+
+def process_batch(batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Fold the next batch of settled orders into the matrix.
+    إضافة الدفعة التالية من الطلبات المستقرة إلى المصفوفة.
+
+    Returns:
+        tuple: (orders read, products refreshed); (0, 0) when caught up
+    """
+    from orders.models import Order
+
+    with transaction.atomic():
+        # Locked until commit: a concurrent run waits, then sees the new position
+        # مقفل حتى التثبيت: التشغيل المتزامن ينتظر ثم يرى الموضع الجديد
+        CatalogJobCursor.objects.get_or_create(name=CURSOR_NAME)
+        cursor = CatalogJobCursor.objects.select_for_update().get(name=CURSOR_NAME)
+        order_ids = list(
+            Order.objects.filter(pk__gt=cursor.position, created_at__lte=timezone.now() - SETTLE_DELAY)
+            .order_by('pk')
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if not order_ids:
+            return 0, 0
+
+        counts = batch_pairs(order_ids)
+        products = {product for product, _ in counts}
+        if counts:
+            merge_pairs(counts)
+            refresh_recommendations(products)
+        cursor.position = order_ids[-1]
+        cursor.save(update_fields=['position', 'updated_at'])
+    return len(order_ids), len(products)
+
+
+def update_recommendations(batch_size=DEFAULT_BATCH_SIZE, full=False):
+    """
+    Fold every settled order since the last run; `full` starts over.
+    إضافة كل الطلبات المستقرة منذ آخر تشغيل؛ `full` يبدأ من الصفر.
+
+    Returns:
+        dict: {'orders', 'products', 'batches'}
+    """
+    if full:
+        with transaction.atomic():
+            ProductRecommendation.objects.all().delete()
+            ProductCoPurchase.objects.all().delete()
+            CatalogJobCursor.objects.filter(name=CURSOR_NAME).delete()
+
+    totals = {'orders': 0, 'products': 0, 'batches': 0}
+    while True:
+        orders, products = process_batch(batch_size)
+        if not orders:
+            break
+        totals['orders'] += orders
+        totals['products'] += products
+        totals['batches'] += 1
+        logger.info(f'Recommendations: {orders} orders folded, {products} products refreshed')
+
+    if totals['orders'] or full:
+        invalidate('product_related')
+    return totals
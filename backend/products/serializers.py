@@ -6,9 +6,11 @@ This module contains serializers for Category, Product and ProductVariant models
 هذا الملف يحتوي على مسلسلات لنماذج Category و Product و ProductVariant
 """
 
+from django.conf import settings
 from rest_framework import serializers
+from core.images import derivative_urls
 from vendors.serializers import VendorSerializer
-from .models import Category, Product, ProductVariant, ProductImage
+from .models import Category, Product, ProductVariant, ProductImage, CatalogImportJob, validate_color_hex
 
 
 # =============================================================================
@@ -39,6 +41,7 @@ class CategorySerializer(serializers.ModelSerializer):
     # Image URL
     # رابط الصورة
     image_url = serializers.SerializerMethodField()
+    image_derivatives = serializers.SerializerMethodField()
     
     class Meta:
         model = Category
@@ -50,6 +53,7 @@ class CategorySerializer(serializers.ModelSerializer):
             'description',
             'description_ar',
             'image_url',
+            'image_derivatives',
             'icon',
             'parent',
             'parent_name',
@@ -74,6 +78,19 @@ class CategorySerializer(serializers.ModelSerializer):
             'updated_at',
         ]
     
+    def to_representation(self, instance):
+        """
+        Products of a list share few categories: when the context carries a
+        'category_memo' dict, each category is serialized once per response.
+        منتجات القائمة تتشارك فئات قليلة: تُسلسل كل فئة مرة واحدة لكل استجابة.
+        """
+        memo = self.context.get('category_memo')
+        if memo is None:
+            return super().to_representation(instance)
+        if instance.pk not in memo:
+            memo[instance.pk] = super().to_representation(instance)
+        return memo[instance.pk]
+    
     def get_parent_name(self, obj):
         """Get parent category name"""
         if obj.parent:
@@ -89,6 +106,10 @@ class CategorySerializer(serializers.ModelSerializer):
             return obj.image.url
         return None
 
+    def get_image_derivatives(self, obj):
+        """Get resized image URLs (thumb/card/zoom), None until generated"""
+        return derivative_urls(obj, 'image', self.context.get('request'))
+
 
 class CategoryCreateUpdateSerializer(serializers.ModelSerializer):
     """
@@ -157,6 +178,7 @@ class CategoryTreeSerializer(serializers.ModelSerializer):
     children = serializers.SerializerMethodField()
     products_count = serializers.ReadOnlyField()
     image_url = serializers.SerializerMethodField()
+    image_derivatives = serializers.SerializerMethodField()
     
     class Meta:
         model = Category
@@ -167,6 +189,7 @@ class CategoryTreeSerializer(serializers.ModelSerializer):
             'slug',
             'icon',
             'image_url',
+            'image_derivatives',
             'is_active',
             'is_featured',
             'display_order',
@@ -188,6 +211,10 @@ class CategoryTreeSerializer(serializers.ModelSerializer):
             return obj.image.url
         return None
 
+    def get_image_derivatives(self, obj):
+        """Get resized image URLs (thumb/card/zoom), None until generated"""
+        return derivative_urls(obj, 'image', self.context.get('request'))
+
 
 # =============================================================================
 # Product Image Serializers
@@ -204,6 +231,7 @@ class ProductImageSerializer(serializers.ModelSerializer):
     """
     
     image_url = serializers.SerializerMethodField()
+    image_derivatives = serializers.SerializerMethodField()
     
     class Meta:
         model = ProductImage
@@ -211,6 +239,7 @@ class ProductImageSerializer(serializers.ModelSerializer):
             'id',
             'image',
             'image_url',
+            'image_derivatives',
             'display_order',
             'is_primary',
             'alt_text',
@@ -235,6 +264,10 @@ class ProductImageSerializer(serializers.ModelSerializer):
             return obj.image.url
         return None
 
+    def get_image_derivatives(self, obj):
+        """Get resized image URLs (thumb/card/zoom), None until generated"""
+        return derivative_urls(obj, 'image', self.context.get('request'))
+
 
 # =============================================================================
 # Product Variant Serializers
@@ -277,6 +310,7 @@ class ProductVariantSerializer(serializers.ModelSerializer):
     # Image URL - returns full URL instead of just path
     # رابط الصورة - يعيد الرابط الكامل بدلاً من المسار فقط
     image_url = serializers.SerializerMethodField()
+    image_derivatives = serializers.SerializerMethodField()
     
     class Meta:
         model = ProductVariant
@@ -291,6 +325,7 @@ class ProductVariantSerializer(serializers.ModelSerializer):
             'price_override',        # سعر مخصص (إذا كان مختلف عن السعر الأساسي)
             'final_price',           # السعر النهائي (محسوب)
             'image_url',             # رابط الصورة الكامل
+            'image_derivatives',     # روابط النسخ المصغرة (thumb/card/zoom)
             'is_available',          # متوفر/غير متوفر
             'created_at',            # تاريخ الإنشاء
             'updated_at',            # تاريخ آخر تحديث
@@ -322,6 +357,10 @@ class ProductVariantSerializer(serializers.ModelSerializer):
             return obj.image.url
         return None
 
+    def get_image_derivatives(self, obj):
+        """Get resized image URLs (thumb/card/zoom), None until generated"""
+        return derivative_urls(obj, 'image', self.context.get('request'))
+
 
 class ProductSerializer(serializers.ModelSerializer):
     """
@@ -354,6 +393,7 @@ class ProductSerializer(serializers.ModelSerializer):
     # Main image URL for list view
     # رابط الصورة الرئيسية لعرض القائمة
     main_image_url = serializers.SerializerMethodField()
+    main_image_derivatives = serializers.SerializerMethodField()
     
     class Meta:
         model = Product
@@ -369,6 +409,7 @@ class ProductSerializer(serializers.ModelSerializer):
             'category',
             'category_id',
             'main_image_url',
+            'main_image_derivatives',
             'is_active',
             'created_at',
             'updated_at',
@@ -379,26 +420,24 @@ class ProductSerializer(serializers.ModelSerializer):
             'vendor',
             'category',
             'main_image_url',
+            'main_image_derivatives',
             'created_at',
             'updated_at',
         ]
     
     def get_main_image_url(self, obj):
-        """Get main product image URL"""
-        primary = obj.primary_image
-        if primary and primary.image:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(primary.image.url)
-            return primary.image.url
-        # Fallback to first variant image
-        first_variant = obj.variants.filter(image__isnull=False).first()
-        if first_variant and first_variant.image:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(first_variant.image.url)
-            return first_variant.image.url
-        return None
+        """Get main product image URL (primary image, or first variant image)"""
+        source = obj.main_image_source
+        if source is None:
+            return None
+        request = self.context.get('request')
+        if request:
+            return request.build_absolute_uri(source.image.url)
+        return source.image.url
+    
+    def get_main_image_derivatives(self, obj):
+        """Get resized main image URLs (thumb/card/zoom), None until generated"""
+        return derivative_urls(obj.main_image_source, 'image', self.context.get('request'))
 
 
 class ProductDetailSerializer(serializers.ModelSerializer):
@@ -436,6 +475,7 @@ class ProductDetailSerializer(serializers.ModelSerializer):
     # Main image URL for backward compatibility
     # رابط الصورة الرئيسية للتوافق مع الإصدارات السابقة
     main_image_url = serializers.SerializerMethodField()
+    main_image_derivatives = serializers.SerializerMethodField()
     
     class Meta:
         model = Product
@@ -450,6 +490,7 @@ class ProductDetailSerializer(serializers.ModelSerializer):
             'category',
             'images',
             'main_image_url',
+            'main_image_derivatives',
             'variants',
             'is_active',
             'created_at',
@@ -462,25 +503,175 @@ class ProductDetailSerializer(serializers.ModelSerializer):
             'category',
             'images',
             'main_image_url',
+            'main_image_derivatives',
             'variants',
             'created_at',
             'updated_at',
         ]
     
     def get_main_image_url(self, obj):
-        """Get main product image URL"""
-        primary = obj.primary_image
-        if primary and primary.image:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(primary.image.url)
-            return primary.image.url
-        # Fallback to first variant image
-        first_variant = obj.variants.filter(image__isnull=False).first()
-        if first_variant and first_variant.image:
-            request = self.context.get('request')
-            if request:
-                return request.build_absolute_uri(first_variant.image.url)
-            return first_variant.image.url
+        """Get main product image URL (primary image, or first variant image)"""
+        source = obj.main_image_source
+        if source is None:
+            return None
+        request = self.context.get('request')
+        if request:
+            return request.build_absolute_uri(source.image.url)
+        return source.image.url
+    
+    def get_main_image_derivatives(self, obj):
+        """Get resized main image URLs (thumb/card/zoom), None until generated"""
+        return derivative_urls(obj.main_image_source, 'image', self.context.get('request'))
+
+
+
+# =============================================================================
+# Catalog Import Serializers
+# مسلسلات استيراد الكتالوج
+# =============================================================================
+
+class CatalogImportRowSerializer(serializers.Serializer):
+    """
+    Catalog Import Row Serializer
+    مسلسل صف استيراد الكتالوج
+    
+    Validates one row of an import file (one variant).
+    Rows sharing the same product_name become variants of one product.
+    
+    يتحقق من صف واحد في ملف الاستيراد (متغير واحد).
+    الصفوف التي تشترك في نفس product_name تصبح متغيرات لمنتج واحد.
+    
+    Note: category is validated by the import pipeline against a preloaded map.
+    ملاحظة: يتم التحقق من الفئة في خط الاستيراد مقابل خريطة محملة مسبقاً.
+    """
+    
+    # Product fields (taken from the first row of each product)
+    # حقول المنتج (تؤخذ من أول صف لكل منتج)
+    product_name = serializers.CharField(max_length=200)
+    description = serializers.CharField(required=False, allow_blank=True, default='')
+    base_price = serializers.DecimalField(max_digits=10, decimal_places=2)
+    product_type = serializers.ChoiceField(choices=Product.PRODUCT_TYPES, required=False, allow_blank=True, default='')
+    category = serializers.CharField(required=False, allow_blank=True, default='')
+    is_active = serializers.BooleanField(required=False, default=True)
+    
+    # Variant fields
+    # حقول المتغير
+    color = serializers.CharField(max_length=50)
+    color_hex = serializers.CharField(max_length=7, required=False, allow_blank=True, default='', validators=[validate_color_hex])
+    size = serializers.CharField(max_length=20, required=False, allow_blank=True, default='')
+    model = serializers.CharField(max_length=100, required=False, allow_blank=True, default='')
+    sku = serializers.CharField(max_length=100, required=False, allow_blank=True, default='')
+    stock_quantity = serializers.IntegerField(min_value=0, required=False, default=0)
+    price_override = serializers.DecimalField(max_digits=10, decimal_places=2, required=False, allow_null=True, default=None)
+    is_available = serializers.BooleanField(required=False, default=True)
+    
+    def validate_base_price(self, value):
+        """Validate base price is positive"""
+        if value <= 0:
+            raise serializers.ValidationError(
+                "السعر يجب أن يكون أكبر من صفر / Price must be greater than zero"
+            )
+        return value
+
+
+class CatalogImportJobSerializer(serializers.ModelSerializer):
+    """
+    Catalog Import Job Serializer
+    مسلسل مهمة استيراد الكتالوج
+    
+    Used by the job status endpoints (vendor and admin).
+    يُستخدم في نقاط نهاية حالة المهمة (البائع والإدارة).
+    """
+    
+    vendor_name = serializers.CharField(source='vendor.name', read_only=True)
+    file_name = serializers.SerializerMethodField()
+    progress = serializers.ReadOnlyField()
+    
+    class Meta:
+        model = CatalogImportJob
+        fields = [
+            'id',
+            'vendor',
+            'vendor_name',
+            'file_name',
+            'file_format',
+            'status',
+            'progress',
+            'total_rows',
+            'processed_rows',
+            'created_products',
+            'created_variants',
+            'error_count',
+            'errors',
+            'failure_reason',
+            'started_at',
+            'finished_at',
+            'created_at',
+        ]
+        read_only_fields = fields
+    
+    def get_file_name(self, obj) -> str | None:
+        """Get uploaded file base name"""
+        if obj.file:
+            return obj.file.name.rsplit('/', 1)[-1]
         return None
 
+
+class CatalogImportJobListSerializer(CatalogImportJobSerializer):
+    """
+    Catalog Import Job List Serializer
+    مسلسل قائمة مهام استيراد الكتالوج
+    
+    Same as the detail serializer without the per-row errors.
+    مثل مسلسل التفاصيل بدون أخطاء الصفوف.
+    """
+    
+    class Meta(CatalogImportJobSerializer.Meta):
+        fields = [f for f in CatalogImportJobSerializer.Meta.fields if f != 'errors']
+        read_only_fields = fields
+
+
+class CatalogImportUploadSerializer(serializers.Serializer):
+    """
+    Catalog Import Upload Serializer
+    مسلسل رفع ملف استيراد الكتالوج
+    
+    Validates the uploaded file and resolves its format (csv/jsonl).
+    Format is inferred from the file extension when not provided.
+    
+    يتحقق من الملف المرفوع ويحدد صيغته (csv/jsonl).
+    تُستنتج الصيغة من امتداد الملف إذا لم تُحدد.
+    """
+    
+    file = serializers.FileField()
+    file_format = serializers.ChoiceField(
+        choices=CatalogImportJob.FileFormat.choices,
+        required=False
+    )
+    
+    EXTENSION_FORMATS = {
+        'csv': CatalogImportJob.FileFormat.CSV,
+        'jsonl': CatalogImportJob.FileFormat.JSONL,
+        'ndjson': CatalogImportJob.FileFormat.JSONL,
+    }
+    
+    def validate_file(self, value):
+        """Validate file size"""
+        max_size = getattr(settings, 'CATALOG_IMPORT', {}).get('MAX_FILE_SIZE', 50 * 1024 * 1024)
+        if value.size > max_size:
+            raise serializers.ValidationError(
+                f"حجم الملف كبير جداً / File too large (max {max_size // (1024 * 1024)} MB)"
+            )
+        return value
+    
+    def validate(self, attrs):
+        """Infer file format from extension if not provided"""
+        if not attrs.get('file_format'):
+            extension = attrs['file'].name.rsplit('.', 1)[-1].lower() if '.' in attrs['file'].name else ''
+            file_format = self.EXTENSION_FORMATS.get(extension)
+            if not file_format:
+                raise serializers.ValidationError({
+                    'file_format': "صيغة الملف غير معروفة / Unknown file format (use .csv or .jsonl)"
+                })
+            attrs['file_format'] = file_format
+        return attrs
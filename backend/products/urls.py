@@ -8,7 +8,7 @@ This module defines URL routes for Product API endpoints.
 
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ProductViewSet
+from .views import CategoryViewSet, ProductViewSet
 
 # Create router instance
 # إنشاء مثيل router
@@ -22,6 +22,13 @@ router = DefaultRouter()
 # - GET /api/products/{id}/variants/      (custom action)
 router.register(r'products', ProductViewSet, basename='product')
 
+# Register CategoryViewSet (read-only storefront categories)
+# تسجيل CategoryViewSet (فئات الواجهة للقراءة فقط)
+# - GET /api/products/categories/         (list)
+# - GET /api/products/categories/tree/    (custom action)
+# - GET /api/products/categories/{slug}/  (retrieve)
+router.register(r'categories', CategoryViewSet, basename='category')
+
 # URL patterns
 # قائمة مسارات URLs
 urlpatterns = [
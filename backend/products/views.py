@@ -9,18 +9,24 @@ This module contains ViewSets for Product API endpoints.
 from rest_framework import viewsets, filters, status
 from rest_framework.permissions import AllowAny
 from rest_framework.decorators import action
+from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
-from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
 from django_filters.rest_framework import DjangoFilterBackend
 from django_filters import rest_framework as django_filters
+from drf_spectacular.utils import extend_schema, OpenApiParameter
 from django.conf import settings
+from django.db.models import Q
 from decimal import Decimal
 
-from core.utils import success_response
+from core.cache import TieredCache, cache_response
+from core.utils import error_response, success_response
 
-from .models import Product, ProductVariant
+from .facets import facets_cache_key, product_facets
+from .models import Category, Product, ProductRecommendation, ProductVariant
+from .ranking import RANKINGS, TRENDING, annotate_rankings
 from .serializers import (
+    CategorySerializer,
+    CategoryTreeSerializer,
     ProductSerializer,
     ProductDetailSerializer,
     ProductVariantSerializer,
@@ -28,6 +34,17 @@ from .serializers import (
 from vendors.models import Vendor
 
 
+# Relations read by ProductSerializer (product cards): one query plus two
+# prefetches for any number of cards
+# العلاقات التي يقرأها ProductSerializer: استعلام واحد وجلبان مسبقان لأي عدد
+CARD_SELECT_RELATED = ('vendor', 'category', 'category__parent')
+CARD_PREFETCH_RELATED = ('images', 'variants')
+
+# Product cards by id, for the batch endpoint (invalidated with the catalog)
+# بطاقات المنتجات حسب المعرف لنقطة الدفعة (تُبطل مع الكتالوج)
+product_cards = TieredCache('product_cards')
+
+
 # Custom FilterSet for advanced filtering
 # مجموعة فلاتر مخصصة للفلترة المتقدمة
 class ProductFilter(django_filters.FilterSet):
@@ -37,6 +54,7 @@ class ProductFilter(django_filters.FilterSet):
     
     Allows filtering products by:
     - vendor (by ID or slug)
+    - category (by slug, including its subcategories)
     - product_type (shoes/bags)
     - color (from variants)
     - size (from variants)
@@ -52,6 +70,10 @@ class ProductFilter(django_filters.FilterSet):
     # الفلترة حسب slug البائع (مثل "fifi", "soft")
     vendor_slug = django_filters.CharFilter(field_name='vendor__slug', lookup_expr='iexact')
     
+    # Filter by category slug (products of the category and its subcategories)
+    # الفلترة حسب slug الفئة (منتجات الفئة وفئاتها الفرعية)
+    category = django_filters.CharFilter(method='filter_category')
+    
     # Filter by product type
     # الفلترة حسب نوع المنتج
     product_type = django_filters.ChoiceFilter(choices=Product.PRODUCT_TYPES)
@@ -74,6 +96,7 @@ class ProductFilter(django_filters.FilterSet):
         fields = [
             'vendor',           # Filter by vendor ID
             'vendor_slug',      # Filter by vendor slug
+            'category',         # Filter by category slug
             'product_type',     # Filter by type (shoes/bags)
             'color',            # Filter by color
             'size',             # Filter by size
@@ -81,6 +104,12 @@ class ProductFilter(django_filters.FilterSet):
             'max_price',        # Maximum price
             'is_active',        # Filter by active status
         ]
+    
+    def filter_category(self, queryset, name, value):
+        """Products in the category or one of its direct subcategories"""
+        return queryset.filter(
+            Q(category__slug__iexact=value) | Q(category__parent__slug__iexact=value)
+        )
 
 
 class ProductViewSet(viewsets.ReadOnlyModelViewSet):
@@ -95,11 +124,15 @@ class ProductViewSet(viewsets.ReadOnlyModelViewSet):
     - GET /api/products/                    - List all products (with pagination)
     - GET /api/products/{id}/               - Retrieve specific product details
     - GET /api/products/{id}/variants/       - Get all variants for a product
+    - GET /api/products/{id}/related/        - Frequently bought together
+    - GET /api/products/batch/?ids=1,2      - Cards of up to 50 products at once
+    - GET /api/products/top/?by=trending    - Homepage top lists (per category / vendor)
+    - GET /api/products/facets/              - Filter-chip counts for the current filters
     
     Features:
     - Advanced filtering (vendor, type, color, size, price range)
     - Search by name and description
-    - Sorting (price, newest, name)
+    - Sorting (price, newest, name, trending, best selling)
     - Pagination (24 per page)
     """
     
@@ -149,17 +182,20 @@ class ProductViewSet(viewsets.ReadOnlyModelViewSet):
         'base_price',     # Order by price (low to high or high to low)
         'created_at',     # Order by creation date (newest/oldest)
         'name',           # Order by name (A-Z or Z-A)
+        'trending',       # Precomputed time-decayed popularity (products.ranking)
+        'best_selling',   # Precomputed time-decayed units sold (products.ranking)
     ]
     
     # Default ordering
     # الترتيب الافتراضي
     ordering = ['-created_at']  # Default: newest first
 
-    # Cache time from settings (if defined)
-    _list_cache_timeout = getattr(settings, 'CACHE_TIMEOUTS', {}).get('products_list', 60 * 15)
-    _detail_cache_timeout = getattr(settings, 'CACHE_TIMEOUTS', {}).get('product_detail', 60 * 30)
-
-    @method_decorator(cache_page(_list_cache_timeout))
+    # Two-tier cache (core.cache); timeouts from CACHE_TIMEOUTS, invalidated
+    # on product / variant / category / vendor changes (ProductsConfig.ready).
+    # Responses carry ETag / Last-Modified: revalidations get 304
+    # كاش بمستويين؛ المهل من CACHE_TIMEOUTS ويُبطل عند تغيير الكتالوج،
+    # والطلبات الشرطية تحصل على 304
+    @cache_response('products_list')
     def list(self, request, *args, **kwargs):
         """
         List all products with caching
@@ -167,7 +203,7 @@ class ProductViewSet(viewsets.ReadOnlyModelViewSet):
         """
         return super().list(request, *args, **kwargs)
 
-    @method_decorator(cache_page(_detail_cache_timeout))
+    @cache_response('product_detail')
     def retrieve(self, request, *args, **kwargs):
         """
         Retrieve specific product with caching
@@ -186,7 +222,7 @@ class ProductViewSet(viewsets.ReadOnlyModelViewSet):
         Returns:
             QuerySet: Filtered product queryset
         """
-        queryset = Product.objects.select_related('vendor').prefetch_related('variants').all()
+        queryset = Product.objects.select_related(*CARD_SELECT_RELATED).prefetch_related(*CARD_PREFETCH_RELATED)
         
         # Filter by is_active if provided (optional)
         # الفلترة حسب is_active إذا تم توفيره (اختياري)
@@ -201,8 +237,23 @@ class ProductViewSet(viewsets.ReadOnlyModelViewSet):
             # الافتراضي: عرض المنتجات النشطة فقط
             queryset = queryset.filter(is_active=True)
         
+        # Ranking orderings read the ProductRanking side table (one join)
+        # ترتيبات الشعبية تقرأ جدول الترتيب الجانبي
+        ordering = self.request.query_params.get('ordering', '')
+        if any(term.strip().lstrip('-') in RANKINGS for term in ordering.split(',')):
+            queryset = annotate_rankings(queryset)
+        
         return queryset
     
+    def get_serializer_context(self):
+        """
+        Serialize each category once per response (CategorySerializer)
+        تسلسل كل فئة مرة واحدة لكل استجابة
+        """
+        context = super().get_serializer_context()
+        context['category_memo'] = {}
+        return context
+    
     def get_serializer_class(self):
         """
         Return appropriate serializer class based on action
@@ -219,6 +270,7 @@ class ProductViewSet(viewsets.ReadOnlyModelViewSet):
         return ProductSerializer
     
     @action(detail=True, methods=['get'], url_path='variants')
+    @cache_response('product_variants')
     def variants(self, request, pk=None):
         """
         Get all variants for a specific product
@@ -250,4 +302,319 @@ class ProductViewSet(viewsets.ReadOnlyModelViewSet):
             message='Product variants retrieved successfully.',
             status_code=status.HTTP_200_OK
         )
+    
+    @extend_schema(
+        summary='Frequently Bought Together',
+        description=(
+            'Cards of the products most often bought in the same order as this one, '
+            'best first. Precomputed offline from the order history '
+            '(manage.py update_recommendations); `score` is the share of this '
+            "product's orders that also contain the recommended product."
+        ),
+        parameters=[
+            OpenApiParameter(name='limit', type=int, description='Number of products (default and maximum: RECOMMENDATIONS_TOP_K)'),
+        ],
+    )
+    @action(detail=True, methods=['get'], url_path='related')
+    @cache_response('product_related')
+    def related(self, request, pk=None):
+        """
+        Get the products frequently bought together with a product
+        الحصول على المنتجات التي تُشترى غالباً مع منتج
+        
+        Endpoint: GET /api/products/{id}/related/?limit=4
+        
+        Reads the top-K list (ProductRecommendation) built by
+        products.recommendations, skipping inactive products; never
+        aggregates orders per request.
+        يقرأ قائمة أفضل K المحسوبة مسبقاً ولا يجمع الطلبات لكل طلب.
+        
+        Returns:
+            Response: {'product_id', 'results': [cards with `score`]}
+        """
+        top_k = getattr(settings, 'RECOMMENDATIONS_TOP_K', 12)
+        try:
+            limit = min(int(request.query_params.get('limit', top_k)), top_k)
+        except ValueError:
+            limit = 0
+        if limit < 1:
+            return error_response(
+                message='limit must be a positive integer.',
+                status_code=status.HTTP_400_BAD_REQUEST,
+            )
+        
+        product = get_object_or_404(Product.objects.filter(is_active=True).only('pk'), pk=pk)
+        scores = dict(
+            ProductRecommendation.objects.filter(product=product, recommended__is_active=True)
+            .order_by('rank')
+            .values_list('recommended_id', 'score')[:limit]
+        )
+        ranks = {pk: rank for rank, pk in enumerate(scores)}
+        products = sorted(
+            Product.objects.filter(pk__in=scores)
+            .select_related(*CARD_SELECT_RELATED)
+            .prefetch_related(*CARD_PREFETCH_RELATED),
+            key=lambda item: ranks[item.pk],
+        )
+        serializer = ProductSerializer(products, many=True, context=self.get_serializer_context())
+        return success_response(
+            data={
+                'product_id': product.pk,
+                'results': [
+                    {**card, 'score': scores[item.pk]}
+                    for item, card in zip(products, serializer.data)
+                ],
+            },
+            message='Related products retrieved successfully.',
+        )
+    
+    @extend_schema(
+        summary='Catalog Facets',
+        description=(
+            'Matching product counts per color, size, vendor, product type and price '
+            'bucket for the current filters (each facet ignores its own filter), plus '
+            'the price range. Accepts the same filters as the product list.'
+        ),
+    )
+    @action(detail=False, methods=['get'], url_path='facets')
+    @cache_response('product_facets', key=facets_cache_key)
+    def facets(self, request):
+        """
+        Get filter-chip counts for the current filters
+        الحصول على عدادات الفلاتر للفلاتر الحالية
+        
+        Endpoint: GET /api/products/facets/?color=red&vendor_slug=fifi
+        
+        One UNION ALL query (products.facets), cached per normalized filter
+        set: ordering and page parameters do not change the key.
+        استعلام واحد مخزن لكل مجموعة فلاتر موحدة.
+        """
+        filterset = self.filterset_class(request.query_params, queryset=Product.objects.none(), request=request)
+        if not filterset.is_valid():
+            return error_response(
+                message='Invalid filters.',
+                errors=filterset.errors,
+                status_code=status.HTTP_400_BAD_REQUEST,
+            )
+        return success_response(
+            data=product_facets(request, self.get_queryset(), self.filterset_class, view=self),
+            message='Facets retrieved successfully.',
+        )
+    
+    # Most products a batch request may name (ids and slugs together)
+    # الحد الأقصى للمنتجات في طلب الدفعة (المعرفات و slugs معاً)
+    batch_max_items = 50
+    
+    @extend_schema(
+        summary='Batch Product Cards',
+        description=(
+            'Product cards (list serializer) for up to 50 products in one request, '
+            'in the order requested. For wishlists, recently viewed and cart upsells.'
+        ),
+        parameters=[
+            OpenApiParameter(name='ids', type=str, description='Comma-separated product ids'),
+            OpenApiParameter(
+                name='slugs', type=str,
+                description='Comma-separated vendor_slug/product_slug pairs (product slugs are unique per vendor)',
+            ),
+        ],
+    )
+    @action(detail=False, methods=['get'], url_path='batch')
+    def batch(self, request):
+        """
+        Get the cards of several products at once
+        الحصول على بطاقات عدة منتجات دفعة واحدة
+        
+        Endpoint: GET /api/products/batch/?ids=12,7,31&slugs=fifi/summer-sneaker
+        
+        Each card is cached on its own (product_cards namespace): cached cards
+        come from one get_many, the rest from one query with prefetches and one
+        set_many. Inactive or unknown products are listed in `missing`.
+        كل بطاقة مخزنة وحدها: المخزنة من get_many واحد، والباقي من استعلام واحد.
+        
+        Returns:
+            Response: {'results': [cards in request order], 'missing': [ids / slugs]}
+        """
+        ids = _split(request.query_params.get('ids'))
+        slugs = _split(request.query_params.get('slugs'))
+        if len(ids) + len(slugs) > self.batch_max_items:
+            return error_response(
+                message=f'At most {self.batch_max_items} products per request.',
+                status_code=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            ids = [int(pk) for pk in ids]
+        except ValueError:
+            return error_response(
+                message='ids must be comma-separated integers.',
+                status_code=status.HTTP_400_BAD_REQUEST,
+            )
+        pairs = [slug.split('/', 1) for slug in slugs]
+        if any(len(pair) != 2 or not all(pair) for pair in pairs):
+            return error_response(
+                message='slugs must be vendor_slug/product_slug pairs.',
+                status_code=status.HTTP_400_BAD_REQUEST,
+            )
+        
+        # Cards embed absolute media URLs: key them by origin
+        # البطاقات تتضمن روابط مطلقة: المفتاح يتضمن الأصل
+        origin = request.build_absolute_uri('/')
+        slug_ids = product_cards.get_many([f'slug:{slug}' for slug in slugs])
+        wanted = list(dict.fromkeys(ids + [slug_ids[f'slug:{slug}'] for slug in slugs if f'slug:{slug}' in slug_ids]))
+        card_keys = {pk: f'{origin}|{pk}' for pk in wanted}
+        found = product_cards.get_many(card_keys.values())
+        cards = {pk: found[key] for pk, key in card_keys.items() if key in found}
+        
+        unresolved = [pair for slug, pair in zip(slugs, pairs) if f'slug:{slug}' not in slug_ids]
+        missing_ids = [pk for pk in wanted if pk not in cards]
+        if missing_ids or unresolved:
+            # One query (plus prefetches) for every card not cached
+            # استعلام واحد (مع الجلب المسبق) لكل البطاقات غير المخزنة
+            lookup = Q(pk__in=missing_ids)
+            for vendor_slug, product_slug in unresolved:
+                lookup |= Q(vendor__slug=vendor_slug, slug=product_slug)
+            products = list(
+                Product.objects.filter(lookup, is_active=True)
+                .select_related(*CARD_SELECT_RELATED)
+                .prefetch_related(*CARD_PREFETCH_RELATED)
+            )
+            serializer = ProductSerializer(products, many=True, context=self.get_serializer_context())
+            fresh = {}
+            for product, card in zip(products, serializer.data):
+                cards[product.pk] = card
+                fresh[f'{origin}|{product.pk}'] = card
+                slug = f'{product.vendor.slug}/{product.slug}'
+                slug_ids[f'slug:{slug}'] = product.pk
+                fresh[f'slug:{slug}'] = product.pk
+            product_cards.set_many(fresh)
+        
+        order = list(dict.fromkeys(ids + [slug_ids.get(f'slug:{slug}') for slug in slugs]))
+        missing = [pk for pk in ids if pk not in cards]
+        missing += [slug for slug in slugs if slug_ids.get(f'slug:{slug}') not in cards]
+        return success_response(
+            data={
+                'results': [cards[pk] for pk in order if pk in cards],
+                'missing': missing,
+            },
+            message='Products retrieved successfully.',
+        )
+    
+    @extend_schema(
+        summary='Top Products',
+        description=(
+            'Trending or best-selling products (precomputed time-decayed scores), '
+            'for the homepage. Accepts the product list filters, e.g. category or '
+            'vendor_slug for per-category / per-vendor lists. Products without '
+            'recent activity are left out.'
+        ),
+        parameters=[
+            OpenApiParameter(name='by', type=str, enum=RANKINGS, description='Ranking (default: trending)'),
+            OpenApiParameter(name='limit', type=int, description='Number of products (default 12, at most 50)'),
+        ],
+    )
+    @action(detail=False, methods=['get'], url_path='top')
+    @cache_response('homepage')
+    def top(self, request):
+        """
+        Get the top products of a ranking
+        الحصول على أفضل المنتجات حسب ترتيب
+        
+        Endpoint: GET /api/products/top/?by=best_selling&category=sneakers&limit=8
+        
+        One query (plus prefetches) over the ProductRanking index; cached in
+        the homepage namespace, invalidated by each ranking run.
+        استعلام واحد على فهرس الترتيب؛ يُبطل مع كل تشغيل لمهمة الترتيب.
+        
+        Returns:
+            Response: {'by', 'results': [cards, best first]}
+        """
+        by = request.query_params.get('by', TRENDING)
+        if by not in RANKINGS:
+            return error_response(
+                message=f'by must be one of: {", ".join(RANKINGS)}.',
+                status_code=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            limit = min(int(request.query_params.get('limit', 12)), self.batch_max_items)
+        except ValueError:
+            limit = 0
+        if limit < 1:
+            return error_response(
+                message='limit must be a positive integer.',
+                status_code=status.HTTP_400_BAD_REQUEST,
+            )
+        
+        products = (
+            self.filter_queryset(self.get_queryset())
+            .filter(**{f'ranking__{by}__gt': 0})
+            .order_by(f'-ranking__{by}', 'pk')[:limit]
+        )
+        serializer = ProductSerializer(products, many=True, context=self.get_serializer_context())
+        return success_response(
+            data={'by': by, 'results': serializer.data},
+            message='Top products retrieved successfully.',
+        )
 
+
+def _split(value):
+    """Non-empty items of a comma-separated query parameter"""
+    return [item.strip() for item in (value or '').split(',') if item.strip()]
+
+
+class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Category ViewSet
+    ViewSet للفئات
+    
+    Provides read-only access to active categories for the storefront.
+    يوفر وصول للقراءة فقط للفئات النشطة للواجهة.
+    
+    Endpoints:
+    - GET /api/products/categories/                  - List active categories (?is_featured=true)
+    - GET /api/products/categories/{slug}/           - Retrieve one category
+    - GET /api/products/categories/tree/             - Active categories as a tree
+    
+    Categories are few and change rarely: responses are not paginated and
+    are cached in the 'categories' namespace (invalidated on catalog changes).
+    الفئات قليلة ونادراً ما تتغير: بدون تقسيم صفحات ومخزنة في الكاش.
+    """
+    
+    serializer_class = CategorySerializer
+    permission_classes = [AllowAny]  # Public API
+    pagination_class = None
+    lookup_field = 'slug'
+    
+    def get_queryset(self):
+        """
+        Active categories, optionally only the featured ones
+        الفئات النشطة، مع إمكانية عرض المميزة فقط
+        """
+        queryset = Category.objects.filter(is_active=True).select_related('parent')
+        is_featured = self.request.query_params.get('is_featured')
+        if is_featured is not None:
+            queryset = queryset.filter(is_featured=is_featured.lower() in ('true', '1', 'yes'))
+        return queryset.order_by('display_order', 'name')
+    
+    @cache_response('categories')
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+    
+    @cache_response('categories')
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+    
+    @action(detail=False, methods=['get'], url_path='tree')
+    @cache_response('categories')
+    def tree(self, request):
+        """
+        Active root categories with their active subcategories
+        الفئات الجذرية النشطة مع فئاتها الفرعية النشطة
+        
+        Endpoint: GET /api/products/categories/tree/
+        """
+        roots = Category.objects.filter(is_active=True, parent__isnull=True).order_by('display_order', 'name')
+        serializer = CategoryTreeSerializer(roots, many=True, context={'request': request})
+        return success_response(
+            data=serializer.data,
+            message='Category tree retrieved successfully.',
+        )
@@ -4,3 +4,16 @@ from django.apps import AppConfig
 class PromotionsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "promotions"
+
+    def ready(self):
+        """
+        Generate banner/story image derivatives on upload
+        إنشاء مشتقات صور البانرات والقصص عند الرفع
+        """
+        from core.images import register_image_field
+        register_image_field(self.get_model('Banner'), 'image')
+        register_image_field(self.get_model('Story'), 'image')
+        
+        # Keep cached coupon rules in sync
+        # إبقاء قواعد الكوبونات المخزنة متزامنة
+        import promotions.signals
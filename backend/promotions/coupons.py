@@ -0,0 +1,319 @@
+"""
+Coupon Engine
+محرك الكوبونات
+
+Evaluates a coupon against a whole cart / order in memory and reserves
+its usage atomically.
+يقيّم الكوبون على كامل السلة / الطلب في الذاكرة ويحجز استخدامه بشكل ذري.
+
+How it works:
+1. get_coupon_rules(code) loads the coupon and its applicability sets
+   (product / category / user ids) once and caches them by code
+2. quote() checks validity and computes the eligible lines, the discount
+   and its per-line allocation without touching the database
+3. reserve_usage() increments used_count with a conditional UPDATE
+   (... WHERE used_count < usage_limit), so concurrent checkouts can never
+   overspend a limited coupon
+
+طريقة العمل:
+1. get_coupon_rules(code) تحمّل الكوبون ومجموعات التطبيق مرة واحدة وتخزنها مؤقتاً
+2. quote() تتحقق من الصلاحية وتحسب العناصر المؤهلة والخصم دون قاعدة البيانات
+3. reserve_usage() تزيد used_count بـ UPDATE شرطي حتى لا يُتجاوز حد الاستخدام
+
+Usage:
+    rules = get_coupon_rules(code)
+    result = quote(rules, cart_lines(cart), user_id=cart.user_id)
+    result.discount, result.allocations[item_id]
+
+    with transaction.atomic():
+        if not reserve_usage(rules.pk):
+            raise CouponError(...)
+"""
+
+from collections import namedtuple
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Q
+from django.utils import timezone
+
+from core.instrumentation import record_cache
+
+from .models import Coupon
+
+
+CACHE_PREFIX = 'coupon:code'
+
+MONEY_Q = Decimal('0.01')
+ZERO = Decimal('0.00')
+
+# Cached marker for unknown codes (avoids a query per guess)
+# علامة مخزنة للرموز غير الموجودة (تتجنب استعلاماً لكل محاولة)
+MISSING = 'missing'
+
+
+class CouponError(Exception):
+    """
+    Coupon cannot be applied (message is bilingual, safe to show).
+    لا يمكن تطبيق الكوبون (الرسالة ثنائية اللغة وآمنة للعرض).
+    """
+
+
+# One priced line of a cart or order
+# سطر مسعّر واحد من سلة أو طلب
+#   key: cart item id / variant id (used in allocations)
+CouponLine = namedtuple('CouponLine', ['key', 'product_id', 'category_id', 'quantity', 'price'])
+
+# Result of quote()
+# نتيجة quote()
+CouponQuote = namedtuple('CouponQuote', [
+    'coupon', 'subtotal', 'eligible_subtotal', 'discount', 'eligible_keys', 'allocations',
+])
+
+
+# =============================================================================
+# Rules
+# القواعد
+# =============================================================================
+
+class CouponRules:
+    """
+    Snapshot of a coupon and its applicability sets (cache-friendly).
+    لقطة من الكوبون ومجموعات التطبيق (مناسبة للتخزين المؤقت).
+
+    used_count is only a hint here; reserve_usage() is authoritative.
+    used_count هنا للإرشاد فقط؛ reserve_usage() هي المرجع.
+    """
+
+    def __init__(self, coupon, product_ids=(), category_ids=(), user_ids=()):
+        self.pk = coupon.pk
+        self.code = coupon.code
+        self.discount_type = coupon.discount_type
+        self.discount_value = coupon.discount_value
+        self.min_order = coupon.min_order
+        self.max_discount = coupon.max_discount
+        self.usage_limit = coupon.usage_limit
+        self.used_count = coupon.used_count
+        self.applicable_to = coupon.applicable_to
+        self.start_date = coupon.start_date
+        self.end_date = coupon.end_date
+        self.is_active = coupon.is_active
+        self.product_ids = frozenset(product_ids)
+        self.category_ids = frozenset(category_ids)
+        self.user_ids = frozenset(user_ids)
+
+    @classmethod
+    def load(cls, coupon):
+        """Build rules with one query per applicability set in use"""
+        product_ids = category_ids = user_ids = ()
+        if coupon.applicable_to == Coupon.ApplicableTo.PRODUCT:
+            product_ids = coupon.applicable_products.values_list('pk', flat=True)
+        elif coupon.applicable_to == Coupon.ApplicableTo.CATEGORY:
+            category_ids = coupon.applicable_categories.values_list('pk', flat=True)
+        elif coupon.applicable_to == Coupon.ApplicableTo.USER:
+            user_ids = coupon.applicable_users.values_list('pk', flat=True)
+        return cls(coupon, product_ids, category_ids, user_ids)
+
+    def check_live(self, now=None):
+        """Raise CouponError unless active, started, not expired and not used up"""
+        now = now or timezone.now()
+        if not self.is_active or (self.start_date and self.start_date > now):
+            raise CouponError('الكوبون غير فعال / Coupon is not active')
+        if self.end_date and self.end_date < now:
+            raise CouponError('انتهت صلاحية الكوبون / Coupon has expired')
+        if self.usage_limit is not None and self.used_count >= self.usage_limit:
+            raise CouponError('تم استنفاد الكوبون / Coupon usage limit reached')
+
+    def allows_user(self, user_id):
+        if self.applicable_to != Coupon.ApplicableTo.USER:
+            return True
+        return user_id is not None and user_id in self.user_ids
+
+    def applies_to(self, line):
+        if self.applicable_to == Coupon.ApplicableTo.PRODUCT:
+            return line.product_id in self.product_ids
+        if self.applicable_to == Coupon.ApplicableTo.CATEGORY:
+            return line.category_id in self.category_ids
+        # ALL / USER coupons apply to every line
+        # كوبونات ALL / USER تنطبق على جميع العناصر
+        return True
+
+
+def _cache_key(code):
+    return f'{CACHE_PREFIX}:{code.strip().upper()}'
+
+
+def get_coupon_rules(code):
+    """
+    Cached rules of the coupon with this code (case-insensitive), or None.
+    قواعد الكوبون المخزنة لهذا الرمز (بدون حساسية لحالة الأحرف)، أو None.
+    """
+    if not code or not code.strip():
+        return None
+    key = _cache_key(code)
+    rules = cache.get(key)
+    record_cache(rules is not None, 'coupons')
+    if rules is None:
+        coupon = Coupon.objects.filter(code__iexact=code.strip()).first()
+        rules = CouponRules.load(coupon) if coupon else MISSING
+        timeout = getattr(settings, 'CACHE_TIMEOUTS', {}).get('coupons', 60 * 5)
+        cache.set(key, rules, timeout)
+    return None if rules == MISSING else rules
+
+
+def invalidate_coupon(code):
+    """Drop the cached rules of a code / حذف القواعد المخزنة لرمز"""
+    if code:
+        cache.delete(_cache_key(code))
+
+
+# =============================================================================
+# Quote
+# حساب الخصم
+# =============================================================================
+
+def cart_lines(cart):
+    """
+    Coupon lines of a cart (one query).
+    أسطر السلة للكوبون (استعلام واحد).
+    """
+    rows = cart.items.values_list(
+        'pk', 'variant__product_id', 'variant__product__category_id', 'quantity', 'price',
+    )
+    return [CouponLine(*row) for row in rows]
+
+
+def allocate(amount, weights):
+    """
+    Split an amount over keys proportionally to their weights; the rounding
+    remainder goes to the last key so the parts add up exactly.
+    توزيع مبلغ على المفاتيح بنسبة أوزانها؛ باقي التقريب للمفتاح الأخير.
+
+    Args:
+        amount: Decimal to split
+        weights: {key: Decimal weight} (insertion order is kept)
+
+    Returns:
+        dict: {key: share}
+    """
+    base = sum(weights.values(), ZERO)
+    allocations = {}
+    remaining = amount
+    for index, (key, weight) in enumerate(weights.items()):
+        if index == len(weights) - 1:
+            share = remaining
+        else:
+            share = (amount * weight / base).quantize(MONEY_Q) if base else ZERO
+        allocations[key] = share
+        remaining -= share
+    return allocations
+
+
+def quote(rules, lines, user_id=None, now=None):
+    """
+    Validate the coupon for these lines and compute the discount in memory.
+    التحقق من الكوبون لهذه الأسطر وحساب الخصم في الذاكرة.
+
+    Percentage coupons apply to the eligible subtotal (capped by
+    max_discount); fixed coupons give at most the eligible subtotal.
+    min_order is checked against the whole subtotal.
+
+    Args:
+        rules: CouponRules (from get_coupon_rules)
+        lines: [CouponLine]
+        user_id: Customer id (for user-restricted coupons; None for guests)
+
+    Returns:
+        CouponQuote
+
+    Raises:
+        CouponError: Coupon cannot be applied to these lines
+    """
+    rules.check_live(now)
+    if not rules.allows_user(user_id):
+        raise CouponError('هذا الكوبون غير متاح لحسابك / Coupon is not available for your account')
+
+    subtotal = sum((line.price * line.quantity for line in lines), ZERO)
+    if subtotal < rules.min_order:
+        raise CouponError(
+            f'الحد الأدنى للطلب {rules.min_order} / Minimum order is {rules.min_order}'
+        )
+
+    eligible = [line for line in lines if rules.applies_to(line)]
+    if not eligible:
+        raise CouponError('لا توجد منتجات مؤهلة للكوبون / No items in the cart are eligible')
+    eligible_subtotal = sum((line.price * line.quantity for line in eligible), ZERO)
+
+    if rules.discount_type == Coupon.DiscountType.PERCENTAGE:
+        discount = eligible_subtotal * rules.discount_value / 100
+        if rules.max_discount:
+            discount = min(discount, rules.max_discount)
+    else:
+        discount = rules.discount_value
+    discount = min(discount, eligible_subtotal).quantize(MONEY_Q)
+
+    return CouponQuote(
+        coupon=rules,
+        subtotal=subtotal.quantize(MONEY_Q),
+        eligible_subtotal=eligible_subtotal.quantize(MONEY_Q),
+        discount=discount,
+        eligible_keys=[line.key for line in eligible],
+        allocations=allocate(discount, {line.key: line.price * line.quantity for line in eligible}),
+    )
+
+
+def quote_cart(cart):
+    """
+    Quote for the coupon applied to a cart.
+    حساب خصم الكوبون المطبق على السلة.
+
+    Returns:
+        tuple: (CouponQuote or None, error message or None)
+    """
+    if not cart.coupon_code:
+        return None, None
+    rules = get_coupon_rules(cart.coupon_code)
+    if rules is None:
+        return None, 'الكوبون غير موجود / Coupon not found'
+    try:
+        return quote(rules, cart_lines(cart), user_id=cart.user_id), None
+    except CouponError as e:
+        return None, str(e)
+
+
+# =============================================================================
+# Usage
+# الاستخدام
+# =============================================================================
+
+def reserve_usage(coupon_id):
+    """
+    Atomically take one use of a coupon.
+    حجز استخدام واحد للكوبون بشكل ذري.
+
+    UPDATE ... SET used_count = used_count + 1
+     WHERE id = %s AND is_active AND (usage_limit IS NULL OR used_count < usage_limit)
+
+    Call it inside the checkout transaction so a failed checkout rolls the
+    reservation back.
+    استدعها داخل transaction الشراء حتى يُلغى الحجز عند فشل الطلب.
+
+    Returns:
+        bool: False if the coupon is inactive or used up
+    """
+    return Coupon.objects.filter(
+        Q(usage_limit__isnull=True) | Q(used_count__lt=F('usage_limit')),
+        pk=coupon_id,
+        is_active=True,
+    ).update(used_count=F('used_count') + 1) == 1
+
+
+def release_usage(coupon_id):
+    """
+    Give back one use (e.g. when an order is cancelled).
+    إعادة استخدام واحد (مثلاً عند إلغاء الطلب).
+    """
+    return Coupon.objects.filter(pk=coupon_id, used_count__gt=0).update(
+        used_count=F('used_count') - 1
+    ) == 1
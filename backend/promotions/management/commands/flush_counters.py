@@ -0,0 +1,30 @@
+"""
+Flush Counters Command
+أمر تفريغ العدادات
+
+Writes pending Banner/Story view and click deltas to the database. The
+servers flush on their own while traffic comes in; run this from cron (or
+before deploys) so quiet periods don't leave deltas pending.
+
+يكتب فروقات مشاهدات ونقرات البانرات والقصص المعلقة في قاعدة البيانات.
+الخوادم تفرغها بنفسها أثناء الحركة؛ شغّله من cron حتى لا تبقى فروقات معلقة.
+
+Note: without Redis the deltas live inside each server process, so this
+command only sees its own (empty) store.
+ملاحظة: بدون Redis الفروقات داخل كل عملية خادم.
+
+Usage:
+    python manage.py flush_counters
+"""
+
+from django.core.management.base import BaseCommand
+
+from core.counters import flush_counters
+
+
+class Command(BaseCommand):
+    help = 'Flush pending view/click counters / تفريغ العدادات المعلقة'
+
+    def handle(self, *args, **options):
+        updated = flush_counters()
+        self.stdout.write(self.style.SUCCESS(f'Updated {updated} row(s)'))
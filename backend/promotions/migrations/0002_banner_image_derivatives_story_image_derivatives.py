@@ -0,0 +1,23 @@
+# Generated by Django 5.0 on 2026-10-19 02:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('promotions', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='banner',
+            name='image_derivatives',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Auto-generated resized copies / نسخ مصغرة مولدة تلقائياً', verbose_name='Image Derivatives / مشتقات الصورة'),
+        ),
+        migrations.AddField(
+            model_name='story',
+            name='image_derivatives',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Auto-generated resized copies / نسخ مصغرة مولدة تلقائياً', verbose_name='Image Derivatives / مشتقات الصورة'),
+        ),
+    ]
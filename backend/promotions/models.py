@@ -18,6 +18,22 @@ from django.utils.translation import gettext_lazy as _
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
 
+from core.counters import counter
+
+
+# =============================================================================
+# Counters
+# العدادات
+# =============================================================================
+# Views / clicks are buffered and flushed in batches (see core.counters);
+# the model fields hold the persisted part, live_* add the pending delta
+# المشاهدات / النقرات تُجمع وتُكتب على دفعات؛ الحقول تحمل القيمة المحفوظة
+# و live_* تضيف الفرق المعلق
+
+BANNER_VIEWS = counter('promotions.Banner', 'views')
+BANNER_CLICKS = counter('promotions.Banner', 'clicks')
+STORY_VIEWS = counter('promotions.Story', 'views')
+
 
 # =============================================================================
 # Banner Model
@@ -76,6 +92,13 @@ class Banner(models.Model):
         verbose_name=_('Image / الصورة'),
         help_text=_('Banner image / صورة البانر')
     )
+    image_derivatives = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name=_('Image Derivatives / مشتقات الصورة'),
+        help_text=_('Auto-generated resized copies / نسخ مصغرة مولدة تلقائياً')
+    )
     
     # Link Configuration / إعدادات الرابط
     link_type = models.CharField(
@@ -167,14 +190,22 @@ class Banner(models.Model):
         return True
     
     def increment_view(self):
-        """Increment view count / زيادة عدد المشاهدات"""
-        self.views = models.F('views') + 1
-        self.save(update_fields=['views'])
+        """Increment view count (buffered) / زيادة عدد المشاهدات (مؤجلة)"""
+        BANNER_VIEWS.incr(self.pk)
     
     def increment_click(self):
-        """Increment click count / زيادة عدد النقرات"""
-        self.clicks = models.F('clicks') + 1
-        self.save(update_fields=['clicks'])
+        """Increment click count (buffered) / زيادة عدد النقرات (مؤجلة)"""
+        BANNER_CLICKS.incr(self.pk)
+    
+    @property
+    def live_views(self):
+        """Persisted + pending views / المشاهدات المحفوظة + المعلقة"""
+        return BANNER_VIEWS.value(self)
+    
+    @property
+    def live_clicks(self):
+        """Persisted + pending clicks / النقرات المحفوظة + المعلقة"""
+        return BANNER_CLICKS.value(self)
 
 
 # =============================================================================
@@ -215,6 +246,13 @@ class Story(models.Model):
         verbose_name=_('Image / الصورة'),
         help_text=_('Story image / صورة القصة')
     )
+    image_derivatives = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name=_('Image Derivatives / مشتقات الصورة'),
+        help_text=_('Auto-generated resized copies / نسخ مصغرة مولدة تلقائياً')
+    )
     
     # Link Configuration / إعدادات الرابط
     link_type = models.CharField(
@@ -284,9 +322,13 @@ class Story(models.Model):
         return True
     
     def increment_view(self):
-        """Increment view count / زيادة عدد المشاهدات"""
-        self.views = models.F('views') + 1
-        self.save(update_fields=['views'])
+        """Increment view count (buffered) / زيادة عدد المشاهدات (مؤجلة)"""
+        STORY_VIEWS.incr(self.pk)
+    
+    @property
+    def live_views(self):
+        """Persisted + pending views / المشاهدات المحفوظة + المعلقة"""
+        return STORY_VIEWS.value(self)
 
 
 # =============================================================================
@@ -527,7 +569,10 @@ class Coupon(models.Model):
         return False
     
     def increment_usage(self):
-        """Increment usage count / زيادة عدد مرات الاستخدام"""
-        self.used_count = models.F('used_count') + 1
-        self.save(update_fields=['used_count'])
+        """
+        Take one use atomically (False when the usage limit is reached)
+        حجز استخدام واحد بشكل ذري (False عند بلوغ حد الاستخدام)
+        """
+        from promotions.coupons import reserve_usage
+        return reserve_usage(self.pk)
 
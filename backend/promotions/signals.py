@@ -0,0 +1,46 @@
+"""
+Promotions Signals
+إشارات العروض
+
+Keep the cached coupon rules (promotions.coupons) in sync with the database.
+إبقاء قواعد الكوبونات المخزنة مؤقتاً متزامنة مع قاعدة البيانات.
+"""
+
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .coupons import invalidate_coupon
+from .models import Coupon
+
+
+@receiver(pre_save, sender=Coupon)
+def invalidate_previous_code(sender, instance, **kwargs):
+    """Drop the old code's rules when the code is renamed"""
+    if instance.pk:
+        old_code = Coupon.objects.filter(pk=instance.pk).values_list('code', flat=True).first()
+        if old_code and old_code != instance.code:
+            invalidate_coupon(old_code)
+
+
+@receiver(post_save, sender=Coupon)
+@receiver(post_delete, sender=Coupon)
+def invalidate_coupon_rules(sender, instance, **kwargs):
+    """Drop the cached rules after any change / حذف القواعد المخزنة بعد أي تغيير"""
+    invalidate_coupon(instance.code)
+
+
+@receiver(m2m_changed, sender=Coupon.applicable_products.through)
+@receiver(m2m_changed, sender=Coupon.applicable_categories.through)
+@receiver(m2m_changed, sender=Coupon.applicable_users.through)
+def invalidate_coupon_sets(sender, instance, action, reverse, pk_set, **kwargs):
+    """Applicability sets changed / تغيرت مجموعات التطبيق"""
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        invalidate_coupon(instance.code)
+        return
+    # Changed from the product / category / user side
+    # تغيير من جهة المنتج / الفئة / المستخدم
+    coupons = Coupon.objects.all() if pk_set is None else Coupon.objects.filter(pk__in=pk_set)
+    for code in coupons.values_list('code', flat=True):
+        invalidate_coupon(code)
@@ -1,3 +1,211 @@
-from django.test import TestCase
+"""
+Coupon Engine Tests
+اختبارات محرك الكوبونات
 
-# Create your tests here.
+Run:
+    python manage.py test promotions
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.tests.base import generate_marketplace
+from orders.checkout import place_checkout
+from orders.models import Order
+from products.models import Category, Product, ProductVariant
+
+from .coupons import (
+    CouponError, CouponLine, CouponRules, get_coupon_rules, quote, reserve_usage,
+)
+from .models import Coupon
+
+
+def rules(product_ids=(), category_ids=(), user_ids=(), **fields):
+    """CouponRules of an unsaved coupon / قواعد كوبون غير محفوظ"""
+    fields.setdefault('code', 'TEST')
+    fields.setdefault('discount_value', Decimal('10'))
+    fields.setdefault('start_date', timezone.now() - timedelta(days=1))
+    return CouponRules(Coupon(**fields), product_ids, category_ids, user_ids)
+
+
+# key, product, category, quantity, price
+LINES = [
+    CouponLine(1, 10, 100, 1, Decimal('30.00')),
+    CouponLine(2, 20, 200, 2, Decimal('25.00')),
+    CouponLine(3, 30, 100, 1, Decimal('20.00')),
+]
+
+
+class QuoteTests(SimpleTestCase):
+    """
+    quote(): validity, eligible lines, discount and its allocation.
+    quote(): الصلاحية والأسطر المؤهلة والخصم وتوزيعه.
+    """
+
+    def test_percentage_capped_by_max_discount(self):
+        result = quote(rules(discount_value=Decimal('20'), max_discount=Decimal('15.00')), LINES)
+        self.assertEqual(result.subtotal, Decimal('100.00'))
+        self.assertEqual(result.discount, Decimal('15.00'))
+
+        result = quote(rules(discount_value=Decimal('10'), max_discount=Decimal('15.00')), LINES)
+        self.assertEqual(result.discount, Decimal('10.00'))
+
+    def test_fixed_capped_at_eligible_subtotal(self):
+        result = quote(rules(
+            product_ids=[30], applicable_to=Coupon.ApplicableTo.PRODUCT,
+            discount_type=Coupon.DiscountType.FIXED, discount_value=Decimal('50.00'),
+        ), LINES)
+        self.assertEqual(result.eligible_subtotal, Decimal('20.00'))
+        self.assertEqual(result.discount, Decimal('20.00'))
+        self.assertEqual(result.allocations, {3: Decimal('20.00')})
+
+    def test_min_order(self):
+        with self.assertRaises(CouponError):
+            quote(rules(min_order=Decimal('100.01')), LINES)
+        self.assertEqual(quote(rules(min_order=Decimal('100.00')), LINES).discount, Decimal('10.00'))
+
+    def test_product_applicability(self):
+        result = quote(rules(product_ids=[20], applicable_to=Coupon.ApplicableTo.PRODUCT), LINES)
+        self.assertEqual(result.eligible_keys, [2])
+        self.assertEqual(result.discount, Decimal('5.00'))
+        with self.assertRaises(CouponError):
+            quote(rules(product_ids=[99], applicable_to=Coupon.ApplicableTo.PRODUCT), LINES)
+
+    def test_category_applicability(self):
+        result = quote(rules(category_ids=[100], applicable_to=Coupon.ApplicableTo.CATEGORY), LINES)
+        self.assertEqual(result.eligible_keys, [1, 3])
+        self.assertEqual(result.eligible_subtotal, Decimal('50.00'))
+
+    def test_user_applicability(self):
+        user_rules = rules(user_ids=[7], applicable_to=Coupon.ApplicableTo.USER)
+        self.assertEqual(quote(user_rules, LINES, user_id=7).eligible_keys, [1, 2, 3])
+        for user_id in (8, None):
+            with self.assertRaises(CouponError):
+                quote(user_rules, LINES, user_id=user_id)
+
+    def test_allocation_remainder_on_last_line(self):
+        lines = [CouponLine(key, key, 1, 1, Decimal('10.00')) for key in (1, 2, 3)]
+        result = quote(rules(discount_type=Coupon.DiscountType.FIXED, discount_value=Decimal('10.00')), lines)
+        self.assertEqual(list(result.allocations.values()), [Decimal('3.33'), Decimal('3.33'), Decimal('3.34')])
+        self.assertEqual(sum(result.allocations.values()), result.discount)
+
+    def test_inactive_expired_and_used_up(self):
+        for fields in (
+            {'is_active': False},
+            {'end_date': timezone.now() - timedelta(minutes=1)},
+            {'usage_limit': 3, 'used_count': 3},
+        ):
+            with self.subTest(**fields), self.assertRaises(CouponError):
+                quote(rules(**fields), LINES)
+
+
+class CouponUsageTests(TestCase):
+    """
+    Atomic reservation and the cached rules.
+    الحجز الذري والقواعد المخزنة.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.coupon = Coupon.objects.create(
+            code='LIMITED', discount_value=Decimal('10'), usage_limit=2,
+            start_date=timezone.now() - timedelta(days=1),
+        )
+
+    def test_reserve_stops_at_usage_limit(self):
+        self.assertTrue(reserve_usage(self.coupon.pk))
+        self.assertTrue(reserve_usage(self.coupon.pk))
+        self.assertFalse(reserve_usage(self.coupon.pk))
+        self.coupon.refresh_from_db()
+        self.assertEqual(self.coupon.used_count, 2)
+
+    def test_rename_drops_old_code(self):
+        self.assertIsNotNone(get_coupon_rules('limited'))
+        self.coupon.code = 'RENAMED'
+        self.coupon.save()
+        self.assertIsNone(get_coupon_rules('LIMITED'))
+        self.assertEqual(get_coupon_rules('renamed').pk, self.coupon.pk)
+
+    def test_applicability_changes_drop_cached_rules(self):
+        category = Category.objects.create(name='Coupon Category', slug='coupon-category')
+        self.coupon.applicable_to = Coupon.ApplicableTo.CATEGORY
+        self.coupon.save()
+        self.assertEqual(get_coupon_rules('LIMITED').category_ids, frozenset())
+
+        self.coupon.applicable_categories.add(category)
+        self.assertEqual(get_coupon_rules('LIMITED').category_ids, {category.pk})
+
+        # From the category side / من جهة الفئة
+        category.coupons.clear()
+        self.assertEqual(get_coupon_rules('LIMITED').category_ids, frozenset())
+
+
+class CouponReleaseTests(TestCase):
+    """
+    Cancelled / deleted orders give their coupon use back, once per checkout.
+    الطلبات الملغاة / المحذوفة تعيد استخدام الكوبون مرة واحدة لكل عملية شراء.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        generate_marketplace(cls, 'tiny')
+        cls.coupon = Coupon.objects.create(
+            code='ONCE', discount_value=Decimal('10'), usage_limit=5,
+            start_date=timezone.now() - timedelta(days=1),
+        )
+        # The first variant of two different vendors
+        # متغير فعال من بائعين مختلفين
+        cls.variants = []
+        for vendor_id in Product.objects.values_list('vendor', flat=True).distinct().order_by('vendor')[:2]:
+            cls.variants.append(ProductVariant.objects.filter(product__vendor_id=vendor_id).order_by('pk').first())
+
+    def setUp(self):
+        cache.clear()
+
+    def used(self):
+        self.coupon.refresh_from_db()
+        return self.coupon.used_count
+
+    def checkout(self):
+        return place_checkout(
+            self.admin_user, [{'variant_id': variant.pk, 'quantity': 1} for variant in self.variants],
+            customer_name='Coupon Customer', customer_phone='+963911111111',
+            customer_address='Damascus', coupon_code='ONCE',
+        ).placed_orders
+
+    def cancel(self, order):
+        client = APIClient(SERVER_NAME='localhost')
+        client.force_authenticate(self.admin_user)
+        response = client.patch(f'/api/v1/orders/orders/{order.pk}/update-status/', {'status': 'cancelled'}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+    def test_cancelling_every_order_releases_once(self):
+        first, second = self.checkout()
+        self.assertEqual(self.used(), 1)
+
+        self.cancel(first)
+        self.assertEqual(self.used(), 1)
+        self.cancel(second)
+        self.assertEqual(self.used(), 0)
+
+        # Deleting already cancelled orders gives nothing back again
+        # حذف الطلبات الملغاة لا يعيد شيئاً مرة أخرى
+        Order.objects.filter(pk__in=[first.pk, second.pk]).delete()
+        self.assertEqual(self.used(), 0)
+
+    def test_deleting_the_checkout_orders_releases_once(self):
+        orders = self.checkout()
+        self.assertEqual(self.used(), 1)
+        Order.objects.filter(pk__in=[order.pk for order in orders]).delete()
+        self.assertEqual(self.used(), 0)
+
+    def test_cancel_then_delete_the_last_order(self):
+        first, second = self.checkout()
+        self.cancel(first)
+        Order.objects.get(pk=second.pk).delete()
+        self.assertEqual(self.used(), 0)
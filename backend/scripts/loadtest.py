@@ -0,0 +1,210 @@
+#!/usr/bin/env python
+"""
+Load Test Harness
+أداة اختبار الحمل
+
+Measures throughput and latency of the API with persistent (keep-alive)
+connections. Uses only the standard library.
+
+تقيس الإنتاجية وزمن الاستجابة للـ API باتصالات دائمة (keep-alive).
+تستخدم المكتبة القياسية فقط.
+
+Usage:
+    # Against a running server
+    python scripts/loadtest.py --url http://localhost:8000 -c 32 -d 20 \\
+        --path /api/v1/products/products/ --path /api/v1/settings/site/
+
+    # Start runserver and gunicorn locally and compare them
+    python scripts/loadtest.py --compare -c 32 -d 20 --path /api/v1/products/products/
+
+Output (per target):
+    requests, errors, req/s, p50 / p95 / p99 latency (ms), error status codes
+
+Note: DRF throttling answers 429 after a few hundred requests. --compare
+lifts THROTTLE_ANON_RATE for the servers it starts; for a running server
+set THROTTLE_ANON_RATE / THROTTLE_USER_RATE in its environment.
+ملاحظة: تحديد المعدل يُرجع 429؛ --compare يرفع الحد للخوادم التي يشغلها.
+"""
+
+import argparse
+import http.client
+import itertools
+from collections import Counter
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from urllib.parse import urlsplit
+
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+READINESS_PATH = '/health/ready/'
+
+
+# =============================================================================
+# Workload
+# عبء العمل
+# =============================================================================
+
+def _worker(host, port, paths, deadline, results, lock):
+    """One client: reuse a single connection until the deadline"""
+    latencies = []
+    errors = Counter()
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    for path in itertools.cycle(paths):
+        if time.perf_counter() >= deadline:
+            break
+        start = time.perf_counter()
+        try:
+            conn.request('GET', path, headers={'Accept': 'application/json'})
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 400:
+                errors[response.status] += 1
+            if response.getheader('Connection', '').lower() == 'close':
+                conn.close()
+                conn = http.client.HTTPConnection(host, port, timeout=30)
+        except (OSError, http.client.HTTPException) as e:
+            errors[type(e).__name__] += 1
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=30)
+            continue
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+
+    with lock:
+        results['latencies'].extend(latencies)
+        results['errors'].update(errors)
+
+
+def run_load(base_url, paths, concurrency, duration, warmup):
+    """
+    Run the workload and return a summary dict.
+    تشغيل عبء العمل وإرجاع ملخص.
+    """
+    parts = urlsplit(base_url)
+    host, port = parts.hostname, parts.port or 80
+
+    if warmup:
+        run_load(base_url, paths, concurrency, warmup, 0)
+
+    results = {'latencies': [], 'errors': Counter()}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+    threads = [
+        threading.Thread(target=_worker, args=(host, port, paths, deadline, results, lock))
+        for _ in range(concurrency)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(results['latencies'])
+    summary = {
+        'requests': len(latencies),
+        'errors': sum(results['errors'].values()),
+        'error_codes': dict(results['errors']),
+        'rps': len(latencies) / elapsed if elapsed else 0,
+    }
+    if len(latencies) >= 2:
+        quantiles = statistics.quantiles(latencies, n=100)
+        summary.update(p50=quantiles[49] * 1000, p95=quantiles[94] * 1000, p99=quantiles[98] * 1000)
+    else:
+        summary.update(p50=0, p95=0, p99=0)
+    return summary
+
+
+# =============================================================================
+# Local Servers (--compare)
+# الخوادم المحلية
+# =============================================================================
+
+def _wait_ready(base_url, timeout=60):
+    """Poll the readiness endpoint until the server answers"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(base_url + READINESS_PATH, timeout=2) as response:
+                if response.status == 200:
+                    return
+        except OSError:
+            time.sleep(0.5)
+    raise RuntimeError(f'Server at {base_url} did not become ready')
+
+
+def _start_server(name, port):
+    """Start runserver or gunicorn on 127.0.0.1:port"""
+    if name == 'runserver':
+        cmd = [sys.executable, 'manage.py', 'runserver', f'127.0.0.1:{port}', '--noreload']
+    else:
+        cmd = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--bind', f'127.0.0.1:{port}']
+    env = dict(
+        os.environ,
+        GUNICORN_ACCESSLOG='/dev/null',
+        THROTTLE_ANON_RATE='1000000/hour',
+        THROTTLE_USER_RATE='1000000/hour',
+    )
+    return subprocess.Popen(
+        cmd, cwd=BACKEND_DIR, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+
+def _print_table(rows):
+    """Print summaries as an aligned table"""
+    header = f"{'target':<14}{'requests':>10}{'errors':>8}{'req/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+    print(header)
+    print('-' * len(header))
+    for name, s in rows:
+        print(
+            f"{name:<14}{s['requests']:>10}{s['errors']:>8}{s['rps']:>10.1f}"
+            f"{s['p50']:>9.1f}{s['p95']:>9.1f}{s['p99']:>9.1f}"
+        )
+    for name, s in rows:
+        if s['error_codes']:
+            print(f"{name} errors: {s['error_codes']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='API load test / اختبار حمل الـ API')
+    parser.add_argument('--url', default='http://127.0.0.1:8000', help='Base URL of a running server')
+    parser.add_argument('--path', action='append', dest='paths', help='Path to request (repeatable)')
+    parser.add_argument('-c', '--concurrency', type=int, default=16, help='Concurrent clients')
+    parser.add_argument('-d', '--duration', type=float, default=15, help='Seconds per run')
+    parser.add_argument('--warmup', type=float, default=3, help='Warm-up seconds (not measured)')
+    parser.add_argument('--compare', action='store_true', help='Start runserver and gunicorn locally and compare')
+    parser.add_argument('--port', type=int, default=8765, help='First local port used by --compare')
+    args = parser.parse_args()
+
+    paths = args.paths or ['/api/v1/products/products/', '/api/v1/settings/site/']
+
+    if not args.compare:
+        _print_table([(args.url, run_load(args.url, paths, args.concurrency, args.duration, args.warmup))])
+        return
+
+    rows = []
+    for offset, name in enumerate(('runserver', 'gunicorn')):
+        port = args.port + offset
+        base_url = f'http://127.0.0.1:{port}'
+        server = _start_server(name, port)
+        try:
+            _wait_ready(base_url)
+            rows.append((name, run_load(base_url, paths, args.concurrency, args.duration, args.warmup)))
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+    _print_table(rows)
+    baseline, candidate = rows[0][1]['rps'], rows[1][1]['rps']
+    if baseline:
+        print(f'\ngunicorn throughput: {candidate / baseline:.2f}x runserver')
+
+
+if __name__ == '__main__':
+    main()
@@ -19,3 +19,11 @@ class SettingsAppConfig(AppConfig):
     verbose_name = 'Site Settings'  # الاسم المعروض في لوحة الإدارة
     verbose_name_ar = 'إعدادات الموقع'
 
+    def ready(self):
+        """
+        Drop the cached settings responses when any setting changes
+        إبطال كاش استجابات الإعدادات عند تغيير أي إعداد
+        """
+        from core.cache import invalidate_on_change
+
+        invalidate_on_change(['settings'], *self.get_models())
@@ -13,10 +13,10 @@ from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
-from django.utils.decorators import method_decorator
-from django.views.decorators.cache import cache_page
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 
+from core.cache import cache_response
+
 from .models import (
     SiteSettings,
     SocialLink,
@@ -39,9 +39,9 @@ from .serializers import (
 )
 
 
-# Cache duration constants (in seconds)
-# ثوابت مدة الكاش (بالثواني)
-CACHE_SHORT = 60 * 1        # 1 minute - للبيانات المتغيرة (ينتهي تلقائياً كل دقيقة)
+# Cache duration constants (in seconds); every settings response is also
+# invalidated when a settings model changes (SettingsAppConfig.ready)
+# ثوابت مدة الكاش (بالثواني)؛ وتُبطل الاستجابات عند تغيير أي إعداد
 CACHE_MEDIUM = 60 * 30      # 30 minutes - للبيانات شبه الثابتة
 CACHE_LONG = 60 * 60 * 24   # 24 hours - للبيانات الثابتة
 
@@ -78,7 +78,7 @@ class SiteSettingsView(APIView):
         tags=["Settings"],
         responses={200: SiteSettingsPublicSerializer}
     )
-    @method_decorator(cache_page(CACHE_MEDIUM))
+    @cache_response('settings', timeout=CACHE_MEDIUM)
     def get(self, request):
         """
         Get site settings.
@@ -119,7 +119,7 @@ class SocialLinksView(APIView):
         tags=["Settings"],
         responses={200: SocialLinkSerializer(many=True)}
     )
-    @method_decorator(cache_page(CACHE_LONG))
+    @cache_response('settings', timeout=CACHE_LONG)
     def get(self, request):
         """
         Get social links.
@@ -160,7 +160,7 @@ class LanguagesView(APIView):
         tags=["Settings"],
         responses={200: LanguageSerializer(many=True)}
     )
-    @method_decorator(cache_page(CACHE_LONG))
+    @cache_response('settings', timeout=CACHE_LONG)
     def get(self, request):
         """
         Get available languages.
@@ -212,7 +212,7 @@ class NavigationView(APIView):
         ],
         responses={200: NavigationMenuSerializer}
     )
-    @method_decorator(cache_page(CACHE_MEDIUM))
+    @cache_response('settings', timeout=CACHE_MEDIUM)
     def get(self, request):
         """
         Get navigation items.
@@ -292,7 +292,7 @@ class TrustSignalsView(APIView):
         tags=["Settings"],
         responses={200: TrustSignalSerializer(many=True)}
     )
-    @method_decorator(cache_page(CACHE_LONG))
+    @cache_response('settings', timeout=CACHE_LONG)
     def get(self, request):
         """
         Get trust signals.
@@ -333,7 +333,7 @@ class PaymentMethodsView(APIView):
         tags=["Settings"],
         responses={200: PaymentMethodSerializer(many=True)}
     )
-    @method_decorator(cache_page(CACHE_MEDIUM))
+    @cache_response('settings', timeout=CACHE_MEDIUM)
     def get(self, request):
         """
         Get payment methods.
@@ -374,7 +374,7 @@ class ShippingMethodsView(APIView):
         tags=["Settings"],
         responses={200: ShippingMethodSerializer(many=True)}
     )
-    @method_decorator(cache_page(CACHE_MEDIUM))
+    @cache_response('settings', timeout=CACHE_MEDIUM)
     def get(self, request):
         """
         Get shipping methods.
@@ -407,6 +407,10 @@ class AllSettingsView(APIView):
     This is optimized for initial page load to reduce API calls.
     محسّن للتحميل الأولي للصفحة لتقليل استدعاءات API.
     
+    Clients revalidating with If-None-Match / If-Modified-Since get an
+    empty 304 while the settings are unchanged.
+    العملاء الذين يعيدون التحقق يحصلون على 304 فارغة ما دامت الإعدادات لم تتغير.
+    
     Endpoint: GET /api/v1/settings/all/
     """
     
@@ -418,7 +422,7 @@ class AllSettingsView(APIView):
         tags=["Settings"],
         responses={200: AllSettingsSerializer}
     )
-    @method_decorator(cache_page(CACHE_SHORT))
+    @cache_response('settings')
     def get(self, request):
         """
         Get all settings.
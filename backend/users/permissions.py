@@ -145,14 +145,10 @@ class IsVendorOwner(permissions.BasePermission):
         else:
             return False
         
-        # Check if user is owner of this vendor
-        # التحقق من إذا كان المستخدم مالك هذا البائع
-        from .models import VendorUser
-        return VendorUser.objects.filter(
-            user=request.user,
-            vendor=vendor,
-            is_owner=True
-        ).exists()
+        # Check if user is owner of this vendor (memberships loaded once per request)
+        # التحقق من إذا كان المستخدم مالك هذا البائع (العضويات تُحمّل مرة لكل طلب)
+        from .principal import get_principal
+        return get_principal(request).owns_vendor(vendor.pk)
 
 
 # ============================================================================
@@ -0,0 +1,184 @@
+"""
+Request Principal
+هوية الطلب
+
+Who is calling, resolved once per request: the authenticated user, its
+vendor memberships (VendorUser) and its admin role / permissions.
+Permission classes and views of the same request share one instance, so
+the VendorUser lookup runs at most once per request instead of once in
+every permission check and again in the view.
+
+من يستدعي الـ API، تُحل مرة واحدة لكل طلب: المستخدم المسجل وعضويات البائع
+ودور الأدمن وصلاحياته. كلاسات الصلاحيات والعروض في نفس الطلب تتشارك نسخة
+واحدة، فيُنفذ استعلام VendorUser مرة واحدة على الأكثر لكل طلب.
+
+Usage:
+    principal = get_principal(request)
+    principal.vendor, principal.vendor_id, principal.vendor_ids
+    principal.is_vendor_owner, principal.has_vendor_permission('can_view_orders')
+    principal.admin_role, principal.has_admin_permission('orders.edit')
+
+    vendor_user = get_vendor_user(request)   # raises VendorUser.DoesNotExist
+
+The principal is memoized on the underlying Django request (shared by the
+DRF Request wrapper) and is rebuilt if the authenticated user changes.
+الهوية تُحفظ على طلب Django الأساسي وتُعاد بناؤها إذا تغير المستخدم.
+"""
+
+from django.utils.functional import cached_property
+
+from .models import VendorUser
+
+
+class Principal:
+    """
+    Identity and permissions of the user behind a request.
+    هوية وصلاحيات المستخدم خلف الطلب.
+
+    Args:
+        user: request.user (may be anonymous)
+    """
+
+    def __init__(self, user):
+        self.user = user
+
+    @property
+    def is_authenticated(self):
+        return bool(self.user and self.user.is_authenticated)
+
+    # -------------------------------------------------------------------------
+    # Vendor identity
+    # هوية البائع
+    # -------------------------------------------------------------------------
+
+    @cached_property
+    def vendor_memberships(self):
+        """
+        VendorUser rows of the user with their vendor (one query, on first use).
+        صفوف VendorUser للمستخدم مع البائع (استعلام واحد عند أول استخدام).
+        """
+        if not self.is_authenticated:
+            return []
+        memberships = list(
+            VendorUser.objects
+            .select_related('vendor')
+            .filter(user=self.user)
+            .order_by('pk')
+        )
+        # Share the already loaded user instead of joining it again
+        # مشاركة المستخدم المحمّل بدلاً من ربطه مجدداً
+        for membership in memberships:
+            membership.user = self.user
+        return memberships
+
+    @property
+    def vendor_user(self):
+        """Primary VendorUser of the user, or None / عضوية البائع الأساسية"""
+        memberships = self.vendor_memberships
+        return memberships[0] if memberships else None
+
+    @property
+    def vendor(self):
+        vendor_user = self.vendor_user
+        return vendor_user.vendor if vendor_user else None
+
+    @property
+    def vendor_id(self):
+        vendor_user = self.vendor_user
+        return vendor_user.vendor_id if vendor_user else None
+
+    @property
+    def vendor_ids(self):
+        """Ids of every vendor the user belongs to / معرفات جميع بائعي المستخدم"""
+        return [membership.vendor_id for membership in self.vendor_memberships]
+
+    @property
+    def is_vendor_member(self):
+        return bool(self.vendor_memberships)
+
+    @property
+    def is_vendor_owner(self):
+        vendor_user = self.vendor_user
+        return bool(vendor_user and vendor_user.is_owner)
+
+    def owns_vendor(self, vendor_id):
+        """Is the user an owner of this vendor? / هل المستخدم مالك هذا البائع؟"""
+        return any(
+            membership.is_owner and membership.vendor_id == vendor_id
+            for membership in self.vendor_memberships
+        )
+
+    @cached_property
+    def vendor_permissions(self):
+        """
+        Granted vendor permission names (VendorUser.permissions entries set
+        to true; owners are granted everything by has_vendor_permission).
+        أسماء صلاحيات البائع الممنوحة.
+        """
+        vendor_user = self.vendor_user
+        if not vendor_user or not isinstance(vendor_user.permissions, dict):
+            return frozenset()
+        return frozenset(name for name, granted in vendor_user.permissions.items() if granted)
+
+    def has_vendor_permission(self, name):
+        return self.is_vendor_owner or name in self.vendor_permissions
+
+    # -------------------------------------------------------------------------
+    # Admin identity
+    # هوية الأدمن
+    # -------------------------------------------------------------------------
+
+    @cached_property
+    def admin_role(self):
+        from admin_api.permissions import get_admin_role
+        return get_admin_role(self.user)
+
+    @cached_property
+    def admin_permissions(self):
+        """Admin permission strings in get_user_permissions order"""
+        from admin_api.permissions import get_user_permissions
+        return tuple(get_user_permissions(self.user))
+
+    def has_admin_permission(self, name):
+        return name in self.admin_permissions
+
+
+def get_principal(request):
+    """
+    Principal of a request (DRF or Django), resolved once per request.
+    هوية الطلب (DRF أو Django)، تُحل مرة واحدة لكل طلب.
+    """
+    http_request = getattr(request, '_request', request)
+    user = getattr(request, 'user', None)
+    principal = getattr(http_request, '_principal', None)
+    if principal is None or principal.user is not user:
+        principal = Principal(user)
+        http_request._principal = principal
+    return principal
+
+
+def principal_for(user, request=None):
+    """
+    Principal of `user`: the request's own when it is the caller, else a
+    fresh one (e.g. a serializer rendering another account).
+    هوية `user`: هوية الطلب إذا كان هو المستدعي، وإلا نسخة جديدة.
+    """
+    if request is not None and getattr(request, 'user', None) == user:
+        return get_principal(request)
+    return Principal(user)
+
+
+def get_vendor_user(request):
+    """
+    VendorUser (with vendor) of the authenticated user.
+    عضوية البائع (مع البائع) للمستخدم المسجل.
+
+    Drop-in for VendorUser.objects.select_related('vendor').get(user=request.user).
+
+    Raises:
+        VendorUser.DoesNotExist: User is not associated with a vendor
+    """
+    vendor_user = get_principal(request).vendor_user
+    if vendor_user is None:
+        raise VendorUser.DoesNotExist('No vendor associated with this user.')
+    return vendor_user
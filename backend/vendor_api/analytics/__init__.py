@@ -0,0 +1,27 @@
+"""
+Vendor Analytics Engines
+محركات تحليلات البائع
+
+SQL aggregation helpers shared by the vendor analytics views.
+دوال تجميع SQL مشتركة بين عروض تحليلات البائع.
+"""
+
+from .time_buckets import (
+    vendor_timezone,
+    time_analysis,
+)
+from .periods import (
+    vendor_order_items,
+    sales_comparison,
+    new_customers,
+    revenue_series,
+)
+
+__all__ = [
+    'vendor_timezone',
+    'time_analysis',
+    'vendor_order_items',
+    'sales_comparison',
+    'new_customers',
+    'revenue_series',
+]
@@ -0,0 +1,107 @@
+"""
+Vendor Period Metrics
+مؤشرات فترات البائع
+
+Shared sales metrics for the vendor analytics endpoints, evaluated with
+core.comparison so the overview and comparison views report identical
+numbers for the same window (and share the memoized result).
+
+مؤشرات مبيعات مشتركة لنقاط تحليلات البائع، تُحسب عبر core.comparison حتى
+تعرض نقاط النظرة العامة والمقارنة نفس الأرقام لنفس النافذة.
+"""
+
+from django.db.models import Case, CharField, F, Min, Q, Value, When
+from django.db.models.functions import Cast, Coalesce, Concat, NullIf
+
+from core.comparison import Window, compare, count, series, total, window_q
+
+
+# Date field of order items used for all vendor windows
+# حقل التاريخ لعناصر الطلب المستخدم لجميع نوافذ البائع
+DATE_FIELD = 'order__created_at'
+
+# Guest identity, as the per-order loops it replaces: name, else phone,
+# else one customer per order
+# هوية الضيف: الاسم، وإلا الهاتف، وإلا زبون لكل طلب
+GUEST_KEY = Coalesce(
+    NullIf('order__customer_name', Value('')),
+    NullIf('order__customer_phone', Value('')),
+    Concat(Value('guest_'), Cast('order_id', CharField())),
+    output_field=CharField(),
+)
+
+# One customer: the user if registered, else the guest identity
+# زبون واحد: المستخدم إن كان مسجلاً، وإلا هوية الضيف
+CUSTOMER_KEY = Case(
+    When(order__user__isnull=False, then=Concat(Value('user_'), Cast('order__user_id', CharField()))),
+    default=Concat(Value('guest:'), GUEST_KEY),
+    output_field=CharField(),
+)
+
+SALES_METRICS = {
+    'revenue': total(F('price') * F('quantity')),
+    'orders': count('order_id', distinct=True),
+    # Registered customers by user, guests by GUEST_KEY
+    # الزبائن المسجلون حسب المستخدم، والضيوف حسب GUEST_KEY
+    'registered_customers': count('order__user_id', distinct=True),
+    'guest_customers': count(GUEST_KEY, distinct=True, condition=Q(order__user__isnull=True)),
+}
+
+
+def vendor_order_items(vendor):
+    """Order items of the vendor (denormalized OrderItem.vendor)"""
+    from orders.models import OrderItem
+
+    return OrderItem.objects.filter(vendor=vendor)
+
+
+def _with_customers(values):
+    values['customers'] = values['registered_customers'] + values['guest_customers']
+    return values
+
+
+def sales_comparison(vendor, current, previous=None):
+    """
+    Revenue / orders / customers for current vs previous window (1 query, memoized).
+    الإيرادات / الطلبات / الزبائن للفترة الحالية مقابل السابقة.
+
+    Returns:
+        core.comparison.Comparison with an extra derived 'customers' metric
+    """
+    result = compare(
+        vendor_order_items(vendor), SALES_METRICS, current, previous,
+        date_field=DATE_FIELD, scope=f'vendor:{vendor.pk}:sales',
+    )
+    result.current = _with_customers(dict(result.current))
+    result.previous = _with_customers(dict(result.previous))
+    return result
+
+
+def new_customers(vendor, window):
+    """
+    Customers whose first order from the vendor falls in `window` (1 query).
+    الزبائن الذين يقع أول طلب لهم من البائع ضمن النافذة (استعلام واحد).
+
+    Groups the vendor's items up to the window end by CUSTOMER_KEY and
+    counts the groups whose earliest order date is inside the window.
+    """
+    first_orders = (
+        vendor_order_items(vendor)
+        .filter(window_q(DATE_FIELD, Window(None, window.end)))
+        .values(customer=CUSTOMER_KEY)
+        .annotate(first_order=Min(DATE_FIELD))
+        .filter(window_q('first_order', window))
+    )
+    return first_orders.count()
+
+
+def revenue_series(vendor, current, previous=None, unit='day', tz=None):
+    """
+    Aligned revenue series for current vs previous window (1 query, memoized).
+    سلسلة الإيرادات المتحاذية للفترة الحالية مقابل السابقة.
+    """
+    return series(
+        vendor_order_items(vendor), {'revenue': SALES_METRICS['revenue']},
+        current, previous, unit=unit, date_field=DATE_FIELD, tz=tz,
+        scope=f'vendor:{vendor.pk}:sales',
+    )
@@ -0,0 +1,227 @@
+"""
+Vendor Time Buckets
+تجميع مبيعات البائع حسب الوقت
+
+This module computes the hour-of-day x day-of-week heatmap and the
+12-month series for VendorTimeAnalysisView.
+هذا الوحدة تحسب خريطة الساعة × يوم الأسبوع والسلسلة الشهرية (12 شهراً)
+لعرض التحليل الزمني للبائع.
+
+How it works:
+1. Order items are grouped in SQL by ExtractHour / ExtractIsoWeekDay
+   (and TruncMonth) in the vendor's timezone - 2 queries in total,
+   independent of the number of orders
+2. Hourly and weekday totals are folded from the 7x24 cells in Python
+   (each order falls in exactly one cell, so order counts add up)
+3. The payload is cached per (vendor, timezone, range)
+
+طريقة العمل:
+1. عناصر الطلبات تُجمع في SQL حسب الساعة ويوم الأسبوع (والشهر) بالمنطقة
+   الزمنية للبائع - استعلامان فقط بغض النظر عن عدد الطلبات
+2. مجاميع الساعات والأيام تُحسب من خلايا 7×24 في Python
+3. النتيجة تُخزن مؤقتاً لكل (بائع، منطقة زمنية، نطاق)
+
+Payload format (revenue values are strings, like the rest of the API):
+    {
+        'timezone': 'Asia/Damascus',
+        'heatmap_revenue': [[...24 values] x 7 days],   # Monday first
+        'heatmap_orders': [[...24 values] x 7 days],
+        'hourly_revenue', 'hourly_orders', 'best_selling_hour',
+        'day_of_week_revenue', 'day_of_week_orders', 'best_selling_day',
+        'months': ['2026-01', ...], 'monthly_revenue', 'monthly_orders',
+    }
+"""
+
+from datetime import datetime
+from decimal import Decimal
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, DecimalField, F, Sum
+from django.db.models.functions import ExtractHour, ExtractIsoWeekDay, TruncMonth
+from django.utils import timezone
+
+from core.instrumentation import record_cache
+from vendor_api.analytics.periods import vendor_order_items
+
+
+HOURS = 24
+DAYS = 7
+MONTHS = 12
+
+CACHE_PREFIX = 'vendor_analytics:time'
+
+CENT = Decimal('0.01')
+
+
+# =============================================================================
+# Helpers
+# دوال مساعدة
+# =============================================================================
+
+def vendor_timezone(vendor):
+    """
+    Store timezone of a vendor (settings.TIME_ZONE if not configured).
+    المنطقة الزمنية لمتجر البائع (settings.TIME_ZONE إذا لم تُحدد).
+    """
+    from vendors.models import VendorSettings
+
+    vendor_settings = VendorSettings.objects.filter(vendor=vendor).first()
+    if vendor_settings is None:
+        return ZoneInfo(settings.TIME_ZONE)
+    return vendor_settings.get_timezone()
+
+
+def _vendor_items(vendor, date_from, date_to):
+    """Order items of the vendor's products placed within [date_from, date_to]"""
+    return vendor_order_items(vendor).filter(
+        order__created_at__gte=date_from,
+        order__created_at__lte=date_to,
+    )
+
+
+def _sales_totals(queryset):
+    """Annotate grouped rows with revenue (price x quantity) and distinct orders"""
+    return queryset.annotate(
+        revenue=Sum(
+            F('price') * F('quantity'),
+            output_field=DecimalField(max_digits=14, decimal_places=2),
+        ),
+        orders=Count('order_id', distinct=True),
+    ).order_by()
+
+
+def _money(value):
+    return str((value or Decimal('0')).quantize(CENT))
+
+
+def _best_index(values):
+    """Index of the highest positive value (first one on ties), or None"""
+    best = None
+    for index, value in enumerate(values):
+        if value > 0 and (best is None or value > values[best]):
+            best = index
+    return best
+
+
+def _last_months(local_now):
+    """(year, month) pairs of the last MONTHS calendar months, oldest first"""
+    current = local_now.year * 12 + local_now.month - 1
+    return [divmod(current - offset, 12) for offset in range(MONTHS - 1, -1, -1)]
+
+
+# =============================================================================
+# Queries
+# الاستعلامات
+# =============================================================================
+
+def _heatmap(vendor, date_from, date_to, tz):
+    """7x24 revenue / order-count matrices (rows: Monday..Sunday)"""
+    revenue = [[Decimal('0')] * HOURS for _ in range(DAYS)]
+    orders = [[0] * HOURS for _ in range(DAYS)]
+
+    rows = _sales_totals(
+        _vendor_items(vendor, date_from, date_to)
+        .annotate(
+            hour=ExtractHour('order__created_at', tzinfo=tz),
+            weekday=ExtractIsoWeekDay('order__created_at', tzinfo=tz),
+        )
+        .values('weekday', 'hour')
+    )
+    for row in rows:
+        # ISO weekday: 1 = Monday ... 7 = Sunday
+        # يوم ISO: 1 = الاثنين ... 7 = الأحد
+        day = row['weekday'] - 1
+        revenue[day][row['hour']] += row['revenue'] or Decimal('0')
+        orders[day][row['hour']] += row['orders']
+    return revenue, orders
+
+
+def _monthly(vendor, now, tz):
+    """Revenue / orders for the last MONTHS calendar months in the vendor's timezone"""
+    months = _last_months(now.astimezone(tz))
+    first_year, first_index = months[0]
+    start = datetime(first_year, first_index + 1, 1, tzinfo=tz)
+
+    totals = {}
+    rows = _sales_totals(
+        _vendor_items(vendor, start, now)
+        .annotate(month=TruncMonth('order__created_at', tzinfo=tz))
+        .values('month')
+    )
+    for row in rows:
+        month = row['month'].astimezone(tz)
+        totals[(month.year, month.month - 1)] = row
+
+    labels, revenue, orders = [], [], []
+    for year, month_index in months:
+        row = totals.get((year, month_index), {})
+        labels.append(f'{year:04d}-{month_index + 1:02d}')
+        revenue.append(_money(row.get('revenue')))
+        orders.append(row.get('orders', 0))
+    return labels, revenue, orders
+
+
+# =============================================================================
+# Public API
+# الواجهة العامة
+# =============================================================================
+
+def time_analysis(vendor, date_from, date_to, tz=None, now=None):
+    """
+    Heatmap, hourly / weekday totals and 12-month series for a vendor (cached).
+    خريطة المبيعات ومجاميع الساعات والأيام والسلسلة الشهرية للبائع (مع cache).
+
+    Args:
+        vendor: Vendor instance
+        date_from / date_to: Aware datetimes bounding the heatmap
+        tz: tzinfo for bucketing (default: the vendor's store timezone)
+        now: Reference time for the monthly series (default: timezone.now())
+
+    Returns:
+        dict: Payload described in the module docstring
+    """
+    tz = tz or vendor_timezone(vendor)
+    now = now or timezone.now()
+
+    cache_key = ':'.join([
+        CACHE_PREFIX,
+        str(vendor.pk),
+        str(tz),
+        date_from.strftime('%Y%m%d%H%M'),
+        date_to.strftime('%Y%m%d%H%M'),
+        now.astimezone(tz).strftime('%Y%m'),
+    ])
+    data = cache.get(cache_key)
+    record_cache(data is not None, 'vendor_analytics')
+    if data is not None:
+        return data
+
+    cell_revenue, cell_orders = _heatmap(vendor, date_from, date_to, tz)
+
+    hourly_revenue = [sum(day[hour] for day in cell_revenue) for hour in range(HOURS)]
+    hourly_orders = [sum(day[hour] for day in cell_orders) for hour in range(HOURS)]
+    day_revenue = [sum(day) for day in cell_revenue]
+    day_orders = [sum(day) for day in cell_orders]
+
+    month_labels, month_revenue, month_orders = _monthly(vendor, now, tz)
+
+    data = {
+        'timezone': str(tz),
+        'heatmap_revenue': [[_money(value) for value in day] for day in cell_revenue],
+        'heatmap_orders': cell_orders,
+        'hourly_revenue': [_money(value) for value in hourly_revenue],
+        'hourly_orders': hourly_orders,
+        'best_selling_hour': _best_index(hourly_revenue),
+        'day_of_week_revenue': [_money(value) for value in day_revenue],
+        'day_of_week_orders': day_orders,
+        'best_selling_day': _best_index(day_revenue),
+        'months': month_labels,
+        'monthly_revenue': month_revenue,
+        'monthly_orders': month_orders,
+    }
+
+    timeout = getattr(settings, 'CACHE_TIMEOUTS', {}).get('vendor_analytics', 60 * 5)
+    cache.set(cache_key, data, timeout)
+    return data
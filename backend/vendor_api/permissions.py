@@ -13,7 +13,7 @@ Security Features:
 
 from rest_framework.permissions import BasePermission
 from users.permissions import IsVendor
-from users.models import VendorUser
+from users.principal import get_principal
 
 
 # =============================================================================
@@ -68,9 +68,10 @@ class IsVendorOwner(BasePermission):
         if request.user.role != 'vendor':
             return False
         
-        # Check if user is associated with a vendor
-        # التحقق من أن المستخدم مرتبط ببائع
-        return VendorUser.objects.filter(user=request.user).exists()
+        # Check if user is associated with a vendor (resolved once per request,
+        # shared with the view)
+        # التحقق من أن المستخدم مرتبط ببائع (يُحل مرة واحدة لكل طلب ويُشارك مع العرض)
+        return get_principal(request).is_vendor_member
     
     def has_object_permission(self, request, view, obj):
         """
@@ -82,12 +83,10 @@ class IsVendorOwner(BasePermission):
         """
         # Get vendor associated with the user
         # الحصول على البائع المرتبط بالمستخدم
-        vendor_user = VendorUser.objects.filter(user=request.user).first()
-        if not vendor_user:
+        vendor = get_principal(request).vendor
+        if vendor is None:
             return False
         
-        vendor = vendor_user.vendor
-        
         # Check if object belongs to this vendor
         # التحقق من أن الكائن ينتمي لهذا البائع
         if hasattr(obj, 'vendor'):
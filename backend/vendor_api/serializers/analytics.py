@@ -45,7 +45,18 @@ class VendorAnalyticsOverviewSerializer(serializers.Serializer):
     )
     conversion_rate = serializers.FloatField(
         allow_null=True,
-        help_text=_('معدل التحويل / Conversion rate')
+        help_text=_('معدل التحويل (طلبات لكل 100 زيارة) / Conversion rate (orders per 100 visits)')
+    )
+    
+    # Funnel Metrics
+    visits = serializers.IntegerField(
+        help_text=_('زيارات المنتجات / Product visits (unique visitors per product per day)')
+    )
+    product_views = serializers.IntegerField(
+        help_text=_('مشاهدات المنتجات / Product views')
+    )
+    add_to_cart = serializers.IntegerField(
+        help_text=_('الإضافات للسلة / Add-to-cart events')
     )
     
     # Customer Metrics
@@ -330,6 +341,20 @@ class VendorTimeAnalysisSerializer(serializers.Serializer):
         help_text=_('أفضل يوم بيع / Best selling day')
     )
     
+    # Hour x Day Heatmap (rows: Monday..Sunday, columns: hours 0-23)
+    # خريطة الساعة × اليوم (الصفوف: الاثنين..الأحد، الأعمدة: الساعات 0-23)
+    heatmap_revenue = serializers.ListField(
+        child=serializers.ListField(child=serializers.CharField()),
+        help_text=_('الإيرادات لكل يوم × ساعة (7×24) / Revenue per day x hour (7x24)')
+    )
+    heatmap_orders = serializers.ListField(
+        child=serializers.ListField(child=serializers.IntegerField()),
+        help_text=_('عدد الطلبات لكل يوم × ساعة (7×24) / Orders per day x hour (7x24)')
+    )
+    timezone = serializers.CharField(
+        help_text=_('المنطقة الزمنية المستخدمة للتجميع / Timezone used for bucketing')
+    )
+    
     # Seasonal Trends (Monthly)
     monthly_labels = serializers.ListField(
         child=serializers.CharField(),
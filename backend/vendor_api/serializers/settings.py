@@ -6,6 +6,8 @@ This file contains serializers for Vendor Settings data.
 هذا الملف يحتوي على serializers لبيانات إعدادات البائع.
 """
 
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
 from rest_framework import serializers
 from django.utils.translation import gettext_lazy as _
 from django.contrib.auth import get_user_model
@@ -283,6 +285,24 @@ class VendorStoreSettingsUpdateSerializer(serializers.Serializer):
         allow_null=True,
         help_text=_('أرشفة الطلبات تلقائياً بعد X يوم / Auto-archive orders after X days')
     )
+    timezone = serializers.CharField(
+        max_length=64,
+        required=False,
+        help_text=_('المنطقة الزمنية للمتجر (IANA) / Store timezone (IANA), e.g. Asia/Damascus')
+    )
+    
+    def validate_timezone(self, value):
+        """
+        Validate IANA timezone name.
+        التحقق من اسم المنطقة الزمنية.
+        """
+        try:
+            ZoneInfo(value)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise serializers.ValidationError(
+                _('منطقة زمنية غير صالحة / Invalid timezone')
+            )
+        return value
 
 
 class VendorStoreSettingsSerializer(serializers.Serializer):
@@ -307,6 +327,9 @@ class VendorStoreSettingsSerializer(serializers.Serializer):
         allow_null=True,
         help_text=_('أرشفة الطلبات تلقائياً بعد X يوم / Auto-archive orders after X days')
     )
+    timezone = serializers.CharField(
+        help_text=_('المنطقة الزمنية للمتجر / Store timezone')
+    )
 
 
 # =============================================================================
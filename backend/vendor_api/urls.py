@@ -23,6 +23,8 @@ from vendor_api.views.products import (
     VendorProductDetailView,
     VendorProductVariantStockUpdateView,
     VendorProductVariantCreateView,
+    VendorCatalogImportView,
+    VendorCatalogImportDetailView,
 )
 from vendor_api.views.categories import VendorCategoryListView
 from vendor_api.views.orders import VendorOrderListView, VendorOrderDetailView
@@ -178,6 +180,20 @@ products_urlpatterns = [
         VendorProductVariantCreateView.as_view(),
         name='vendor-products-variant-create'
     ),
+    # GET, POST /api/v1/vendor/products/import/
+    # رفع ملف استيراد الكتالوج وعرض المهام
+    path(
+        'import/',
+        VendorCatalogImportView.as_view(),
+        name='vendor-products-import'
+    ),
+    # GET /api/v1/vendor/products/import/{id}/
+    # حالة مهمة الاستيراد
+    path(
+        'import/<int:pk>/',
+        VendorCatalogImportDetailView.as_view(),
+        name='vendor-products-import-detail'
+    ),
 ]
 
 
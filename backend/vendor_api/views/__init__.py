@@ -23,6 +23,8 @@ from .application import (
 from .products import (
     VendorProductListCreateView,
     VendorProductDetailView,
+    VendorCatalogImportView,
+    VendorCatalogImportDetailView,
 )
 from .categories import (
     VendorCategoryListView,
@@ -71,6 +73,8 @@ __all__ = [
     'VendorApplicationView',
     'VendorProductListCreateView',
     'VendorProductDetailView',
+    'VendorCatalogImportView',
+    'VendorCatalogImportDetailView',
     'VendorCategoryListView',
     'VendorOrderListView',
     'VendorOrderDetailView',
@@ -26,7 +26,7 @@ Security:
 
 from rest_framework.views import APIView
 from django.utils.translation import gettext_lazy as _
-from django.db.models import Q, Sum, Count, Avg, Max, Min
+from django.db.models import F, Sum, Count, Avg, Max, Min
 from django.db.models.functions import TruncDate, TruncMonth, TruncHour, Extract
 from django.utils import timezone
 from datetime import timedelta, datetime
@@ -46,6 +46,17 @@ from vendor_api.serializers.analytics import (
 )
 from core.utils import success_response, error_response
 from users.models import VendorUser
+from users.principal import get_vendor_user
+from vendor_api.analytics import (
+    time_analysis,
+    vendor_timezone,
+    sales_comparison,
+    revenue_series,
+    vendor_order_items,
+    new_customers as count_new_customers,
+)
+from core.comparison import Window, previous_window
+from analytics.metrics import conversion_rate, vendor_traffic
 import hashlib
 
 
@@ -60,7 +71,7 @@ def get_vendor_from_request(request):
     الحصول على البائع المرتبط بالمستخدم المسجل.
     """
     try:
-        vendor_user = VendorUser.objects.select_related('vendor').get(user=request.user)
+        vendor_user = get_vendor_user(request)
         return vendor_user.vendor
     except VendorUser.DoesNotExist:
         return None
@@ -82,17 +93,20 @@ def generate_customer_key(vendor_id: int, user_id: int = None, guest_identifier:
     return hash_obj.hexdigest()[:16]
 
 
-def parse_date_range(date_from: str = None, date_to: str = None):
+def parse_date_range(date_from: str = None, date_to: str = None, tzinfo=None):
     """
     Parse date range from query parameters.
     تحليل نطاق التاريخ من معاملات الاستعلام.
+    
+    Dates are interpreted in tzinfo (default: the current timezone).
+    التواريخ تُفسر بالمنطقة الزمنية tzinfo (الافتراضي: المنطقة الحالية).
     """
     now = timezone.now()
     
     if date_from:
         try:
             date_from_obj = datetime.strptime(date_from, '%Y-%m-%d').date()
-            date_from_obj = timezone.make_aware(datetime.combine(date_from_obj, datetime.min.time()))
+            date_from_obj = timezone.make_aware(datetime.combine(date_from_obj, datetime.min.time()), tzinfo)
         except ValueError:
             date_from_obj = None
     else:
@@ -101,7 +115,7 @@ def parse_date_range(date_from: str = None, date_to: str = None):
     if date_to:
         try:
             date_to_obj = datetime.strptime(date_to, '%Y-%m-%d').date()
-            date_to_obj = timezone.make_aware(datetime.combine(date_to_obj, datetime.max.time()))
+            date_to_obj = timezone.make_aware(datetime.combine(date_to_obj, datetime.max.time()), tzinfo)
         except ValueError:
             date_to_obj = None
     else:
@@ -138,7 +152,6 @@ class VendorAnalyticsOverviewView(APIView):
         Get analytics overview.
         الحصول على نظرة عامة على التحليلات.
         """
-        from orders.models import Order, OrderItem
         from products.models import Product
         
         vendor = get_vendor_from_request(request)
@@ -153,112 +166,37 @@ class VendorAnalyticsOverviewView(APIView):
             request.query_params.get('date_to')
         )
         
-        # Get vendor order items
-        vendor_order_items = OrderItem.objects.filter(
-            product_variant__product__vendor=vendor
-        ).select_related('order', 'product_variant', 'product_variant__product')
-        
-        # Apply date filter
-        if date_from:
-            vendor_order_items = vendor_order_items.filter(order__created_at__gte=date_from)
-        if date_to:
-            vendor_order_items = vendor_order_items.filter(order__created_at__lte=date_to)
-        
-        # Get unique orders
-        order_ids = vendor_order_items.values_list('order_id', flat=True).distinct()
-        orders = Order.objects.filter(id__in=order_ids)
-        
-        # Calculate date range for comparison
-        now = timezone.now()
+        # Current window (default: last 30 days); the previous window has the
+        # same length and ends right before it
+        # النافذة الحالية (الافتراضي آخر 30 يوماً)؛ السابقة بنفس الطول قبلها مباشرة
+        now = timezone.now().replace(second=0, microsecond=0)
         if date_from and date_to:
-            period_days = (date_to - date_from).days
-            previous_start = date_from - timedelta(days=period_days + 1)
-            previous_end = date_from - timedelta(days=1)
+            current = Window(date_from, date_to)
         else:
-            # Default: last 30 days
-            date_from = now - timedelta(days=30)
-            date_to = now
-            previous_start = date_from - timedelta(days=30)
-            previous_end = date_from
+            current = Window(now - timedelta(days=30), now)
+        date_from, date_to = current
         
-        # Current period calculations
-        current_items = vendor_order_items.filter(
-            order__created_at__gte=date_from,
-            order__created_at__lte=date_to
-        )
-        current_revenue = sum(
-            Decimal(str(item.price)) * Decimal(str(item.quantity))
-            for item in current_items
-        ) or Decimal('0.00')
-        current_orders_count = orders.filter(
-            created_at__gte=date_from,
-            created_at__lte=date_to
-        ).count()
+        # Revenue / orders / customers for both windows in one query (memoized,
+        # shared with the comparison endpoint)
+        # الإيرادات / الطلبات / الزبائن للنافذتين باستعلام واحد (مشترك مع نقطة المقارنة)
+        comparison = sales_comparison(vendor, current)
+        current_revenue = comparison.current['revenue']
+        current_orders_count = comparison.current['orders']
+        total_customers = comparison.current['customers']
+        revenue_change = comparison.change('revenue')
+        orders_change = comparison.change('orders')
         
-        # Previous period calculations
-        previous_items = OrderItem.objects.filter(
-            product_variant__product__vendor=vendor,
-            order__created_at__gte=previous_start,
-            order__created_at__lte=previous_end
-        )
-        previous_revenue = sum(
-            Decimal(str(item.price)) * Decimal(str(item.quantity))
-            for item in previous_items
-        ) or Decimal('0.00')
-        previous_orders_count = Order.objects.filter(
-            id__in=previous_items.values_list('order_id', flat=True).distinct(),
-            created_at__gte=previous_start,
-            created_at__lte=previous_end
-        ).count()
-        
-        # Calculate changes
-        if previous_revenue > 0:
-            revenue_change = float(((current_revenue - previous_revenue) / previous_revenue) * 100)
-        else:
-            revenue_change = 100.0 if current_revenue > 0 else 0.0
-        
-        if previous_orders_count > 0:
-            orders_change = float(((current_orders_count - previous_orders_count) / previous_orders_count) * 100)
-        else:
-            orders_change = 100.0 if current_orders_count > 0 else 0.0
+        vendor_items = vendor_order_items(vendor)
         
         # Calculate AOV
         average_order_value = Decimal('0.00')
         if current_orders_count > 0:
             average_order_value = current_revenue / Decimal(str(current_orders_count))
         
-        # Calculate customer metrics
-        current_orders_list = orders.filter(
-            created_at__gte=date_from,
-            created_at__lte=date_to
-        )
-        unique_customers = set()
-        for order in current_orders_list:
-            if order.user:
-                unique_customers.add(order.user.id)
-            else:
-                guest_id = order.customer_name or order.customer_phone or f"guest_{order.id}"
-                unique_customers.add(f"guest_{guest_id}")
-        
-        total_customers = len(unique_customers)
-        
-        # New customers (first order in this period)
-        all_orders = orders.filter(created_at__lte=date_to)
-        new_customers = 0
-        for order in current_orders_list:
-            if order.user:
-                # Check if this is first order
-                first_order = all_orders.filter(user=order.user).order_by('created_at').first()
-                if first_order and first_order.id == order.id:
-                    new_customers += 1
-            else:
-                # Guest - count as new if first order
-                guest_id = order.customer_name or order.customer_phone or f"guest_{order.id}"
-                first_order = all_orders.filter(
-                    Q(customer_name=order.customer_name) | Q(customer_phone=order.customer_phone)
-                ).order_by('created_at').first()
-                if first_order and first_order.id == order.id:
-                    new_customers += 1
+        # New customers (first order from the vendor in this period), one
+        # grouped query with the same customer identity as total_customers
+        # الزبائن الجدد (أول طلب من البائع في هذه الفترة) باستعلام واحد
+        new_customers = count_new_customers(vendor, current)
         
         # Repeat customer rate
         repeat_customer_rate = None
@@ -271,9 +209,9 @@ class VendorAnalyticsOverviewView(APIView):
         if total_customers > 0:
             customer_lifetime_value = current_revenue / Decimal(str(total_customers))
         
-        # Conversion rate (orders / visits) - simplified
-        conversion_rate = None
-        # Note: Actual conversion rate requires visit tracking
+        # Funnel from the daily event rollups: visits -> add to cart -> orders
+        # مسار الشراء من العدادات اليومية: زيارات -> إضافة للسلة -> طلبات
+        traffic = vendor_traffic(vendor, {'current': current})['current']
         
         # Product metrics
         vendor_products = Product.objects.filter(vendor=vendor)
@@ -282,7 +220,7 @@ class VendorAnalyticsOverviewView(APIView):
         
         # Top product revenue
         top_product_revenue = None
-        product_revenue = vendor_order_items.filter(
+        product_revenue = vendor_items.filter(
             order__created_at__gte=date_from,
             order__created_at__lte=date_to
         ).values('product_variant__product').annotate(
@@ -298,7 +236,10 @@ class VendorAnalyticsOverviewView(APIView):
             'revenue_change': revenue_change,
             'total_orders': current_orders_count,
             'orders_change': orders_change,
-            'conversion_rate': conversion_rate,
+            'conversion_rate': conversion_rate(current_orders_count, traffic['visits']),
+            'visits': traffic['visits'],
+            'product_views': traffic['product_views'],
+            'add_to_cart': traffic['add_to_cart'],
             'total_customers': total_customers,
             'new_customers': new_customers,
             'repeat_customer_rate': repeat_customer_rate,
@@ -390,7 +331,7 @@ class VendorSalesAnalyticsView(APIView):
         
         # Get vendor order items
         vendor_order_items = OrderItem.objects.filter(
-            product_variant__product__vendor=vendor,
+            vendor=vendor,
             order__created_at__gte=start_date,
             order__created_at__lte=end_date
         ).select_related('order', 'product_variant', 'product_variant__product')
@@ -530,7 +471,7 @@ class VendorProductAnalyticsView(APIView):
         
         # Get vendor order items
         vendor_order_items = OrderItem.objects.filter(
-            product_variant__product__vendor=vendor
+            vendor=vendor
         ).select_related('order', 'product_variant', 'product_variant__product', 'product_variant__product__category')
         
         # Apply date filter
@@ -671,7 +612,7 @@ class VendorCustomerAnalyticsView(APIView):
         
         # Get vendor order items
         vendor_order_items = OrderItem.objects.filter(
-            product_variant__product__vendor=vendor
+            vendor=vendor
         ).select_related('order', 'order__user')
         
         # Get orders in date range
@@ -703,6 +644,18 @@ class VendorCustomerAnalyticsView(APIView):
             cumulative_customers.update(customer_growth_by_date[date_key])
             customer_growth_data.append(len(cumulative_customers))
         
+        # Vendor revenue per order in one grouped query
+        # إيرادات البائع لكل طلب باستعلام مجمّع واحد
+        order_revenue = {
+            order_id: revenue.quantize(Decimal('0.01'))
+            for order_id, revenue in (
+                vendor_order_items.filter(order__in=orders)
+                .values('order_id')
+                .annotate(revenue=Sum(F('price') * F('quantity')))
+                .values_list('order_id', 'revenue')
+            )
+        }
+        
         # Aggregate customer data
         customers_data = {}
         for order in orders:
@@ -727,14 +680,7 @@ class VendorCustomerAnalyticsView(APIView):
                     'last_order_at': None,
                 }
             
-            # Calculate revenue for this order
-            order_items = vendor_order_items.filter(order=order)
-            order_revenue = sum(
-                Decimal(str(item.price)) * Decimal(str(item.quantity))
-                for item in order_items
-            ) or Decimal('0.00')
-            
-            customers_data[customer_key]['total_spent'] += order_revenue
+            customers_data[customer_key]['total_spent'] += order_revenue.get(order.id, Decimal('0.00'))
             customers_data[customer_key]['orders_count'] += 1
             
             if not customers_data[customer_key]['last_order_at'] or order.created_at > customers_data[customer_key]['last_order_at']:
@@ -759,20 +705,9 @@ class VendorCustomerAnalyticsView(APIView):
         # Calculate statistics
         total_customers = len(customers_list)
         
-        # New vs returning customers
-        all_orders = Order.objects.filter(
-            id__in=vendor_order_items.values_list('order_id', flat=True).distinct(),
-            created_at__lte=date_to
-        )
-        new_customers = 0
-        for customer_key, customer_data in customers_data.items():
-            # Check if first order in date range
-            first_order = all_orders.filter(
-                created_at__lte=date_to
-            ).order_by('created_at').first()
-            # Simplified: count as new if only 1 order
-            if customer_data['orders_count'] == 1:
-                new_customers += 1
+        # New vs returning customers: first order from the vendor in the range
+        # الزبائن الجدد مقابل العائدين: أول طلب من البائع ضمن الفترة
+        new_customers = count_new_customers(vendor, Window(date_from, date_to))
         
         returning_customers = total_customers - new_customers
         
@@ -828,169 +763,67 @@ class VendorTimeAnalysisView(APIView):
         """
         Get time analysis.
         الحصول على التحليل الزمني.
-        """
-        from orders.models import Order, OrderItem
         
+        Buckets are computed in SQL in the store timezone (see
+        vendor_api.analytics.time_buckets) and cached per (vendor, range).
+        التجميع يتم في SQL بالمنطقة الزمنية للمتجر ويُخزن مؤقتاً لكل (بائع، نطاق).
+        """
         vendor = get_vendor_from_request(request)
         if not vendor:
             return error_response(
                 message=_('لا يوجد بائع مرتبط بهذا المستخدم / No vendor associated with this user')
             )
         
-        # Parse date range
+        tz = vendor_timezone(vendor)
+        
+        # Parse date range (dates are days in the store timezone)
+        # تحليل نطاق التاريخ (الأيام بالمنطقة الزمنية للمتجر)
         date_from, date_to = parse_date_range(
             request.query_params.get('date_from'),
-            request.query_params.get('date_to')
+            request.query_params.get('date_to'),
+            tz,
         )
         
-        # Default to last 30 days
-        now = timezone.now()
+        # Default to last 30 days; truncated to the minute so repeated
+        # requests share a cache entry
+        # الافتراضي آخر 30 يوماً؛ مقرّب للدقيقة حتى تتشارك الطلبات المتكررة الـ cache
+        now = timezone.now().replace(second=0, microsecond=0)
         if not date_from:
             date_from = now - timedelta(days=30)
         if not date_to:
             date_to = now
         
-        # Get vendor order items
-        vendor_order_items = OrderItem.objects.filter(
-            product_variant__product__vendor=vendor,
-            order__created_at__gte=date_from,
-            order__created_at__lte=date_to
-        ).select_related('order')
-        
-        # Get orders
-        order_ids = vendor_order_items.values_list('order_id', flat=True).distinct()
-        orders = Order.objects.filter(
-            id__in=order_ids,
-            created_at__gte=date_from,
-            created_at__lte=date_to
-        )
-        
-        # Hourly analysis
-        hourly_revenue = defaultdict(Decimal)
-        hourly_orders = defaultdict(int)
-        
-        for order in orders:
-            hour = order.created_at.hour
-            order_items = vendor_order_items.filter(order=order)
-            order_revenue = sum(
-                Decimal(str(item.price)) * Decimal(str(item.quantity))
-                for item in order_items
-            ) or Decimal('0.00')
-            
-            hourly_revenue[hour] += order_revenue
-            hourly_orders[hour] += 1
-        
-        # Build hourly arrays (0-23)
-        hourly_labels = [f"{i:02d}:00" for i in range(24)]
-        hourly_revenue_data = []
-        hourly_orders_data = []
-        
-        for hour in range(24):
-            hourly_revenue_data.append(str(hourly_revenue[hour]))
-            hourly_orders_data.append(hourly_orders[hour])
-        
-        # Find best selling hour
-        best_selling_hour = None
-        max_revenue = Decimal('0.00')
-        for hour, revenue in hourly_revenue.items():
-            if revenue > max_revenue:
-                max_revenue = revenue
-                best_selling_hour = hour
-        
-        # Day of week analysis
-        day_names = {
-            0: _('الاثنين / Monday'),
-            1: _('الثلاثاء / Tuesday'),
-            2: _('الأربعاء / Wednesday'),
-            3: _('الخميس / Thursday'),
-            4: _('الجمعة / Friday'),
-            5: _('السبت / Saturday'),
-            6: _('الأحد / Sunday'),
-        }
-        
-        day_of_week_revenue = defaultdict(Decimal)
-        day_of_week_orders = defaultdict(int)
-        
-        for order in orders:
-            day_of_week = order.created_at.weekday()
-            order_items = vendor_order_items.filter(order=order)
-            order_revenue = sum(
-                Decimal(str(item.price)) * Decimal(str(item.quantity))
-                for item in order_items
-            ) or Decimal('0.00')
-            
-            day_of_week_revenue[day_of_week] += order_revenue
-            day_of_week_orders[day_of_week] += 1
-        
-        # Build day of week arrays
-        day_of_week_labels = []
-        day_of_week_revenue_data = []
-        day_of_week_orders_data = []
-        
-        for day in range(7):
-            day_of_week_labels.append(day_names[day])
-            day_of_week_revenue_data.append(str(day_of_week_revenue[day]))
-            day_of_week_orders_data.append(day_of_week_orders[day])
-        
-        # Find best selling day
-        best_selling_day = None
-        max_revenue_day = Decimal('0.00')
-        for day, revenue in day_of_week_revenue.items():
-            if revenue > max_revenue_day:
-                max_revenue_day = revenue
-                best_selling_day = day_names[day]
-        
-        # Monthly trends (last 12 months)
-        monthly_revenue = defaultdict(Decimal)
-        monthly_orders = defaultdict(int)
-        
-        monthly_items = OrderItem.objects.filter(
-            product_variant__product__vendor=vendor,
-            order__created_at__gte=now - timedelta(days=365),
-            order__created_at__lte=now
-        )
+        analysis = time_analysis(vendor, date_from, date_to, tz=tz, now=now)
         
-        for item in monthly_items:
-            month_key = item.order.created_at.strftime('%Y-%m')
-            monthly_revenue[month_key] += Decimal(str(item.price)) * Decimal(str(item.quantity))
-        
-        monthly_order_ids = monthly_items.values_list('order_id', flat=True).distinct()
-        monthly_orders_list = Order.objects.filter(
-            id__in=monthly_order_ids,
-            created_at__gte=now - timedelta(days=365),
-            created_at__lte=now
-        )
-        
-        for order in monthly_orders_list:
-            month_key = order.created_at.strftime('%Y-%m')
-            monthly_orders[month_key] += 1
-        
-        # Build monthly arrays
-        monthly_labels = []
-        monthly_revenue_data = []
-        monthly_orders_data = []
-        
-        for i in range(12):
-            month_date = now - timedelta(days=30 * (11 - i))
-            month_key = month_date.strftime('%Y-%m')
-            month_label = month_date.strftime('%b %Y')
-            
-            monthly_labels.append(month_label)
-            monthly_revenue_data.append(str(monthly_revenue[month_key]))
-            monthly_orders_data.append(monthly_orders[month_key])
+        day_names = [
+            _('الاثنين / Monday'),
+            _('الثلاثاء / Tuesday'),
+            _('الأربعاء / Wednesday'),
+            _('الخميس / Thursday'),
+            _('الجمعة / Friday'),
+            _('السبت / Saturday'),
+            _('الأحد / Sunday'),
+        ]
+        best_day = analysis['best_selling_day']
         
         data = {
-            'hourly_labels': hourly_labels,
-            'hourly_revenue': hourly_revenue_data,
-            'hourly_orders': hourly_orders_data,
-            'best_selling_hour': best_selling_hour,
-            'day_of_week_labels': day_of_week_labels,
-            'day_of_week_revenue': day_of_week_revenue_data,
-            'day_of_week_orders': day_of_week_orders_data,
-            'best_selling_day': best_selling_day,
-            'monthly_labels': monthly_labels,
-            'monthly_revenue': monthly_revenue_data,
-            'monthly_orders': monthly_orders_data,
+            'timezone': analysis['timezone'],
+            'hourly_labels': [f"{hour:02d}:00" for hour in range(24)],
+            'hourly_revenue': analysis['hourly_revenue'],
+            'hourly_orders': analysis['hourly_orders'],
+            'best_selling_hour': analysis['best_selling_hour'],
+            'day_of_week_labels': day_names,
+            'day_of_week_revenue': analysis['day_of_week_revenue'],
+            'day_of_week_orders': analysis['day_of_week_orders'],
+            'best_selling_day': day_names[best_day] if best_day is not None else None,
+            'heatmap_revenue': analysis['heatmap_revenue'],
+            'heatmap_orders': analysis['heatmap_orders'],
+            'monthly_labels': [
+                datetime.strptime(month, '%Y-%m').strftime('%b %Y')
+                for month in analysis['months']
+            ],
+            'monthly_revenue': analysis['monthly_revenue'],
+            'monthly_orders': analysis['monthly_orders'],
         }
         
         return success_response(data=data)
@@ -1010,6 +843,15 @@ class VendorComparisonAnalyticsView(APIView):
     permission_classes = [IsVendorUser, IsVendorOwner]
     throttle_classes = [VendorUserRateThrottle]
     
+    # period -> (days, current label, previous label)
+    # الفترة -> (الأيام، تسمية الفترة الحالية، تسمية الفترة السابقة)
+    PERIODS = {
+        'week': (7, _('آخر 7 أيام / Last 7 days'), _('الأسبوع السابق / Previous week')),
+        'month': (30, _('آخر 30 يوم / Last 30 days'), _('الشهر السابق / Previous month')),
+        'quarter': (90, _('آخر 90 يوم / Last 90 days'), _('الربع السابق / Previous quarter')),
+        'year': (365, _('آخر سنة / Last year'), _('السنة السابقة / Previous year')),
+    }
+    
     @extend_schema(
         summary='Vendor Comparison Analytics',
         description='Get period comparison analytics (current vs previous period)',
@@ -1025,8 +867,6 @@ class VendorComparisonAnalyticsView(APIView):
         Get comparison analytics.
         الحصول على تحليلات المقارنة.
         """
-        from orders.models import Order, OrderItem
-        
         vendor = get_vendor_from_request(request)
         if not vendor:
             return error_response(
@@ -1039,185 +879,53 @@ class VendorComparisonAnalyticsView(APIView):
             request.query_params.get('date_to')
         )
         
-        now = timezone.now()
+        # Truncated to the minute so repeated requests share memoized results
+        # مقرّب للدقيقة حتى تتشارك الطلبات المتكررة النتائج المخزنة
+        now = timezone.now().replace(second=0, microsecond=0)
         
-        # Determine current period
+        # Determine current period; the previous period has the same length
+        # and ends right before the current one starts
+        # تحديد الفترة الحالية؛ الفترة السابقة بنفس الطول وتنتهي قبل بدايتها مباشرة
         if date_from and date_to:
-            current_start = date_from
-            current_end = date_to
-            period_days = (date_to - date_from).days
-            previous_start = date_from - timedelta(days=period_days + 1)
-            previous_end = date_from - timedelta(days=1)
+            current = Window(date_from, date_to)
+            previous = previous_window(current)
             current_label = f"{date_from.strftime('%d/%m/%Y')} - {date_to.strftime('%d/%m/%Y')}"
-            previous_label = f"{previous_start.strftime('%d/%m/%Y')} - {previous_end.strftime('%d/%m/%Y')}"
-        else:
-            # Use period
-            if period == 'week':
-                current_end = now
-                current_start = now - timedelta(days=7)
-                previous_end = current_start - timedelta(days=1)
-                previous_start = previous_end - timedelta(days=7)
-                current_label = _('آخر 7 أيام / Last 7 days')
-                previous_label = _('الأسبوع السابق / Previous week')
-            elif period == 'month':
-                current_end = now
-                current_start = now - timedelta(days=30)
-                previous_end = current_start - timedelta(days=1)
-                previous_start = previous_end - timedelta(days=30)
-                current_label = _('آخر 30 يوم / Last 30 days')
-                previous_label = _('الشهر السابق / Previous month')
-            elif period == 'quarter':
-                current_end = now
-                current_start = now - timedelta(days=90)
-                previous_end = current_start - timedelta(days=1)
-                previous_start = previous_end - timedelta(days=90)
-                current_label = _('آخر 90 يوم / Last 90 days')
-                previous_label = _('الربع السابق / Previous quarter')
-            else:  # year
-                current_end = now
-                current_start = now - timedelta(days=365)
-                previous_end = current_start - timedelta(days=1)
-                previous_start = previous_end - timedelta(days=365)
-                current_label = _('آخر سنة / Last year')
-                previous_label = _('السنة السابقة / Previous year')
-        
-        # Current period calculations
-        current_items = OrderItem.objects.filter(
-            product_variant__product__vendor=vendor,
-            order__created_at__gte=current_start,
-            order__created_at__lte=current_end
-        )
-        current_revenue = sum(
-            Decimal(str(item.price)) * Decimal(str(item.quantity))
-            for item in current_items
-        ) or Decimal('0.00')
-        
-        current_order_ids = current_items.values_list('order_id', flat=True).distinct()
-        current_orders = Order.objects.filter(
-            id__in=current_order_ids,
-            created_at__gte=current_start,
-            created_at__lte=current_end
-        )
-        current_orders_count = current_orders.count()
-        
-        # Current customers
-        current_customers_set = set()
-        for order in current_orders:
-            if order.user:
-                current_customers_set.add(order.user.id)
-            else:
-                guest_id = order.customer_name or order.customer_phone or f"guest_{order.id}"
-                current_customers_set.add(f"guest_{guest_id}")
-        current_customers_count = len(current_customers_set)
-        
-        # Previous period calculations
-        previous_items = OrderItem.objects.filter(
-            product_variant__product__vendor=vendor,
-            order__created_at__gte=previous_start,
-            order__created_at__lte=previous_end
-        )
-        previous_revenue = sum(
-            Decimal(str(item.price)) * Decimal(str(item.quantity))
-            for item in previous_items
-        ) or Decimal('0.00')
-        
-        previous_order_ids = previous_items.values_list('order_id', flat=True).distinct()
-        previous_orders = Order.objects.filter(
-            id__in=previous_order_ids,
-            created_at__gte=previous_start,
-            created_at__lte=previous_end
-        )
-        previous_orders_count = previous_orders.count()
-        
-        # Previous customers
-        previous_customers_set = set()
-        for order in previous_orders:
-            if order.user:
-                previous_customers_set.add(order.user.id)
-            else:
-                guest_id = order.customer_name or order.customer_phone or f"guest_{order.id}"
-                previous_customers_set.add(f"guest_{guest_id}")
-        previous_customers_count = len(previous_customers_set)
-        
-        # Calculate changes
-        if previous_revenue > 0:
-            revenue_change = float(((current_revenue - previous_revenue) / previous_revenue) * 100)
+            previous_label = f"{previous.start.strftime('%d/%m/%Y')} - {previous.end.strftime('%d/%m/%Y')}"
         else:
-            revenue_change = 100.0 if current_revenue > 0 else 0.0
-        
-        if previous_orders_count > 0:
-            orders_change = float(((current_orders_count - previous_orders_count) / previous_orders_count) * 100)
-        else:
-            orders_change = 100.0 if current_orders_count > 0 else 0.0
-        
-        if previous_customers_count > 0:
-            customers_change = float(((current_customers_count - previous_customers_count) / previous_customers_count) * 100)
-        else:
-            customers_change = 100.0 if current_customers_count > 0 else 0.0
-        
-        # Build comparison chart data (grouped by date)
-        if period == 'week' or (date_from and (date_to - date_from).days <= 7):
-            trunc_func = TruncDate
-            label_format = '%d/%m'
-        elif period == 'month' or (date_from and (date_to - date_from).days <= 90):
-            trunc_func = TruncDate
+            period_days, current_label, previous_label = self.PERIODS.get(period, self.PERIODS['year'])
+            current = Window(now - timedelta(days=period_days), now)
+            previous = previous_window(current)
+        
+        # Both periods in one conditional-aggregate query (memoized)
+        # الفترتان باستعلام تجميع شرطي واحد (مع تخزين مؤقت)
+        comparison = sales_comparison(vendor, current, previous)
+        
+        # Comparison chart: aligned buckets (day i of current vs day i of previous)
+        # رسم المقارنة: فترات متحاذية (اليوم i من الحالية مقابل اليوم i من السابقة)
+        if period in ('week', 'month') or (date_from and date_to and (date_to - date_from).days <= 90):
+            unit = 'day'
             label_format = '%d/%m'
         else:
-            trunc_func = TruncMonth
+            unit = 'month'
             label_format = '%b %Y'
         
-        # Current period chart data
-        current_revenue_by_date = defaultdict(Decimal)
-        for order in current_orders:
-            date_key = trunc_func(order.created_at)
-            order_items = current_items.filter(order=order)
-            order_revenue = sum(
-                Decimal(str(item.price)) * Decimal(str(item.quantity))
-                for item in order_items
-            ) or Decimal('0.00')
-            current_revenue_by_date[date_key] += order_revenue
-        
-        # Previous period chart data
-        previous_revenue_by_date = defaultdict(Decimal)
-        for order in previous_orders:
-            date_key = trunc_func(order.created_at)
-            order_items = previous_items.filter(order=order)
-            order_revenue = sum(
-                Decimal(str(item.price)) * Decimal(str(item.quantity))
-                for item in order_items
-            ) or Decimal('0.00')
-            previous_revenue_by_date[date_key] += order_revenue
-        
-        # Build comparison arrays
-        all_dates = sorted(set(list(current_revenue_by_date.keys()) + list(previous_revenue_by_date.keys())))
-        comparison_labels = []
-        current_period_data = []
-        previous_period_data = []
-        
-        for date_key in all_dates:
-            if trunc_func == TruncDate:
-                comparison_labels.append(date_key.strftime(label_format))
-            else:
-                comparison_labels.append(date_key.strftime(label_format))
-            
-            current_period_data.append(str(current_revenue_by_date[date_key]))
-            previous_period_data.append(str(previous_revenue_by_date[date_key]))
+        chart = revenue_series(vendor, current, previous, unit=unit)
         
         data = {
             'current_period_label': current_label,
-            'current_revenue': str(current_revenue),
-            'current_orders': current_orders_count,
-            'current_customers': current_customers_count,
+            'current_revenue': str(comparison.current['revenue']),
+            'current_orders': comparison.current['orders'],
+            'current_customers': comparison.current['customers'],
             'previous_period_label': previous_label,
-            'previous_revenue': str(previous_revenue),
-            'previous_orders': previous_orders_count,
-            'previous_customers': previous_customers_count,
-            'revenue_change': revenue_change,
-            'orders_change': orders_change,
-            'customers_change': customers_change,
-            'comparison_labels': comparison_labels,
-            'current_period_data': current_period_data,
-            'previous_period_data': previous_period_data,
+            'previous_revenue': str(comparison.previous['revenue']),
+            'previous_orders': comparison.previous['orders'],
+            'previous_customers': comparison.previous['customers'],
+            'revenue_change': comparison.change('revenue'),
+            'orders_change': comparison.change('orders'),
+            'customers_change': comparison.change('customers'),
+            'comparison_labels': [bucket.strftime(label_format) for bucket in chart['labels']],
+            'current_period_data': [str(value) for value in chart['current']['revenue']],
+            'previous_period_data': [str(value) for value in chart['previous']['revenue']],
         }
         
         return success_response(data=data)
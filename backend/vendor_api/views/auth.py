@@ -18,6 +18,7 @@ from vendor_api.throttling import VendorUserRateThrottle
 from vendor_api.permissions import IsVendorUser
 from core.utils import success_response, error_response
 from users.models import VendorUser
+from users.principal import get_vendor_user
 import logging
 
 logger = logging.getLogger(__name__)
@@ -242,7 +243,7 @@ class VendorMeView(APIView):
         try:
             # Get vendor_user with optimized query
             # الحصول على vendor_user مع استعلام محسّن
-            vendor_user = VendorUser.objects.select_related('vendor', 'user').get(user=request.user)
+            vendor_user = get_vendor_user(request)
             vendor = vendor_user.vendor
             user = request.user
             
@@ -34,6 +34,7 @@ from vendor_api.throttling import VendorUserRateThrottle
 from vendor_api.serializers.customers import VendorCustomerListSerializer
 from orders.models import Order, OrderItem
 from users.models import VendorUser, User
+from users.principal import get_vendor_user
 from core.utils import success_response, error_response
 from core.pagination import StandardResultsSetPagination
 
@@ -171,7 +172,7 @@ class VendorCustomerListView(APIView):
         # Get vendor associated with the authenticated user
         # الحصول على البائع المرتبط بالمستخدم المسجل
         try:
-            vendor_user = VendorUser.objects.select_related('vendor').get(user=request.user)
+            vendor_user = get_vendor_user(request)
             vendor = vendor_user.vendor
         except VendorUser.DoesNotExist:
             return error_response(
@@ -13,7 +13,7 @@ Endpoints:
 from rest_framework.views import APIView
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
-from django.db.models import Sum, Count, Q
+from django.db.models import Sum, Count, Q, F
 from django.db.models.functions import TruncDate, TruncMonth
 from datetime import timedelta, datetime
 from decimal import Decimal
@@ -31,7 +31,17 @@ from vendor_api.serializers.dashboard import (
     VendorSalesChartSerializer,
 )
 from core.utils import success_response, error_response
+from core.comparison import (
+    ONE_MICROSECOND,
+    Window,
+    aggregate_windows,
+    count,
+    percent_change,
+    total,
+)
+from analytics.metrics import vendor_traffic
 from users.models import VendorUser
+from users.principal import get_vendor_user
 import hashlib
 
 
@@ -86,7 +96,7 @@ class VendorDashboardOverviewView(APIView):
         # Get vendor associated with the authenticated user
         # الحصول على البائع المرتبط بالمستخدم المسجل
         try:
-            vendor_user = VendorUser.objects.select_related('vendor').get(user=request.user)
+            vendor_user = get_vendor_user(request)
             vendor = vendor_user.vendor
         except VendorUser.DoesNotExist:
             return success_response(
@@ -95,99 +105,78 @@ class VendorDashboardOverviewView(APIView):
                 status_code=404
             )
         
-        # Time calculations
-        # حسابات الوقت
-        now = timezone.now()
-        today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        week_start = today_start - timedelta(days=today_start.weekday())
+        # Time calculations (truncated to the minute so repeated requests
+        # share the memoized aggregates)
+        # حسابات الوقت (مقرّبة للدقيقة حتى تتشارك الطلبات المتكررة النتائج المخزنة)
+        now = timezone.now().replace(second=0, microsecond=0)
+        today_start = now.replace(hour=0, minute=0)
         month_start = today_start.replace(day=1)
         last_month_start = (month_start - timedelta(days=1)).replace(day=1)
         
+        # Windows shared by the sales and order statistics
+        # النوافذ المشتركة بين إحصائيات المبيعات والطلبات
+        windows = {
+            'all': None,
+            'today': Window(today_start, now),
+            'this_month': Window(month_start, now),
+            'last_month': Window(last_month_start, month_start - ONE_MICROSECOND),
+            'recent': Window(now - timedelta(days=30), now),
+        }
+        completed = ['delivered', 'completed']
+        
         # =================================================================
         # Revenue Statistics (Sales)
         # إحصائيات الإيرادات (المبيعات)
         # =================================================================
         
-        # Get all orders and order items for this vendor (using denormalized vendor field)
-        # الحصول على جميع الطلبات وعناصر الطلب لهذا البائع (باستخدام حقل vendor المطبيع)
-        vendor_order_items = OrderItem.objects.filter(vendor=vendor)
-        vendor_orders = Order.objects.filter(vendor=vendor)
-        
-        # Total sales (all time) - only completed/delivered orders
-        # إجمالي المبيعات (كل الأوقات) - فقط الطلبات المكتملة/المسلمة
-        # Calculate total sales correctly (sum of price * quantity for each item)
-        # حساب إجمالي المبيعات بشكل صحيح (مجموع السعر * الكمية لكل عنصر)
-        completed_items = vendor_order_items.filter(
-            order__status__in=['delivered', 'completed']
-        )
-        total_sales = sum(
-            Decimal(str(item.price)) * Decimal(str(item.quantity))
-            for item in completed_items
-        ) or Decimal('0.00')
-        
-        # This month's sales
-        # مبيعات هذا الشهر
-        this_month_items = vendor_order_items.filter(
-            order__status__in=['delivered', 'completed'],
-            order__created_at__gte=month_start
+        # All sales windows in one conditional-aggregate query (denormalized
+        # vendor field); totals only count completed/delivered orders, today's
+        # sales count every order
+        # جميع نوافذ المبيعات باستعلام تجميع شرطي واحد؛ المجاميع للطلبات
+        # المكتملة/المسلمة فقط، ومبيعات اليوم لجميع الطلبات
+        sales = aggregate_windows(
+            OrderItem.objects.filter(vendor=vendor),
+            {
+                'completed': total(
+                    F('price') * F('quantity'), condition=Q(order__status__in=completed)
+                ),
+                'all': total(F('price') * F('quantity')),
+            },
+            windows,
+            date_field='order__created_at',
+            scope=f'vendor:{vendor.pk}:dashboard-sales',
         )
-        this_month_sales = sum(
-            Decimal(str(item.price)) * Decimal(str(item.quantity))
-            for item in this_month_items
-        ) or Decimal('0.00')
-        
-        # Last month's sales
-        # مبيعات الشهر الماضي
-        last_month_items = vendor_order_items.filter(
-            order__status__in=['delivered', 'completed'],
-            order__created_at__gte=last_month_start,
-            order__created_at__lt=month_start
-        )
-        last_month_sales = sum(
-            Decimal(str(item.price)) * Decimal(str(item.quantity))
-            for item in last_month_items
-        ) or Decimal('0.00')
-        
-        # Sales change percentage
-        # نسبة التغيير في المبيعات
-        if last_month_sales > 0:
-            sales_change = float(
-                ((this_month_sales - last_month_sales) / last_month_sales) * 100
-            )
-        else:
-            sales_change = 100.0 if this_month_sales > 0 else 0.0
         
-        # Today's sales
-        # مبيعات اليوم
-        today_items = vendor_order_items.filter(
-            order__created_at__gte=today_start
+        total_sales = sales['all']['completed']
+        today_sales = sales['today']['all']
+        sales_change = percent_change(
+            sales['this_month']['completed'], sales['last_month']['completed']
         )
-        today_sales = sum(
-            Decimal(str(item.price)) * Decimal(str(item.quantity))
-            for item in today_items
-        ) or Decimal('0.00')
         
         # =================================================================
         # Order Statistics
         # إحصائيات الطلبات
         # =================================================================
         
-        total_orders = vendor_orders.count()
-        today_orders = vendor_orders.filter(created_at__gte=today_start).count()
-        pending_orders = vendor_orders.filter(status='pending').count()
-        processing_orders = vendor_orders.filter(status__in=['processing', 'confirmed']).count()
-        
-        # This month's orders
-        this_month_orders = vendor_orders.filter(created_at__gte=month_start).count()
-        last_month_orders = vendor_orders.filter(
-            created_at__gte=last_month_start,
-            created_at__lt=month_start
-        ).count()
+        orders = aggregate_windows(
+            Order.objects.filter(vendor=vendor),
+            {
+                'orders': count(),
+                'completed': count(condition=Q(status__in=completed)),
+                'pending': count(condition=Q(status='pending')),
+                'processing': count(condition=Q(status__in=['processing', 'confirmed'])),
+            },
+            windows,
+            scope=f'vendor:{vendor.pk}:dashboard-orders',
+        )
         
-        if last_month_orders > 0:
-            orders_change = ((this_month_orders - last_month_orders) / last_month_orders) * 100
-        else:
-            orders_change = 100.0 if this_month_orders > 0 else 0.0
+        total_orders = orders['all']['orders']
+        today_orders = orders['today']['orders']
+        pending_orders = orders['all']['pending']
+        processing_orders = orders['all']['processing']
+        orders_change = percent_change(
+            orders['this_month']['orders'], orders['last_month']['orders']
+        )
         
         # =================================================================
         # Product Statistics
@@ -236,14 +225,15 @@ class VendorDashboardOverviewView(APIView):
         # إحصائيات زيارات المتجر
         # =================================================================
         
-        # TODO: Implement shop visits tracking when analytics system is ready
-        # TODO: تنفيذ تتبع زيارات المتجر عندما يكون نظام التحليلات جاهزاً
+        # Product visits from the daily event rollups (one query for all windows)
+        # زيارات المنتجات من العدادات اليومية (استعلام واحد لجميع النوافذ)
+        traffic = vendor_traffic(vendor, windows)
         
-        # For now, return placeholder values
-        # في الوقت الحالي، إرجاع قيم مؤقتة
-        total_visits = 0
-        today_visits = 0
-        visits_change = 0.0
+        total_visits = traffic['all']['visits']
+        today_visits = traffic['today']['visits']
+        visits_change = percent_change(
+            traffic['this_month']['visits'], traffic['last_month']['visits']
+        )
         
         # =================================================================
         # Response Rate Statistics
@@ -255,54 +245,20 @@ class VendorDashboardOverviewView(APIView):
         # Response rate = (completed + delivered orders) / total orders * 100
         # معدل الاستجابة = (الطلبات المكتملة + المسلمة) / إجمالي الطلبات * 100
         
-        # Strategy: Try to use last 30 days, if no data, use all orders
-        # الاستراتيجية: محاولة استخدام آخر 30 يوم، إذا لم تكن هناك بيانات، استخدم جميع الطلبات
-        
-        # First, try last 30 days (more relevant for current performance)
-        # أولاً، محاولة آخر 30 يوم (أكثر صلة بالأداء الحالي)
-        thirty_days_ago = now - timedelta(days=30)
-        recent_orders = vendor_orders.filter(created_at__gte=thirty_days_ago)
-        total_recent_orders = recent_orders.count()
-        
-        # If we have recent orders, use them for calculation
-        # إذا كانت لدينا طلبات حديثة، استخدمها للحساب
-        if total_recent_orders > 0:
-            # Count completed/delivered orders from recent period
-            # عد الطلبات المكتملة/المسلمة من الفترة الحديثة
-            completed_recent_orders = recent_orders.filter(
-                status__in=['delivered', 'completed']
-            ).count()
-            
-            # Calculate response rate percentage
-            # حساب نسبة معدل الاستجابة
-            response_rate = round((completed_recent_orders / total_recent_orders) * 100, 1)
-            
-            # Ensure response rate is between 0 and 100
-            # التأكد من أن معدل الاستجابة بين 0 و 100
+        # First, try last 30 days (more relevant for current performance);
+        # if there are no recent orders, use all orders (fallback)
+        # أولاً، محاولة آخر 30 يوم؛ إذا لم تكن هناك طلبات حديثة، استخدم جميع الطلبات
+        response_window = orders['recent'] if orders['recent']['orders'] > 0 else orders['all']
+        
+        if response_window['orders'] > 0:
+            # Calculate response rate percentage (between 0 and 100)
+            # حساب نسبة معدل الاستجابة (بين 0 و 100)
+            response_rate = round((response_window['completed'] / response_window['orders']) * 100, 1)
             response_rate = max(0.0, min(100.0, response_rate))
         else:
-            # No recent orders, try to use all orders (fallback)
-            # لا توجد طلبات حديثة، محاولة استخدام جميع الطلبات (بديل)
-            total_all_orders = vendor_orders.count()
-            
-            if total_all_orders > 0:
-                # Count completed/delivered orders from all time
-                # عد الطلبات المكتملة/المسلمة من كل الأوقات
-                completed_all_orders = vendor_orders.filter(
-                    status__in=['delivered', 'completed']
-                ).count()
-                
-                # Calculate response rate from all orders
-                # حساب معدل الاستجابة من جميع الطلبات
-                response_rate = round((completed_all_orders / total_all_orders) * 100, 1)
-                
-                # Ensure response rate is between 0 and 100
-                # التأكد من أن معدل الاستجابة بين 0 و 100
-                response_rate = max(0.0, min(100.0, response_rate))
-            else:
-                # No orders at all - return None (no data available)
-                # لا توجد طلبات على الإطلاق - إرجاع None (لا توجد بيانات متاحة)
-                response_rate = None
+            # No orders at all - return None (no data available)
+            # لا توجد طلبات على الإطلاق - إرجاع None (لا توجد بيانات متاحة)
+            response_rate = None
         
         # =================================================================
         # Build Response
@@ -403,7 +359,7 @@ class VendorSalesChartView(APIView):
         # Get vendor associated with the authenticated user
         # الحصول على البائع المرتبط بالمستخدم المسجل
         try:
-            vendor_user = VendorUser.objects.select_related('vendor').get(user=request.user)
+            vendor_user = get_vendor_user(request)
             vendor = vendor_user.vendor
         except VendorUser.DoesNotExist:
             return error_response(
@@ -670,7 +626,7 @@ class VendorDashboardTipsView(APIView):
         # Get vendor associated with the authenticated user
         # الحصول على البائع المرتبط بالمستخدم المسجل
         try:
-            vendor_user = VendorUser.objects.select_related('vendor').get(user=request.user)
+            vendor_user = get_vendor_user(request)
             vendor = vendor_user.vendor
         except VendorUser.DoesNotExist:
             return error_response(
@@ -711,7 +667,7 @@ class VendorDashboardTipsView(APIView):
         # Priority 1: Out of stock products
         # الأولوية 1: المنتجات التي نفد مخزونها
         if out_of_stock_products.exists():
-            product = out_of_stock_products.first()
+            product = out_of_stock_products[0]
             tip = {
                 'type': 'out_of_stock',
                 'priority': 1,
@@ -730,7 +686,7 @@ class VendorDashboardTipsView(APIView):
         # Priority 2: Low stock products
         # الأولوية 2: المنتجات قليلة المخزون
         elif low_stock_products.exists():
-            product = low_stock_products.first()
+            product = low_stock_products[0]
             # Get the variant with lowest stock
             # الحصول على المتغير بأقل مخزون
             variant = product.variants.filter(
@@ -760,7 +716,7 @@ class VendorDashboardTipsView(APIView):
         # Priority 3: Inactive products
         # الأولوية 3: المنتجات غير النشطة
         elif inactive_products.exists():
-            product = inactive_products.first()
+            product = inactive_products[0]
             tip = {
                 'type': 'inactive',
                 'priority': 3,
@@ -871,7 +827,7 @@ class VendorRecentOrdersView(APIView):
         # Get vendor associated with the authenticated user
         # الحصول على البائع المرتبط بالمستخدم المسجل
         try:
-            vendor_user = VendorUser.objects.select_related('vendor').get(user=request.user)
+            vendor_user = get_vendor_user(request)
             vendor = vendor_user.vendor
         except VendorUser.DoesNotExist:
             return error_response(
@@ -1023,7 +979,7 @@ class VendorReportExportView(APIView):
         # Get vendor associated with the authenticated user
         # الحصول على البائع المرتبط بالمستخدم المسجل
         try:
-            vendor_user = VendorUser.objects.select_related('vendor').get(user=request.user)
+            vendor_user = get_vendor_user(request)
             vendor = vendor_user.vendor
         except VendorUser.DoesNotExist:
             return error_response(
@@ -1159,7 +1115,7 @@ class VendorReportExportView(APIView):
         
         visits_data = [
             ('إجمالي الزيارات', str(data.get('total_visits', 0))),
-            ('التغيير من الأسبوع الماضي', f'{data.get("total_visits_change", 0):.1f}%'),
+            ('التغيير من الشهر الماضي', f'{data.get("total_visits_change", 0):.1f}%'),
             ('زيارات اليوم', str(data.get('today_visits', 0))),
         ]
         
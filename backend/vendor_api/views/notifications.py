@@ -31,6 +31,7 @@ from notifications.serializers import (
 )
 from core.utils import success_response, error_response
 from users.models import VendorUser
+from users.principal import get_vendor_user
 
 
 # =============================================================================
@@ -103,7 +104,7 @@ class VendorNotificationListView(APIView):
         # Get vendor user
         # الحصول على مستخدم البائع
         try:
-            vendor_user = VendorUser.objects.select_related('vendor').get(user=request.user)
+            vendor_user = get_vendor_user(request)
             vendor = vendor_user.vendor
         except VendorUser.DoesNotExist:
             return error_response(
@@ -225,7 +226,7 @@ class VendorUnreadCountView(APIView):
         # Get vendor user
         # الحصول على مستخدم البائع
         try:
-            vendor_user = VendorUser.objects.select_related('vendor').get(user=request.user)
+            vendor_user = get_vendor_user(request)
             vendor = vendor_user.vendor
         except VendorUser.DoesNotExist:
             return error_response(
@@ -280,7 +281,7 @@ class VendorMarkAsReadView(APIView):
         # Get vendor user
         # الحصول على مستخدم البائع
         try:
-            vendor_user = VendorUser.objects.select_related('vendor').get(user=request.user)
+            vendor_user = get_vendor_user(request)
             vendor = vendor_user.vendor
         except VendorUser.DoesNotExist:
             return error_response(
@@ -346,7 +347,7 @@ class VendorMarkMultipleAsReadView(APIView):
         # Get vendor user
         # الحصول على مستخدم البائع
         try:
-            vendor_user = VendorUser.objects.select_related('vendor').get(user=request.user)
+            vendor_user = get_vendor_user(request)
             vendor = vendor_user.vendor
         except VendorUser.DoesNotExist:
             return error_response(
@@ -420,7 +421,7 @@ class VendorMarkAllAsReadView(APIView):
         # Get vendor user
         # الحصول على مستخدم البائع
         try:
-            vendor_user = VendorUser.objects.select_related('vendor').get(user=request.user)
+            vendor_user = get_vendor_user(request)
             vendor = vendor_user.vendor
         except VendorUser.DoesNotExist:
             return error_response(
@@ -482,7 +483,7 @@ class VendorNotificationStatsView(APIView):
         # Get vendor user
         # الحصول على مستخدم البائع
         try:
-            vendor_user = VendorUser.objects.select_related('vendor').get(user=request.user)
+            vendor_user = get_vendor_user(request)
             vendor = vendor_user.vendor
         except VendorUser.DoesNotExist:
             return error_response(
@@ -38,6 +38,7 @@ from vendor_api.serializers.orders import (
 )
 from orders.models import Order, OrderItem
 from users.models import VendorUser
+from users.principal import get_vendor_user
 from core.utils import success_response, error_response
 from core.pagination import StandardResultsSetPagination
 import hashlib
@@ -130,7 +131,7 @@ class VendorOrderListView(APIView):
         # Get vendor associated with the authenticated user
         # الحصول على البائع المرتبط بالمستخدم المسجل
         try:
-            vendor_user = VendorUser.objects.select_related('vendor').get(user=request.user)
+            vendor_user = get_vendor_user(request)
             vendor = vendor_user.vendor
         except VendorUser.DoesNotExist:
             return error_response(
@@ -351,7 +352,7 @@ class VendorOrderDetailView(APIView):
         # Get vendor associated with the authenticated user
         # الحصول على البائع المرتبط بالمستخدم المسجل
         try:
-            vendor_user = VendorUser.objects.select_related('vendor').get(user=request.user)
+            vendor_user = get_vendor_user(request)
             vendor = vendor_user.vendor
         except VendorUser.DoesNotExist:
             return error_response(
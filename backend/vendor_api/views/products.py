@@ -38,8 +38,15 @@ from vendor_api.serializers.products import (
     VendorProductVariantStockUpdateSerializer,
     VendorProductVariantCreateSerializer,
 )
-from products.models import Product, ProductImage, ProductVariant
+from products.models import Product, ProductImage, ProductVariant, CatalogImportJob
+from products.serializers import (
+    CatalogImportJobSerializer,
+    CatalogImportJobListSerializer,
+    CatalogImportUploadSerializer,
+)
+from products.catalog_import import start_import_job
 from users.models import VendorUser
+from users.principal import get_vendor_user
 from core.utils import success_response, error_response
 from core.pagination import StandardResultsSetPagination
 
@@ -51,16 +58,15 @@ logger = logging.getLogger(__name__)
 # دوال مساعدة
 # =============================================================================
 
-def get_vendor_from_user(user):
+def get_vendor_from_request(request):
     """
-    Get vendor associated with user.
+    Get vendor associated with the authenticated user (resolved once per request).
     Raises VendorUser.DoesNotExist if not found.
     
-    الحصول على البائع المرتبط بالمستخدم.
+    الحصول على البائع المرتبط بالمستخدم المسجل (يُحل مرة واحدة لكل طلب).
     يرفع VendorUser.DoesNotExist إذا لم يوجد.
     """
-    vendor_user = VendorUser.objects.select_related('vendor').get(user=user)
-    return vendor_user.vendor
+    return get_vendor_user(request).vendor
 
 
 # =============================================================================
@@ -110,7 +116,7 @@ class VendorProductListCreateView(APIView):
         عرض جميع منتجات البائع المسجل.
         """
         try:
-            vendor = get_vendor_from_user(request.user)
+            vendor = get_vendor_from_request(request)
         except VendorUser.DoesNotExist:
             return error_response(
                 message=_('لا يوجد بائع مرتبط بهذا المستخدم / No vendor associated with this user'),
@@ -231,7 +237,7 @@ class VendorProductListCreateView(APIView):
         try:
             # Get vendor from session (security)
             # الحصول على البائع من الجلسة (أمان)
-            vendor = get_vendor_from_user(request.user)
+            vendor = get_vendor_from_request(request)
         except VendorUser.DoesNotExist:
             return error_response(
                 message=_('لا يوجد بائع مرتبط بهذا المستخدم / No vendor associated with this user'),
@@ -334,7 +340,7 @@ class VendorProductDetailView(APIView):
         الحصول على تفاصيل المنتج.
         """
         try:
-            vendor = get_vendor_from_user(request.user)
+            vendor = get_vendor_from_request(request)
         except VendorUser.DoesNotExist:
             return error_response(
                 message=_('لا يوجد بائع مرتبط بهذا المستخدم / No vendor associated with this user'),
@@ -374,7 +380,7 @@ class VendorProductDetailView(APIView):
         vendor_id لا يمكن تغييره (أمان).
         """
         try:
-            vendor = get_vendor_from_user(request.user)
+            vendor = get_vendor_from_request(request)
         except VendorUser.DoesNotExist:
             return error_response(
                 message=_('لا يوجد بائع مرتبط بهذا المستخدم / No vendor associated with this user'),
@@ -433,7 +439,7 @@ class VendorProductDetailView(APIView):
         CASCADE سيحذف المتغيرات والصور.
         """
         try:
-            vendor = get_vendor_from_user(request.user)
+            vendor = get_vendor_from_request(request)
         except VendorUser.DoesNotExist:
             return error_response(
                 message=_('لا يوجد بائع مرتبط بهذا المستخدم / No vendor associated with this user'),
@@ -517,7 +523,7 @@ class VendorProductVariantStockUpdateView(APIView):
         تحديث كميات المخزون لعدة متغيرات.
         """
         try:
-            vendor = get_vendor_from_user(request.user)
+            vendor = get_vendor_from_request(request)
         except VendorUser.DoesNotExist:
             return error_response(
                 message=_('لا يوجد بائع مرتبط بهذا المستخدم / No vendor associated with this user'),
@@ -650,7 +656,7 @@ class VendorProductVariantCreateView(APIView):
         إنشاء متغير جديد للمنتج.
         """
         try:
-            vendor = get_vendor_from_user(request.user)
+            vendor = get_vendor_from_request(request)
         except VendorUser.DoesNotExist:
             return error_response(
                 message=_('لا يوجد بائع مرتبط بهذا المستخدم / No vendor associated with this user'),
@@ -709,3 +715,151 @@ class VendorProductVariantCreateView(APIView):
                 message=_('حدث خطأ أثناء إنشاء المتغير / Error occurred while creating variant'),
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+
+
+# =============================================================================
+# Catalog Import Views
+# عروض استيراد الكتالوج
+# =============================================================================
+
+class VendorCatalogImportView(APIView):
+    """
+    Upload a CSV/JSONL catalog file or list previous import jobs.
+    رفع ملف كتالوج CSV/JSONL أو عرض مهام الاستيراد السابقة.
+    
+    The file is processed in the background; poll the job detail endpoint
+    for progress and per-row errors.
+    
+    يُعالج الملف في الخلفية؛ استعلم نقطة تفاصيل المهمة
+    لمعرفة التقدم وأخطاء الصفوف.
+    """
+    
+    permission_classes = [IsVendorUser, IsVendorOwner]
+    throttle_classes = [VendorUserRateThrottle]
+    parser_classes = [MultiPartParser, FormParser]
+    
+    @extend_schema(
+        summary='List Catalog Imports',
+        description='List catalog import jobs for the authenticated vendor',
+        parameters=[
+            OpenApiParameter(name='page', type=int, description='Page number'),
+            OpenApiParameter(name='page_size', type=int, description='Items per page (max 100)'),
+        ],
+        responses={200: CatalogImportJobListSerializer(many=True)},
+        tags=['Vendor Products'],
+    )
+    def get(self, request):
+        """
+        List import jobs for the authenticated vendor.
+        عرض مهام الاستيراد للبائع المسجل.
+        """
+        try:
+            vendor = get_vendor_from_request(request)
+        except VendorUser.DoesNotExist:
+            return error_response(
+                message=_('لا يوجد بائع مرتبط بهذا المستخدم / No vendor associated with this user'),
+                status_code=status.HTTP_404_NOT_FOUND
+            )
+        
+        queryset = CatalogImportJob.objects.select_related('vendor').filter(
+            vendor=vendor  # Vendor isolation (security)
+        ).order_by('-created_at')
+        
+        paginator = StandardResultsSetPagination()
+        page = paginator.paginate_queryset(queryset, request)
+        serializer = CatalogImportJobListSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+    
+    @extend_schema(
+        summary='Upload Catalog Import',
+        description='Upload a CSV or JSONL file; one row per variant, rows with the same product_name form one product',
+        request=CatalogImportUploadSerializer,
+        responses={
+            202: CatalogImportJobSerializer,
+            400: OpenApiResponse(description='Validation error'),
+        },
+        tags=['Vendor Products'],
+    )
+    def post(self, request):
+        """
+        Create an import job for the authenticated vendor.
+        vendor_id is set automatically from session (security).
+        
+        إنشاء مهمة استيراد للبائع المسجل.
+        vendor_id يُضاف تلقائياً من الجلسة (أمان).
+        """
+        try:
+            vendor = get_vendor_from_request(request)
+        except VendorUser.DoesNotExist:
+            return error_response(
+                message=_('لا يوجد بائع مرتبط بهذا المستخدم / No vendor associated with this user'),
+                status_code=status.HTTP_404_NOT_FOUND
+            )
+        
+        serializer = CatalogImportUploadSerializer(data=request.data)
+        if not serializer.is_valid():
+            return error_response(
+                message=_('بيانات غير صالحة / Invalid data'),
+                errors=serializer.errors,
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
+        
+        with transaction.atomic():
+            job = CatalogImportJob.objects.create(
+                vendor=vendor,  # vendor_id from session (security)
+                uploaded_by=request.user,
+                file=serializer.validated_data['file'],
+                file_format=serializer.validated_data['file_format'],
+            )
+            start_import_job(job)
+        
+        return success_response(
+            data=CatalogImportJobSerializer(job).data,
+            message=_('تم استلام ملف الاستيراد وجاري معالجته / Import file received and queued for processing'),
+            status_code=status.HTTP_202_ACCEPTED
+        )
+
+
+class VendorCatalogImportDetailView(APIView):
+    """
+    Get status, progress and per-row errors of an import job.
+    الحصول على حالة وتقدم وأخطاء صفوف مهمة الاستيراد.
+    """
+    
+    permission_classes = [IsVendorUser, IsVendorOwner]
+    throttle_classes = [VendorUserRateThrottle]
+    
+    @extend_schema(
+        summary='Get Catalog Import Status',
+        description='Get progress and per-row errors of an import job (must belong to authenticated vendor)',
+        responses={
+            200: CatalogImportJobSerializer,
+            404: OpenApiResponse(description='Import job not found or not owned by vendor'),
+        },
+        tags=['Vendor Products'],
+    )
+    def get(self, request, pk):
+        """
+        Get import job status.
+        الحصول على حالة مهمة الاستيراد.
+        """
+        try:
+            vendor = get_vendor_from_request(request)
+        except VendorUser.DoesNotExist:
+            return error_response(
+                message=_('لا يوجد بائع مرتبط بهذا المستخدم / No vendor associated with this user'),
+                status_code=status.HTTP_404_NOT_FOUND
+            )
+        
+        try:
+            job = CatalogImportJob.objects.select_related('vendor').get(
+                pk=pk,
+                vendor=vendor  # Ownership verification (security)
+            )
+        except CatalogImportJob.DoesNotExist:
+            return error_response(
+                message=_('مهمة الاستيراد غير موجودة / Import job not found'),
+                status_code=status.HTTP_404_NOT_FOUND
+            )
+        
+        return success_response(data=CatalogImportJobSerializer(job).data)
@@ -53,6 +53,7 @@ from vendor_api.serializers.settings import (
 )
 from core.utils import success_response, error_response
 from users.models import VendorUser, UserProfile
+from users.principal import get_vendor_user
 from vendors.models import VendorSettings
 
 User = get_user_model()
@@ -69,7 +70,7 @@ def get_vendor_from_request(request):
     الحصول على البائع المرتبط بالمستخدم المسجل.
     """
     try:
-        vendor_user = VendorUser.objects.select_related('vendor', 'user').get(user=request.user)
+        vendor_user = get_vendor_user(request)
         return vendor_user.vendor, vendor_user
     except VendorUser.DoesNotExist:
         return None, None
@@ -609,6 +610,7 @@ class VendorStoreSettingsView(APIView):
             'default_order_status': settings.default_order_status,
             'stock_alert_threshold': settings.stock_alert_threshold,
             'auto_archive_orders_after_days': settings.auto_archive_orders_after_days,
+            'timezone': settings.timezone,
         }
         
         return success_response(data=data)
@@ -653,6 +655,8 @@ class VendorStoreSettingsView(APIView):
             settings.stock_alert_threshold = serializer.validated_data['stock_alert_threshold']
         if 'auto_archive_orders_after_days' in serializer.validated_data:
             settings.auto_archive_orders_after_days = serializer.validated_data['auto_archive_orders_after_days']
+        if 'timezone' in serializer.validated_data:
+            settings.timezone = serializer.validated_data['timezone']
         
         settings.save()
         
@@ -664,6 +668,7 @@ class VendorStoreSettingsView(APIView):
             'default_order_status': settings.default_order_status,
             'stock_alert_threshold': settings.stock_alert_threshold,
             'auto_archive_orders_after_days': settings.auto_archive_orders_after_days,
+            'timezone': settings.timezone,
         }
         
         return success_response(
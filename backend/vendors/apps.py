@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class VendorsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'vendors'
+
+    def ready(self):
+        """
+        Generate logo derivatives on upload
+        إنشاء مشتقات الشعار عند الرفع
+        """
+        from core.images import register_image_field
+        register_image_field(self.get_model('Vendor'), 'logo')
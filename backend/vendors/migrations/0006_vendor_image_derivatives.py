@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-19 02:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendors', '0005_vendorsettings'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vendor',
+            name='image_derivatives',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Auto-generated resized copies (core.images)', verbose_name='مشتقات الشعار / Logo Derivatives'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.0 on 2026-10-19 03:03
+
+import vendors.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vendors', '0006_vendor_image_derivatives'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vendorsettings',
+            name='timezone',
+            field=models.CharField(default=vendors.models.default_store_timezone, help_text='المنطقة الزمنية للمتجر (IANA) المستخدمة في التحليلات', max_length=64, verbose_name='المنطقة الزمنية / Timezone'),
+        ),
+    ]
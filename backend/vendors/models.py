@@ -13,6 +13,9 @@ Author: Yalla Buy Team
 """
 
 from decimal import Decimal
+from functools import partial
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
 from django.db import models
 from django.db import transaction
 from django.db.models import Q
@@ -21,6 +24,8 @@ from django.utils.text import slugify
 from django.utils.translation import gettext_lazy as _
 from django.conf import settings
 
+from core.identifiers import save_with_unique_value
+
 
 # =============================================================================
 # Vendor Model
@@ -60,6 +65,13 @@ class Vendor(models.Model):
         blank=True,
         verbose_name=_('الشعار / Logo')
     )
+    image_derivatives = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name=_('مشتقات الشعار / Logo Derivatives'),
+        help_text=_('Auto-generated resized copies (core.images)')
+    )
     description = models.TextField(
         blank=True,
         verbose_name=_('الوصف / Description')
@@ -115,15 +127,16 @@ class Vendor(models.Model):
     
     def save(self, *args, **kwargs):
         """Generate unique slug from name if not provided"""
-        if not self.slug:
-            base = slugify(self.name)
-            slug = base
-            i = 2
-            while Vendor.objects.filter(slug=slug).exclude(pk=self.pk).exists():
-                slug = f"{base}-{i}"
-                i += 1
-            self.slug = slug
-        super().save(*args, **kwargs)
+        if self.slug:
+            super().save(*args, **kwargs)
+            return
+        save_with_unique_value(
+            self, 'slug', slugify(self.name),
+            queryset=Vendor.objects.exclude(pk=self.pk),
+            save=partial(super().save, *args, **kwargs),
+            max_length=self._meta.get_field('slug').max_length,
+            fallback='vendor',
+        )
     
     def __str__(self):
         return self.name
@@ -573,6 +586,11 @@ class VendorApplication(models.Model):
 # نموذج إعدادات البائع
 # =============================================================================
 
+def default_store_timezone():
+    """Default store timezone (project TIME_ZONE) / المنطقة الزمنية الافتراضية"""
+    return settings.TIME_ZONE
+
+
 class VendorSettings(models.Model):
     """
     Vendor settings including notification preferences and store settings.
@@ -596,6 +614,7 @@ class VendorSettings(models.Model):
             - default_order_status: حالة الطلب الافتراضية
             - stock_alert_threshold: حد تنبيه المخزون
             - auto_archive_orders_after_days: أرشفة الطلبات تلقائياً بعد (أيام)
+            - timezone: المنطقة الزمنية للمتجر (تُستخدم في التحليلات)
     """
     
     # One-to-one relationship with Vendor
@@ -693,6 +712,15 @@ class VendorSettings(models.Model):
         help_text=_('عدد الأيام بعدها يتم أرشفة الطلبات تلقائياً (اتركه فارغاً لتعطيل الأرشفة التلقائية)')
     )
     
+    # IANA name (e.g. 'Asia/Damascus'); analytics bucket hours/days in this zone
+    # اسم IANA (مثل 'Asia/Damascus')؛ التحليلات تجمّع الساعات/الأيام بهذه المنطقة
+    timezone = models.CharField(
+        max_length=64,
+        default=default_store_timezone,
+        verbose_name=_('المنطقة الزمنية / Timezone'),
+        help_text=_('المنطقة الزمنية للمتجر (IANA) المستخدمة في التحليلات')
+    )
+    
     # ==========================================================================
     # Timestamps
     # الطوابع الزمنية
@@ -731,4 +759,14 @@ class VendorSettings(models.Model):
             VendorSettings: Settings instance
         """
         settings, created = cls.objects.get_or_create(vendor=vendor)
-        return settings
\ No newline at end of file
+        return settings
+    
+    def get_timezone(self):
+        """
+        Store timezone as a tzinfo (falls back to settings.TIME_ZONE).
+        المنطقة الزمنية للمتجر ككائن tzinfo (الافتراضي settings.TIME_ZONE).
+        """
+        try:
+            return ZoneInfo(self.timezone)
+        except (ZoneInfoNotFoundError, ValueError, TypeError):
+            return ZoneInfo(settings.TIME_ZONE)